@@ -1,16 +1,38 @@
 """Admin API routes for ExaPlay raw command execution.
 
-Implements the raw command endpoint for debugging and advanced usage.
-Includes rate limiting and enhanced logging for security.
+Implements the raw command and batch endpoints for debugging and advanced
+usage, plus upstream statistics for monitoring. Includes rate limiting and
+enhanced logging for security.
 """
 
+from typing import Any, Dict
+
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 
-from app.deps import check_admin_rate_limit, get_authenticated_request
-from app.exaplay.models import CommandRequest, ErrorResponse, GenericReply
+from app.deps import check_admin_rate_limit, get_authenticated_request, rate_limiter_stats
+from app.exaplay.admission import admission_controllers
+from app.exaplay.osc_listener import osc_broadcaster
+from app.exaplay.breaker import circuit_breakers
+from app.exaplay.coalescer import write_coalescer
+from app.exaplay.fader import fade_engine
+from app.exaplay.fleet import get_host_registry, route_command
+from app.exaplay.macros import get_macro_registry
+from app.exaplay.models import (
+    BatchItemResult,
+    BatchRequest,
+    BatchResponse,
+    CommandRequest,
+    ErrorResponse,
+    GenericReply,
+)
+from app.exaplay.multiplexer import multiplexers
+from app.exaplay.poller import status_poller
+from app.exaplay.pool import connection_pools
+from app.exaplay.read_cache import read_cache
+from app.exaplay.rtt import rtt_estimators
+from app.exaplay.scheduler import command_scheduler
 from app.exaplay.tcp_client import (
     ExaPlayError,
-    send_exaplay_command,
 )
 from app.logging import PerformanceTimer, get_logger, get_trace_id
 
@@ -52,6 +74,7 @@ router = APIRouter(
         422: {"description": "ExaPlay returned ERR / cannot process command"},
         429: {"description": "Rate limit exceeded"},
         502: {"description": "Upstream (TCP) error or malformed response from ExaPlay"},
+        503: {"description": "ExaPlay host unavailable (circuit breaker open, see Retry-After)"},
         504: {"description": "Upstream TCP timeout while talking to ExaPlay"}
     }
 )
@@ -110,7 +133,7 @@ async def send_raw_command(
     
     try:
         with PerformanceTimer("raw_command", logger, command_type=command.split(",")[0]):
-            reply = await send_exaplay_command(command)
+            reply = await route_command(command)
         
         logger.info(
             "Raw command successful",
@@ -129,3 +152,323 @@ async def send_raw_command(
             client_ip=req.client.host if req.client else "unknown"
         )
         raise map_exaplay_error_to_http(e)
+
+
+@router.post(
+    "/batch",
+    response_model=BatchResponse,
+    summary="Send an ordered batch of commands in one upstream round trip",
+    description="""Accepts raw command strings and typed operations (play/pause/stop/seek/vol).
+
+By default all commands are written to ExaPlay in a single pipelined burst and every
+command is executed; per-item replies, errors and latencies are returned. With
+`stopOnError=true` commands are sent one after another and the batch stops at the
+first ERR or transport failure, marking the remaining items as skipped.""",
+    dependencies=[Depends(check_admin_rate_limit)],
+    responses={
+        200: {"description": "Per-item results (individual items may have failed)"},
+        400: {"description": "Bad request (validation failure)"},
+        429: {"description": "Rate limit exceeded"},
+        502: {"description": "Upstream (TCP) error before any reply was received"},
+        503: {"description": "ExaPlay host unavailable (circuit breaker open, see Retry-After)"},
+        504: {"description": "Upstream TCP timeout before any reply was received"}
+    }
+)
+async def send_batch(
+    request: BatchRequest,
+    req: Request
+) -> BatchResponse:
+    """Send several commands to ExaPlay as one batch.
+    
+    Replaces a sequence of individual HTTP calls (e.g. a scene change)
+    with a single request and a single upstream burst.
+    
+    Args:
+        request: Ordered commands and error-handling mode
+        req: FastAPI request object for logging/rate limiting
+        
+    Returns:
+        BatchResponse: Per-item results in request order
+        
+    Raises:
+        HTTPException: If ExaPlay could not be reached at all
+    """
+    commands = [
+        item.strip() if isinstance(item, str) else item.to_command()
+        for item in request.commands
+    ]
+    
+    # Audit trail, mirroring the raw command endpoint
+    logger.warning(
+        "Batch admin command executed",
+        command_count=len(commands),
+        command_types=sorted({command.split(",")[0] for command in commands}),
+        stop_on_error=request.stopOnError,
+        client_ip=req.client.host if req.client else "unknown"
+    )
+    
+    try:
+        with PerformanceTimer("batch_command", logger, command_count=len(commands)) as timer:
+            outcomes = await get_host_registry().send_pipeline(
+                commands,
+                stop_on_error=request.stopOnError
+            )
+    except ExaPlayError as e:
+        logger.error(
+            "Batch command failed",
+            command_count=len(commands),
+            error=str(e),
+            client_ip=req.client.host if req.client else "unknown"
+        )
+        raise map_exaplay_error_to_http(e)
+    
+    results = [
+        BatchItemResult(
+            index=index,
+            sent=outcome.command,
+            status="ok" if outcome.error is None else "error",
+            reply=outcome.reply,
+            error=str(outcome.error) if outcome.error is not None else None,
+            latencyMs=round(outcome.latency * 1000, 3)
+        )
+        for index, outcome in enumerate(outcomes)
+    ]
+    results.extend(
+        BatchItemResult(index=index, sent=commands[index], status="skipped")
+        for index in range(len(outcomes), len(commands))
+    )
+    
+    failed = sum(1 for result in results if result.status == "error")
+    skipped = len(commands) - len(outcomes)
+    
+    logger.info(
+        "Batch command completed",
+        command_count=len(commands),
+        failed=failed,
+        skipped=skipped
+    )
+    
+    return BatchResponse(
+        results=results,
+        succeeded=len(outcomes) - failed,
+        failed=failed,
+        skipped=skipped,
+        totalLatencyMs=round(timer.elapsed_ms, 3)
+    )
+
+
+@router.get(
+    "/stats",
+    summary="Upstream connection statistics",
+    description="Returns per-host request/error counters and latency, connection pool size, waiters and checkout latency, multiplexer activity, circuit breaker state, read cache hit/miss/coalesced counters, status poller activity, write coalescing counters, volume fade steps and tick jitter, the scheduler's fire error histogram, macro runs, each host's RTT estimate and adaptive reply timeout, and admission queue depth and wait per priority, tracked clients and rejections per rate limiter, and OSC datagrams received per event loop wakeup",
+    responses={
+        200: {
+            "description": "Upstream statistics",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "hosts": {
+                            "default": {
+                                "address": "192.168.1.174:7000",
+                                "default": True,
+                                "compositions": [],
+                                "requests": 120,
+                                "errors": 1,
+                                "timeouts": 1,
+                                "connection_errors": 0,
+                                "protocol_errors": 0,
+                                "latency_ms": {"avg": 1.8, "max": 5012.4, "last": 1.2},
+                                "last_error": "Command timeout after 5.0s",
+                                "last_error_at": 1760000000.0
+                            }
+                        },
+                        "pools": {
+                            "192.168.1.174:7000": {
+                                "size": 2,
+                                "idle": 1,
+                                "in_use": 1,
+                                "waiters": 0,
+                                "checkout_ms": {"avg": 0.05, "max": 3.1, "last": 0.02},
+                                "keepalive": {
+                                    "probes": 42,
+                                    "failures": 0,
+                                    "last_ok": True,
+                                    "last_rtt_ms": 0.8,
+                                    "last_age_s": 4.2,
+                                    "last_error": None
+                                }
+                            }
+                        },
+                        "multiplexers": {},
+                        "breakers": {
+                            "192.168.1.174:7000": {
+                                "state": "closed",
+                                "consecutive_failures": 0,
+                                "failure_threshold": 5,
+                                "retry_after": 0,
+                                "opened": 1,
+                                "rejected": 42,
+                                "probes": 2
+                            }
+                        },
+                        "cache": {
+                            "entries": 31,
+                            "inflight": 0,
+                            "invalidations": 12,
+                            "commands": {
+                                "get:status": {"ttl": 0.2, "hits": 9120, "misses": 1410, "coalesced": 2210},
+                                "get:vol": {"ttl": 1.0, "hits": 2950, "misses": 120, "coalesced": 40},
+                                "get:ver": {"ttl": 60.0, "hits": 310, "misses": 2, "coalesced": 0}
+                            }
+                        },
+                        "poller": {
+                            "running": True,
+                            "compositions": 30,
+                            "playing": 4,
+                            "polls": 5120,
+                            "commands": 9870,
+                            "errors": 0,
+                            "last_poll_ms": 2.4,
+                            "oldest_status_s": 4.9
+                        },
+                        "writes": {
+                            "inflight": 0,
+                            "parameters": {
+                                "vol": {"submitted": 840, "sent": 212, "coalesced": 628}
+                            }
+                        },
+                        "fades": {
+                            "active": 1,
+                            "started": 14,
+                            "completed": 11,
+                            "cancelled": 2,
+                            "failed": 0,
+                            "steps_sent": 1180,
+                            "steps_dropped": 3,
+                            "jitter_avg_ms": 0.9,
+                            "jitter_max_ms": 6.2
+                        },
+                        "schedule": {
+                            "running": True,
+                            "pending": 3,
+                            "fired": 57,
+                            "cancelled": 1,
+                            "failed_commands": 0,
+                            "fire_error_ms": {
+                                "avg": 0.06,
+                                "max": 0.41,
+                                "buckets": {
+                                    "0.1": 52, "0.25": 56, "0.5": 57, "1": 57, "2.5": 57, "5": 57,
+                                    "10": 57, "25": 57, "50": 57, "100": 57, "250": 57, "1000": 57, "+Inf": 57
+                                }
+                            }
+                        },
+                        "macros": {
+                            "registered": 4,
+                            "running": 0,
+                            "runs": 31,
+                            "completed": 30,
+                            "aborted": 1,
+                            "cancelled": 0
+                        },
+                        "rtt": {
+                            "192.168.1.174:7000": {
+                                "samples": 1532,
+                                "srtt_ms": 3.1,
+                                "rttvar_ms": 0.9,
+                                "timeout_ms": 250.0,
+                                "backoff": 1,
+                                "timeouts": 2,
+                                "last_ms": 2.8,
+                                "max_ms": 41.7,
+                                "min_timeout_ms": 250.0,
+                                "max_timeout_ms": 5000.0
+                            }
+                        },
+                        "admission": {
+                            "192.168.1.174:7000": {
+                                "inflight": 8,
+                                "max_inflight": 8,
+                                "service_ms": 3.4,
+                                "priorities": {
+                                    "critical": {
+                                        "queued": 0,
+                                        "admitted": 812,
+                                        "shed": 0,
+                                        "wait_budget_ms": None,
+                                        "wait_ms": {"avg": 0.02, "max": 6.1, "last": 0.0}
+                                    },
+                                    "normal": {
+                                        "queued": 1,
+                                        "admitted": 2405,
+                                        "shed": 0,
+                                        "wait_budget_ms": 1000.0,
+                                        "wait_ms": {"avg": 0.4, "max": 21.7, "last": 1.2}
+                                    },
+                                    "bulk": {
+                                        "queued": 5,
+                                        "admitted": 9133,
+                                        "shed": 17,
+                                        "wait_budget_ms": 250.0,
+                                        "wait_ms": {"avg": 2.1, "max": 250.0, "last": 14.9}
+                                    }
+                                }
+                            }
+                        },
+                        "rate_limits": {
+                            "admin": {
+                                "max_requests": 60,
+                                "window_seconds": 60,
+                                "tracked_keys": 3,
+                                "max_keys": 10000,
+                                "evicted": 0,
+                                "rejected": 4
+                            }
+                        },
+                        "osc": {
+                            "running": True,
+                            "datagrams": 184220,
+                            "wakeups": 20311,
+                            "datagrams_per_wakeup": 9.07,
+                            "clients": 3,
+                            "delta_clients": 1,
+                            "state": {"compositions": 12, "updates": 184220, "unchanged": 1840, "events": 61020},
+                            "ring": {
+                                "capacity": 4096,
+                                "next_id": 61021,
+                                "compositions": 12,
+                                "conflations": 2,
+                                "coalesced": 5310,
+                                "resumes": 5,
+                                "subscribed_topics": 3
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+)
+async def get_upstream_stats() -> Dict[str, Any]:
+    """Report statistics about upstream ExaPlay connections.
+    
+    Returns:
+        Dict: Per-host routing counters, connection pool, multiplexer, circuit breaker, read cache, poller,
+        write coalescing, fade, schedule, macro, RTT estimator, admission, rate limiter and OSC statistics
+    """
+    return {
+        "hosts": get_host_registry().stats(),
+        "pools": connection_pools.stats(),
+        "multiplexers": multiplexers.stats(),
+        "breakers": circuit_breakers.stats(),
+        "cache": read_cache.stats(),
+        "poller": status_poller.stats(),
+        "writes": write_coalescer.stats(),
+        "fades": fade_engine.stats(),
+        "schedule": command_scheduler.stats(),
+        "macros": get_macro_registry().stats(),
+        "rtt": rtt_estimators.stats(),
+        "admission": admission_controllers.stats(),
+        "rate_limits": rate_limiter_stats(),
+        "osc": osc_broadcaster.stats(),
+    }
@@ -7,23 +7,32 @@ All routes require authentication and translate to ExaPlay TCP commands.
 from fastapi import APIRouter, Depends, HTTPException, Path, status
 from typing_extensions import Annotated
 
-from app.deps import get_authenticated_request
+from app.deps import get_authenticated_request, rate_limit, request_deadline, request_priority
+from app.exaplay.admission import Priority
+from app.exaplay.fleet import route_command
 from app.exaplay.models import ErrorResponse, GenericReply
 from app.exaplay.tcp_client import (
+    ExaPlayCircuitOpenError,
     ExaPlayConnectionError,
+    ExaPlayDeadlineError,
     ExaPlayError,
+    ExaPlayOverloadedError,
     ExaPlayProtocolError,
     ExaPlayTimeoutError,
-    send_exaplay_command,
 )
 from app.logging import PerformanceTimer, get_logger, get_trace_id
+from app.settings import settings
 
 logger = get_logger(__name__)
 
 router = APIRouter(
     prefix="/compositions",
     tags=["Control"],
-    dependencies=get_authenticated_request()
+    dependencies=get_authenticated_request() + [
+        rate_limit("control"),
+        request_deadline(settings.control_request_timeout),
+        request_priority(Priority.CRITICAL)
+    ]
 )
 
 
@@ -38,7 +47,36 @@ def map_exaplay_error_to_http(error: ExaPlayError) -> HTTPException:
     """
     trace_id = get_trace_id()
     
-    if isinstance(error, ExaPlayTimeoutError):
+    if isinstance(error, ExaPlayCircuitOpenError):
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=ErrorResponse(
+                error=f"Upstream unavailable: {str(error)}",
+                command=error.command,
+                traceId=trace_id
+            ).model_dump(),
+            headers={"Retry-After": str(error.retry_after)}
+        )
+    elif isinstance(error, ExaPlayOverloadedError):
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=ErrorResponse(
+                error=f"Upstream busy: {str(error)}",
+                command=error.command,
+                traceId=trace_id
+            ).model_dump(),
+            headers={"Retry-After": str(error.retry_after)}
+        )
+    elif isinstance(error, ExaPlayDeadlineError):
+        return HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=ErrorResponse(
+                error="Request deadline exceeded",
+                command=error.command,
+                traceId=trace_id
+            ).model_dump()
+        )
+    elif isinstance(error, ExaPlayTimeoutError):
         return HTTPException(
             status_code=status.HTTP_504_GATEWAY_TIMEOUT,
             detail=ErrorResponse(
@@ -93,6 +131,7 @@ def map_exaplay_error_to_http(error: ExaPlayError) -> HTTPException:
         },
         422: {"description": "ExaPlay returned ERR / cannot process command"},
         502: {"description": "Upstream (TCP) error or malformed response from ExaPlay"},
+        503: {"description": "ExaPlay host unavailable (circuit breaker open, see Retry-After)"},
         504: {"description": "Upstream TCP timeout while talking to ExaPlay"}
     }
 )
@@ -118,7 +157,7 @@ async def play_composition(
     
     try:
         with PerformanceTimer("play_composition", logger, composition=name):
-            reply = await send_exaplay_command(command)
+            reply = await route_command(command, composition=name)
         
         logger.info(
             "Play command successful",
@@ -147,6 +186,7 @@ async def play_composition(
         200: {"description": "ExaPlay acknowledged"},
         422: {"description": "ExaPlay returned ERR / cannot process command"},
         502: {"description": "Upstream (TCP) error or malformed response from ExaPlay"},
+        503: {"description": "ExaPlay host unavailable (circuit breaker open, see Retry-After)"},
         504: {"description": "Upstream TCP timeout while talking to ExaPlay"}
     }
 )
@@ -171,7 +211,7 @@ async def pause_composition(
     
     try:
         with PerformanceTimer("pause_composition", logger, composition=name):
-            reply = await send_exaplay_command(command)
+            reply = await route_command(command, composition=name)
         
         logger.info(
             "Pause command successful",
@@ -200,6 +240,7 @@ async def pause_composition(
         200: {"description": "ExaPlay acknowledged"},
         422: {"description": "ExaPlay returned ERR / cannot process command"},
         502: {"description": "Upstream (TCP) error or malformed response from ExaPlay"},
+        503: {"description": "ExaPlay host unavailable (circuit breaker open, see Retry-After)"},
         504: {"description": "Upstream TCP timeout while talking to ExaPlay"}
     }
 )
@@ -224,7 +265,7 @@ async def stop_composition(
     
     try:
         with PerformanceTimer("stop_composition", logger, composition=name):
-            reply = await send_exaplay_command(command)
+            reply = await route_command(command, composition=name)
         
         logger.info(
             "Stop command successful",
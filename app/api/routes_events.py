@@ -1,16 +1,19 @@
 """Events API routes for ExaPlay real-time status streaming.
 
 Implements Server-Sent Events (SSE) endpoint for live status updates
-when OSC is enabled. Provides real-time composition status without polling.
+when OSC is enabled. Provides real-time composition status without polling,
+plus a snapshot of the merged OSC state of every composition.
 """
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, HTTPException, Query, Request, status
 from fastapi.responses import StreamingResponse
-from typing import AsyncGenerator
+from typing import AsyncGenerator, List, Optional, Union
+from typing_extensions import Annotated
 
-from app.deps import get_authenticated_request
-from app.exaplay.osc_listener import osc_broadcaster
-from app.logging import get_logger
+from app.deps import get_authenticated_request, rate_limit
+from app.exaplay.models import ErrorResponse, SSEStatusSnapshot
+from app.exaplay.osc_listener import EVENT_TYPES, osc_broadcaster
+from app.logging import get_logger, get_trace_id
 from app.settings import settings
 
 logger = get_logger(__name__)
@@ -18,7 +21,7 @@ logger = get_logger(__name__)
 router = APIRouter(
     prefix="/events",
     tags=["Events"],
-    dependencies=get_authenticated_request()
+    dependencies=get_authenticated_request() + [rate_limit("events")]
 )
 
 
@@ -27,7 +30,20 @@ router = APIRouter(
     summary="Live status stream (SSE)",
     description="""Optional Server-Sent Events (SSE) stream of ExaPlay status updates.
     
-If enabled, the backend ingests ExaPlay OSC OUT and emits JSON events per composition.
+If enabled, the backend ingests ExaPlay OSC OUT and merges status, cuetime and
+cueframe per composition. Each change emits one `status` event with the full
+state; with `?delta=true` events carry only the composition and the changed
+fields. On connect the current state of every known composition is sent first.
+
+Every event has an `id`. A client reconnecting with `Last-Event-ID` resumes right
+after that event if it is still buffered (SSE_BUFFER_SIZE events); otherwise, and
+for clients too slow to keep up, the latest state of every composition is sent
+in place of the missed events.
+
+`compositions` and `types` (comma-separated) subscribe to just those compositions
+and event types; `max_hz` caps how often updates are sent, each carrying the latest
+state of every composition that changed since the previous one. A display following
+one composition at `max_hz=10` is not sent the other compositions' 60 Hz updates.
 Returns 503 if OSC is not enabled in configuration.""",
     responses={
         200: {
@@ -40,11 +56,13 @@ Returns 503 if OSC is not enabled in configuration.""",
             },
             "content": {
                 "text/event-stream": {
-                    "example": """event: status
+                    "example": """id: 41
+event: status
 data: {"composition":"comp1","status":1,"cuetime":15.6,"cueframe":939}
 
-event: cuetime  
-data: {"composition":"comp1","status":1,"cuetime":16.1,"cueframe":966}
+id: 42
+event: status
+data: {"composition":"comp1","status":1,"cuetime":15.61,"cueframe":940}
 
 : keepalive
 
@@ -52,12 +70,27 @@ data: {"composition":"comp1","status":1,"cuetime":16.1,"cueframe":966}
                 }
             }
         },
+        400: {
+            "description": "Unknown event type"
+        },
         503: {
             "description": "OSC streaming not enabled or not available"
         }
     }
 )
-async def status_stream(request: Request) -> StreamingResponse:
+async def status_stream(
+    request: Request,
+    delta: Annotated[bool, Query(description="Send only the fields that changed in each status event")] = False,
+    compositions: Annotated[
+        Optional[str], Query(description="Comma-separated composition names to follow (default: all)")
+    ] = None,
+    types: Annotated[
+        Optional[str], Query(description=f"Comma-separated event types to follow: {', '.join(EVENT_TYPES)}")
+    ] = None,
+    max_hz: Annotated[
+        float, Query(ge=0, le=1000, description="Most updates per second, coalesced to the latest state (0: no cap)")
+    ] = 0
+) -> StreamingResponse:
     """Stream live ExaPlay status updates via Server-Sent Events.
     
     This endpoint provides a continuous stream of real-time status updates
@@ -65,19 +98,21 @@ async def status_stream(request: Request) -> StreamingResponse:
     live updates without polling.
     
     The stream includes:
-    - status events: Overall playback state changes
-    - cuetime events: Time position updates  
-    - cueframe events: Frame position updates
+    - status events: One merged event per composition change (status, cuetime, cueframe)
     - keepalive comments: Periodic heartbeat to maintain connection
     
     Args:
         request: FastAPI request object for client management
+        delta: Send only the changed fields after the initial full state
+        compositions: Comma-separated compositions to subscribe to
+        types: Comma-separated event types to subscribe to
+        max_hz: Cap on updates per second
         
     Returns:
         StreamingResponse: SSE stream with real-time events
         
     Raises:
-        HTTPException: 503 if OSC is not enabled
+        HTTPException: 400 for unknown event types, 503 if OSC is not enabled
     """
     # Check if OSC is enabled
     if not settings.exaplay_osc_enable:
@@ -97,23 +132,49 @@ async def status_stream(request: Request) -> StreamingResponse:
             }
         )
     
-    # Register client with broadcaster
-    client_queue = osc_broadcaster.add_client()
+    composition_filter = _split(compositions)
+    type_filter = _split(types)
+    unknown_types = [event_type for event_type in type_filter if event_type not in EVENT_TYPES]
+    if unknown_types:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorResponse(
+                error=f"Unknown event types: {', '.join(unknown_types)} (expected {', '.join(EVENT_TYPES)})",
+                traceId=get_trace_id()
+            ).model_dump()
+        )
+    
+    # Register client with broadcaster, resuming after Last-Event-ID if sent
+    try:
+        last_event_id = int(request.headers["last-event-id"])
+    except (KeyError, ValueError):
+        last_event_id = None
+    client = osc_broadcaster.add_client(
+        delta=delta,
+        last_event_id=last_event_id,
+        compositions=composition_filter,
+        event_types=type_filter,
+        max_hz=max_hz
+    )
     
     logger.info(
         "SSE client connected",
         client_ip=request.client.host if request.client else "unknown",
-        total_clients=len(osc_broadcaster._clients)
+        total_clients=len(osc_broadcaster._clients),
+        delta=delta,
+        last_event_id=last_event_id,
+        compositions=len(composition_filter) or None,
+        max_hz=max_hz or None
     )
     
-    async def event_stream() -> AsyncGenerator[str, None]:
+    async def event_stream() -> AsyncGenerator[Union[str, bytes], None]:
         """Generate SSE events for the connected client."""
         try:
             # Send initial connection event
             yield "event: connected\ndata: {\"message\":\"Connected to ExaPlay status stream\"}\n\n"
             
-            # Stream events from the broadcaster
-            async for event_data in osc_broadcaster.get_client_events(client_queue):
+            # Stream events from the broadcaster (current state first, unless resuming)
+            async for event_data in osc_broadcaster.get_client_events(client):
                 yield event_data
                 
         except Exception as e:
@@ -141,6 +202,58 @@ async def status_stream(request: Request) -> StreamingResponse:
     )
 
 
+@router.get(
+    "/state",
+    response_model=List[SSEStatusSnapshot],
+    summary="Live state snapshot",
+    description="""Merged OSC state of every composition ExaPlay has reported, read from memory
+(no TCP round trip). `age` is the time since the last OSC message for the composition.
+Returns 503 if OSC is not enabled in configuration.""",
+    responses={
+        200: {
+            "description": "Merged state per composition",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {"composition": "comp1", "status": 1, "cuetime": 15.6, "cueframe": 939, "age": 0.016}
+                    ]
+                }
+            }
+        },
+        503: {"description": "OSC streaming not enabled or not available"}
+    }
+)
+async def state_snapshot() -> List[SSEStatusSnapshot]:
+    """Get the merged OSC state of every known composition.
+    
+    Returns:
+        List[SSEStatusSnapshot]: State and age per composition, ordered by name
+        
+    Raises:
+        HTTPException: 503 if OSC is not enabled
+    """
+    if not settings.exaplay_osc_enable:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=ErrorResponse(
+                error="OSC streaming not enabled. Set EXAPLAY_OSC_ENABLE=true to enable.",
+                traceId=get_trace_id()
+            ).model_dump()
+        )
+    snapshot = osc_broadcaster.state.snapshot()
+    return [
+        SSEStatusSnapshot(**state.event(), age=round(age, 3))
+        for _, (state, age) in sorted(snapshot.items())
+    ]
+
+
+def _split(value: Optional[str]) -> List[str]:
+    """Split a comma-separated query parameter, dropping blanks and duplicates."""
+    if not value:
+        return []
+    return list(dict.fromkeys(item.strip() for item in value.split(",") if item.strip()))
+
+
 async def _disabled_stream() -> AsyncGenerator[str, None]:
     """Generate a stream indicating OSC is disabled."""
     yield "event: error\n"
@@ -0,0 +1,223 @@
+"""Group control API routes for synchronized playback across compositions.
+
+Implements play, pause, stop and cuetime for named composition groups
+(e.g. the tiles of a video wall), which may live on different ExaPlay
+hosts. Every member's command is released from a single write barrier
+so members start as close together as the network allows.
+All routes require authentication and translate to ExaPlay TCP commands.
+"""
+
+from typing import Callable, Dict, List
+
+from fastapi import APIRouter, HTTPException, Path, status
+from typing_extensions import Annotated
+
+from app.deps import get_authenticated_request, rate_limit, request_priority
+from app.exaplay.admission import Priority
+from app.exaplay.fleet import get_host_registry
+from app.exaplay.models import CuetimeSetRequest, ErrorResponse, GroupCommandResponse, GroupMemberResult
+from app.exaplay.tcp_client import ExaPlayProtocolError
+from app.logging import PerformanceTimer, get_logger, get_trace_id
+
+# Import error mapping from control routes
+from app.api.routes_control import map_exaplay_error_to_http
+
+logger = get_logger(__name__)
+
+router = APIRouter(
+    prefix="/groups",
+    tags=["Groups"],
+    dependencies=get_authenticated_request() + [rate_limit("groups"), request_priority(Priority.CRITICAL)]
+)
+
+GroupName = Annotated[str, Path(description="Composition group name", min_length=1)]
+
+GROUP_RESPONSES = {
+    200: {"description": "Per-member results and dispatch skew (individual members may have failed)"},
+    404: {"description": "Unknown group"},
+    502: {"description": "Upstream (TCP) error on every member"},
+    503: {"description": "Circuit breaker open for every member's host (see Retry-After)"},
+    504: {"description": "Upstream TCP timeout on every member"}
+}
+
+
+def _ms(seconds: float) -> float:
+    """Convert seconds to milliseconds rounded for JSON responses."""
+    return round(seconds * 1000, 3)
+
+
+async def dispatch_group(group: str, command_for: Callable[[str], str]) -> GroupCommandResponse:
+    """Send one command per group member through a synchronized dispatch.
+    
+    Args:
+        group: Group name from the fleet configuration
+        command_for: Builds the raw command for a member composition
+    
+    Returns:
+        GroupCommandResponse: Per-member results and measured skew
+    
+    Raises:
+        HTTPException: 404 for an unknown group, or the mapped upstream
+            error if no member could be reached at all
+    """
+    registry = get_host_registry()
+    members = registry.groups.get(group)
+    if members is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ErrorResponse(
+                error=f"Unknown group: {group}",
+                traceId=get_trace_id()
+            ).model_dump()
+        )
+    
+    commands = [command_for(member) for member in members]
+    
+    with PerformanceTimer("group_command", logger, group=group, members=len(members)):
+        outcomes = await registry.send_synchronized(commands)
+    
+    written = [result.written_at for _, result in outcomes if result.written_at is not None]
+    replied = [result.replied_at for _, result in outcomes if result.replied_at is not None]
+    
+    errors = [result.error for _, result in outcomes if result.error is not None]
+    if len(errors) == len(outcomes) and not any(isinstance(e, ExaPlayProtocolError) for e in errors):
+        logger.error("Group command failed on every member", group=group, error=str(errors[0]))
+        raise map_exaplay_error_to_http(errors[0])
+    
+    first_write = min(written) if written else 0.0
+    results: List[GroupMemberResult] = [
+        GroupMemberResult(
+            composition=member,
+            host=host.name,
+            sent=result.command,
+            status="ok" if result.error is None else "error",
+            reply=result.reply,
+            error=str(result.error) if result.error is not None else None,
+            writeOffsetMs=_ms(result.written_at - first_write) if result.written_at is not None else None,
+            replyOffsetMs=_ms(result.replied_at - first_write) if result.replied_at is not None else None
+        )
+        for member, (host, result) in zip(members, outcomes, strict=True)
+    ]
+    
+    response = GroupCommandResponse(
+        group=group,
+        members=results,
+        succeeded=len(outcomes) - len(errors),
+        failed=len(errors),
+        writeSkewMs=_ms(max(written) - first_write) if written else 0.0,
+        replySkewMs=_ms(max(replied) - min(replied)) if replied else None
+    )
+    
+    logger.info(
+        "Group command completed",
+        group=group,
+        command=commands[0].split(",")[0],
+        failed=response.failed,
+        write_skew_ms=response.writeSkewMs,
+        reply_skew_ms=response.replySkewMs
+    )
+    
+    return response
+
+
+@router.get(
+    "",
+    summary="List composition groups",
+    description="Returns every configured group and its member compositions"
+)
+async def list_groups() -> Dict[str, List[str]]:
+    """List configured composition groups.
+    
+    Returns:
+        Dict: Member compositions keyed by group name
+    """
+    return get_host_registry().groups
+
+
+@router.post(
+    "/{group}/play",
+    response_model=GroupCommandResponse,
+    summary="Play every composition in a group simultaneously",
+    description="Sends `play,{member}` to every member from a single write barrier",
+    responses=GROUP_RESPONSES
+)
+async def play_group(group: GroupName) -> GroupCommandResponse:
+    """Start all members of a group together.
+    
+    Args:
+        group: Name of the group to play
+    
+    Returns:
+        GroupCommandResponse: Per-member replies and dispatch skew
+    
+    Raises:
+        HTTPException: For an unknown group or if no member could be reached
+    """
+    return await dispatch_group(group, lambda member: f"play,{member}")
+
+
+@router.post(
+    "/{group}/pause",
+    response_model=GroupCommandResponse,
+    summary="Pause every composition in a group simultaneously",
+    description="Sends `pause,{member}` to every member from a single write barrier",
+    responses=GROUP_RESPONSES
+)
+async def pause_group(group: GroupName) -> GroupCommandResponse:
+    """Pause all members of a group together.
+    
+    Args:
+        group: Name of the group to pause
+    
+    Returns:
+        GroupCommandResponse: Per-member replies and dispatch skew
+    
+    Raises:
+        HTTPException: For an unknown group or if no member could be reached
+    """
+    return await dispatch_group(group, lambda member: f"pause,{member}")
+
+
+@router.post(
+    "/{group}/stop",
+    response_model=GroupCommandResponse,
+    summary="Stop every composition in a group simultaneously",
+    description="Sends `stop,{member}` to every member from a single write barrier",
+    responses=GROUP_RESPONSES
+)
+async def stop_group(group: GroupName) -> GroupCommandResponse:
+    """Stop all members of a group together.
+    
+    Args:
+        group: Name of the group to stop
+    
+    Returns:
+        GroupCommandResponse: Per-member replies and dispatch skew
+    
+    Raises:
+        HTTPException: For an unknown group or if no member could be reached
+    """
+    return await dispatch_group(group, lambda member: f"stop,{member}")
+
+
+@router.post(
+    "/{group}/cuetime",
+    response_model=GroupCommandResponse,
+    summary="Seek every composition in a group to the same time",
+    description="Sends `set:cuetime,{member},{seconds}` to every member from a single write barrier",
+    responses=GROUP_RESPONSES
+)
+async def set_group_cuetime(group: GroupName, request: CuetimeSetRequest) -> GroupCommandResponse:
+    """Seek all members of a group to the same position.
+    
+    Args:
+        group: Name of the group
+        request: Request containing the target time in seconds
+    
+    Returns:
+        GroupCommandResponse: Per-member replies and dispatch skew
+    
+    Raises:
+        HTTPException: For an unknown group or if no member could be reached
+    """
+    return await dispatch_group(group, lambda member: f"set:cuetime,{member},{request.seconds}")
@@ -0,0 +1,200 @@
+"""Macro API routes for named command sequences run server-side.
+
+Implements registering, listing and removing macros, and running a macro
+while streaming its progress as Server-Sent Events or NDJSON.
+All routes require authentication.
+"""
+
+import json
+from typing import Any, AsyncGenerator, Dict, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Path, Query, Response, status
+from fastapi.responses import StreamingResponse
+from typing_extensions import Annotated, Literal
+
+from app.deps import get_authenticated_request, rate_limit
+from app.exaplay.macros import MacroRun, get_macro_registry
+from app.exaplay.models import ErrorResponse, MacroDefinition
+from app.logging import get_logger, get_trace_id
+
+logger = get_logger(__name__)
+
+router = APIRouter(
+    prefix="/macros",
+    tags=["Macros"],
+    dependencies=get_authenticated_request() + [rate_limit("macros")]
+)
+
+MacroName = Annotated[str, Path(description="Macro name", min_length=1, max_length=100)]
+
+
+def _not_found(name: str) -> HTTPException:
+    """Build the 404 for an unknown macro."""
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=ErrorResponse(error=f"Unknown macro: {name}", traceId=get_trace_id()).model_dump()
+    )
+
+
+async def _sse_stream(run: MacroRun) -> AsyncGenerator[str, None]:
+    """Format a run's events as Server-Sent Events."""
+    async for event in run.events():
+        yield f"event: {event['event']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+
+async def _ndjson_stream(run: MacroRun) -> AsyncGenerator[str, None]:
+    """Format a run's events as newline-delimited JSON."""
+    async for event in run.events():
+        yield json.dumps(event, separators=(",", ":")) + "\n"
+
+
+@router.get(
+    "",
+    summary="List macros",
+    description="Returns every registered macro keyed by name"
+)
+async def list_macros() -> Dict[str, MacroDefinition]:
+    """List registered macros.
+    
+    Returns:
+        Dict: Macro definitions keyed by name
+    """
+    registry = get_macro_registry()
+    return {name: registry.get(name) for name in registry.names()}
+
+
+@router.get(
+    "/{name}",
+    response_model=MacroDefinition,
+    summary="Get a macro",
+    responses={404: {"description": "Unknown macro"}}
+)
+async def get_macro(name: MacroName) -> MacroDefinition:
+    """Get a macro definition.
+    
+    Args:
+        name: Macro name
+    
+    Returns:
+        MacroDefinition: The macro's steps
+    
+    Raises:
+        HTTPException: 404 for an unknown macro
+    """
+    macro = get_macro_registry().get(name)
+    if macro is None:
+        raise _not_found(name)
+    return macro
+
+
+@router.put(
+    "/{name}",
+    response_model=MacroDefinition,
+    summary="Register or replace a macro",
+    description="Stores the macro in memory until restart (configure MACROS_FILE for persistent macros)",
+    responses={
+        200: {"description": "Existing macro replaced"},
+        201: {"description": "Macro registered"}
+    }
+)
+async def put_macro(name: MacroName, macro: MacroDefinition, response: Response) -> MacroDefinition:
+    """Register or replace a macro.
+    
+    Args:
+        name: Macro name
+        macro: Steps of the macro
+        response: Outgoing response, for the status code
+    
+    Returns:
+        MacroDefinition: The stored macro
+    """
+    if not get_macro_registry().register(name, macro):
+        response.status_code = status.HTTP_201_CREATED
+    return macro
+
+
+@router.delete(
+    "/{name}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Remove a macro",
+    description="Runs already in progress are not affected",
+    responses={404: {"description": "Unknown macro"}}
+)
+async def delete_macro(name: MacroName) -> Response:
+    """Remove a macro.
+    
+    Args:
+        name: Macro name
+    
+    Raises:
+        HTTPException: 404 for an unknown macro
+    """
+    if not get_macro_registry().remove(name):
+        raise _not_found(name)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.post(
+    "/{name}/run",
+    summary="Run a macro and stream its progress",
+    description="""Runs the macro inside the API process and streams one event per step.
+
+The stream format is NDJSON (`application/x-ndjson`) unless `format=sse` is given or the
+`Accept` header asks for `text/event-stream`. Events: `started`, `step` (command sent),
+`wait` (condition met), `aborted` (stopOnError), `completed`. The run continues if the
+client disconnects.""",
+    responses={
+        200: {
+            "description": "Progress events",
+            "content": {
+                "application/x-ndjson": {
+                    "example": """{"event":"started","macro":"show_start","runId":"a1b2c3d4e5f6","steps":2}
+{"event":"step","macro":"show_start","runId":"a1b2c3d4e5f6","index":0,"sent":"play,show","status":"ok","reply":"OK","latencyMs":1.2,"elapsedMs":1.3}
+{"event":"wait","macro":"show_start","runId":"a1b2c3d4e5f6","index":1,"composition":"show","status":"ok","state":"playing","time":0.04,"waitedMs":51.0,"elapsedMs":52.4}
+{"event":"completed","macro":"show_start","runId":"a1b2c3d4e5f6","succeeded":2,"failed":0,"elapsedMs":52.5}
+"""
+                },
+                "text/event-stream": {
+                    "example": """event: started
+data: {"event":"started","macro":"show_start","runId":"a1b2c3d4e5f6","steps":2}
+
+"""
+                }
+            }
+        },
+        404: {"description": "Unknown macro"}
+    }
+)
+async def run_macro(
+    name: MacroName,
+    format: Annotated[
+        Optional[Literal["ndjson", "sse"]],
+        Query(description="Stream format (defaults from the Accept header)")
+    ] = None,
+    accept: Annotated[Optional[str], Header()] = None
+) -> StreamingResponse:
+    """Run a macro, streaming progress events.
+    
+    Args:
+        name: Macro name
+        format: Stream format override
+        accept: Accept header, used when no format is given
+    
+    Returns:
+        StreamingResponse: NDJSON or SSE progress events
+    
+    Raises:
+        HTTPException: 404 for an unknown macro
+    """
+    try:
+        run = get_macro_registry().run(name)
+    except KeyError:
+        raise _not_found(name)
+    
+    if format is None:
+        format = "sse" if accept and "text/event-stream" in accept else "ndjson"
+    
+    headers: Dict[str, Any] = {"Cache-Control": "no-cache", "X-Macro-Run-Id": run.id}
+    if format == "sse":
+        return StreamingResponse(_sse_stream(run), media_type="text/event-stream", headers=headers)
+    return StreamingResponse(_ndjson_stream(run), media_type="application/x-ndjson", headers=headers)
@@ -7,13 +7,15 @@ All routes require authentication and translate to ExaPlay TCP commands.
 from fastapi import APIRouter, Depends, HTTPException, Path, status
 from typing_extensions import Annotated
 
-from app.deps import get_authenticated_request
-from app.exaplay.models import CueSetRequest, CuetimeSetRequest, ErrorResponse, GenericReply
+from app.deps import get_authenticated_request, rate_limit, request_deadline, request_priority
+from app.exaplay.admission import Priority
+from app.exaplay.fleet import route_command, route_write
+from app.exaplay.models import CoalescedReply, CueSetRequest, CuetimeSetRequest, ErrorResponse, GenericReply
 from app.exaplay.tcp_client import (
     ExaPlayError,
-    send_exaplay_command,
 )
 from app.logging import PerformanceTimer, get_logger, get_trace_id
+from app.settings import settings
 
 # Import error mapping from control routes
 from app.api.routes_control import map_exaplay_error_to_http
@@ -23,38 +25,47 @@ logger = get_logger(__name__)
 router = APIRouter(
     prefix="/compositions",
     tags=["Positioning"],
-    dependencies=get_authenticated_request()
+    dependencies=get_authenticated_request() + [
+        rate_limit("control"),
+        request_deadline(settings.control_request_timeout),
+        request_priority(Priority.CRITICAL)
+    ]
 )
 
 
 @router.post(
     "/{name}/cuetime",
-    response_model=GenericReply,
+    response_model=CoalescedReply,
     summary="Seek to a time (seconds) for timeline compositions",
-    description="Sends `set:cuetime,{name},{seconds}` command to ExaPlay server",
+    description="""Sends `set:cuetime,{name},{seconds}` command to ExaPlay server.
+
+Concurrent seeks for the same composition are coalesced: while one is in flight
+only the newest position is sent next, and superseded requests return `coalesced: true`.""",
     responses={
-        200: {"description": "ExaPlay acknowledged"},
+        200: {"description": "ExaPlay acknowledged, or superseded by a newer position (coalesced)"},
         422: {"description": "ExaPlay returned ERR / cannot process command"},
         502: {"description": "Upstream (TCP) error or malformed response from ExaPlay"},
+        503: {"description": "ExaPlay host unavailable (circuit breaker open, see Retry-After)"},
         504: {"description": "Upstream TCP timeout while talking to ExaPlay"}
     }
 )
 async def set_cuetime(
     name: Annotated[str, Path(description="ExaPlay composition name (timeline or cuelist)", min_length=1)],
     request: CuetimeSetRequest
-) -> GenericReply:
+) -> CoalescedReply:
     """Seek to a specific time position in seconds.
     
     This command is primarily intended for timeline compositions.
     For cuelist compositions, the behavior may vary depending on
-    the ExaPlay configuration and cuelist structure.
+    the ExaPlay configuration and cuelist structure. Scrub-bar bursts
+    of seeks are coalesced so the latest position wins.
     
     Args:
         name: Name of the composition
         request: Request containing the target time in seconds
         
     Returns:
-        GenericReply: Command sent and ExaPlay's response
+        CoalescedReply: Command, ExaPlay's response and whether it was coalesced
         
     Raises:
         HTTPException: For various error conditions (timeout, connection, protocol)
@@ -63,16 +74,16 @@ async def set_cuetime(
     
     try:
         with PerformanceTimer("set_cuetime", logger, composition=name, seconds=request.seconds):
-            reply = await send_exaplay_command(command)
+            result = await route_write(command, composition=name, parameter="cuetime")
         
         logger.info(
-            "Cuetime command successful",
+            "Cuetime command coalesced" if result.coalesced else "Cuetime command successful",
             composition=name,
             seconds=request.seconds,
-            reply=reply
+            reply=result.reply
         )
         
-        return GenericReply(sent=command, reply=reply)
+        return CoalescedReply(sent=command, reply=result.reply, coalesced=result.coalesced)
         
     except ExaPlayError as e:
         logger.error(
@@ -94,6 +105,7 @@ async def set_cuetime(
         200: {"description": "ExaPlay acknowledged"},
         422: {"description": "ExaPlay returned ERR / cannot process command"},
         502: {"description": "Upstream (TCP) error or malformed response from ExaPlay"},
+        503: {"description": "ExaPlay host unavailable (circuit breaker open, see Retry-After)"},
         504: {"description": "Upstream TCP timeout while talking to ExaPlay"}
     }
 )
@@ -123,7 +135,7 @@ async def set_cue(
     
     try:
         with PerformanceTimer("set_cue", logger, composition=name, index=request.index):
-            reply = await send_exaplay_command(command)
+            reply = await route_command(command, composition=name)
         
         logger.info(
             "Cue command successful",
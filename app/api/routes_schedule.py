@@ -0,0 +1,168 @@
+"""Schedule API routes for commands fired at absolute times.
+
+Implements adding, listing, inspecting and cancelling scheduled commands.
+Scheduled operations are released from one write barrier at their fire
+time on connections checked out beforehand (see app.exaplay.scheduler).
+All routes require authentication.
+"""
+
+import time
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, HTTPException, Path, status
+from typing_extensions import Annotated
+
+from app.deps import get_authenticated_request, rate_limit
+from app.exaplay.models import (
+    ErrorResponse,
+    ScheduledCommandResponse,
+    ScheduleListResponse,
+    ScheduleRequest,
+)
+from app.exaplay.scheduler import SchedulerFullError, command_scheduler
+from app.logging import get_logger, get_trace_id
+
+logger = get_logger(__name__)
+
+router = APIRouter(
+    prefix="/schedule",
+    tags=["Schedule"],
+    dependencies=get_authenticated_request() + [rate_limit("schedule")]
+)
+
+EntryId = Annotated[str, Path(description="Schedule entry ID", min_length=1)]
+
+
+def _not_found(entry_id: str) -> HTTPException:
+    """Build the 404 for an unknown or forgotten entry."""
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=ErrorResponse(
+            error=f"Unknown schedule entry: {entry_id}",
+            traceId=get_trace_id()
+        ).model_dump()
+    )
+
+
+@router.post(
+    "",
+    response_model=ScheduledCommandResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Schedule commands for an absolute time",
+    description="""Schedules typed operations (play, pause, stop, seek, vol, cue) to be sent
+together at a wall-clock (`at`) or server-monotonic (`monotonic`) time.
+
+Connections are checked out SCHEDULE_PREPARE_LEAD seconds ahead so that firing is
+only a write; `fireErrorMs` reports how late the writes actually left.""",
+    responses={
+        201: {"description": "Commands scheduled"},
+        400: {"description": "Invalid operations, or a fire time in the past or beyond SCHEDULE_MAX_HORIZON"},
+        503: {"description": "SCHEDULE_MAX_PENDING entries are already pending"}
+    }
+)
+async def add_schedule(request: ScheduleRequest) -> ScheduledCommandResponse:
+    """Schedule commands for an absolute time.
+    
+    Args:
+        request: Operations and their fire time
+    
+    Returns:
+        ScheduledCommandResponse: The pending entry
+    
+    Raises:
+        HTTPException: 400 for an unusable fire time, 503 if the schedule is full
+    """
+    commands = [operation.to_command() for operation in request.commands]
+    try:
+        entry = command_scheduler.add(commands, at=request.at, monotonic=request.monotonic)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorResponse(error=str(e), traceId=get_trace_id()).model_dump()
+        )
+    except SchedulerFullError as e:
+        logger.warning("Schedule is full", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=ErrorResponse(error=f"Schedule is full: {e}", traceId=get_trace_id()).model_dump()
+        )
+    return entry.snapshot()
+
+
+@router.get(
+    "",
+    response_model=ScheduleListResponse,
+    summary="List scheduled commands",
+    description="""Returns pending and recently fired or cancelled entries by fire time, together with
+the server's wall-clock and monotonic time (for scheduling with `monotonic`)."""
+)
+async def list_schedule() -> ScheduleListResponse:
+    """List scheduled commands.
+    
+    Returns:
+        ScheduleListResponse: Entries and the current server clocks
+    """
+    return ScheduleListResponse(
+        serverTime=datetime.now(timezone.utc),
+        serverMonotonic=round(time.monotonic(), 6),
+        scheduled=[entry.snapshot() for entry in command_scheduler.entries()]
+    )
+
+
+@router.get(
+    "/{entry_id}",
+    response_model=ScheduledCommandResponse,
+    summary="Get a scheduled entry",
+    description="Returns the entry and, once fired, its per-command results and fire error",
+    responses={404: {"description": "Unknown schedule entry"}}
+)
+async def get_schedule_entry(entry_id: EntryId) -> ScheduledCommandResponse:
+    """Get a scheduled entry.
+    
+    Args:
+        entry_id: Schedule entry ID
+    
+    Returns:
+        ScheduledCommandResponse: The entry
+    
+    Raises:
+        HTTPException: 404 for an unknown entry
+    """
+    entry = command_scheduler.get(entry_id)
+    if entry is None:
+        raise _not_found(entry_id)
+    return entry.snapshot()
+
+
+@router.delete(
+    "/{entry_id}",
+    response_model=ScheduledCommandResponse,
+    summary="Cancel a scheduled entry",
+    description="Cancels an entry that has not fired yet. Nothing is sent to ExaPlay.",
+    responses={
+        404: {"description": "Unknown schedule entry"},
+        409: {"description": "The entry has already fired or was cancelled"}
+    }
+)
+async def cancel_schedule_entry(entry_id: EntryId) -> ScheduledCommandResponse:
+    """Cancel a scheduled entry.
+    
+    Args:
+        entry_id: Schedule entry ID
+    
+    Returns:
+        ScheduledCommandResponse: The cancelled entry
+    
+    Raises:
+        HTTPException: 404 for an unknown entry, 409 if it can no longer be cancelled
+    """
+    try:
+        entry = command_scheduler.cancel(entry_id)
+    except KeyError:
+        raise _not_found(entry_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=ErrorResponse(error=str(e), traceId=get_trace_id()).model_dump()
+        )
+    return entry.snapshot()
@@ -4,23 +4,51 @@ Implements status monitoring and version information endpoints.
 All routes require authentication except where noted.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Path, status
+from typing import Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response, status
+from fastapi.responses import PlainTextResponse
 from typing_extensions import Annotated
 
-from app.deps import get_authenticated_request, get_public_request
-from app.exaplay.mapper import ExaPlayMappingError, parse_status_response, parse_version_response
-from app.exaplay.models import ErrorResponse, HealthResponse, StatusResponse, VersionResponse
+from app.deps import get_authenticated_request, get_public_request, rate_limit, request_priority
+from app.exaplay.admission import Priority
+from app.exaplay.breaker import BreakerState, circuit_breakers
+from app.exaplay.fleet import get_host_registry, route_command, route_read
+from app.exaplay.mapper import (
+    ExaPlayMappingError,
+    parse_status_response,
+    parse_version_response,
+    parse_volume_response,
+)
+from app.exaplay.models import (
+    BulkStatusResponse,
+    CompositionStatusItem,
+    ErrorResponse,
+    HealthResponse,
+    HostReadiness,
+    ReadinessResponse,
+    StatusResponse,
+    VersionResponse,
+)
+from app.exaplay.poller import status_poller
+from app.exaplay.read_cache import CachedReply
 from app.exaplay.tcp_client import (
     ExaPlayError,
-    send_exaplay_command,
 )
 from app.logging import PerformanceTimer, get_logger, get_trace_id
+from app.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, registry as metrics_registry
+from app.settings import settings
 
 # Import error mapping from control routes  
 from app.api.routes_control import map_exaplay_error_to_http
 
 logger = get_logger(__name__)
 
+# Upper bound on compositions per bulk status request (matches the batch endpoint)
+_MAX_BULK_NAMES = 100
+
+_BULK_FIELDS = ("status", "volume")
+
 # Health router (no auth required)
 health_router = APIRouter(tags=["Health"])
 
@@ -28,26 +56,44 @@ health_router = APIRouter(tags=["Health"])
 status_router = APIRouter(
     prefix="/compositions",
     tags=["Status"],
-    dependencies=get_authenticated_request()
+    dependencies=get_authenticated_request() + [rate_limit("status")]
 )
 
 meta_router = APIRouter(
     tags=["Meta"],
-    dependencies=get_authenticated_request()
+    dependencies=get_authenticated_request() + [rate_limit("status")]
 )
 
 
 @health_router.get(
     "/healthz",
     response_model=HealthResponse,
+    response_model_exclude_none=True,
     summary="Liveness probe",
-    description="Simple health check endpoint that doesn't require authentication",
+    description="""Simple health check endpoint that doesn't require authentication.
+
+Always returns 200 while the API process is alive. If an ExaPlay host's circuit
+breaker is open, status is `degraded` and `upstreams` shows the breaker state.""",
     responses={
         200: {
             "description": "Service is healthy",
             "content": {
                 "application/json": {
-                    "example": {"status": "ok"}
+                    "examples": {
+                        "ok": {"value": {"status": "ok"}},
+                        "degraded": {
+                            "value": {
+                                "status": "degraded",
+                                "upstreams": {
+                                    "192.168.1.174:7000": {
+                                        "state": "open",
+                                        "consecutive_failures": 5,
+                                        "retry_after": 4
+                                    }
+                                }
+                            }
+                        }
+                    }
                 }
             }
         }
@@ -58,15 +104,131 @@ async def health_check() -> HealthResponse:
     
     This endpoint is used by load balancers, container orchestrators,
     and monitoring systems to verify that the service is running and
-    responsive. It does not require authentication.
+    responsive. It does not require authentication. Upstream outages
+    are reported as "degraded" rather than failing the probe, so the
+    API is not restarted because ExaPlay is down.
     
     Returns:
         HealthResponse: Simple status indicator
     """
     logger.debug("Health check requested")
+    
+    unavailable = circuit_breakers.unhealthy()
+    if unavailable:
+        return HealthResponse(status="degraded", upstreams=unavailable)
     return HealthResponse(status="ok")
 
 
+@health_router.get(
+    "/readyz",
+    response_model=ReadinessResponse,
+    summary="Readiness probe",
+    description="""Reports whether every ExaPlay host is reachable, without contacting ExaPlay.
+
+Reachability comes from the connection pool's cached keepalive probes (`get:ver` every
+TCP_KEEPALIVE_INTERVAL on idle connections) and connection attempts: a host is reachable
+if its last probe succeeded within READINESS_PROBE_MAX_AGE seconds and its circuit
+breaker is not open. Returns 503 if any host is unreachable.""",
+    responses={
+        200: {
+            "description": "All ExaPlay hosts reachable",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "status": "ready",
+                        "hosts": {
+                            "default": {
+                                "address": "192.168.1.174:7000",
+                                "reachable": True,
+                                "breaker": "closed",
+                                "lastProbeOk": True,
+                                "lastProbeRttMs": 0.8,
+                                "lastProbeAgeS": 4.2,
+                                "lastProbeError": None,
+                                "poolSize": 1,
+                                "poolIdle": 1,
+                                "poolMinSize": 1
+                            }
+                        }
+                    }
+                }
+            }
+        },
+        503: {"description": "At least one ExaPlay host is unreachable (same body, status not_ready)"}
+    }
+)
+async def readiness_check(response: Response) -> ReadinessResponse:
+    """Readiness check built only from cached probe results.
+    
+    Unlike /healthz this fails while ExaPlay is unreachable, so that load
+    balancers can route around an API instance that cannot serve commands.
+    It never causes upstream traffic, however often it is polled.
+    
+    Args:
+        response: Outgoing response, for the 503 status code
+    
+    Returns:
+        ReadinessResponse: Overall status and per-host reachability
+    """
+    hosts: Dict[str, HostReadiness] = {}
+    for name, host in get_host_registry().hosts.items():
+        pool = host.client.pool
+        breaker = host.client.breaker
+        probe = pool.probe_status()
+        fresh = probe["age"] is not None and probe["age"] <= settings.readiness_probe_max_age
+        hosts[name] = HostReadiness(
+            address=host.address,
+            reachable=bool(probe["ok"]) and fresh and breaker.state != BreakerState.OPEN,
+            breaker=breaker.state.value,
+            lastProbeOk=probe["ok"],
+            lastProbeRttMs=None if probe["ok"] is None else round(probe["rtt"] * 1000, 3),
+            lastProbeAgeS=None if probe["age"] is None else round(probe["age"], 3),
+            lastProbeError=probe["error"],
+            poolSize=pool.size,
+            poolIdle=pool.idle,
+            poolMinSize=pool.min_size
+        )
+    
+    ready = all(host.reachable for host in hosts.values())
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        logger.debug("Readiness check failed", unreachable=[name for name, host in hosts.items() if not host.reachable])
+    return ReadinessResponse(status="ready" if ready else "not_ready", hosts=hosts)
+
+
+@health_router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Prometheus metrics",
+    description="""In-process metrics in the Prometheus text exposition format (no authentication).
+
+Covers HTTP latency by route template and status, ExaPlay TCP command latency by command
+verb, host and outcome, command retries and timeouts, connected SSE clients, OSC messages
+received (use `rate()` for messages per second), SSE broadcast drops and rate-limit
+rejections. Rendering never causes upstream traffic.""",
+    responses={
+        200: {
+            "description": "Metrics in text exposition format 0.0.4",
+            "content": {
+                "text/plain": {
+                    "example": """# HELP exaplay_command_retries_total ExaPlay TCP command attempts retried after a timeout or connection failure
+# TYPE exaplay_command_retries_total counter
+exaplay_command_retries_total{host="192.168.1.174:7000"} 2
+"""
+                }
+            }
+        }
+    }
+)
+async def metrics() -> PlainTextResponse:
+    """Render every registered metric for a Prometheus scrape.
+    
+    Returns:
+        PlainTextResponse: Metrics in the text exposition format
+    """
+    return PlainTextResponse(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 @meta_router.get(
     "/version",
     response_model=VersionResponse,
@@ -82,14 +244,20 @@ async def health_check() -> HealthResponse:
             }
         },
         502: {"description": "Upstream (TCP) error or malformed response from ExaPlay"},
+        503: {"description": "ExaPlay host unavailable (circuit breaker open, see Retry-After)"},
         504: {"description": "Upstream TCP timeout while talking to ExaPlay"}
     }
 )
-async def get_version() -> VersionResponse:
+async def get_version(response: Response) -> VersionResponse:
     """Get ExaPlay server version information.
     
     Sends the `get:ver` command to ExaPlay and returns the version
     string. This can be useful for compatibility checking and debugging.
+    Replies are cached (READ_CACHE_VERSION_TTL); cached responses carry
+    an Age header.
+    
+    Args:
+        response: Outgoing response, for the Age header
     
     Returns:
         VersionResponse: ExaPlay version information
@@ -101,7 +269,11 @@ async def get_version() -> VersionResponse:
     
     try:
         with PerformanceTimer("get_version", logger):
-            reply = await send_exaplay_command(command)
+            cached = await route_read(command)
+        reply = cached.reply
+        
+        if cached.age is not None:
+            response.headers["Age"] = str(int(cached.age))
         
         # Parse the version response
         try:
@@ -138,11 +310,146 @@ async def get_version() -> VersionResponse:
         raise map_exaplay_error_to_http(e)
 
 
+def _parse_list(value: str, parameter: str) -> List[str]:
+    """Split a comma-separated query parameter, dropping blanks and duplicates.
+    
+    Raises:
+        HTTPException: 400 if a value contains a line terminator
+    """
+    items = list(dict.fromkeys(item.strip() for item in value.split(",") if item.strip()))
+    if any("\r" in item or "\n" in item for item in items):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorResponse(
+                error=f"'{parameter}' cannot contain line terminators",
+                traceId=get_trace_id()
+            ).model_dump()
+        )
+    return items
+
+
+@status_router.get(
+    "/status",
+    response_model=BulkStatusResponse,
+    response_model_exclude_none=True,
+    summary="Get status of many compositions",
+    dependencies=[request_priority(Priority.BULK)],
+    description="""Gathers `get:status` and/or `get:vol` for every named composition in one request.
+
+All upstream reads are sent as one pipelined burst per ExaPlay host, in the `bulk`
+priority lane (shed with 429 while control commands keep the host busy). With the
+status poller enabled, compositions it has fresh state for are answered from
+memory unless `fresh=true`. Failures are reported per composition and field.""",
+    responses={
+        200: {"description": "Per-composition results (individual items may carry errors)"},
+        400: {"description": "Missing or invalid names/fields"},
+        429: {"description": "Upstream busy with higher-priority work (see Retry-After)"},
+        502: {"description": "Upstream (TCP) error on every composition"},
+        503: {"description": "ExaPlay host unavailable (circuit breaker open, see Retry-After)"},
+        504: {"description": "Upstream TCP timeout on every composition"}
+    }
+)
+async def get_bulk_status(
+    names: Annotated[str, Query(description="Comma-separated composition names", min_length=1)],
+    fields: Annotated[str, Query(description="Comma-separated fields to read: status, volume")] = "status",
+    fresh: Annotated[bool, Query(description="Bypass the in-memory state and read from ExaPlay")] = False
+) -> BulkStatusResponse:
+    """Get status and/or volume for several compositions at once.
+    
+    Replaces one HTTP request per composition (each repeating auth,
+    tracing and logging) with a single request whose upstream reads are
+    pipelined per host.
+    
+    Args:
+        names: Comma-separated composition names (at most 100)
+        fields: Comma-separated subset of ``status`` and ``volume``
+        fresh: Skip the poller's state table
+        
+    Returns:
+        BulkStatusResponse: Results keyed by composition name
+        
+    Raises:
+        HTTPException: 400 for invalid parameters, or the mapped upstream
+            error if no composition could be read at all
+    """
+    compositions = _parse_list(names, "names")
+    requested = _parse_list(fields, "fields")
+    
+    unknown_fields = [field for field in requested if field not in _BULK_FIELDS]
+    if not compositions or not requested or unknown_fields or len(compositions) > _MAX_BULK_NAMES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorResponse(
+                error=(
+                    f"Provide 1-{_MAX_BULK_NAMES} names and fields from {', '.join(_BULK_FIELDS)}"
+                    + (f" (unknown: {', '.join(unknown_fields)})" if unknown_fields else "")
+                ),
+                traceId=get_trace_id()
+            ).model_dump()
+        )
+    
+    items: Dict[str, CompositionStatusItem] = {name: CompositionStatusItem() for name in compositions}
+    commands: List[str] = []
+    for name in compositions:
+        status_poller.track(name)
+        if "status" in requested:
+            known = None if fresh else status_poller.status(name)
+            if known is not None:
+                items[name].status = known[0]
+            else:
+                commands.append(f"get:status,{name}")
+        if "volume" in requested:
+            known_volume = None if fresh else status_poller.volume(name)
+            if known_volume is not None:
+                items[name].volume = known_volume[0]
+            else:
+                commands.append(f"get:vol,{name}")
+    
+    if commands:
+        try:
+            with PerformanceTimer("get_bulk_status", logger, compositions=len(compositions), commands=len(commands)):
+                results = await get_host_registry().send_pipeline(commands)
+        except ExaPlayError as e:
+            logger.error("Bulk status failed", compositions=len(compositions), error=str(e))
+            raise map_exaplay_error_to_http(e)
+        
+        for result in results:
+            kind, name = result.command.split(",", 1)
+            item = items[name]
+            field = "status" if kind == "get:status" else "volume"
+            if result.error is not None:
+                item.errors = {**(item.errors or {}), field: str(result.error)}
+                continue
+            try:
+                if field == "status":
+                    item.status = parse_status_response(result.reply)
+                    status_poller.update_status(name, item.status)
+                else:
+                    item.volume = parse_volume_response(result.reply)
+                    status_poller.update_volume(name, item.volume)
+            except ExaPlayMappingError as e:
+                item.errors = {**(item.errors or {}), field: f"Malformed {field} response: {str(e)}"}
+    
+    failed = sum(1 for item in items.values() if item.errors)
+    logger.info(
+        "Get bulk status completed",
+        compositions=len(compositions),
+        fields=requested,
+        upstream_commands=len(commands),
+        failed=failed
+    )
+    
+    return BulkStatusResponse(compositions=items)
+
+
 @status_router.get(
     "/{name}/status",
     response_model=StatusResponse,
     summary="Get normalized composition status",
-    description="Wraps `get:status,{name}` and maps CSV to normalized JSON",
+    description="""Wraps `get:status,{name}` and maps CSV to normalized JSON.
+
+With the status poller enabled the status is served from memory (with an `Age`
+header); `?fresh=true` forces an upstream read.""",
     responses={
         200: {
             "description": "Normalized status payload",
@@ -159,11 +466,14 @@ async def get_version() -> VersionResponse:
             }
         },
         502: {"description": "Upstream (TCP) error or malformed response from ExaPlay"},
+        503: {"description": "ExaPlay host unavailable (circuit breaker open, see Retry-After)"},
         504: {"description": "Upstream TCP timeout while talking to ExaPlay"}
     }
 )
 async def get_status(
-    name: Annotated[str, Path(description="ExaPlay composition name (timeline or cuelist)", min_length=1)]
+    name: Annotated[str, Path(description="ExaPlay composition name (timeline or cuelist)", min_length=1)],
+    response: Response,
+    fresh: Annotated[bool, Query(description="Bypass the in-memory state and cache and read from ExaPlay")] = False
 ) -> StatusResponse:
     """Get normalized composition status.
     
@@ -174,10 +484,15 @@ async def get_status(
     state(0=stopped,1=playing,2=paused), time(s), frame, clipIndex(-1 if N/A), duration(s)
     
     This is converted to a structured response with enum state values
-    and properly typed numeric fields.
+    and properly typed numeric fields. Replies are cached briefly
+    (READ_CACHE_STATUS_TTL); cached responses carry an Age header.
+    When the status poller is running, the last polled status is
+    returned from memory unless ``fresh`` is set.
     
     Args:
         name: Name of the composition to query
+        response: Outgoing response, for the Age header
+        fresh: Skip the poller's state table and the read cache
         
     Returns:
         StatusResponse: Normalized status information
@@ -187,9 +502,24 @@ async def get_status(
     """
     command = f"get:status,{name}"
     
+    status_poller.track(name)
+    known = None if fresh else status_poller.status(name)
+    if known is not None:
+        status_response, age = known
+        response.headers["Age"] = str(int(age))
+        logger.debug("Get status served from poller", composition=name, age=round(age, 3))
+        return status_response
+    
     try:
-        with PerformanceTimer("get_status", logger, composition=name):
-            reply = await send_exaplay_command(command)
+        with PerformanceTimer("get_status", logger, composition=name, fresh=fresh):
+            if fresh:
+                cached = CachedReply(await route_command(command, composition=name), None)
+            else:
+                cached = await route_read(command, composition=name)
+        reply = cached.reply
+        
+        if cached.age is not None:
+            response.headers["Age"] = str(int(cached.age))
         
         # Parse the status response from CSV to normalized JSON
         try:
@@ -210,6 +540,8 @@ async def get_status(
                 ).model_dump()
             )
         
+        status_poller.update_status(name, status_response)
+        
         logger.info(
             "Get status successful",
             composition=name,
@@ -1,18 +1,30 @@
 """Volume API routes for ExaPlay volume control.
 
-Implements get and set volume endpoints for composition audio control.
+Implements get and set volume endpoints and server-side volume fades
+for composition audio control.
 All routes require authentication and translate to ExaPlay TCP commands.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Path, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response, status
 from typing_extensions import Annotated
 
-from app.deps import get_authenticated_request
+from app.deps import get_authenticated_request, rate_limit, request_priority
+from app.exaplay.admission import Priority
+from app.exaplay.fader import fade_engine
+from app.exaplay.fleet import route_command, route_read, route_write
 from app.exaplay.mapper import ExaPlayMappingError, parse_volume_response
-from app.exaplay.models import ErrorResponse, GenericReply, VolumeResponse, VolumeSetRequest
+from app.exaplay.models import (
+    CoalescedReply,
+    ErrorResponse,
+    FadeStatusResponse,
+    VolumeFadeRequest,
+    VolumeResponse,
+    VolumeSetRequest,
+)
+from app.exaplay.poller import status_poller
+from app.exaplay.read_cache import CachedReply
 from app.exaplay.tcp_client import (
     ExaPlayError,
-    send_exaplay_command,
 )
 from app.logging import PerformanceTimer, get_logger, get_trace_id
 
@@ -24,7 +36,7 @@ logger = get_logger(__name__)
 router = APIRouter(
     prefix="/compositions",
     tags=["Volume"],
-    dependencies=get_authenticated_request()
+    dependencies=get_authenticated_request() + [rate_limit("control"), request_priority(Priority.CRITICAL)]
 )
 
 
@@ -32,7 +44,10 @@ router = APIRouter(
     "/{name}/volume",
     response_model=VolumeResponse,
     summary="Get composition volume",
-    description="Sends `get:vol,{name}` command to ExaPlay server and returns normalized volume value",
+    description="""Sends `get:vol,{name}` command to ExaPlay server and returns normalized volume value.
+
+With the status poller enabled the volume is served from memory (with an `Age`
+header); `?fresh=true` forces an upstream read.""",
     responses={
         200: {
             "description": "Current volume value",
@@ -43,19 +58,27 @@ router = APIRouter(
             }
         },
         502: {"description": "Upstream (TCP) error or malformed response from ExaPlay"},
+        503: {"description": "ExaPlay host unavailable (circuit breaker open, see Retry-After)"},
         504: {"description": "Upstream TCP timeout while talking to ExaPlay"}
     }
 )
 async def get_volume(
-    name: Annotated[str, Path(description="ExaPlay composition name (timeline or cuelist)", min_length=1)]
+    name: Annotated[str, Path(description="ExaPlay composition name (timeline or cuelist)", min_length=1)],
+    response: Response,
+    fresh: Annotated[bool, Query(description="Bypass the in-memory state and cache and read from ExaPlay")] = False
 ) -> VolumeResponse:
     """Get the current volume level for a composition.
     
     Retrieves the current volume setting from ExaPlay and returns
-    it as a normalized integer value between 0 and 100.
+    it as a normalized integer value between 0 and 100. Replies are
+    cached (READ_CACHE_VOLUME_TTL); cached responses carry an Age header.
+    When the status poller is running, the last polled volume is
+    returned from memory unless ``fresh`` is set.
     
     Args:
         name: Name of the composition
+        response: Outgoing response, for the Age header
+        fresh: Skip the poller's state table and the read cache
         
     Returns:
         VolumeResponse: Current volume level (0-100)
@@ -65,9 +88,24 @@ async def get_volume(
     """
     command = f"get:vol,{name}"
     
+    status_poller.track(name)
+    known = None if fresh else status_poller.volume(name)
+    if known is not None:
+        volume_value, age = known
+        response.headers["Age"] = str(int(age))
+        logger.debug("Get volume served from poller", composition=name, age=round(age, 3))
+        return VolumeResponse(value=volume_value)
+    
     try:
-        with PerformanceTimer("get_volume", logger, composition=name):
-            reply = await send_exaplay_command(command)
+        with PerformanceTimer("get_volume", logger, composition=name, fresh=fresh):
+            if fresh:
+                cached = CachedReply(await route_command(command, composition=name), None)
+            else:
+                cached = await route_read(command, composition=name)
+        reply = cached.reply
+        
+        if cached.age is not None:
+            response.headers["Age"] = str(int(cached.age))
         
         # Parse the volume response
         try:
@@ -88,6 +126,8 @@ async def get_volume(
                 ).model_dump()
             )
         
+        status_poller.update_volume(name, volume_value)
+        
         logger.info(
             "Get volume successful",
             composition=name,
@@ -109,49 +149,58 @@ async def get_volume(
 
 @router.post(
     "/{name}/volume",
-    response_model=GenericReply,
+    response_model=CoalescedReply,
     summary="Set composition volume (0..100)",
-    description="Sends `set:vol,{name},{value}` command to ExaPlay server",
+    description="""Sends `set:vol,{name},{value}` command to ExaPlay server.
+
+Concurrent writes for the same composition are coalesced: while one is in flight
+only the newest value is sent next, and superseded requests return `coalesced: true`.
+A running volume fade of the composition is cancelled first.""",
     responses={
-        200: {"description": "ExaPlay acknowledged"},
+        200: {"description": "ExaPlay acknowledged, or superseded by a newer value (coalesced)"},
         422: {"description": "ExaPlay returned ERR / cannot process command"},
         502: {"description": "Upstream (TCP) error or malformed response from ExaPlay"},
+        503: {"description": "ExaPlay host unavailable (circuit breaker open, see Retry-After)"},
         504: {"description": "Upstream TCP timeout while talking to ExaPlay"}
     }
 )
 async def set_volume(
     name: Annotated[str, Path(description="ExaPlay composition name (timeline or cuelist)", min_length=1)],
     request: VolumeSetRequest
-) -> GenericReply:
+) -> CoalescedReply:
     """Set the volume level for a composition.
     
     Sets the volume to the specified level between 0 and 100.
-    The change takes effect immediately during playback.
+    The change takes effect immediately during playback. Fader-style
+    bursts of writes are coalesced so the latest value wins. A running
+    fade is cancelled so it cannot overwrite the new level.
     
     Args:
         name: Name of the composition
         request: Request containing the target volume level (0-100)
         
     Returns:
-        GenericReply: Command sent and ExaPlay's response
+        CoalescedReply: Command, ExaPlay's response and whether it was coalesced
         
     Raises:
         HTTPException: For various error conditions (timeout, connection, protocol)
     """
     command = f"set:vol,{name},{request.value}"
     
+    await fade_engine.cancel(name)
+    
     try:
         with PerformanceTimer("set_volume", logger, composition=name, volume=request.value):
-            reply = await send_exaplay_command(command)
+            result = await route_write(command, composition=name, parameter="vol")
         
         logger.info(
-            "Set volume successful",
+            "Set volume coalesced" if result.coalesced else "Set volume successful",
             composition=name,
             volume=request.value,
-            reply=reply
+            reply=result.reply
         )
         
-        return GenericReply(sent=command, reply=reply)
+        return CoalescedReply(sent=command, reply=result.reply, coalesced=result.coalesced)
         
     except ExaPlayError as e:
         logger.error(
@@ -162,3 +211,130 @@ async def set_volume(
             error=str(e)
         )
         raise map_exaplay_error_to_http(e)
+
+
+@router.post(
+    "/{name}/volume/fade",
+    response_model=FadeStatusResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Fade composition volume to a target level",
+    description="""Fades the volume server-side by sending `set:vol,{name},{value}` steps at
+VOLUME_FADE_TICK_RATE along a linear, equal-power or exponential curve.
+
+Returns as soon as the fade has started. A new fade of the same composition
+retargets from the level reached so far; `POST /volume` cancels the fade.""",
+    responses={
+        202: {"description": "Fade started"},
+        502: {"description": "Upstream (TCP) error or malformed response while reading the current volume"},
+        503: {"description": "ExaPlay host unavailable (circuit breaker open, see Retry-After)"},
+        504: {"description": "Upstream TCP timeout while reading the current volume"}
+    }
+)
+async def start_volume_fade(
+    name: Annotated[str, Path(description="ExaPlay composition name (timeline or cuelist)", min_length=1)],
+    request: VolumeFadeRequest
+) -> FadeStatusResponse:
+    """Start a server-side volume fade.
+    
+    The fade starts from the current volume (or, when retargeting, from
+    the level the running fade reached) and runs in the background.
+    Progress, dropped steps and tick jitter are reported by
+    ``GET /compositions/{name}/volume/fade``.
+    
+    Args:
+        name: Name of the composition
+        request: Target level, duration and curve of the fade
+        
+    Returns:
+        FadeStatusResponse: The started fade
+        
+    Raises:
+        HTTPException: If the current volume could not be read
+    """
+    try:
+        fade = await fade_engine.start(name, request.target, request.duration, request.curve)
+    except ExaPlayMappingError as e:
+        logger.error("Failed to parse volume response", composition=name, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=ErrorResponse(
+                error=f"Malformed volume response: {str(e)}",
+                command=f"get:vol,{name}",
+                traceId=get_trace_id()
+            ).model_dump()
+        )
+    except ExaPlayError as e:
+        logger.error("Start volume fade failed", composition=name, error=str(e))
+        raise map_exaplay_error_to_http(e)
+    
+    return fade.snapshot()
+
+
+@router.get(
+    "/{name}/volume/fade",
+    response_model=FadeStatusResponse,
+    summary="Get volume fade progress",
+    description="Returns the running or most recent volume fade of a composition.",
+    responses={
+        404: {"description": "No fade has been started for this composition"}
+    }
+)
+async def get_volume_fade(
+    name: Annotated[str, Path(description="ExaPlay composition name (timeline or cuelist)", min_length=1)]
+) -> FadeStatusResponse:
+    """Get the progress of a composition's volume fade.
+    
+    Args:
+        name: Name of the composition
+        
+    Returns:
+        FadeStatusResponse: State, progress, steps and tick jitter of the fade
+        
+    Raises:
+        HTTPException: If no fade was started for the composition
+    """
+    fade = fade_engine.get(name)
+    if fade is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ErrorResponse(
+                error=f"No volume fade for composition '{name}'",
+                traceId=get_trace_id()
+            ).model_dump()
+        )
+    return fade.snapshot()
+
+
+@router.delete(
+    "/{name}/volume/fade",
+    response_model=FadeStatusResponse,
+    summary="Cancel a running volume fade",
+    description="Stops the fade at the level it reached. No command is sent to ExaPlay.",
+    responses={
+        404: {"description": "No fade is running for this composition"}
+    }
+)
+async def cancel_volume_fade(
+    name: Annotated[str, Path(description="ExaPlay composition name (timeline or cuelist)", min_length=1)]
+) -> FadeStatusResponse:
+    """Cancel a composition's running volume fade.
+    
+    Args:
+        name: Name of the composition
+        
+    Returns:
+        FadeStatusResponse: The cancelled fade
+        
+    Raises:
+        HTTPException: If no fade is running for the composition
+    """
+    fade = await fade_engine.cancel(name)
+    if fade is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ErrorResponse(
+                error=f"No volume fade running for composition '{name}'",
+                traceId=get_trace_id()
+            ).model_dump()
+        )
+    return fade.snapshot()
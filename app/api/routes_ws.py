@@ -0,0 +1,327 @@
+"""WebSocket control-and-telemetry channel.
+
+One authenticated connection carries both playback commands and pushed
+status events, so a touch panel no longer pays bearer-auth checks, trace
+ID generation and request logging for every button press or fader move.
+
+Frames are JSON text:
+
+- client to server: a command ``{"id": "r1", "op": "play", "name": "comp1"}``
+  (ops play, pause, stop, seek, vol and cue with ``value`` as in batch
+  operations), or ``{"op": "subscribe", ...}`` to change the event
+  subscription
+- server to client: ``{"type": "reply", "id": "r1", "ok": true, ...}`` per
+  frame, and ``{"type": "event", "event": "status", "eventId": 42, "data":
+  {...}}`` for every pushed event when OSC is enabled
+
+Commands go through the same upstream path as the control, position and
+volume routes (route_command, or route_write for coalesced seek and
+volume writes) with the control routes' deadline, priority and rate
+limit; failures carry the status code the REST call would have returned.
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Set
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
+
+from app.api.routes_control import map_exaplay_error_to_http
+from app.deps import get_rate_limiter
+from app.exaplay.admission import Priority, UpstreamPriority
+from app.exaplay.deadline import RequestDeadline
+from app.exaplay.event_ring import SSEClient
+from app.exaplay.fader import fade_engine
+from app.exaplay.fleet import route_command, route_write
+from app.exaplay.models import BatchOperationType, WSCommand, WSReply, WSSubscribe
+from app.exaplay.osc_listener import EVENT_TYPES, osc_broadcaster
+from app.exaplay.tcp_client import ExaPlayError
+from app.logging import RequestLoggingContext, get_logger
+from app.metrics import websocket_clients
+from app.settings import settings
+
+logger = get_logger(__name__)
+
+router = APIRouter(tags=["WebSocket"])
+
+# Most commands of one connection in flight at once; further frames wait
+WS_MAX_INFLIGHT = 32
+
+# Coalesced parameter writes per operation (as in the position and volume routes)
+_WRITE_PARAMETERS = {
+    BatchOperationType.SEEK: "cuetime",
+    BatchOperationType.VOL: "vol",
+}
+
+
+def _authenticate(websocket: WebSocket) -> bool:
+    """Check the API key of a WebSocket handshake.
+    
+    Accepts an ``Authorization: Bearer`` header or, for browsers (which
+    cannot set headers on WebSocket requests), a ``token`` query parameter.
+    """
+    scheme, _, token = websocket.headers.get("Authorization", "").partition(" ")
+    if not (token and scheme.lower() == "bearer"):
+        token = websocket.query_params.get("token", "")
+    return bool(token) and token == settings.api_key
+
+
+def _error_reply(request_id: Optional[str], error: HTTPException, sent: Optional[str] = None) -> WSReply:
+    """Build the reply for a failure raised as the equivalent HTTPException."""
+    detail = error.detail if isinstance(error.detail, dict) else {"error": str(error.detail)}
+    retry_after = (error.headers or {}).get("Retry-After")
+    return WSReply(
+        id=request_id,
+        ok=False,
+        sent=sent,
+        status=error.status_code,
+        error=detail.get("error"),
+        retryAfter=int(retry_after) if retry_after is not None else None
+    )
+
+
+def _event_frames(chunk: bytes) -> List[str]:
+    """Convert SSE messages from the event ring into WebSocket event frames."""
+    frames = []
+    for message in chunk.split(b"\n\n"):
+        head, _, data = message.partition(b"data: ")
+        if not data:
+            continue  # keepalive comment
+        fields = dict(line.split(b": ", 1) for line in head.splitlines() if b": " in line)
+        frames.append(
+            '{"type":"event","event":%s,"eventId":%s,"data":%s}' % (
+                json.dumps(fields.get(b"event", b"message").decode()),
+                fields.get(b"id", b"null").decode(),
+                data.decode()
+            )
+        )
+    return frames
+
+
+class ControlChannel:
+    """State of one WebSocket connection: sending, in-flight commands and event push."""
+    
+    def __init__(self, websocket: WebSocket) -> None:
+        """Initialize the channel for an accepted WebSocket.
+        
+        Args:
+            websocket: Accepted connection
+        """
+        self.websocket = websocket
+        self._send_lock = asyncio.Lock()
+        self._inflight = asyncio.Semaphore(WS_MAX_INFLIGHT)
+        self._tasks: Set[asyncio.Task] = set()
+        self._client: Optional[SSEClient] = None
+        self._pusher: Optional[asyncio.Task] = None
+        
+        # Statistics
+        self.commands = 0
+        self.errors = 0
+    
+    async def send(self, frame: str) -> None:
+        """Send one text frame (frames from concurrent tasks are serialized)."""
+        async with self._send_lock:
+            await self.websocket.send_text(frame)
+    
+    async def send_reply(self, reply: WSReply) -> None:
+        """Send a reply frame."""
+        await self.send(reply.model_dump_json(exclude_none=True))
+    
+    async def handle_frame(self, text: str) -> None:
+        """Dispatch one received frame; commands run as tasks so replies may arrive out of order.
+        
+        Args:
+            text: Raw frame text
+        """
+        try:
+            message = json.loads(text)
+            if not isinstance(message, dict):
+                raise ValueError("frame must be a JSON object")
+        except ValueError as e:
+            await self.send_reply(WSReply(ok=False, status=status.HTTP_400_BAD_REQUEST, error=f"Invalid frame: {e}"))
+            return
+        
+        request_id = message.get("id") if isinstance(message.get("id"), str) else None
+        try:
+            if message.get("op") == "subscribe":
+                await self.subscribe(WSSubscribe.model_validate(message))
+                return
+            command = WSCommand.model_validate(message)
+        except (ValidationError, ValueError) as e:
+            error = e.errors()[0]["msg"] if isinstance(e, ValidationError) else str(e)
+            await self.send_reply(WSReply(id=request_id, ok=False, status=status.HTTP_400_BAD_REQUEST, error=error))
+            return
+        
+        await self._inflight.acquire()
+        task = asyncio.create_task(self._run_command(command))
+        self._tasks.add(task)
+        task.add_done_callback(self._command_done)
+    
+    def _command_done(self, task: asyncio.Task) -> None:
+        """Release the in-flight slot of a finished command task."""
+        self._tasks.discard(task)
+        self._inflight.release()
+    
+    async def execute(self, command: WSCommand) -> WSReply:
+        """Send a command upstream the way the REST control routes do.
+        
+        Args:
+            command: Validated command frame
+        
+        Returns:
+            WSReply: Success or failure reply
+        """
+        sent = command.to_command()
+        self.commands += 1
+        try:
+            await get_rate_limiter("control").check_rate_limit(self.websocket)
+            budget = settings.control_request_timeout or settings.request_timeout
+            with RequestDeadline(budget), UpstreamPriority(Priority.CRITICAL):
+                parameter = _WRITE_PARAMETERS.get(command.op)
+                if parameter is None:
+                    reply, coalesced = await route_command(sent, composition=command.name), None
+                else:
+                    if command.op == BatchOperationType.VOL:
+                        await fade_engine.cancel(command.name)
+                    result = await route_write(sent, composition=command.name, parameter=parameter)
+                    reply, coalesced = result.reply, result.coalesced
+        except ExaPlayError as e:
+            self.errors += 1
+            logger.warning("WebSocket command failed", request_id=command.id, command=sent, error=str(e))
+            return _error_reply(command.id, map_exaplay_error_to_http(e), sent)
+        except HTTPException as e:
+            self.errors += 1
+            return _error_reply(command.id, e, sent)
+        
+        logger.debug("WebSocket command completed", request_id=command.id, command=sent, reply=reply)
+        return WSReply(id=command.id, ok=True, sent=sent, reply=reply, coalesced=coalesced)
+    
+    async def _run_command(self, command: WSCommand) -> None:
+        """Execute a command and send its reply."""
+        reply = await self.execute(command)
+        try:
+            await self.send_reply(reply)
+        except (WebSocketDisconnect, RuntimeError):
+            pass
+    
+    async def subscribe(self, request: WSSubscribe) -> None:
+        """Replace the event subscription, resuming where the previous one stopped.
+        
+        Args:
+            request: Validated subscribe frame
+        """
+        unknown_types = [event_type for event_type in request.types or () if event_type not in EVENT_TYPES]
+        if unknown_types:
+            await self.send_reply(WSReply(
+                id=request.id,
+                ok=False,
+                status=status.HTTP_400_BAD_REQUEST,
+                error=f"Unknown event types: {', '.join(unknown_types)} (expected {', '.join(EVENT_TYPES)})"
+            ))
+            return
+        if not settings.exaplay_osc_enable:
+            await self.send_reply(WSReply(
+                id=request.id,
+                ok=False,
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                error="OSC streaming not enabled. Set EXAPLAY_OSC_ENABLE=true to enable."
+            ))
+            return
+        
+        last_event_id = await self._stop_events()
+        self._start_events(
+            delta=request.delta,
+            last_event_id=last_event_id,
+            compositions=request.compositions or None,
+            event_types=request.types or None,
+            max_hz=request.maxHz
+        )
+        await self.send_reply(WSReply(id=request.id, ok=True))
+    
+    def _start_events(self, **subscription: Any) -> None:
+        """Register with the broadcaster and start pushing events."""
+        self._client = osc_broadcaster.add_client(**subscription)
+        self._pusher = asyncio.create_task(self._push_events(self._client))
+    
+    async def _stop_events(self) -> Optional[int]:
+        """Stop pushing events.
+        
+        Returns:
+            Optional[int]: Id of the last event sent, for resuming
+        """
+        pusher, client = self._pusher, self._client
+        self._pusher = self._client = None
+        if pusher is not None:
+            pusher.cancel()
+            try:
+                await pusher
+            except asyncio.CancelledError:
+                pass
+        if client is None:
+            return None
+        osc_broadcaster.remove_client(client)
+        return client.cursor - 1
+    
+    async def _push_events(self, client: SSEClient) -> None:
+        """Forward the client's events from the broadcaster as event frames."""
+        try:
+            async for chunk in osc_broadcaster.get_client_events(client):
+                for frame in _event_frames(chunk):
+                    await self.send(frame)
+        except (WebSocketDisconnect, RuntimeError):
+            pass
+    
+    async def run(self) -> None:
+        """Serve the connection until the client disconnects."""
+        if settings.exaplay_osc_enable:
+            self._start_events()
+        await self.send(json.dumps({"type": "hello", "events": settings.exaplay_osc_enable}))
+        try:
+            while True:
+                message = await self.websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                text = message.get("text")
+                if text is None:
+                    text = (message.get("bytes") or b"").decode("utf-8", errors="replace")
+                await self.handle_frame(text)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            await self._stop_events()
+            for task in list(self._tasks):
+                task.cancel()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Per-connection counters, logged when the connection closes."""
+        return {"commands": self.commands, "errors": self.errors}
+
+
+@router.websocket("/ws")
+async def control_channel(websocket: WebSocket) -> None:
+    """Serve the WebSocket control-and-telemetry channel.
+    
+    Authenticates the handshake once (Bearer header or ``token`` query
+    parameter), then accepts command frames and pushes status events until
+    the client disconnects. The whole connection shares one trace ID.
+    
+    Args:
+        websocket: Incoming WebSocket connection
+    """
+    client_ip = websocket.client.host if websocket.client else "unknown"
+    with RequestLoggingContext():
+        if not _authenticate(websocket):
+            logger.warning("Authentication failed: WebSocket handshake", path=websocket.url.path, client_ip=client_ip)
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        
+        await websocket.accept()
+        channel = ControlChannel(websocket)
+        websocket_clients.inc()
+        logger.info("WebSocket connected", client_ip=client_ip)
+        try:
+            await channel.run()
+        finally:
+            websocket_clients.dec()
+            logger.info("WebSocket disconnected", client_ip=client_ip, **channel.stats())
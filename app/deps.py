@@ -4,14 +4,20 @@ Provides reusable dependency functions for Bearer token authentication,
 CORS configuration, and other common request processing needs.
 """
 
-from typing import Optional
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
 
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.exaplay.admission import Priority, set_priority
+from app.exaplay.deadline import tighten_deadline
 from app.exaplay.models import ErrorResponse
 from app.logging import RequestLoggingContext, get_logger, get_trace_id, set_trace_id
+from app.metrics import rate_limit_rejections
 from app.settings import settings
 
 logger = get_logger(__name__)
@@ -150,6 +156,56 @@ def configure_cors(app) -> None:
     )
 
 
+def request_deadline(seconds: Optional[float]):
+    """Get a dependency that tightens the request deadline for a route group.
+    
+    The budget can only shrink the deadline set by the middleware (from
+    X-Request-Timeout or REQUEST_TIMEOUT), never extend it.
+    
+    Args:
+        seconds: Budget in seconds; None or 0 keeps the request's deadline
+        
+    Returns:
+        Dependency applying the budget
+    """
+    async def apply_request_deadline() -> None:
+        tighten_deadline(seconds)
+    
+    return Depends(apply_request_deadline)
+
+
+def request_priority(default: Optional[Priority] = None):
+    """Get a dependency that sets the upstream priority lane of a request.
+    
+    An X-Request-Priority header (critical, normal or bulk) takes
+    precedence over the route's default, so that clients can mark their
+    own background polling as bulk.
+    
+    Args:
+        default: Priority of the route group; None keeps the current priority
+        
+    Returns:
+        Dependency applying the priority
+    """
+    async def apply_request_priority(request: Request) -> None:
+        header = request.headers.get("X-Request-Priority")
+        if header is not None:
+            try:
+                set_priority(Priority(header.strip().lower()))
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=ErrorResponse(
+                        error=f"X-Request-Priority must be one of: {', '.join(p.value for p in Priority)}",
+                        traceId=get_trace_id()
+                    ).model_dump()
+                )
+        elif default is not None:
+            set_priority(default)
+    
+    return Depends(apply_request_priority)
+
+
 # Dependency combinations for common use cases
 def get_authenticated_request() -> list:
     """Get dependencies for authenticated endpoints.
@@ -157,7 +213,7 @@ def get_authenticated_request() -> list:
     Returns:
         list: Dependencies for endpoints requiring authentication
     """
-    return [Depends(setup_request_context), Depends(verify_api_key)]
+    return [Depends(setup_request_context), Depends(verify_api_key), request_priority()]
 
 
 def get_public_request() -> list:
@@ -169,58 +225,134 @@ def get_public_request() -> list:
     return [Depends(setup_request_context)]
 
 
-# Rate limiting dependency (simplified implementation)
+# Rate limiting
+class _Bucket:
+    """Token bucket state of one client."""
+    
+    __slots__ = ("tokens", "updated")
+    
+    def __init__(self, tokens: float, updated: float) -> None:
+        """Initialize a bucket with the given tokens at time.monotonic() updated."""
+        self.tokens = tokens
+        self.updated = updated
+
+
 class RateLimiter:
-    """Simple in-memory rate limiter for API endpoints.
+    """In-memory token-bucket rate limiter keyed by client IP or API key.
     
-    Note: This is a basic implementation suitable for single-instance
-    deployments. For production clusters, consider using Redis or
-    similar distributed rate limiting solutions.
+    Each client may send up to max_requests at once, refilled continuously
+    at max_requests per window_seconds, so a check is O(1) regardless of
+    traffic. Buckets live in an LRU map capped at max_keys; a bucket idle
+    long enough to have refilled completely is indistinguishable from a new
+    one and is evicted as soon as it reaches the LRU end.
+    
+    Note: State is per process. For production clusters, consider using
+    Redis or similar distributed rate limiting solutions.
+    
+    Example:
+        limiter = RateLimiter(max_requests=60, window_seconds=60, name="admin")
+        await limiter.check_rate_limit(request)  # 429 once the bucket is empty
     """
     
-    def __init__(self, max_requests: int, window_seconds: int = 60) -> None:
+    def __init__(
+        self,
+        max_requests: int,
+        window_seconds: int = 60,
+        name: str = "default",
+        max_keys: Optional[int] = None
+    ) -> None:
         """Initialize rate limiter.
         
         Args:
-            max_requests: Maximum requests allowed in window
+            max_requests: Maximum requests allowed in window (also the burst size; 0 disables limiting)
             window_seconds: Time window in seconds
+            name: Limiter name used in logs, headers and the metrics label
+            max_keys: Most clients tracked at once (defaults to settings)
         """
+        self.name = name
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self._requests: dict = {}  # client_ip -> list of timestamps
+        self.max_keys = max_keys or settings.rate_limit_max_keys
+        self._buckets: "OrderedDict[str, _Bucket]" = OrderedDict()
+        self.evicted = 0
+    
+    def _evict(self, now: float, refill_time: float) -> None:
+        """Drop least recently used buckets that are full again or over the key cap."""
+        while self._buckets:
+            key, bucket = next(iter(self._buckets.items()))
+            if len(self._buckets) <= self.max_keys and now - bucket.updated < refill_time:
+                break
+            del self._buckets[key]
+            self.evicted += 1
+    
+    def acquire(self, key: str, now: Optional[float] = None) -> Tuple[bool, int, int]:
+        """Take a token from a client's bucket.
+        
+        Args:
+            key: Client key (IP address or API key)
+            now: Current time.monotonic() (for tests)
+        
+        Returns:
+            Tuple: (allowed, remaining requests, seconds until the bucket is
+            full again, or until the next token if not allowed)
+        """
+        now = time.monotonic() if now is None else now
+        capacity = float(self.max_requests)
+        rate = capacity / self.window_seconds
+        
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = _Bucket(capacity, now)
+            self._buckets[key] = bucket
+            self._evict(now, self.window_seconds)
+        else:
+            bucket.tokens = min(capacity, bucket.tokens + (now - bucket.updated) * rate)
+            bucket.updated = now
+            self._buckets.move_to_end(key)
+        
+        if bucket.tokens < 1.0:
+            return False, 0, math.ceil((1.0 - bucket.tokens) / rate)
+        bucket.tokens -= 1.0
+        return True, int(bucket.tokens), math.ceil((capacity - bucket.tokens) / rate)
+    
+    @property
+    def tracked(self) -> int:
+        """Number of clients currently tracked."""
+        return len(self._buckets)
     
     async def check_rate_limit(self, request: Request) -> None:
         """Check if request is within rate limits.
         
+        Adds RateLimit-Limit, RateLimit-Remaining, RateLimit-Reset and
+        RateLimit-Policy to the response (via request.state.rate_limit).
+        
         Args:
             request: FastAPI request object
             
         Raises:
             HTTPException: 429 if rate limit exceeded
         """
-        import time
+        if self.max_requests <= 0:
+            return
         
-        client_ip = request.client.host if request.client else "unknown"
-        current_time = time.time()
+        allowed, remaining, reset = self.acquire(rate_limit_key(request))
+        headers = {
+            "RateLimit-Limit": str(self.max_requests),
+            "RateLimit-Remaining": str(remaining),
+            "RateLimit-Reset": str(reset),
+            "RateLimit-Policy": f'{self.max_requests};w={self.window_seconds};name="{self.name}"'
+        }
+        request.state.rate_limit = headers
         
-        # Initialize or clean up old requests for this client
-        if client_ip not in self._requests:
-            self._requests[client_ip] = []
-        
-        # Remove requests outside the current window
-        self._requests[client_ip] = [
-            req_time for req_time in self._requests[client_ip]
-            if current_time - req_time < self.window_seconds
-        ]
-        
-        # Check if limit exceeded
-        if len(self._requests[client_ip]) >= self.max_requests:
+        if not allowed:
+            rate_limit_rejections.inc(self.name)
             logger.warning(
                 "Rate limit exceeded",
-                client_ip=client_ip,
-                requests_in_window=len(self._requests[client_ip]),
+                limiter=self.name,
+                client_ip=request.client.host if request.client else "unknown",
                 max_requests=self.max_requests,
-                window_seconds=self.window_seconds
+                window_seconds=self.window_seconds,
+                retry_after=reset
             )
             
             raise HTTPException(
@@ -229,22 +361,90 @@ class RateLimiter:
                     error=f"Rate limit exceeded. Maximum {self.max_requests} requests per {self.window_seconds} seconds.",
                     traceId=get_trace_id()
                 ).model_dump(),
-                headers={
-                    "Retry-After": str(self.window_seconds),
-                    "X-RateLimit-Limit": str(self.max_requests),
-                    "X-RateLimit-Window": str(self.window_seconds)
-                }
+                headers={"Retry-After": str(reset), **headers}
             )
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the limiter configuration and tracked clients.
         
-        # Record this request
-        self._requests[client_ip].append(current_time)
+        Returns:
+            Dict: Rate limiter statistics suitable for JSON serialization
+        """
+        return {
+            "max_requests": self.max_requests,
+            "window_seconds": self.window_seconds,
+            "tracked_keys": len(self._buckets),
+            "max_keys": self.max_keys,
+            "evicted": self.evicted,
+            "rejected": int(rate_limit_rejections.value(self.name)),
+        }
 
 
-# Create rate limiter instance for admin commands
-admin_rate_limiter = RateLimiter(
-    max_requests=settings.rate_limit_commands_per_minute,
-    window_seconds=60
-)
+def rate_limit_key(request: Request) -> str:
+    """Key identifying the client a request is rate limited as.
+    
+    Args:
+        request: FastAPI request object
+    
+    Returns:
+        str: The bearer token when RATE_LIMIT_KEY is api_key and one was
+        sent, otherwise the client IP
+    """
+    if settings.rate_limit_key == "api_key":
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if token and scheme.lower() == "bearer":
+            return f"key:{token}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+_rate_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(group: str) -> RateLimiter:
+    """Get the limiter of a route group, creating it on first use.
+    
+    The limit comes from RATE_LIMITS[group]; the admin group defaults to
+    RATE_LIMIT_COMMANDS_PER_MINUTE, every other group to unlimited.
+    
+    Args:
+        group: Route group name
+    
+    Returns:
+        RateLimiter: Shared limiter for the group
+    """
+    limiter = _rate_limiters.get(group)
+    if limiter is None:
+        default = settings.rate_limit_commands_per_minute if group == "admin" else 0
+        per_minute = settings.rate_limits.get(group, default)
+        limiter = RateLimiter(max_requests=int(per_minute), window_seconds=60, name=group)
+        _rate_limiters[group] = limiter
+    return limiter
+
+
+def rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Statistics for every enabled route group limiter."""
+    return {group: limiter.stats() for group, limiter in _rate_limiters.items() if limiter.max_requests > 0}
+
+
+def rate_limit(group: str):
+    """Get a dependency that rate limits a route group.
+    
+    Runs before the endpoint, so rejected requests never cause upstream work.
+    
+    Args:
+        group: Route group name (see Settings.RATE_LIMIT_GROUPS)
+    
+    Returns:
+        Dependency applying the group's limiter
+    """
+    async def apply_rate_limit(request: Request) -> None:
+        await get_rate_limiter(group).check_rate_limit(request)
+    
+    return Depends(apply_rate_limit)
+
+
+# Rate limiter instance for admin commands
+admin_rate_limiter = get_rate_limiter("admin")
 
 
 async def check_admin_rate_limit(request: Request) -> None:
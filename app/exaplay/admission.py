@@ -0,0 +1,336 @@
+"""Priority lanes and admission control for upstream ExaPlay commands.
+
+Control commands and status polling used to compete for a host's
+connections in arrival order, so a burst of dashboard polls could delay
+a show-critical ``play``. Every upstream command (or pipelined batch) now
+passes a per-host admission controller first:
+
+- At most ``max_inflight`` commands run against a host at once.
+- Waiting commands are admitted strictly by priority lane (``critical``,
+  then ``normal``, then ``bulk``), in arrival order within a lane.
+- Lanes with a wait budget shed work instead of queueing it: a command
+  is rejected up front if the expected wait already exceeds the budget,
+  and removed from the queue if it waits longer than that. The caller
+  gets a suggested retry delay computed from the queue ahead of it.
+
+The priority of the current request lives in a context variable (like
+the deadline in app.exaplay.deadline), set per route group by the
+request_priority dependency or explicitly via X-Request-Priority.
+Like the pool and breaker, the controller knows nothing about ExaPlay;
+ExaPlayTCPClient maps a rejection to ExaPlayOverloadedError.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextvars import ContextVar, Token
+from enum import Enum
+from typing import Any, Deque, Dict, Optional
+
+from app.logging import get_logger
+from app.settings import settings
+
+logger = get_logger(__name__)
+
+# Smoothing gain for the per-command service time estimate
+_SERVICE_ALPHA = 0.2
+
+
+class Priority(str, Enum):
+    """Upstream priority lanes, most important first."""
+    CRITICAL = "critical"
+    NORMAL = "normal"
+    BULK = "bulk"
+
+
+# Lanes in admission order
+_LANES = (Priority.CRITICAL, Priority.NORMAL, Priority.BULK)
+
+# Priority of upstream work in the current request or background task
+priority_context: ContextVar[Priority] = ContextVar("exaplay_priority", default=Priority.NORMAL)
+
+
+def get_priority() -> Priority:
+    """Get the priority of the current context's upstream work.
+    
+    Returns:
+        Priority: Current priority lane (normal unless set)
+    """
+    return priority_context.get()
+
+
+def set_priority(priority: Priority) -> None:
+    """Set the priority for the rest of the current context.
+    
+    Args:
+        priority: Priority lane for subsequent upstream commands
+    """
+    priority_context.set(priority)
+
+
+class UpstreamPriority:
+    """Context manager that scopes an upstream priority.
+    
+    Example:
+        with UpstreamPriority(Priority.BULK):
+            await route_command("get:status,comp1")
+    """
+    
+    def __init__(self, priority: Priority) -> None:
+        """Initialize context manager.
+        
+        Args:
+            priority: Priority lane for upstream commands inside the block
+        """
+        self.priority = priority
+        self._token: Optional[Token] = None
+    
+    def __enter__(self) -> Priority:
+        """Enter the context and set the priority."""
+        self._token = priority_context.set(self.priority)
+        return self.priority
+    
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        """Exit the context and restore the previous priority."""
+        if self._token is not None:
+            priority_context.reset(self._token)
+            self._token = None
+
+
+class AdmissionRejected(Exception):
+    """Raised when a command is shed because its lane's queue is too slow."""
+    
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _LaneStats:
+    """Admission counters and queue wait times for one priority lane."""
+    
+    def __init__(self) -> None:
+        """Initialize zeroed counters."""
+        self.admitted = 0
+        self.shed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_last = 0.0
+    
+    def record_wait(self, wait: float) -> None:
+        """Account for one admitted command and its time in the queue."""
+        self.admitted += 1
+        self.wait_total += wait
+        self.wait_last = wait
+        self.wait_max = max(self.wait_max, wait)
+
+
+class AdmissionController:
+    """Per-host in-flight cap with strict-priority queueing and load shedding.
+    
+    Example:
+        admitted = await controller.acquire(Priority.BULK, timeout=2.0)
+        try:
+            reply = await send(...)
+        finally:
+            controller.release(admitted)
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        max_inflight: int,
+        wait_budgets: Optional[Dict[Priority, Optional[float]]] = None
+    ) -> None:
+        """Initialize an idle controller.
+        
+        Args:
+            name: Identifier used in logs and stats (usually host:port)
+            max_inflight: Commands allowed to run against the host at once
+            wait_budgets: Longest queue wait per lane before work is shed,
+                None meaning never shed (defaults to settings)
+        """
+        self.name = name
+        self.max_inflight = max_inflight
+        self.wait_budgets: Dict[Priority, Optional[float]] = wait_budgets or {
+            Priority.CRITICAL: None,
+            Priority.NORMAL: settings.upstream_queue_budget_normal or None,
+            Priority.BULK: settings.upstream_queue_budget_bulk or None,
+        }
+        
+        self._inflight = 0
+        self._queues: Dict[Priority, Deque[asyncio.Future]] = {lane: deque() for lane in _LANES}
+        # Seconds a command holds its slot, smoothed; 0 until measured
+        self._service_time = 0.0
+        self._lanes: Dict[Priority, _LaneStats] = {lane: _LaneStats() for lane in _LANES}
+    
+    @property
+    def inflight(self) -> int:
+        """Number of commands currently admitted."""
+        return self._inflight
+    
+    def _ahead_of(self, priority: Priority) -> int:
+        """Number of queued commands admitted before a new one of this priority."""
+        ahead = 0
+        for lane in _LANES:
+            ahead += len(self._queues[lane])
+            if lane == priority:
+                break
+        return ahead
+    
+    def expected_wait(self, priority: Priority) -> float:
+        """Estimated queue wait for a command of this priority arriving now.
+        
+        Args:
+            priority: Priority lane of the command
+        
+        Returns:
+            float: Seconds until a slot is expected to free up for it
+        """
+        if self._inflight < self.max_inflight and not self._ahead_of(priority):
+            return 0.0
+        return (self._ahead_of(priority) + 1) * self._service_time / self.max_inflight
+    
+    def _reject(self, priority: Priority, reason: str) -> AdmissionRejected:
+        """Count a shed command and build its rejection."""
+        self._lanes[priority].shed += 1
+        retry_after = max(1, math.ceil(self.expected_wait(priority)))
+        logger.warning(
+            "Upstream command shed",
+            host=self.name,
+            priority=priority.value,
+            reason=reason,
+            inflight=self._inflight,
+            queued=self._ahead_of(priority),
+            retry_after=retry_after
+        )
+        return AdmissionRejected(f"{self.name} is overloaded ({reason})", retry_after)
+    
+    async def acquire(self, priority: Priority, timeout: Optional[float] = None) -> float:
+        """Wait for an in-flight slot.
+        
+        Args:
+            priority: Priority lane of the command
+            timeout: Caller's own bound on the wait (e.g. its deadline)
+        
+        Returns:
+            float: time.perf_counter() at admission, to pass to release()
+        
+        Raises:
+            AdmissionRejected: If the lane's wait budget is or would be exceeded
+            asyncio.TimeoutError: If the caller's timeout expired first
+        """
+        start = time.perf_counter()
+        if self._inflight < self.max_inflight and not self._ahead_of(priority):
+            self._inflight += 1
+            self._lanes[priority].record_wait(0.0)
+            return start
+        
+        budget = self.wait_budgets.get(priority)
+        if budget is not None and self.expected_wait(priority) > budget:
+            raise self._reject(priority, f"expected {priority.value} queue wait above {budget:g}s")
+        
+        limit = budget
+        if timeout is not None:
+            limit = timeout if limit is None else min(limit, timeout)
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues[priority].append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=limit)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # Admitted just as the wait ended; hand the slot on
+                self.release()
+            elif waiter in self._queues[priority]:
+                self._queues[priority].remove(waiter)
+            if isinstance(e, asyncio.TimeoutError) and budget is not None and limit == budget:
+                raise self._reject(priority, f"{priority.value} queue wait above {budget:g}s") from e
+            raise
+        
+        admitted = time.perf_counter()
+        self._lanes[priority].record_wait(admitted - start)
+        return admitted
+    
+    def release(self, admitted_at: Optional[float] = None) -> None:
+        """Free a slot, handing it to the most important waiting command.
+        
+        Args:
+            admitted_at: Value returned by acquire(), for the service time estimate
+        """
+        if admitted_at is not None:
+            elapsed = time.perf_counter() - admitted_at
+            self._service_time += _SERVICE_ALPHA * (elapsed - self._service_time)
+        
+        for lane in _LANES:
+            queue = self._queues[lane]
+            while queue:
+                waiter = queue.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+        self._inflight -= 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of in-flight commands and per-lane queues.
+        
+        Returns:
+            Dict: Admission statistics suitable for JSON serialization
+        """
+        lanes: Dict[str, Any] = {}
+        for lane in _LANES:
+            counters = self._lanes[lane]
+            avg = counters.wait_total / counters.admitted if counters.admitted else 0.0
+            budget = self.wait_budgets.get(lane)
+            lanes[lane.value] = {
+                "queued": len(self._queues[lane]),
+                "admitted": counters.admitted,
+                "shed": counters.shed,
+                "wait_budget_ms": None if budget is None else round(budget * 1000, 3),
+                "wait_ms": {
+                    "avg": round(avg * 1000, 3),
+                    "max": round(counters.wait_max * 1000, 3),
+                    "last": round(counters.wait_last * 1000, 3),
+                },
+            }
+        return {
+            "inflight": self._inflight,
+            "max_inflight": self.max_inflight,
+            "service_ms": round(self._service_time * 1000, 3),
+            "priorities": lanes,
+        }
+
+
+class AdmissionControllerManager:
+    """Process-wide registry of admission controllers, one per ExaPlay host."""
+    
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._controllers: Dict[str, AdmissionController] = {}
+    
+    def get(self, host: str, port: int, max_inflight: int) -> AdmissionController:
+        """Get the controller for a host, creating it on first use.
+        
+        Args:
+            host: ExaPlay server hostname/IP
+            port: ExaPlay TCP port
+            max_inflight: In-flight cap if the controller must be created
+                (UPSTREAM_MAX_INFLIGHT takes precedence when set)
+        
+        Returns:
+            AdmissionController: Shared controller for host:port
+        """
+        key = f"{host}:{port}"
+        controller = self._controllers.get(key)
+        if controller is None:
+            controller = AdmissionController(key, settings.upstream_max_inflight or max_inflight)
+            self._controllers[key] = controller
+        return controller
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Statistics for every controller keyed by host:port."""
+        return {key: controller.stats() for key, controller in self._controllers.items()}
+
+
+# Global admission registry shared by all clients
+admission_controllers = AdmissionControllerManager()
@@ -0,0 +1,263 @@
+"""Per-host circuit breaking for ExaPlay upstreams.
+
+When an ExaPlay host stops answering, every request would otherwise burn
+through its full retry schedule (several timeouts plus backoff sleeps)
+before failing, tying up coroutines and HTTP workers for tens of seconds.
+The breaker counts consecutive transport failures per host and, once a
+threshold is reached, opens: requests are then rejected immediately
+until a single background probe (``get:ver``) succeeds.
+
+State machine:
+- closed: requests flow; transport failures are counted
+- open: requests fail fast; a probe is scheduled after the reset timeout
+- half_open: the probe is in flight; requests still fail fast
+
+A failed probe re-opens the breaker with a doubled reset timeout (capped).
+Like the pool and multiplexer, the breaker knows nothing about ExaPlay
+exceptions; ExaPlayTCPClient decides what counts as a failure and raises
+ExaPlayCircuitOpenError when a request is rejected.
+"""
+
+import asyncio
+import math
+import time
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.logging import get_logger
+from app.settings import settings
+
+logger = get_logger(__name__)
+
+Probe = Callable[[], Awaitable[Any]]
+
+
+class BreakerState(str, Enum):
+    """Circuit breaker states."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a background half-open probe.
+    
+    Example:
+        breaker = CircuitBreaker("host:7000", probe=client._probe)
+        if not breaker.allow_request():
+            raise ExaPlayCircuitOpenError(..., retry_after=breaker.retry_after())
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        probe: Probe,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: Optional[float] = None,
+        max_reset_timeout: Optional[float] = None
+    ) -> None:
+        """Initialize a closed breaker.
+        
+        Args:
+            name: Identifier used in logs and stats (usually host:port)
+            probe: Coroutine factory that raises if the host is still down
+            failure_threshold: Consecutive failures that open the breaker; 0 disables it (defaults to settings)
+            reset_timeout: Seconds before the first probe (defaults to settings)
+            max_reset_timeout: Upper bound for the probe backoff (defaults to settings)
+        """
+        self.name = name
+        self._probe = probe
+        self.failure_threshold = (
+            settings.circuit_breaker_failure_threshold if failure_threshold is None else failure_threshold
+        )
+        self.reset_timeout = reset_timeout or settings.circuit_breaker_reset_timeout
+        self.max_reset_timeout = max(
+            max_reset_timeout or settings.circuit_breaker_max_reset_timeout,
+            self.reset_timeout
+        )
+        
+        self._state = BreakerState.CLOSED
+        self._consecutive_failures = 0
+        self._current_reset_timeout = self.reset_timeout
+        self._next_probe_at = 0.0
+        self._probe_task: Optional[asyncio.Task] = None
+        
+        # Statistics
+        self._opened = 0
+        self._rejected = 0
+        self._probes = 0
+        self._last_opened_at: Optional[float] = None
+        self._last_error: Optional[str] = None
+    
+    @property
+    def state(self) -> BreakerState:
+        """Current breaker state."""
+        return self._state
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether the breaker ever opens (threshold above zero)."""
+        return self.failure_threshold > 0
+    
+    def allow_request(self) -> bool:
+        """Check whether a request may be sent to the host now.
+        
+        Returns:
+            bool: False if the request must fail fast
+        """
+        if self._state == BreakerState.CLOSED:
+            return True
+        self._rejected += 1
+        return False
+    
+    def retry_after(self) -> int:
+        """Whole seconds until the host may be tried again (at least 1)."""
+        remaining = self._next_probe_at - time.monotonic()
+        return max(1, math.ceil(remaining))
+    
+    def record_success(self) -> None:
+        """Reset the failure count; a reply of any kind proves the host is up."""
+        self._consecutive_failures = 0
+        if self._state != BreakerState.CLOSED and self._probe_task is not asyncio.current_task():
+            self._close()
+    
+    def record_failure(self, error: Optional[BaseException] = None) -> None:
+        """Count a transport failure and open the breaker at the threshold.
+        
+        Args:
+            error: The failure, kept for stats and logs
+        """
+        if error is not None:
+            self._last_error = str(error)
+        if not self.enabled or self._state != BreakerState.CLOSED:
+            return
+        
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= self.failure_threshold:
+            self._open()
+    
+    def _open(self) -> None:
+        """Trip the breaker and schedule the half-open probe."""
+        self._state = BreakerState.OPEN
+        self._opened += 1
+        self._last_opened_at = time.time()
+        self._next_probe_at = time.monotonic() + self._current_reset_timeout
+        
+        logger.warning(
+            "Circuit breaker opened",
+            upstream=self.name,
+            consecutive_failures=self._consecutive_failures,
+            retry_after=self._current_reset_timeout,
+            error=self._last_error
+        )
+        
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.get_running_loop().create_task(self._probe_loop())
+    
+    def _close(self) -> None:
+        """Return to normal operation."""
+        logger.info("Circuit breaker closed", upstream=self.name)
+        self._state = BreakerState.CLOSED
+        self._consecutive_failures = 0
+        self._current_reset_timeout = self.reset_timeout
+        task, self._probe_task = self._probe_task, None
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+    
+    async def _probe_loop(self) -> None:
+        """Probe the host until it answers, backing off between attempts."""
+        while self._state != BreakerState.CLOSED:
+            await asyncio.sleep(max(0.0, self._next_probe_at - time.monotonic()))
+            
+            self._state = BreakerState.HALF_OPEN
+            self._probes += 1
+            try:
+                await self._probe()
+            except Exception as e:
+                self._last_error = str(e)
+                self._current_reset_timeout = min(self._current_reset_timeout * 2, self.max_reset_timeout)
+                self._state = BreakerState.OPEN
+                self._next_probe_at = time.monotonic() + self._current_reset_timeout
+                logger.info(
+                    "Circuit breaker probe failed",
+                    upstream=self.name,
+                    retry_after=self._current_reset_timeout,
+                    error=str(e)
+                )
+            else:
+                self._close()
+    
+    async def close(self) -> None:
+        """Stop any pending probe."""
+        task, self._probe_task = self._probe_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of breaker state and counters.
+        
+        Returns:
+            Dict: Breaker statistics suitable for JSON serialization
+        """
+        return {
+            "state": self._state.value,
+            "consecutive_failures": self._consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "retry_after": self.retry_after() if self._state != BreakerState.CLOSED else 0,
+            "opened": self._opened,
+            "rejected": self._rejected,
+            "probes": self._probes,
+            "last_opened_at": self._last_opened_at,
+            "last_error": self._last_error,
+        }
+
+
+class CircuitBreakerRegistry:
+    """Process-wide registry of circuit breakers, one per ExaPlay host."""
+    
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._breakers: Dict[str, CircuitBreaker] = {}
+    
+    def get(self, host: str, port: int, probe: Probe) -> CircuitBreaker:
+        """Get the breaker for a host, creating it on first use.
+        
+        Args:
+            host: ExaPlay server hostname/IP
+            port: ExaPlay TCP port
+            probe: Coroutine factory used if the breaker must be created
+        
+        Returns:
+            CircuitBreaker: Shared breaker for host:port
+        """
+        key = f"{host}:{port}"
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(key, probe)
+            self._breakers[key] = breaker
+        return breaker
+    
+    async def close(self) -> None:
+        """Stop pending probes on all breakers."""
+        for breaker in self._breakers.values():
+            await breaker.close()
+    
+    def unhealthy(self) -> Dict[str, Dict[str, Any]]:
+        """Statistics for breakers that are not closed, keyed by host:port."""
+        return {
+            key: breaker.stats()
+            for key, breaker in self._breakers.items()
+            if breaker.state != BreakerState.CLOSED
+        }
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Statistics for every breaker keyed by host:port."""
+        return {key: breaker.stats() for key, breaker in self._breakers.items()}
+
+
+# Global breaker registry shared by all clients
+circuit_breakers = CircuitBreakerRegistry()
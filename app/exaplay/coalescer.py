@@ -0,0 +1,129 @@
+"""Last-writer-wins coalescing for high-rate parameter writes.
+
+Faders and scrub bars send many ``set:vol``/``set:cuetime`` writes per
+second for the same composition. Sent one by one, they queue up behind
+each other and the final value reaches ExaPlay late. The coalescer keeps
+at most one write in flight and at most one pending per (composition,
+parameter) pair: a newer value replaces the pending one, whose caller is
+acknowledged as coalesced without anything being sent. When the
+in-flight write completes, the latest pending value follows immediately,
+so the last value is applied within one round trip of the previous write.
+
+Each write is sent in the context of the request that submitted it, so
+its deadline and trace ID apply. Like the pool and multiplexer, the
+coalescer knows nothing about ExaPlay exceptions; send errors reach the
+caller whose value was being sent.
+"""
+
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+Send = Callable[[], Awaitable[str]]
+WriteKey = Tuple[str, str]  # (composition, parameter)
+
+
+class CoalescedWrite(NamedTuple):
+    """Outcome of a coalesced write."""
+    command: str
+    reply: Optional[str]  # None if superseded before being sent
+    coalesced: bool
+
+
+class _PendingWrite(NamedTuple):
+    command: str
+    send: Send
+    context: contextvars.Context
+    future: asyncio.Future
+
+
+class WriteCoalescer:
+    """Per-key last-writer-wins write queue of depth one.
+    
+    Example:
+        result = await write_coalescer.submit(("comp1", "vol"), "set:vol,comp1,40", send)
+        if result.coalesced:
+            ...  # A newer value replaced this one before it was sent
+    """
+    
+    def __init__(self) -> None:
+        """Initialize with no writes in flight."""
+        self._pending: Dict[WriteKey, _PendingWrite] = {}
+        self._runners: Dict[WriteKey, asyncio.Task] = {}
+        
+        # Statistics per parameter
+        self._counters: Dict[str, Dict[str, int]] = {}
+    
+    def _count(self, parameter: str, counter: str) -> None:
+        """Increment a per-parameter counter."""
+        counters = self._counters.setdefault(parameter, {"submitted": 0, "sent": 0, "coalesced": 0})
+        counters[counter] += 1
+    
+    async def submit(self, key: WriteKey, command: str, send: Send, timeout: Optional[float] = None) -> CoalescedWrite:
+        """Queue a write, replacing any pending write for the same key.
+        
+        Args:
+            key: (composition, parameter) the write targets
+            command: Raw command carrying the new value
+            send: Coroutine factory that sends the command and returns the reply
+            timeout: Seconds to wait for the outcome (None waits until it is known)
+        
+        Returns:
+            CoalescedWrite: The reply, or coalesced=True if a newer value superseded this one
+        
+        Raises:
+            asyncio.TimeoutError: If timeout expired first (the write may still be sent)
+            Exception: Whatever send raised for this write
+        """
+        self._count(key[1], "submitted")
+        write = _PendingWrite(command, send, contextvars.copy_context(), asyncio.get_running_loop().create_future())
+        
+        runner = self._runners.get(key)
+        if runner is None or runner.done():
+            # Nothing in flight: this write goes out at once. The runner is
+            # its own task so a caller that disconnects does not cancel the
+            # writes queued behind it
+            self._runners[key] = asyncio.ensure_future(self._run(key, write))
+        else:
+            superseded = self._pending.pop(key, None)
+            if superseded is not None and not superseded.future.done():
+                self._count(key[1], "coalesced")
+                superseded.future.set_result(CoalescedWrite(superseded.command, None, True))
+            self._pending[key] = write
+        
+        return await asyncio.wait_for(asyncio.shield(write.future), timeout=timeout)
+    
+    async def _run(self, key: WriteKey, first: _PendingWrite) -> None:
+        """Send a write, then the latest pending write for its key until none is left."""
+        write: Optional[_PendingWrite] = first
+        try:
+            while write is not None:
+                self._count(key[1], "sent")
+                task = asyncio.get_running_loop().create_task(write.send(), context=write.context)
+                try:
+                    reply = await asyncio.shield(task)
+                except Exception as e:
+                    if not write.future.done():
+                        write.future.set_exception(e)
+                else:
+                    if not write.future.done():
+                        write.future.set_result(CoalescedWrite(write.command, reply, False))
+                write = self._pending.pop(key, None)
+        finally:
+            if self._runners.get(key) is asyncio.current_task():
+                del self._runners[key]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of write counters per parameter.
+        
+        Returns:
+            Dict: Coalescer statistics suitable for JSON serialization
+        """
+        return {
+            "inflight": sum(1 for runner in self._runners.values() if not runner.done()),
+            "parameters": {parameter: dict(counters) for parameter, counters in self._counters.items()},
+        }
+
+
+# Global coalescer shared by the volume and cuetime routes
+write_coalescer = WriteCoalescer()
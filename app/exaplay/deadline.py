@@ -0,0 +1,103 @@
+"""Request-scoped deadline budget for upstream ExaPlay calls.
+
+Without a deadline, every connect, write, read and retry of a request gets
+the full TCP timeout, so one request's worst case is the sum of all of
+them plus backoff sleeps. A deadline is an absolute point in time stored
+in a context variable for the current request (like the trace ID in
+app.logging). ExaPlayTCPClient shortens each operation's timeout to the
+remaining budget, skips retries that cannot fit, and raises
+ExaPlayDeadlineError as soon as the budget is spent.
+
+Deadlines only ever get tighter: nesting a scope with a longer budget
+keeps the earlier deadline.
+"""
+
+import time
+from contextvars import ContextVar, Token
+from typing import Any, Optional
+
+# Absolute time.monotonic() deadline for the current request, if any
+deadline_context: ContextVar[Optional[float]] = ContextVar("exaplay_deadline", default=None)
+
+
+def get_deadline() -> Optional[float]:
+    """Get the current request's absolute deadline.
+    
+    Returns:
+        Optional[float]: time.monotonic() deadline, or None if unbounded
+    """
+    return deadline_context.get()
+
+
+def remaining_budget() -> Optional[float]:
+    """Seconds left before the current deadline.
+    
+    Returns:
+        Optional[float]: Remaining seconds (may be negative), or None if unbounded
+    """
+    deadline = deadline_context.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def tighten_deadline(seconds: Optional[float]) -> None:
+    """Bound the rest of the current context to at most ``seconds``.
+    
+    Used by per-route dependencies; the value lives until the request's
+    context ends.
+    
+    Args:
+        seconds: Budget in seconds; None or a non-positive value leaves the deadline unchanged
+    """
+    if not seconds or seconds <= 0:
+        return
+    candidate = time.monotonic() + seconds
+    current = deadline_context.get()
+    if current is None or candidate < current:
+        deadline_context.set(candidate)
+
+
+class RequestDeadline:
+    """Context manager that scopes a deadline budget.
+    
+    Example:
+        with RequestDeadline(2.5):
+            reply = await client.send_command("get:status,comp1")
+            # Raises ExaPlayDeadlineError once 2.5s have elapsed
+    
+    ``RequestDeadline(None, unbounded=True)`` clears any inherited
+    deadline, for background work that must not be cut short by the
+    request that happened to start it.
+    """
+    
+    def __init__(self, seconds: Optional[float], unbounded: bool = False) -> None:
+        """Initialize context manager.
+        
+        Args:
+            seconds: Budget in seconds (None or non-positive keeps the inherited deadline)
+            unbounded: Remove any inherited deadline instead of tightening it
+        """
+        self.seconds = seconds
+        self.unbounded = unbounded
+        self._token: Optional[Token] = None
+    
+    def __enter__(self) -> Optional[float]:
+        """Enter the context and set the deadline.
+        
+        Returns:
+            Optional[float]: The effective absolute deadline
+        """
+        if self.unbounded:
+            self._token = deadline_context.set(None)
+        else:
+            current = deadline_context.get()
+            self._token = deadline_context.set(current)
+            tighten_deadline(self.seconds)
+        return deadline_context.get()
+    
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        """Exit the context and restore the previous deadline."""
+        if self._token is not None:
+            deadline_context.reset(self._token)
+            self._token = None
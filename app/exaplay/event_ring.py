@@ -0,0 +1,359 @@
+"""Shared ring buffer of pre-encoded SSE events with per-client cursors.
+
+Every event is encoded once and stored under a monotonically increasing
+id in a fixed-size ring; publishing is O(1) regardless of the number of
+connected clients. Each client keeps only a cursor (the next id it has
+not yet sent) and reads forward from the ring when woken, so a slow
+client never blocks the producer or other clients.
+
+A client whose cursor has fallen out of the ring (too slow, or resuming
+with a Last-Event-ID older than the buffer) receives the latest event of
+every composition instead, then continues from the head. Clients always
+end up with the current state rather than an arbitrary gap.
+
+Clients that filter by composition or event type, or cap their rate,
+subscribe to topics ((event type, composition), or (event type, "*") for
+all compositions) instead. Publishing marks the event's topic dirty for
+the clients in that topic's subscriber set only, and such a client sends
+the latest event of each dirty topic at most max_hz times per second.
+Clients following one composition at 10 Hz are not woken for the others.
+"""
+
+import asyncio
+import time
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Topic of an event: (event type, composition); "*" subscribes to every composition
+Topic = Tuple[str, str]
+ALL_COMPOSITIONS = "*"
+
+# Most events returned by one read, bounding a single write to the client
+READ_BATCH_SIZE = 256
+
+
+class RingEvent:
+    """One published event in its encoded forms."""
+    
+    __slots__ = ("id", "composition", "event_type", "full", "delta")
+    
+    def __init__(self, event_id: int, composition: str, event_type: str, full: bytes, delta: Optional[bytes]) -> None:
+        """Initialize an event.
+        
+        Args:
+            event_id: Ring event id
+            composition: Composition the event belongs to
+            event_type: SSE event type
+            full: Encoded SSE message with the full payload
+            delta: Encoded SSE message with only the changed fields, if any
+        """
+        self.id = event_id
+        self.composition = composition
+        self.event_type = event_type
+        self.full = full
+        self.delta = delta
+
+
+class SSEClient:
+    """Read position and preferences of one connected SSE client."""
+    
+    __slots__ = ("cursor", "delta", "pending", "skipped", "topics", "dirty", "wakeup", "min_interval", "last_sent")
+    
+    def __init__(
+        self,
+        cursor: int,
+        delta: bool = False,
+        topics: Optional[Set[Topic]] = None,
+        max_hz: float = 0.0
+    ) -> None:
+        """Initialize a client.
+        
+        Args:
+            cursor: Id of the next event to send
+            delta: Send delta messages where the event has one
+            topics: Subscribed topics, or None to read every event from the ring
+            max_hz: Most sends per second (0 for no cap)
+        """
+        self.cursor = cursor
+        self.delta = delta
+        # Full messages to send before reading the ring (initial or conflation snapshot)
+        self.pending: List[bytes] = []
+        # Events never delivered because the client fell behind
+        self.skipped = 0
+        
+        self.topics = topics
+        # Subscribed topics published to since the last send, with their event count
+        self.dirty: Dict[Topic, int] = {}
+        self.wakeup = asyncio.Event() if topics is not None else None
+        self.min_interval = 1.0 / max_hz if max_hz > 0 else 0.0
+        self.last_sent = 0.0
+    
+    @property
+    def subscribed(self) -> bool:
+        """Whether the client receives topic subscriptions rather than the whole ring."""
+        return self.topics is not None
+
+
+class EventRing:
+    """Fixed-size ring of encoded events shared by all SSE clients.
+    
+    Example:
+        ring.publish("comp1", "status", full, delta)
+        client = ring.attach(last_event_id=None)
+        while True:
+            await ring.wait(client, timeout=30.0)
+            messages = ring.read(client)
+    """
+    
+    def __init__(self, capacity: int) -> None:
+        """Initialize an empty ring.
+        
+        Args:
+            capacity: Number of events retained for resuming and slow clients
+        """
+        self.capacity = max(1, capacity)
+        self._slots: List[Optional[RingEvent]] = [None] * self.capacity
+        # Latest event per topic, for snapshots and subscribed clients
+        self._latest: Dict[Topic, RingEvent] = {}
+        # Subscribed clients per topic
+        self._subscribers: Dict[Topic, Set[SSEClient]] = {}
+        self._next_id = 1
+        self._event = asyncio.Event()
+        
+        # Statistics
+        self.conflations = 0
+        self.coalesced = 0
+        self.resumes = 0
+    
+    @property
+    def next_id(self) -> int:
+        """Id the next published event will get."""
+        return self._next_id
+    
+    @property
+    def oldest_id(self) -> int:
+        """Id of the oldest event still in the ring."""
+        return max(1, self._next_id - self.capacity)
+    
+    def publish(self, composition: str, event_type: str, full: bytes, delta: Optional[bytes] = None) -> int:
+        """Append an event and wake waiting clients.
+        
+        Unfiltered clients share one wakeup; subscribed clients are only
+        marked and woken if they subscribed to the event's topic.
+        
+        Args:
+            composition: Composition the event belongs to
+            event_type: SSE event type
+            full: Encoded message with the full payload (without an id line)
+            delta: Encoded message with only the changed fields, if it differs
+        
+        Returns:
+            int: The event's id
+        """
+        event_id = self._next_id
+        id_line = b"id: %d\n" % event_id
+        event = RingEvent(event_id, composition, event_type, id_line + full, id_line + delta if delta is not None else None)
+        self._slots[event_id % self.capacity] = event
+        topic = (event_type, composition)
+        self._latest[topic] = event
+        self._next_id = event_id + 1
+        self._event.set()
+        
+        subscribers = self._subscribers
+        if subscribers:
+            for client in chain(subscribers.get(topic, ()), subscribers.get((event_type, ALL_COMPOSITIONS), ())):
+                client.dirty[topic] = client.dirty.get(topic, 0) + 1
+                client.wakeup.set()
+        return event_id
+    
+    def attach(
+        self,
+        delta: bool = False,
+        last_event_id: Optional[int] = None,
+        topics: Optional[Iterable[Topic]] = None,
+        max_hz: float = 0.0
+    ) -> SSEClient:
+        """Create a client positioned at the head of the ring.
+        
+        A new client is sent the latest event of every composition first. A
+        client resuming with a Last-Event-ID still in the ring continues right
+        after it; an older (or unknown) id also gets the snapshot.
+        
+        With topics the client is subscribed instead: it is sent the latest
+        event of each of its topics (those newer than last_event_id when
+        resuming) and then only changes to them.
+        
+        Args:
+            delta: Send delta messages where available
+            last_event_id: Id of the last event the client received, if resuming
+            topics: (event type, composition) pairs to subscribe to; composition
+                "*" matches every composition
+            max_hz: Most sends per second (0 for no cap); requires topics
+        
+        Returns:
+            SSEClient: The new client
+        
+        Raises:
+            ValueError: If max_hz is set without topics
+        """
+        if topics is None and max_hz > 0:
+            raise ValueError("max_hz requires topics (use (event type, \"*\") for every composition)")
+        resumable = last_event_id is not None and last_event_id < self._next_id
+        if topics is None:
+            client = SSEClient(self._next_id, delta)
+            if resumable and self.oldest_id - 1 <= last_event_id:
+                client.cursor = last_event_id + 1
+                self.resumes += 1
+            else:
+                client.pending = self.snapshot()
+            return client
+        
+        client = SSEClient(self._next_id, delta, set(topics or ()), max_hz)
+        for topic in client.topics:
+            self._subscribers.setdefault(topic, set()).add(client)
+        if resumable:
+            self.resumes += 1
+        client.pending = self.snapshot(client.topics, after=last_event_id if resumable else 0)
+        return client
+    
+    def detach(self, client: SSEClient) -> None:
+        """Remove a subscribed client from its topics."""
+        for topic in client.topics or ():
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(client)
+                if not subscribers:
+                    del self._subscribers[topic]
+    
+    def snapshot(self, topics: Optional[Set[Topic]] = None, after: int = 0) -> List[bytes]:
+        """Latest full message of every topic, in event order.
+        
+        Args:
+            topics: Only these topics (composition "*" matches all), or None for all
+            after: Only events with a higher id
+        
+        Returns:
+            List[bytes]: Encoded messages
+        """
+        events = [
+            event for topic, event in self._latest.items()
+            if event.id > after and (
+                topics is None or topic in topics or (topic[0], ALL_COMPOSITIONS) in topics
+            )
+        ]
+        return [event.full for event in sorted(events, key=lambda event: event.id)]
+    
+    def read(self, client: SSEClient) -> List[bytes]:
+        """Take the messages a client has not sent yet and advance its cursor.
+        
+        Args:
+            client: Reading client
+        
+        Returns:
+            List[bytes]: Encoded messages, at most READ_BATCH_SIZE from the ring
+        """
+        if client.pending:
+            messages, client.pending = client.pending, []
+            client.last_sent = time.monotonic()
+            return messages
+        if client.subscribed:
+            return self._read_subscribed(client)
+        
+        head = self._next_id
+        if client.cursor >= head:
+            return []
+        oldest = self.oldest_id
+        if client.cursor < oldest:
+            # Fell out of the ring: replace the lost events with the current state
+            client.skipped += oldest - client.cursor
+            client.cursor = head
+            self.conflations += 1
+            return self.snapshot()
+        
+        end = min(head, client.cursor + READ_BATCH_SIZE)
+        slots, capacity, delta = self._slots, self.capacity, client.delta
+        messages = []
+        for event_id in range(client.cursor, end):
+            event = slots[event_id % capacity]
+            messages.append(event.delta if delta and event.delta is not None else event.full)
+        client.cursor = end
+        return messages
+    
+    def _read_subscribed(self, client: SSEClient) -> List[bytes]:
+        """Take the latest event of each topic published to since the last send."""
+        dirty, client.dirty = client.dirty, {}
+        client.wakeup.clear()
+        if not dirty:
+            return []
+        client.last_sent = time.monotonic()
+        
+        events = []
+        for topic, count in dirty.items():
+            event = self._latest.get(topic)
+            if event is not None:
+                events.append((event, count))
+            self.coalesced += count - 1
+        events.sort(key=lambda pair: pair[0].id)
+        if events:
+            client.cursor = max(client.cursor, events[-1][0].id + 1)
+        # A delta is only valid on top of the event sent just before it
+        return [
+            event.delta if client.delta and count == 1 and event.delta is not None else event.full
+            for event, count in events
+        ]
+    
+    async def wait(self, client: SSEClient, timeout: float) -> bool:
+        """Wait until the client has something to read.
+        
+        A subscribed client with a rate cap then waits out the rest of its
+        send interval, so everything published meanwhile is coalesced.
+        
+        Args:
+            client: Waiting client
+            timeout: Seconds to wait at most for the first event
+        
+        Returns:
+            bool: True if messages are available, False on timeout
+        """
+        if client.pending:
+            return True
+        if client.subscribed:
+            if not client.dirty:
+                try:
+                    await asyncio.wait_for(client.wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    return False
+            delay = client.last_sent + client.min_interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return True
+        if client.cursor < self._next_id:
+            return True
+        if self._event.is_set():
+            # Everyone woken by the last set has caught up; wait for the next one
+            self._event = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+    
+    def clear(self) -> None:
+        """Forget the latest state per composition (ids keep increasing)."""
+        self._latest.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of ring counters.
+        
+        Returns:
+            Dict: Ring statistics suitable for JSON serialization
+        """
+        return {
+            "capacity": self.capacity,
+            "next_id": self._next_id,
+            "compositions": len(self._latest),
+            "conflations": self.conflations,
+            "coalesced": self.coalesced,
+            "resumes": self.resumes,
+            "subscribed_topics": len(self._subscribers),
+        }
@@ -0,0 +1,350 @@
+"""Server-side volume fades sent as timed ``set:vol`` steps.
+
+Clients used to fade by sending one HTTP request per volume step. That
+costs far more than the fade itself, and steps bunch up audibly whenever
+requests are delayed. The fade engine instead runs one background task
+per composition that sends ``set:vol`` at VOLUME_FADE_TICK_RATE over the
+host's pooled (persistent) connections, following a linear, equal-power
+or exponential curve.
+
+Ticks are scheduled on absolute times from the start of the fade, so a
+slow step does not shift the rest of the fade: ticks whose slot passed
+while the previous step was still in flight are dropped and counted, and
+the final step always lands on the target. Steps are only sent when the
+integer volume changes.
+
+Starting a new fade on a composition retargets it from the last level
+ExaPlay acknowledged; a manual volume write cancels the running fade.
+"""
+
+import asyncio
+import math
+import time
+from typing import Any, Dict, Optional
+
+from app.exaplay.admission import Priority, UpstreamPriority
+from app.exaplay.deadline import RequestDeadline
+from app.exaplay.fleet import route_command, route_read
+from app.exaplay.mapper import parse_volume_response
+from app.exaplay.models import FadeCurve, FadeStatusResponse
+from app.exaplay.poller import status_poller
+from app.exaplay.tcp_client import ExaPlayError
+from app.logging import get_logger
+from app.settings import settings
+
+logger = get_logger(__name__)
+
+# Consecutive failed steps after which a fade gives up
+_MAX_CONSECUTIVE_ERRORS = 3
+
+# Steepness of the exponential curve (level change over the fade is e^k - 1)
+_EXPONENTIAL_STEEPNESS = 4.0
+
+
+def fade_level(curve: FadeCurve, start: float, target: float, progress: float) -> float:
+    """Volume level of a fade at a point in time.
+    
+    The equal-power and exponential curves are mirrored for fades that go
+    down, so a fade-out drops quickly at first and tails off gently.
+    
+    Args:
+        curve: Fade curve
+        start: Level at progress 0
+        target: Level at progress 1
+        progress: Fraction of the fade duration elapsed (0..1)
+    
+    Returns:
+        float: Level at that point, between start and target
+    """
+    progress = min(1.0, max(0.0, progress))
+    rising = target >= start
+    if curve == FadeCurve.EQUAL_POWER:
+        shape = math.sin(progress * math.pi / 2) if rising else 1 - math.cos(progress * math.pi / 2)
+    elif curve == FadeCurve.EXPONENTIAL:
+        def exponential(p: float) -> float:
+            return math.expm1(_EXPONENTIAL_STEEPNESS * p) / math.expm1(_EXPONENTIAL_STEEPNESS)
+        shape = exponential(progress) if rising else 1 - exponential(1 - progress)
+    else:
+        shape = progress
+    return start + (target - start) * shape
+
+
+class Fade:
+    """One running or finished fade of a composition."""
+    
+    def __init__(self, name: str, start: int, target: int, duration: float, curve: FadeCurve) -> None:
+        """Initialize a fade that has not sent any step yet.
+        
+        Args:
+            name: Composition name
+            start: Volume level the fade starts from
+            target: Volume level the fade ends on
+            duration: Fade duration in seconds
+            curve: Fade curve
+        """
+        self.name = name
+        self.start = start
+        self.target = target
+        self.duration = duration
+        self.curve = curve
+        self.value = start
+        self.state = "running"
+        self.started_at = time.monotonic()
+        self.ended_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        
+        # Statistics
+        self.steps_sent = 0
+        self.steps_dropped = 0
+        self.errors = 0
+        self.jitter_total = 0.0
+        self.jitter_max = 0.0
+        self.ticks = 0
+    
+    @property
+    def running(self) -> bool:
+        """Whether the fade is still sending steps."""
+        return self.state == "running"
+    
+    def progress(self) -> float:
+        """Fraction of the fade duration elapsed."""
+        end = self.ended_at if self.ended_at is not None else time.monotonic()
+        if self.state == "completed":
+            return 1.0
+        return min(1.0, (end - self.started_at) / self.duration)
+    
+    def snapshot(self) -> FadeStatusResponse:
+        """Current progress as an API response."""
+        return FadeStatusResponse(
+            composition=self.name,
+            state=self.state,
+            curve=self.curve,
+            start=self.start,
+            target=self.target,
+            duration=self.duration,
+            value=self.value,
+            progress=round(self.progress(), 3),
+            stepsSent=self.steps_sent,
+            stepsDropped=self.steps_dropped,
+            errors=self.errors,
+            jitterAvgMs=round(self.jitter_total / self.ticks * 1000, 3) if self.ticks else None,
+            jitterMaxMs=round(self.jitter_max * 1000, 3) if self.ticks else None,
+        )
+
+
+class FadeEngine:
+    """Runs at most one volume fade per composition.
+    
+    Example:
+        fade = await fade_engine.start("comp1", target=0, duration=3.0, curve=FadeCurve.EQUAL_POWER)
+        ...
+        await fade_engine.cancel("comp1")  # Before a manual set:vol
+    """
+    
+    def __init__(self) -> None:
+        """Initialize with no fades."""
+        # Last fade per composition, kept after it ends for status queries
+        self._fades: Dict[str, Fade] = {}
+        
+        # Statistics
+        self._started = 0
+        self._finished: Dict[str, int] = {"completed": 0, "cancelled": 0, "failed": 0}
+        self._steps_sent = 0
+        self._steps_dropped = 0
+        self._ticks = 0
+        self._jitter_total = 0.0
+        self._jitter_max = 0.0
+    
+    def get(self, name: str) -> Optional[Fade]:
+        """Get the running or last finished fade of a composition."""
+        return self._fades.get(name)
+    
+    async def start(self, name: str, target: int, duration: float, curve: FadeCurve) -> Fade:
+        """Start fading a composition, replacing any fade already running.
+        
+        A running fade is retargeted: the new fade starts from the last level
+        the old one got acknowledged. Otherwise the start level comes from
+        the status poller or a (cached) ``get:vol`` read.
+        
+        Args:
+            name: Composition name
+            target: Volume level 0-100 to end on
+            duration: Fade duration in seconds
+            curve: Fade curve
+        
+        Returns:
+            Fade: The started fade
+        
+        Raises:
+            ExaPlayError: If the current volume could not be read
+            ExaPlayMappingError: If ExaPlay's volume reply is malformed
+        """
+        start = await self._current_level(name)
+        
+        # A running fade (possibly started while the volume was being read)
+        # hands over at the level it reached
+        previous = self._fades.get(name)
+        retargeted = previous is not None and previous.running
+        if previous is not None and retargeted:
+            await self._stop(previous, "cancelled")
+            start = previous.value
+        
+        fade = Fade(name, start, target, duration, curve)
+        self._fades[name] = fade
+        self._started += 1
+        fade.task = asyncio.create_task(self._run(fade))
+        logger.info(
+            "Volume fade started",
+            composition=name,
+            start=start,
+            target=target,
+            duration=duration,
+            curve=curve.value,
+            retargeted=retargeted
+        )
+        return fade
+    
+    async def cancel(self, name: str) -> Optional[Fade]:
+        """Stop a composition's running fade, if any.
+        
+        Returns once no further step of the fade can reach ExaPlay, so a
+        manual write sent afterwards is not overwritten by the fade.
+        
+        Args:
+            name: Composition name
+        
+        Returns:
+            Optional[Fade]: The cancelled fade, or None if none was running
+        """
+        fade = self._fades.get(name)
+        if fade is None or not fade.running:
+            return None
+        await self._stop(fade, "cancelled")
+        logger.info("Volume fade cancelled", composition=name, value=fade.value)
+        return fade
+    
+    async def close(self) -> None:
+        """Cancel every running fade."""
+        for fade in list(self._fades.values()):
+            if fade.running:
+                await self._stop(fade, "cancelled")
+    
+    async def _current_level(self, name: str) -> int:
+        """Level a new fade of the composition starts from."""
+        fade = self._fades.get(name)
+        if fade is not None and fade.running:
+            return fade.value
+        known = status_poller.volume(name)
+        if known is not None:
+            return known[0]
+        cached = await route_read(f"get:vol,{name}", composition=name)
+        return parse_volume_response(cached.reply)
+    
+    async def _stop(self, fade: Fade, state: str) -> None:
+        """Cancel a fade's task and wait for it to end."""
+        self._finish(fade, state)
+        task = fade.task
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await asyncio.shield(task)
+            except asyncio.CancelledError:
+                # Our own caller being cancelled must not be swallowed
+                if not task.done() or not task.cancelled():
+                    raise
+    
+    def _finish(self, fade: Fade, state: str) -> None:
+        """Mark a running fade as ended."""
+        if fade.running:
+            fade.state = state
+            fade.ended_at = time.monotonic()
+            self._finished[state] += 1
+    
+    def _record_tick(self, fade: Fade, lateness: float) -> None:
+        """Account a tick's scheduling jitter."""
+        fade.ticks += 1
+        fade.jitter_total += lateness
+        fade.jitter_max = max(fade.jitter_max, lateness)
+        self._ticks += 1
+        self._jitter_total += lateness
+        self._jitter_max = max(self._jitter_max, lateness)
+    
+    async def _run(self, fade: Fade) -> None:
+        """Send the fade's steps until it reaches the target or is cancelled."""
+        # Background work: the starting request's deadline must not apply,
+        # and fade steps are show output, so they take the critical lane
+        with RequestDeadline(None, unbounded=True), UpstreamPriority(Priority.CRITICAL):
+            loop = asyncio.get_running_loop()
+            interval = 1.0 / settings.volume_fade_tick_rate
+            ticks = max(1, math.ceil(fade.duration / interval))
+            begin = loop.time()
+            consecutive_errors = 0
+            
+            tick = 1
+            while tick <= ticks:
+                delay = begin + min(tick * interval, fade.duration) - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                
+                # Slots that passed while the previous step was in flight are
+                # dropped; the final tick is never dropped
+                now = loop.time()
+                missed = min(int((now - begin) / interval) - tick, ticks - tick)
+                if missed > 0:
+                    fade.steps_dropped += missed
+                    self._steps_dropped += missed
+                    tick += missed
+                scheduled = begin + min(tick * interval, fade.duration)
+                self._record_tick(fade, max(0.0, now - scheduled))
+                
+                value = round(fade_level(fade.curve, fade.start, fade.target, tick / ticks))
+                if value != fade.value:
+                    command = f"set:vol,{fade.name},{value}"
+                    try:
+                        await route_command(command, composition=fade.name)
+                    except ExaPlayError as e:
+                        fade.errors += 1
+                        consecutive_errors += 1
+                        logger.warning("Volume fade step failed", composition=fade.name, command=command, error=str(e))
+                        if consecutive_errors >= _MAX_CONSECUTIVE_ERRORS:
+                            self._finish(fade, "failed")
+                            logger.error("Volume fade aborted", composition=fade.name, value=fade.value, error=str(e))
+                            return
+                        if tick == ticks:
+                            # Keep trying to land on the target
+                            continue
+                    else:
+                        consecutive_errors = 0
+                        fade.value = value
+                        fade.steps_sent += 1
+                        self._steps_sent += 1
+                tick += 1
+            
+            self._finish(fade, "completed")
+            logger.info(
+                "Volume fade completed",
+                composition=fade.name,
+                target=fade.target,
+                steps_sent=fade.steps_sent,
+                steps_dropped=fade.steps_dropped
+            )
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of fade counters and tick jitter.
+        
+        Returns:
+            Dict: Fade engine statistics suitable for JSON serialization
+        """
+        return {
+            "active": sum(1 for fade in self._fades.values() if fade.running),
+            "started": self._started,
+            **self._finished,
+            "steps_sent": self._steps_sent,
+            "steps_dropped": self._steps_dropped,
+            "jitter_avg_ms": round(self._jitter_total / self._ticks * 1000, 3) if self._ticks else None,
+            "jitter_max_ms": round(self._jitter_max * 1000, 3) if self._ticks else None,
+        }
+
+
+# Global fade engine shared by the volume routes
+fade_engine = FadeEngine()
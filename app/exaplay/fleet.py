@@ -0,0 +1,624 @@
+"""Multi-host routing for a fleet of ExaPlay render nodes.
+
+A single API instance can front several ExaPlay servers. The host registry
+maps composition names (exactly, or via shell-style patterns such as
+``lobby_*``) to named hosts, each with its own connection pool, timeout
+and retry policy. Commands without a composition (e.g. ``get:ver``) and
+unmatched compositions go to the default host.
+
+The registry is configured from JSON, either inline in EXAPLAY_FLEET or in
+the file named by EXAPLAY_FLEET_FILE:
+    
+    {
+        "default": "node01",
+        "hosts": {
+            "node01": {"host": "10.0.0.11", "compositions": ["intro", "lobby_*"]},
+            "node02": {"host": "10.0.0.12", "port": 7000, "timeout": 2.0,
+                       "max_retries": 1, "compositions": ["stage_*"]}
+        },
+        "groups": {
+            "videowall": ["stage_left", "stage_center", "stage_right"]
+        }
+    }
+
+Without either setting the registry holds one host named ``default`` built
+from EXAPLAY_HOST/EXAPLAY_TCP_PORT, so single-node deployments behave as
+before. Groups name sets of compositions (possibly on different hosts)
+that are controlled together with a synchronized dispatch.
+"""
+
+import asyncio
+import json
+import time
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field, ValidationError, model_validator
+
+from app.exaplay.coalescer import CoalescedWrite, write_coalescer
+from app.exaplay.deadline import remaining_budget
+from app.exaplay.poller import status_poller
+from app.exaplay.read_cache import CachedReply, command_kind, read_cache
+from app.exaplay.tcp_client import (
+    CommandResult,
+    ExaPlayCircuitOpenError,
+    ExaPlayConnectionError,
+    ExaPlayDeadlineError,
+    ExaPlayError,
+    ExaPlayOverloadedError,
+    ExaPlayProtocolError,
+    ExaPlayTCPClient,
+    ExaPlayTimeoutError,
+    SynchronizedResult,
+    send_synchronized,
+)
+from app.logging import get_logger
+from app.settings import settings
+
+logger = get_logger(__name__)
+
+DEFAULT_HOST_NAME = "default"
+
+# Upper bound on memoised pattern lookups, so arbitrary names cannot grow it forever
+_RESOLVE_CACHE_MAX = 4096
+
+
+class HostConfig(BaseModel):
+    """Connection and retry policy for one ExaPlay host.
+    
+    Unset values fall back to the global TCP settings.
+    """
+    host: str = Field(..., min_length=1, description="ExaPlay server hostname or IP address")
+    port: int = Field(default=7000, ge=1, le=65535, description="ExaPlay TCP control port")
+    timeout: Optional[float] = Field(default=None, gt=0, description="TCP operation timeout in seconds")
+    max_retries: Optional[int] = Field(default=None, ge=0, description="Maximum retry attempts")
+    retry_backoff: Optional[float] = Field(default=None, ge=0, description="Initial retry backoff in seconds")
+    pool_min_size: Optional[int] = Field(default=None, ge=0, description="Idle connections kept open")
+    pool_max_size: Optional[int] = Field(default=None, ge=1, description="Maximum concurrent connections")
+    compositions: List[str] = Field(
+        default_factory=list,
+        description="Composition names or shell-style patterns served by this host"
+    )
+
+
+class FleetConfig(BaseModel):
+    """Host registry configuration."""
+    hosts: Dict[str, HostConfig] = Field(..., min_length=1, description="Hosts keyed by name")
+    default: Optional[str] = Field(
+        default=None,
+        description="Host for unmatched compositions (defaults to the first host)"
+    )
+    groups: Dict[str, List[str]] = Field(
+        default_factory=dict,
+        description="Composition groups controlled together, keyed by group name"
+    )
+    
+    @model_validator(mode="after")
+    def check_default(self) -> "FleetConfig":
+        """Ensure the default host refers to a configured host."""
+        if self.default is None:
+            self.default = next(iter(self.hosts))
+        elif self.default not in self.hosts:
+            raise ValueError(f"Default host '{self.default}' is not defined in hosts")
+        for group, members in self.groups.items():
+            if not members or not all(member.strip() for member in members):
+                raise ValueError(f"Group '{group}' must list at least one non-empty composition name")
+        return self
+    
+    @model_validator(mode="after")
+    def check_unique_addresses(self) -> "FleetConfig":
+        """Ensure no two hosts share an address.
+        
+        The pool, circuit breaker, RTT estimator and admission controller
+        are shared per host:port and take their policy from the first
+        client created for it, so a second entry for the same address
+        would silently run with the first entry's settings.
+        """
+        seen: Dict[str, str] = {}
+        for name, host_config in self.hosts.items():
+            address = f"{host_config.host.lower()}:{host_config.port}"
+            if address in seen:
+                raise ValueError(
+                    f"Hosts '{seen[address]}' and '{name}' both use {address}; "
+                    f"list the compositions of both under one host"
+                )
+            seen[address] = name
+        return self
+
+
+class HostStats:
+    """Request, error and latency counters for one host."""
+    
+    def __init__(self) -> None:
+        """Initialize zeroed counters."""
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.connection_errors = 0
+        self.protocol_errors = 0
+        self.rejected = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.latency_last = 0.0
+        self.last_error: Optional[str] = None
+        self.last_error_at: Optional[float] = None
+    
+    def record(self, latency: float, error: Optional[BaseException] = None) -> None:
+        """Account for one completed command.
+        
+        Args:
+            latency: Seconds spent on the command, including retries
+            error: Error the command failed with, if any
+        """
+        self.requests += 1
+        self.latency_total += latency
+        self.latency_last = latency
+        self.latency_max = max(self.latency_max, latency)
+        
+        if error is None:
+            return
+        
+        self.errors += 1
+        if isinstance(error, (ExaPlayCircuitOpenError, ExaPlayOverloadedError)):
+            self.rejected += 1
+        elif isinstance(error, ExaPlayTimeoutError):
+            self.timeouts += 1
+        elif isinstance(error, ExaPlayProtocolError):
+            self.protocol_errors += 1
+        else:
+            self.connection_errors += 1
+        self.last_error = str(error)
+        self.last_error_at = time.time()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters suitable for JSON serialization."""
+        avg = self.latency_total / self.requests if self.requests else 0.0
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "connection_errors": self.connection_errors,
+            "protocol_errors": self.protocol_errors,
+            "rejected": self.rejected,
+            "latency_ms": {
+                "avg": round(avg * 1000, 3),
+                "max": round(self.latency_max * 1000, 3),
+                "last": round(self.latency_last * 1000, 3),
+            },
+            "last_error": self.last_error,
+            "last_error_at": self.last_error_at,
+        }
+
+
+class ExaPlayHost:
+    """A named fleet member: its client (pool and retry policy) and counters."""
+    
+    def __init__(self, name: str, config: HostConfig) -> None:
+        """Create the host's client and register its connection pool.
+        
+        Args:
+            name: Host name from the registry
+            config: Connection and retry policy
+        """
+        self.name = name
+        self.config = config
+        self.client = ExaPlayTCPClient(
+            host=config.host,
+            port=config.port,
+            timeout=config.timeout,
+            max_retries=config.max_retries,
+            retry_backoff=config.retry_backoff,
+            pool_min_size=config.pool_min_size,
+            pool_max_size=config.pool_max_size
+        )
+        self.stats = HostStats()
+    
+    @property
+    def address(self) -> str:
+        """host:port of the ExaPlay server."""
+        return f"{self.client.host}:{self.client.port}"
+
+
+def composition_of(command: str) -> Optional[str]:
+    """Extract the composition name from a raw ExaPlay command.
+    
+    Composition commands carry the name as their first argument
+    (``play,comp1``, ``set:vol,comp1,50``, ``get:status,comp1``).
+    
+    Args:
+        command: Raw command string
+    
+    Returns:
+        Optional[str]: Composition name, or None for host-level commands
+    """
+    parts = command.split(",", 2)
+    if len(parts) < 2:
+        return None
+    return parts[1].strip() or None
+
+
+class HostRegistry:
+    """Routes commands to ExaPlay hosts by composition name.
+    
+    Example:
+        registry = HostRegistry(FleetConfig(hosts={"a": HostConfig(host="10.0.0.11")}))
+        reply = await registry.send_command("play,intro", composition="intro")
+    """
+    
+    def __init__(self, config: FleetConfig) -> None:
+        """Build hosts and lookup tables from a fleet configuration.
+        
+        Args:
+            config: Validated fleet configuration
+        
+        Raises:
+            ValueError: If a composition name is assigned to more than one host
+        """
+        self.hosts: Dict[str, ExaPlayHost] = {
+            name: ExaPlayHost(name, host_config) for name, host_config in config.hosts.items()
+        }
+        assert config.default is not None
+        self.default = self.hosts[config.default]
+        
+        # Exact names resolve with one dict lookup; patterns are tried in
+        # configuration order and the outcome memoised per name
+        self._exact: Dict[str, ExaPlayHost] = {}
+        self._patterns: List[Tuple[str, ExaPlayHost]] = []
+        for host in self.hosts.values():
+            for entry in host.config.compositions:
+                if any(char in entry for char in "*?["):
+                    self._patterns.append((entry, host))
+                elif self._exact.setdefault(entry, host) is not host:
+                    raise ValueError(
+                        f"Composition '{entry}' is assigned to both "
+                        f"'{self._exact[entry].name}' and '{host.name}'"
+                    )
+        self._resolved: Dict[str, ExaPlayHost] = {}
+        
+        self.groups: Dict[str, List[str]] = config.groups
+    
+    @classmethod
+    def from_settings(cls) -> "HostRegistry":
+        """Build the registry from EXAPLAY_FLEET_FILE, EXAPLAY_FLEET or the single-host settings.
+        
+        Returns:
+            HostRegistry: Registry for the configured fleet
+        
+        Raises:
+            ValueError: If the fleet configuration cannot be read or is invalid
+        """
+        source = None
+        raw = None
+        if settings.exaplay_fleet_file:
+            source = settings.exaplay_fleet_file
+            try:
+                raw = Path(source).read_text(encoding="utf-8")
+            except OSError as e:
+                raise ValueError(f"Cannot read EXAPLAY_FLEET_FILE {source}: {e}") from e
+        elif settings.exaplay_fleet:
+            source = "EXAPLAY_FLEET"
+            raw = settings.exaplay_fleet
+        
+        if raw is None:
+            return cls(FleetConfig(hosts={
+                DEFAULT_HOST_NAME: HostConfig(host=settings.exaplay_host, port=settings.exaplay_tcp_port)
+            }))
+        
+        try:
+            config = FleetConfig.model_validate(json.loads(raw))
+        except (json.JSONDecodeError, ValidationError) as e:
+            raise ValueError(f"Invalid fleet configuration in {source}: {e}") from e
+        
+        logger.info("Loaded ExaPlay fleet configuration", source=source, hosts=list(config.hosts))
+        return cls(config)
+    
+    def resolve(self, composition: Optional[str]) -> ExaPlayHost:
+        """Find the host serving a composition.
+        
+        Args:
+            composition: Composition name, or None for host-level commands
+        
+        Returns:
+            ExaPlayHost: Target host (the default host if nothing matches)
+        """
+        if composition is None:
+            return self.default
+        
+        host = self._exact.get(composition) or self._resolved.get(composition)
+        if host is not None:
+            return host
+        
+        host = next(
+            (candidate for pattern, candidate in self._patterns if fnmatchcase(composition, pattern)),
+            self.default
+        )
+        if len(self._resolved) >= _RESOLVE_CACHE_MAX:
+            self._resolved.clear()
+        self._resolved[composition] = host
+        return host
+    
+    def host_for_command(self, command: str) -> ExaPlayHost:
+        """Find the host for a raw command from the composition it names."""
+        return self.resolve(composition_of(command))
+    
+    async def send_command(self, command: str, composition: Optional[str] = None) -> str:
+        """Send a command to the host serving its composition.
+        
+        Args:
+            command: Raw command string (without CR terminator)
+            composition: Composition the command targets (parsed from the command if omitted)
+        
+        Returns:
+            str: Reply from ExaPlay
+        
+        Raises:
+            ExaPlayError: For any communication or protocol errors
+        """
+        if composition is None:
+            composition = composition_of(command)
+        host = self.resolve(composition)
+        
+        start = time.perf_counter()
+        try:
+            reply = await host.client.send_command(command)
+        except ExaPlayError as e:
+            host.stats.record(time.perf_counter() - start, e)
+            raise
+        host.stats.record(time.perf_counter() - start)
+        
+        self._after_write(host, command, composition)
+        return reply
+    
+    async def read_command(self, command: str, composition: Optional[str] = None) -> CachedReply:
+        """Send a read command through the read cache.
+        
+        Status, volume and version reads are answered from the cache while
+        fresh, and concurrent identical misses share one upstream call.
+        Other commands are sent as with send_command().
+        
+        Args:
+            command: Raw command string (without CR terminator)
+            composition: Composition the command targets (parsed from the command if omitted)
+        
+        Returns:
+            CachedReply: Reply, with its age if it was served from the cache
+        
+        Raises:
+            ExaPlayError: For any communication or protocol errors
+        """
+        if composition is None:
+            composition = composition_of(command)
+        if command_kind(command) is None:
+            return CachedReply(await self.send_command(command, composition=composition), None)
+        
+        host = self.resolve(composition)
+        try:
+            return await read_cache.get(
+                host.address,
+                command,
+                composition,
+                lambda: self.send_command(command, composition=composition),
+                timeout=remaining_budget()
+            )
+        except asyncio.TimeoutError as e:
+            # Only raised while waiting on another request's fetch
+            raise ExaPlayDeadlineError("Request deadline exceeded", command=command) from e
+    
+    @staticmethod
+    def _after_write(host: ExaPlayHost, command: str, composition: Optional[str]) -> None:
+        """Update cached state for a composition after a command that may change it succeeded."""
+        if not command.startswith("get:"):
+            read_cache.invalidate(host.address, composition)
+            status_poller.apply_command(composition, command)
+    
+    async def _pipeline_on(
+        self,
+        host: ExaPlayHost,
+        commands: List[str],
+        stop_on_error: bool
+    ) -> List[CommandResult]:
+        """Run a pipeline on one host and account for every result."""
+        start = time.perf_counter()
+        try:
+            results = await host.client.send_pipeline(commands, stop_on_error=stop_on_error)
+        except ExaPlayError as e:
+            host.stats.record(time.perf_counter() - start, e)
+            raise
+        for result in results:
+            host.stats.record(result.latency, result.error)
+            if result.error is None:
+                self._after_write(host, result.command, composition_of(result.command))
+        return results
+    
+    async def send_pipeline(self, commands: List[str], stop_on_error: bool = False) -> List[CommandResult]:
+        """Send a batch, split into one pipeline per target host.
+        
+        Without ``stop_on_error`` each host receives its share of the batch
+        as one burst and hosts are driven concurrently, so a slow node only
+        delays its own items. With ``stop_on_error`` consecutive runs of
+        commands for the same host are sent in order and the batch stops at
+        the first failure.
+        
+        Args:
+            commands: Raw command strings (without CR terminator), in order
+            stop_on_error: Stop at the first ERR reply or transport failure
+        
+        Returns:
+            List[CommandResult]: Per-command results in request order (shorter
+            than ``commands`` if the batch stopped early)
+        
+        Raises:
+            ExaPlayError: If no host could be reached before any reply arrived
+        """
+        targets = [self.host_for_command(command) for command in commands]
+        
+        if stop_on_error:
+            results: List[CommandResult] = []
+            start = 0
+            while start < len(commands):
+                end = start
+                while end < len(commands) and targets[end] is targets[start]:
+                    end += 1
+                try:
+                    run = await self._pipeline_on(targets[start], commands[start:end], True)
+                except ExaPlayError as e:
+                    if not results:
+                        raise
+                    results.append(CommandResult(commands[start], None, e, 0.0))
+                    break
+                results.extend(run)
+                if len(run) < end - start or run[-1].error is not None:
+                    break
+                start = end
+            return results
+        
+        groups: Dict[str, List[int]] = {}
+        for index, host in enumerate(targets):
+            groups.setdefault(host.name, []).append(index)
+        
+        outcomes = await asyncio.gather(
+            *(
+                self._pipeline_on(self.hosts[name], [commands[i] for i in indexes], False)
+                for name, indexes in groups.items()
+            ),
+            return_exceptions=True
+        )
+        
+        if all(isinstance(outcome, BaseException) for outcome in outcomes):
+            raise outcomes[0]
+        
+        ordered: List[Optional[CommandResult]] = [None] * len(commands)
+        for indexes, outcome in zip(groups.values(), outcomes, strict=True):
+            for position, index in enumerate(indexes):
+                if isinstance(outcome, BaseException):
+                    error = outcome if isinstance(outcome, ExaPlayError) else ExaPlayConnectionError(
+                        str(outcome), command=commands[index]
+                    )
+                    ordered[index] = CommandResult(commands[index], None, error, 0.0)
+                else:
+                    ordered[index] = outcome[position]
+        return [result for result in ordered if result is not None]
+    
+    async def send_synchronized(
+        self,
+        commands: List[str],
+        release_at: Optional[float] = None
+    ) -> List[Tuple[ExaPlayHost, SynchronizedResult]]:
+        """Send commands to their hosts at the same instant.
+        
+        See send_synchronized() in tcp_client for the pre-acquire and
+        barrier phases. Each host receives its commands as one burst.
+        
+        Args:
+            commands: Raw command strings, routed by the composition they name
+            release_at: time.perf_counter() instant to write at (None writes at once)
+            
+        Returns:
+            List: (target host, outcome with write/reply timestamps) per command, in order
+        """
+        hosts = [self.host_for_command(command) for command in commands]
+        results = await send_synchronized(
+            [(host.client, command) for host, command in zip(hosts, commands, strict=True)],
+            release_at=release_at
+        )
+        
+        for host, result in zip(hosts, results, strict=True):
+            if result.replied_at is not None and result.written_at is not None:
+                host.stats.record(result.replied_at - result.written_at, result.error)
+            else:
+                host.stats.record(0.0, result.error)
+            if result.error is None:
+                self._after_write(host, result.command, composition_of(result.command))
+        return list(zip(hosts, results, strict=True))
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-host address, routing and counters keyed by host name."""
+        return {
+            name: {
+                "address": host.address,
+                "default": host is self.default,
+                "compositions": host.config.compositions,
+                **host.stats.snapshot(),
+            }
+            for name, host in self.hosts.items()
+        }
+
+
+_registry: Optional[HostRegistry] = None
+
+
+def get_host_registry() -> HostRegistry:
+    """Get the process-wide host registry, loading it on first use.
+    
+    Returns:
+        HostRegistry: Registry built from settings
+    """
+    global _registry
+    if _registry is None:
+        _registry = HostRegistry.from_settings()
+    return _registry
+
+
+async def route_command(command: str, composition: Optional[str] = None) -> str:
+    """Send a command to whichever fleet host serves its composition.
+    
+    Args:
+        command: Raw command string
+        composition: Target composition (parsed from the command if omitted)
+    
+    Returns:
+        str: Reply from ExaPlay
+    
+    Raises:
+        ExaPlayError: For any communication or protocol errors
+    """
+    return await get_host_registry().send_command(command, composition=composition)
+
+
+async def route_read(command: str, composition: Optional[str] = None) -> CachedReply:
+    """Send a read command through the read cache of whichever host serves it.
+    
+    Args:
+        command: Raw command string
+        composition: Target composition (parsed from the command if omitted)
+    
+    Returns:
+        CachedReply: Reply, with its age if it was served from the cache
+    
+    Raises:
+        ExaPlayError: For any communication or protocol errors
+    """
+    return await get_host_registry().read_command(command, composition=composition)
+
+
+async def route_write(command: str, composition: str, parameter: str) -> CoalescedWrite:
+    """Send a parameter write with last-writer-wins coalescing.
+    
+    While a write for the same composition and parameter is in flight,
+    only the newest of the writes submitted meanwhile is sent after it;
+    the others return with ``coalesced=True``.
+    
+    Args:
+        command: Raw command carrying the new value (e.g. ``set:vol,comp1,40``)
+        composition: Target composition
+        parameter: Parameter being written (e.g. ``vol``, ``cuetime``)
+    
+    Returns:
+        CoalescedWrite: Reply, or coalesced=True if a newer value superseded this one
+    
+    Raises:
+        ExaPlayError: For any communication or protocol errors of this write
+    """
+    if not settings.write_coalescing_enable:
+        return CoalescedWrite(command, await route_command(command, composition=composition), False)
+    
+    try:
+        return await write_coalescer.submit(
+            (composition, parameter),
+            command,
+            lambda: route_command(command, composition=composition),
+            timeout=remaining_budget()
+        )
+    except asyncio.TimeoutError as e:
+        raise ExaPlayDeadlineError("Request deadline exceeded", command=command) from e
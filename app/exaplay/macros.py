@@ -0,0 +1,322 @@
+"""Named cue macros executed inside the API process.
+
+A macro is an ordered list of steps, each an optional delay followed by a
+typed command or a wait for a composition's status (e.g. until it is
+playing). Running the sequence server-side saves a client-to-API round
+trip per step, and waits poll ExaPlay directly every
+MACRO_WAIT_POLL_INTERVAL instead of through client-side polling loops.
+
+Macros are loaded from MACROS_FILE at startup and can be registered or
+removed at runtime through the API. A run is a background task that
+reports progress as a sequence of events; it keeps going if the client
+streaming those events disconnects, so a show sequence is never left
+half-executed.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from pydantic import TypeAdapter, ValidationError
+
+from app.exaplay.admission import Priority, UpstreamPriority
+from app.exaplay.deadline import RequestDeadline
+from app.exaplay.fleet import route_command
+from app.exaplay.mapper import ExaPlayMappingError, parse_status_response
+from app.exaplay.models import MacroDefinition, MacroWait, StatusResponse
+from app.exaplay.tcp_client import ExaPlayDeadlineError, ExaPlayError
+from app.logging import get_logger
+from app.settings import settings
+
+logger = get_logger(__name__)
+
+# Budget of the last status poll when the wait step's timeout is already (nearly) spent
+_MIN_POLL_BUDGET = 0.001
+
+
+class MacroWaitTimeout(Exception):
+    """Raised when a macro's wait condition is not met in time."""
+
+
+def _ms(seconds: float) -> float:
+    """Convert seconds to milliseconds rounded for JSON events."""
+    return round(seconds * 1000, 3)
+
+
+def wait_satisfied(wait: MacroWait, status: StatusResponse) -> bool:
+    """Check a wait condition against a composition status.
+    
+    Args:
+        wait: Condition to check
+        status: Current status of the composition
+    
+    Returns:
+        bool: True if every given part of the condition holds
+    """
+    if wait.state is not None and status.state != wait.state:
+        return False
+    if wait.timeAtLeast is not None and status.time < wait.timeAtLeast:
+        return False
+    return True
+
+
+class MacroRun:
+    """One execution of a macro, reporting progress as events."""
+    
+    def __init__(self, name: str, macro: MacroDefinition) -> None:
+        """Initialize a run that has not started yet.
+        
+        Args:
+            name: Macro name
+            macro: Macro definition
+        """
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.macro = macro
+        self.state = "running"
+        self.task: Optional[asyncio.Task] = None
+        self._events: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+    
+    async def events(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the run's progress events until it has finished."""
+        while True:
+            event = await self._events.get()
+            if event is None:
+                return
+            yield event
+    
+    def _emit(self, event: str, **fields: Any) -> None:
+        """Queue a progress event."""
+        self._events.put_nowait({"event": event, "macro": self.name, "runId": self.id, **fields})
+    
+    async def execute(self) -> None:
+        """Run every step in order, emitting an event per step."""
+        # Background work: the starting request's deadline must not apply,
+        # and show sequences take the critical lane
+        with RequestDeadline(None, unbounded=True), UpstreamPriority(Priority.CRITICAL):
+            start = time.perf_counter()
+            succeeded = failed = 0
+            self._emit("started", steps=len(self.macro.steps))
+            try:
+                for index, step in enumerate(self.macro.steps):
+                    if step.delay:
+                        await asyncio.sleep(step.delay)
+                    
+                    step_start = time.perf_counter()
+                    try:
+                        if step.command is not None:
+                            command = step.command.to_command()
+                            reply = await route_command(command, composition=step.command.name)
+                            self._emit(
+                                "step",
+                                index=index,
+                                sent=command,
+                                status="ok",
+                                reply=reply,
+                                latencyMs=_ms(time.perf_counter() - step_start),
+                                elapsedMs=_ms(time.perf_counter() - start)
+                            )
+                        elif step.wait is not None:
+                            status = await self._wait(step.wait)
+                            self._emit(
+                                "wait",
+                                index=index,
+                                composition=step.wait.name,
+                                status="ok",
+                                state=status.state.value,
+                                time=status.time,
+                                waitedMs=_ms(time.perf_counter() - step_start),
+                                elapsedMs=_ms(time.perf_counter() - start)
+                            )
+                        succeeded += 1
+                    except (ExaPlayError, ExaPlayMappingError, MacroWaitTimeout) as e:
+                        failed += 1
+                        target = (
+                            {"composition": step.wait.name} if step.wait is not None
+                            else {"sent": step.command.to_command()} if step.command is not None else {}
+                        )
+                        self._emit(
+                            "wait" if step.wait is not None else "step",
+                            index=index,
+                            **target,
+                            status="error",
+                            error=str(e),
+                            elapsedMs=_ms(time.perf_counter() - start)
+                        )
+                        if self.macro.stopOnError:
+                            self.state = "aborted"
+                            self._emit("aborted", index=index, error=str(e), elapsedMs=_ms(time.perf_counter() - start))
+                            logger.warning("Macro aborted", macro=self.name, run_id=self.id, index=index, error=str(e))
+                            return
+                
+                self.state = "completed"
+                self._emit(
+                    "completed",
+                    succeeded=succeeded,
+                    failed=failed,
+                    elapsedMs=_ms(time.perf_counter() - start)
+                )
+                logger.info("Macro completed", macro=self.name, run_id=self.id, succeeded=succeeded, failed=failed)
+            except asyncio.CancelledError:
+                self.state = "cancelled"
+                self._emit("cancelled", elapsedMs=_ms(time.perf_counter() - start))
+                raise
+            finally:
+                self._events.put_nowait(None)
+    
+    async def _wait(self, wait: MacroWait) -> StatusResponse:
+        """Poll a composition's status until the condition holds.
+        
+        Raises:
+            MacroWaitTimeout: If the condition does not hold within wait.timeout
+        """
+        deadline = time.perf_counter() + wait.timeout
+        command = f"get:status,{wait.name}"
+        while True:
+            try:
+                # The step's timeout also bounds the poll in flight, so an
+                # unresponsive host cannot hold the wait for TCP timeouts and retries
+                with RequestDeadline(max(deadline - time.perf_counter(), _MIN_POLL_BUDGET)):
+                    reply = await route_command(command, composition=wait.name)
+            except ExaPlayDeadlineError as e:
+                raise MacroWaitTimeout(
+                    f"Timed out after {wait.timeout:g}s waiting for {wait.name} (no status reply)"
+                ) from e
+            status = parse_status_response(reply)
+            if wait_satisfied(wait, status):
+                return status
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise MacroWaitTimeout(
+                    f"Timed out after {wait.timeout:g}s waiting for {wait.name} "
+                    f"(state {status.state.value}, time {status.time})"
+                )
+            await asyncio.sleep(min(settings.macro_wait_poll_interval, remaining))
+
+
+class MacroRegistry:
+    """Named macros and their runs.
+    
+    Example:
+        run = get_macro_registry().run("show_start")
+        async for event in run.events():
+            ...
+    """
+    
+    def __init__(self, macros: Optional[Dict[str, MacroDefinition]] = None) -> None:
+        """Initialize the registry.
+        
+        Args:
+            macros: Initial macro definitions keyed by name
+        """
+        self._macros: Dict[str, MacroDefinition] = dict(macros or {})
+        self._runs: Dict[str, MacroRun] = {}
+        
+        # Statistics
+        self._counters: Dict[str, int] = {"runs": 0, "completed": 0, "aborted": 0, "cancelled": 0}
+    
+    @classmethod
+    def from_settings(cls) -> "MacroRegistry":
+        """Build the registry from MACROS_FILE (empty if unset).
+        
+        Returns:
+            MacroRegistry: Registry with the configured macros
+        
+        Raises:
+            ValueError: If the macros file cannot be read or is invalid
+        """
+        if not settings.macros_file:
+            return cls()
+        try:
+            raw = Path(settings.macros_file).read_text(encoding="utf-8")
+            macros = TypeAdapter(Dict[str, MacroDefinition]).validate_python(json.loads(raw))
+        except (OSError, json.JSONDecodeError, ValidationError) as e:
+            raise ValueError(f"Invalid MACROS_FILE {settings.macros_file}: {e}") from e
+        logger.info("Loaded macros", source=settings.macros_file, macros=list(macros))
+        return cls(macros)
+    
+    def names(self) -> List[str]:
+        """Registered macro names in registration order."""
+        return list(self._macros)
+    
+    def get(self, name: str) -> Optional[MacroDefinition]:
+        """Get a macro definition by name."""
+        return self._macros.get(name)
+    
+    def register(self, name: str, macro: MacroDefinition) -> bool:
+        """Add or replace a macro.
+        
+        Returns:
+            bool: True if a macro of that name was replaced
+        """
+        replaced = name in self._macros
+        self._macros[name] = macro
+        logger.info("Macro registered", macro=name, steps=len(macro.steps), replaced=replaced)
+        return replaced
+    
+    def remove(self, name: str) -> bool:
+        """Remove a macro; runs already started continue.
+        
+        Returns:
+            bool: True if the macro existed
+        """
+        return self._macros.pop(name, None) is not None
+    
+    def run(self, name: str) -> MacroRun:
+        """Start running a macro in the background.
+        
+        Args:
+            name: Macro name
+        
+        Returns:
+            MacroRun: The started run, whose events() report its progress
+        
+        Raises:
+            KeyError: If no macro of that name is registered
+        """
+        run = MacroRun(name, self._macros[name])
+        self._runs[run.id] = run
+        self._counters["runs"] += 1
+        run.task = asyncio.create_task(run.execute())
+        run.task.add_done_callback(lambda _: self._finished(run))
+        logger.info("Macro started", macro=name, run_id=run.id, steps=len(run.macro.steps))
+        return run
+    
+    def _finished(self, run: MacroRun) -> None:
+        """Account a run that has ended."""
+        self._runs.pop(run.id, None)
+        if run.state in self._counters:
+            self._counters[run.state] += 1
+    
+    async def close(self) -> None:
+        """Cancel every running macro."""
+        runs = [run.task for run in self._runs.values() if run.task is not None]
+        for task in runs:
+            task.cancel()
+        await asyncio.gather(*runs, return_exceptions=True)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of macro counters.
+        
+        Returns:
+            Dict: Macro statistics suitable for JSON serialization
+        """
+        return {"registered": len(self._macros), "running": len(self._runs), **self._counters}
+
+
+_registry: Optional[MacroRegistry] = None
+
+
+def get_macro_registry() -> MacroRegistry:
+    """Get the process-wide macro registry, loading MACROS_FILE on first use.
+    
+    Returns:
+        MacroRegistry: Shared macro registry
+    """
+    global _registry
+    if _registry is None:
+        _registry = MacroRegistry.from_settings()
+    return _registry
@@ -4,10 +4,11 @@ This module defines all the data models that match the OpenAPI specification
 exactly, ensuring type safety and automatic validation/serialization.
 """
 
+from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Literal, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 class PlaybackState(str, Enum):
@@ -49,6 +50,22 @@ class VolumeSetRequest(BaseModel):
     model_config = {"json_schema_extra": {"examples": [{"value": 60}]}}
 
 
+class FadeCurve(str, Enum):
+    """Shape of a volume fade between its start and target level."""
+    LINEAR = "linear"
+    EQUAL_POWER = "equal-power"
+    EXPONENTIAL = "exponential"
+
+
+class VolumeFadeRequest(BaseModel):
+    """Request to fade composition volume to a target level over time."""
+    target: int = Field(..., ge=0, le=100, description="Volume level 0-100 at the end of the fade")
+    duration: float = Field(..., gt=0, le=3600, description="Fade duration in seconds")
+    curve: FadeCurve = Field(FadeCurve.LINEAR, description="Fade curve: linear, equal-power or exponential")
+    
+    model_config = {"json_schema_extra": {"examples": [{"target": 0, "duration": 3.0, "curve": "equal-power"}]}}
+
+
 class CommandRequest(BaseModel):
     """Request to send a raw ExaPlay command (admin/debug endpoint)."""
     raw: str = Field(..., description="Raw ExaPlay command without trailing CR")
@@ -56,6 +73,176 @@ class CommandRequest(BaseModel):
     model_config = {"json_schema_extra": {"examples": [{"raw": "get:status,comp1"}]}}
 
 
+class BatchOperationType(str, Enum):
+    """Typed operations accepted in a batch request."""
+    PLAY = "play"
+    PAUSE = "pause"
+    STOP = "stop"
+    SEEK = "seek"
+    VOL = "vol"
+    CUE = "cue"
+
+
+class BatchOperation(BaseModel):
+    """Typed batch item that is translated to an ExaPlay command.
+    
+    - play/pause/stop: `value` is ignored
+    - seek: `value` is the target time in seconds (`set:cuetime`)
+    - vol: `value` is the volume level 0-100 (`set:vol`)
+    - cue: `value` is the cue/clip index, 1-based for cuelists (`set:cue`)
+    """
+    op: BatchOperationType = Field(..., description="Operation to perform")
+    name: str = Field(..., min_length=1, description="ExaPlay composition name")
+    value: Optional[float] = Field(None, ge=0, description="Seconds for seek, level 0-100 for vol, index for cue")
+    
+    @model_validator(mode="after")
+    def check_value(self) -> "BatchOperation":
+        """Validate that seek, vol and cue operations carry a usable value."""
+        if self.op in (BatchOperationType.SEEK, BatchOperationType.VOL, BatchOperationType.CUE) and self.value is None:
+            raise ValueError(f"'{self.op.value}' requires a value")
+        if self.op == BatchOperationType.VOL and not (0 <= self.value <= 100 and self.value == int(self.value)):
+            raise ValueError("vol value must be an integer between 0 and 100")
+        if self.op == BatchOperationType.CUE and not (self.value >= 1 and self.value == int(self.value)):
+            raise ValueError("cue value must be an integer index of at least 1")
+        return self
+    
+    def to_command(self) -> str:
+        """Build the raw ExaPlay command for this operation."""
+        if self.op == BatchOperationType.SEEK:
+            return f"set:cuetime,{self.name},{self.value}"
+        if self.op == BatchOperationType.VOL:
+            return f"set:vol,{self.name},{int(self.value)}"
+        if self.op == BatchOperationType.CUE:
+            return f"set:cue,{self.name},{int(self.value)}"
+        return f"{self.op.value},{self.name}"
+
+
+class ScheduleRequest(BaseModel):
+    """Typed operations to fire together at an absolute time.
+    
+    Exactly one of `at` (wall clock) or `monotonic` (the server's monotonic
+    clock, as reported by `GET /schedule`) must be given.
+    """
+    commands: List[BatchOperation] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Operations released from one write barrier at the scheduled time"
+    )
+    at: Optional[datetime] = Field(None, description="Wall-clock fire time (ISO 8601; UTC if no offset is given)")
+    monotonic: Optional[float] = Field(None, description="Fire time on the server's monotonic clock, in seconds")
+    
+    @model_validator(mode="after")
+    def check_time(self) -> "ScheduleRequest":
+        """Validate that exactly one fire time is given."""
+        if (self.at is None) == (self.monotonic is None):
+            raise ValueError("Exactly one of 'at' or 'monotonic' is required")
+        return self
+    
+    model_config = {
+        "json_schema_extra": {
+            "examples": [{
+                "commands": [{"op": "cue", "name": "show", "value": 3}, {"op": "play", "name": "show"}],
+                "at": "2026-10-15T20:00:00Z"
+            }]
+        }
+    }
+
+
+class MacroWait(BaseModel):
+    """Condition a macro waits for, checked by polling the composition's status."""
+    name: str = Field(..., min_length=1, description="Composition whose status is checked")
+    state: Optional[PlaybackState] = Field(None, description="Playback state to wait for")
+    timeAtLeast: Optional[float] = Field(None, ge=0, description="Wait until the playback time reaches this many seconds")
+    timeout: float = Field(10.0, gt=0, le=3600, description="Seconds to wait before the step fails")
+    
+    @model_validator(mode="after")
+    def check_condition(self) -> "MacroWait":
+        """Validate that there is something to wait for."""
+        if self.state is None and self.timeAtLeast is None:
+            raise ValueError("A wait needs 'state' and/or 'timeAtLeast'")
+        return self
+
+
+class MacroStep(BaseModel):
+    """One macro step: an optional delay, then a command or a wait."""
+    delay: float = Field(0.0, ge=0, le=3600, description="Seconds to pause before this step")
+    command: Optional[BatchOperation] = Field(None, description="Operation to send")
+    wait: Optional[MacroWait] = Field(None, description="Condition to wait for")
+    
+    @model_validator(mode="after")
+    def check_action(self) -> "MacroStep":
+        """Validate that the step does at most one thing."""
+        if self.command is not None and self.wait is not None:
+            raise ValueError("A step has either 'command' or 'wait', not both")
+        return self
+
+
+class MacroDefinition(BaseModel):
+    """Named, ordered sequence of commands, delays and waits run server-side."""
+    description: Optional[str] = Field(None, description="What the macro does")
+    steps: List[MacroStep] = Field(..., min_length=1, max_length=200, description="Steps, executed in order")
+    stopOnError: bool = Field(True, description="Abort the run at the first failed command or wait")
+    
+    model_config = {
+        "json_schema_extra": {
+            "examples": [{
+                "description": "Start the show and fade in the intro",
+                "steps": [
+                    {"command": {"op": "cue", "name": "show", "value": 1}},
+                    {"command": {"op": "play", "name": "show"}},
+                    {"wait": {"name": "show", "state": "playing", "timeout": 5}},
+                    {"delay": 2.5, "command": {"op": "vol", "name": "show", "value": 100}}
+                ],
+                "stopOnError": True
+            }]
+        }
+    }
+
+
+class BatchRequest(BaseModel):
+    """Ordered list of commands to send to ExaPlay in one upstream burst.
+    
+    Each item is either a raw command string or a typed operation.
+    """
+    commands: List[Union[str, BatchOperation]] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Raw command strings and/or typed operations, executed in order"
+    )
+    stopOnError: bool = Field(
+        False,
+        description="Stop at the first ERR or transport failure instead of sending every command in one burst"
+    )
+    
+    @field_validator("commands")
+    @classmethod
+    def check_raw_commands(cls, commands: List[Union[str, BatchOperation]]) -> List[Union[str, BatchOperation]]:
+        """Reject empty raw commands and embedded line terminators."""
+        for item in commands:
+            if isinstance(item, str):
+                if not item.strip():
+                    raise ValueError("Raw commands cannot be empty")
+                if "\r" in item or "\n" in item:
+                    raise ValueError("Raw commands cannot contain CR or LF characters")
+        return commands
+    
+    model_config = {
+        "json_schema_extra": {
+            "examples": [{
+                "commands": [
+                    "stop,showA",
+                    {"op": "vol", "name": "showA", "value": 80},
+                    {"op": "seek", "name": "showA", "value": 12.5},
+                    {"op": "play", "name": "showA"}
+                ],
+                "stopOnError": False
+            }]
+        }
+    }
+
+
 # Response Models
 class VersionResponse(BaseModel):
     """Response containing ExaPlay version information."""
@@ -76,6 +263,66 @@ class GenericReply(BaseModel):
     }
 
 
+class CoalescedReply(BaseModel):
+    """Response to a parameter write that may have been coalesced.
+    
+    Writes to the same composition parameter that arrive while another is
+    in flight are coalesced: only the newest is sent, earlier ones are
+    acknowledged with ``coalesced: true`` and no reply.
+    """
+    sent: str = Field(..., description="Raw command for this request's value")
+    reply: Optional[str] = Field(None, description="Raw single-line reply from ExaPlay (null if coalesced)")
+    coalesced: bool = Field(False, description="True if a newer value superseded this one before it was sent")
+    
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {"sent": "set:vol,comp1,60", "reply": "OK", "coalesced": False},
+                {"sent": "set:vol,comp1,58", "reply": None, "coalesced": True}
+            ]
+        }
+    }
+
+
+class FadeStatusResponse(BaseModel):
+    """Progress of a server-side volume fade."""
+    composition: str = Field(..., description="Composition being faded")
+    state: Literal["running", "completed", "cancelled", "failed"] = Field(..., description="Fade state")
+    curve: FadeCurve = Field(..., description="Fade curve")
+    start: int = Field(..., ge=0, le=100, description="Volume level the fade started from")
+    target: int = Field(..., ge=0, le=100, description="Volume level the fade ends on")
+    duration: float = Field(..., description="Fade duration in seconds")
+    value: int = Field(..., ge=0, le=100, description="Last volume level acknowledged by ExaPlay")
+    progress: float = Field(..., ge=0, le=1, description="Fraction of the fade duration elapsed")
+    stepsSent: int = Field(..., description="set:vol steps sent so far")
+    stepsDropped: int = Field(..., description="Ticks skipped because the previous step was still in flight")
+    errors: int = Field(..., description="Steps that failed")
+    jitterAvgMs: Optional[float] = Field(None, description="Average milliseconds between a tick's scheduled and actual time")
+    jitterMaxMs: Optional[float] = Field(None, description="Largest tick lateness in milliseconds")
+    
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "composition": "comp1",
+                    "state": "running",
+                    "curve": "equal-power",
+                    "start": 80,
+                    "target": 0,
+                    "duration": 3.0,
+                    "value": 57,
+                    "progress": 0.4,
+                    "stepsSent": 24,
+                    "stepsDropped": 0,
+                    "errors": 0,
+                    "jitterAvgMs": 0.8,
+                    "jitterMaxMs": 2.1
+                }
+            ]
+        }
+    }
+
+
 class VolumeResponse(BaseModel):
     """Response containing current volume level."""
     value: int = Field(..., ge=0, le=100, description="Current volume level 0-100")
@@ -108,6 +355,38 @@ class StatusResponse(BaseModel):
     }
 
 
+class CompositionStatusItem(BaseModel):
+    """Status and/or volume of one composition in a bulk status response."""
+    status: Optional[StatusResponse] = Field(None, description="Normalized status (if requested and available)")
+    volume: Optional[int] = Field(None, ge=0, le=100, description="Volume level (if requested and available)")
+    errors: Optional[Dict[str, str]] = Field(
+        None,
+        description="Per-field errors keyed by field name (`status`, `volume`)"
+    )
+
+
+class BulkStatusResponse(BaseModel):
+    """Status of many compositions gathered in one request."""
+    compositions: Dict[str, CompositionStatusItem] = Field(
+        ...,
+        description="Results keyed by composition name, in request order"
+    )
+    
+    model_config = {
+        "json_schema_extra": {
+            "examples": [{
+                "compositions": {
+                    "comp1": {
+                        "status": {"state": "playing", "time": 15.65, "frame": 939, "clipIndex": -1, "duration": 300.0},
+                        "volume": 75
+                    },
+                    "missing": {"errors": {"status": "ExaPlay returned ERR", "volume": "ExaPlay returned ERR"}}
+                }
+            }]
+        }
+    }
+
+
 class ErrorResponse(BaseModel):
     """Standardized error response with trace ID for debugging."""
     error: str = Field(..., description="Error message")
@@ -148,9 +427,210 @@ class SSEStatusEvent(BaseModel):
     }
 
 
+class SSEStatusSnapshot(SSEStatusEvent):
+    """Merged OSC state of one composition, as served by the state snapshot."""
+    age: float = Field(..., description="Seconds since the last OSC message for the composition")
+    
+    model_config = {
+        "json_schema_extra": {
+            "examples": [{
+                "composition": "comp1",
+                "status": 1,
+                "cuetime": 15.6,
+                "cueframe": 939,
+                "age": 0.016
+            }]
+        }
+    }
+
+
+class WSCommand(BatchOperation):
+    """Command frame sent over the WebSocket control channel."""
+    id: Optional[str] = Field(None, max_length=64, description="Client request id, echoed in the reply")
+    
+    model_config = {"json_schema_extra": {"examples": [{"id": "r17", "op": "vol", "name": "comp1", "value": 60}]}}
+
+
+class WSSubscribe(BaseModel):
+    """Frame replacing the event subscription of a WebSocket connection."""
+    op: Literal["subscribe"] = Field(..., description="Always 'subscribe'")
+    id: Optional[str] = Field(None, max_length=64, description="Client request id, echoed in the reply")
+    compositions: Optional[List[str]] = Field(None, description="Compositions to follow (default: all)")
+    types: Optional[List[str]] = Field(None, description="Event types to follow (default: all)")
+    maxHz: float = Field(0, ge=0, le=1000, description="Most updates per second (0: no cap)")
+    delta: bool = Field(False, description="Send only the changed fields of status events")
+    
+    model_config = {"json_schema_extra": {"examples": [{"op": "subscribe", "compositions": ["comp1"], "maxHz": 10}]}}
+
+
+class WSReply(BaseModel):
+    """Reply frame to a WebSocket command or subscription."""
+    type: Literal["reply"] = "reply"
+    id: Optional[str] = Field(None, description="Request id of the command")
+    ok: bool = Field(..., description="Whether the command succeeded")
+    sent: Optional[str] = Field(None, description="Raw command sent to ExaPlay")
+    reply: Optional[str] = Field(None, description="Reply from ExaPlay")
+    coalesced: Optional[bool] = Field(None, description="Superseded by a newer write before it was sent")
+    status: Optional[int] = Field(None, description="HTTP status code the equivalent REST call would have returned")
+    error: Optional[str] = Field(None, description="Error message")
+    retryAfter: Optional[int] = Field(None, description="Seconds to wait before retrying (429/503)")
+    
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {"type": "reply", "id": "r17", "ok": True, "sent": "set:vol,comp1,60", "reply": "OK", "coalesced": False},
+                {"type": "reply", "id": "r18", "ok": False, "sent": "play,comp9", "status": 504, "error": "TCP timeout"}
+            ]
+        }
+    }
+
+
+class BatchItemResult(BaseModel):
+    """Result of a single command within a batch."""
+    index: int = Field(..., description="Position of the command in the request")
+    sent: str = Field(..., description="Raw command sent to ExaPlay")
+    status: Literal["ok", "error", "skipped"] = Field(..., description="Outcome of the command")
+    reply: Optional[str] = Field(None, description="Raw reply from ExaPlay, if one was received")
+    error: Optional[str] = Field(None, description="Error message if the command failed")
+    latencyMs: Optional[float] = Field(None, description="Milliseconds from sending to receiving the reply")
+
+
+class BatchResponse(BaseModel):
+    """Per-item results of a batch request."""
+    results: List[BatchItemResult] = Field(..., description="Results in request order")
+    succeeded: int = Field(..., description="Number of commands that returned a non-ERR reply")
+    failed: int = Field(..., description="Number of commands that failed")
+    skipped: int = Field(..., description="Number of commands not sent because of stopOnError")
+    totalLatencyMs: float = Field(..., description="Milliseconds for the whole upstream batch")
+    
+    model_config = {
+        "json_schema_extra": {
+            "examples": [{
+                "results": [
+                    {"index": 0, "sent": "play,comp1", "status": "ok", "reply": "OK", "latencyMs": 1.2},
+                    {"index": 1, "sent": "set:vol,comp1,80", "status": "ok", "reply": "OK", "latencyMs": 1.3}
+                ],
+                "succeeded": 2,
+                "failed": 0,
+                "skipped": 0,
+                "totalLatencyMs": 1.4
+            }]
+        }
+    }
+
+
+class GroupMemberResult(BaseModel):
+    """Outcome of a group command for one member composition."""
+    composition: str = Field(..., description="Member composition name")
+    host: str = Field(..., description="Fleet host the command was sent to")
+    sent: str = Field(..., description="Raw command sent to ExaPlay")
+    status: Literal["ok", "error"] = Field(..., description="Outcome of the command")
+    reply: Optional[str] = Field(None, description="Raw reply from ExaPlay, if one was received")
+    error: Optional[str] = Field(None, description="Error message if the command failed")
+    writeOffsetMs: Optional[float] = Field(None, description="Milliseconds after the first write that this command was written")
+    replyOffsetMs: Optional[float] = Field(None, description="Milliseconds after the first write that the reply arrived")
+
+
+class GroupCommandResponse(BaseModel):
+    """Per-member results and dispatch skew of a synchronized group command."""
+    group: str = Field(..., description="Group name")
+    members: List[GroupMemberResult] = Field(..., description="Results in group member order")
+    succeeded: int = Field(..., description="Number of members that returned a non-ERR reply")
+    failed: int = Field(..., description="Number of members that failed")
+    writeSkewMs: float = Field(..., description="Milliseconds between the first and last write")
+    replySkewMs: Optional[float] = Field(None, description="Milliseconds between the first and last reply")
+    
+    model_config = {
+        "json_schema_extra": {
+            "examples": [{
+                "group": "videowall",
+                "members": [
+                    {
+                        "composition": "wall_left", "host": "node01", "sent": "play,wall_left",
+                        "status": "ok", "reply": "OK", "writeOffsetMs": 0.0, "replyOffsetMs": 1.1
+                    },
+                    {
+                        "composition": "wall_right", "host": "node02", "sent": "play,wall_right",
+                        "status": "ok", "reply": "OK", "writeOffsetMs": 0.012, "replyOffsetMs": 1.4
+                    }
+                ],
+                "succeeded": 2,
+                "failed": 0,
+                "writeSkewMs": 0.012,
+                "replySkewMs": 0.3
+            }]
+        }
+    }
+
+
+class ScheduledCommandResponse(BaseModel):
+    """A scheduled set of commands and, once fired, its outcome."""
+    id: str = Field(..., description="Schedule entry ID")
+    state: Literal["pending", "firing", "done", "cancelled"] = Field(..., description="Entry state")
+    commands: List[str] = Field(..., description="Raw commands to send")
+    fireAt: datetime = Field(..., description="Scheduled wall-clock fire time (UTC)")
+    fireMonotonic: float = Field(..., description="Scheduled fire time on the server's monotonic clock")
+    firedAt: Optional[datetime] = Field(None, description="Wall-clock time the commands were written (UTC)")
+    fireErrorMs: Optional[float] = Field(None, description="Milliseconds between the scheduled time and the last write")
+    results: Optional[List[BatchItemResult]] = Field(None, description="Per-command outcome once fired")
+    
+    model_config = {
+        "json_schema_extra": {
+            "examples": [{
+                "id": "3f9c2a71d4e0",
+                "state": "done",
+                "commands": ["set:cue,show,3", "play,show"],
+                "fireAt": "2026-10-15T20:00:00Z",
+                "fireMonotonic": 81234.5,
+                "firedAt": "2026-10-15T20:00:00.000042Z",
+                "fireErrorMs": 0.042,
+                "results": [
+                    {"index": 0, "sent": "set:cue,show,3", "status": "ok", "reply": "OK", "latencyMs": 1.1},
+                    {"index": 1, "sent": "play,show", "status": "ok", "reply": "OK", "latencyMs": 1.2}
+                ]
+            }]
+        }
+    }
+
+
+class ScheduleListResponse(BaseModel):
+    """Scheduled commands together with the server clocks they refer to."""
+    serverTime: datetime = Field(..., description="Current server wall-clock time (UTC)")
+    serverMonotonic: float = Field(..., description="Current value of the server's monotonic clock")
+    scheduled: List[ScheduledCommandResponse] = Field(..., description="Pending and recently fired entries, by fire time")
+
+
 # Health Check Response
 class HealthResponse(BaseModel):
-    """Simple health check response."""
+    """Simple health check response.
+    
+    `upstreams` is only present when at least one ExaPlay host's circuit
+    breaker is not closed, in which case status is "degraded".
+    """
     status: str = Field(default="ok", description="Service health status")
+    upstreams: Optional[Dict[str, Dict[str, Any]]] = Field(
+        None,
+        description="Circuit breaker state of unavailable ExaPlay hosts, keyed by host:port"
+    )
     
     model_config = {"json_schema_extra": {"examples": [{"status": "ok"}]}}
+
+
+class HostReadiness(BaseModel):
+    """Cached reachability of one ExaPlay host."""
+    address: str = Field(..., description="host:port of the ExaPlay host")
+    reachable: bool = Field(..., description="Recent successful probe and circuit breaker not open")
+    breaker: str = Field(..., description="Circuit breaker state: closed, open or half_open")
+    lastProbeOk: Optional[bool] = Field(None, description="Outcome of the last keepalive probe or connect (null before the first)")
+    lastProbeRttMs: Optional[float] = Field(None, description="Round trip of the last probe or connect in milliseconds")
+    lastProbeAgeS: Optional[float] = Field(None, description="Seconds since the last probe or connect")
+    lastProbeError: Optional[str] = Field(None, description="Error of the last probe, if it failed")
+    poolSize: int = Field(..., description="Open pooled connections")
+    poolIdle: int = Field(..., description="Idle pooled connections ready for checkout")
+    poolMinSize: int = Field(..., description="Connections the pool keeps open while idle")
+
+
+class ReadinessResponse(BaseModel):
+    """Readiness probe response built from cached keepalive results."""
+    status: Literal["ready", "not_ready"] = Field(..., description="ready if every ExaPlay host is reachable")
+    hosts: Dict[str, HostReadiness] = Field(..., description="Reachability per fleet host, keyed by host name")
@@ -0,0 +1,318 @@
+"""Pipelined command multiplexing over a single ExaPlay connection.
+
+ExaPlay answers every CR-terminated command with exactly one
+CRLF-terminated reply, in order. The multiplexer exploits this by letting
+many coroutines write their commands back-to-back onto one socket while
+a single reader task resolves a FIFO of per-command futures. A burst of
+N commands then costs one round trip instead of N.
+
+If a command times out while it is the oldest outstanding one and no
+reply at all arrived during its timeout, the stream can no longer be
+trusted to be in step. The multiplexer then resynchronises by dropping the
+connection and failing everything in flight; the next command reconnects.
+
+Like the connection pool, the multiplexer only deals with transport.
+Failures surface as asyncio/OS errors which ExaPlayTCPClient maps to
+ExaPlay exceptions.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.exaplay.pool import ConnectionOpener
+from app.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class _PendingCommand:
+    """A command written to the socket that is still awaiting its reply."""
+    
+    __slots__ = ("command", "future", "sent_at", "replied_at")
+    
+    def __init__(self, command: str, future: "asyncio.Future[str]") -> None:
+        self.command = command
+        self.future = future
+        self.sent_at = time.perf_counter()
+        self.replied_at = 0.0
+
+
+class ExaPlayMultiplexer:
+    """Shares one TCP connection between many concurrent commands.
+    
+    Example:
+        mux = ExaPlayMultiplexer(client._connect, name="host:7000")
+        replies = await asyncio.gather(
+            mux.submit("get:status,comp1", timeout=1.0),
+            mux.submit("get:status,comp2", timeout=1.0),
+        )
+    """
+    
+    def __init__(self, opener: ConnectionOpener, name: str) -> None:
+        """Initialize a disconnected multiplexer.
+        
+        Args:
+            opener: Coroutine factory that opens a new (reader, writer) pair
+            name: Identifier used in logs and stats (usually host:port)
+        """
+        self._opener = opener
+        self.name = name
+        
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: Deque[_PendingCommand] = deque()
+        self._last_reply_at = 0.0
+        
+        # Held only while connecting and writing, never across a round trip
+        self._write_lock = asyncio.Lock()
+        
+        # Statistics
+        self._commands = 0
+        self._late_replies = 0
+        self._resyncs = 0
+        self._connects = 0
+        self._max_in_flight = 0
+    
+    @property
+    def in_flight(self) -> int:
+        """Number of commands written but not yet answered."""
+        return len(self._pending)
+    
+    @property
+    def connected(self) -> bool:
+        """Whether the shared connection is currently open."""
+        return self._writer is not None and not self._writer.is_closing()
+    
+    async def _ensure_connected(self) -> asyncio.StreamWriter:
+        """Open the shared connection and reader task if needed.
+        
+        Must be called with the write lock held.
+        """
+        if self.connected:
+            assert self._writer is not None
+            return self._writer
+        
+        reader, writer = await self._opener()
+        self._reader, self._writer = reader, writer
+        self._connects += 1
+        self._reader_task = asyncio.create_task(self._read_loop(reader))
+        return writer
+    
+    async def _read_loop(self, reader: asyncio.StreamReader) -> None:
+        """Match incoming replies to pending commands in FIFO order."""
+        error: BaseException
+        try:
+            while True:
+                reply_bytes = await reader.readuntil(b"\r\n")
+                self._last_reply_at = time.perf_counter()
+                if not self._pending:
+                    # Nothing was asked for; the stream is out of step
+                    raise ConnectionResetError("Unsolicited reply from ExaPlay")
+                
+                entry = self._pending.popleft()
+                if entry.future.done():
+                    # The caller timed out, this is its late reply
+                    self._late_replies += 1
+                    continue
+                
+                entry.replied_at = self._last_reply_at
+                try:
+                    entry.future.set_result(reply_bytes.decode("utf-8").rstrip("\r\n"))
+                except UnicodeDecodeError as e:
+                    entry.future.set_exception(e)
+                    
+        except asyncio.CancelledError:
+            return
+        except asyncio.IncompleteReadError as e:
+            error = e
+        except Exception as e:
+            error = e
+        
+        if self._reader is reader:
+            logger.warning("Multiplexed connection lost", connection=self.name, error=str(error))
+            self._teardown(ConnectionResetError(f"Connection lost: {error}"))
+    
+    def _teardown(self, error: BaseException) -> None:
+        """Close the connection and fail every pending command."""
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = None
+        self._writer = None
+        
+        task, self._reader_task = self._reader_task, None
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+        
+        while self._pending:
+            entry = self._pending.popleft()
+            if not entry.future.done():
+                entry.future.set_exception(error)
+    
+    def resync(self, reason: str = "manual") -> None:
+        """Drop the connection so the next command starts from a clean stream.
+        
+        Every in-flight command fails with ConnectionResetError, which the
+        client treats as retryable.
+        
+        Args:
+            reason: Why resynchronisation was triggered (for logs)
+        """
+        self._resyncs += 1
+        logger.warning(
+            "Resynchronising multiplexed connection",
+            connection=self.name,
+            reason=reason,
+            in_flight=len(self._pending)
+        )
+        self._teardown(ConnectionResetError(f"Multiplexer resynchronised: {reason}"))
+    
+    async def _write(self, commands: List[str]) -> List[_PendingCommand]:
+        """Register commands as pending and write them in a single burst."""
+        loop = asyncio.get_running_loop()
+        async with self._write_lock:
+            writer = await self._ensure_connected()
+            
+            entries = [_PendingCommand(command, loop.create_future()) for command in commands]
+            self._pending.extend(entries)
+            self._commands += len(entries)
+            self._max_in_flight = max(self._max_in_flight, len(self._pending))
+            
+            # Nothing may await between registering and writing, or the
+            # FIFO would no longer match what is on the wire
+            writer.write("".join(f"{command}\r" for command in commands).encode("utf-8"))
+            try:
+                await writer.drain()
+            except BaseException:
+                for entry in entries:
+                    entry.future.cancel()
+                raise
+        
+        return entries
+    
+    async def _wait(self, entry: _PendingCommand, timeout: float) -> str:
+        """Wait for one pending reply, resynchronising if the stream stalls."""
+        try:
+            return await asyncio.wait_for(entry.future, timeout=timeout)
+        except asyncio.TimeoutError:
+            # wait_for cancelled the future, so a late reply is discarded.
+            # If we are the oldest outstanding command and the socket has
+            # been silent for the whole timeout, the stream has stalled.
+            silent_for = time.perf_counter() - max(entry.sent_at, self._last_reply_at)
+            if self._pending and self._pending[0] is entry and silent_for >= timeout:
+                self.resync(f"timeout waiting for reply to {entry.command.split(',')[0]}")
+            raise
+    
+    async def submit(self, command: str, timeout: float, write_timeout: Optional[float] = None) -> str:
+        """Pipeline one command and wait for its reply.
+        
+        Args:
+            command: Raw command string (without CR terminator)
+            timeout: Seconds to wait for the reply after writing
+            write_timeout: Seconds to wait for the connection and write
+                (defaults to timeout)
+        
+        Returns:
+            str: Reply from ExaPlay (without CRLF terminator)
+        
+        Raises:
+            asyncio.TimeoutError: If no reply arrives in time
+            OSError: If the connection fails or is resynchronised
+        """
+        entries = await asyncio.wait_for(self._write([command]), timeout=write_timeout or timeout)
+        return await self._wait(entries[0], timeout)
+    
+    async def submit_many(
+        self,
+        commands: List[str],
+        timeout: float,
+        write_timeout: Optional[float] = None
+    ) -> List[Tuple[Any, float]]:
+        """Pipeline several commands in one write and collect their replies.
+        
+        Args:
+            commands: Raw command strings, sent in order
+            timeout: Seconds to wait for each reply after writing
+            write_timeout: Seconds to wait for the connection and write
+                (defaults to timeout)
+        
+        Returns:
+            List: (reply string or exception, seconds from write to reply)
+            for each command, in order
+        """
+        entries = await asyncio.wait_for(self._write(commands), timeout=write_timeout or timeout)
+        results = await asyncio.gather(
+            *(self._wait(entry, timeout) for entry in entries),
+            return_exceptions=True
+        )
+        return [
+            (result, (entry.replied_at or time.perf_counter()) - entry.sent_at)
+            for entry, result in zip(entries, results, strict=True)
+        ]
+    
+    async def close(self) -> None:
+        """Close the shared connection and fail any pending commands."""
+        task = self._reader_task
+        self._teardown(ConnectionResetError("Multiplexer closed"))
+        if task is not None:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of multiplexer activity.
+        
+        Returns:
+            Dict: Multiplexer statistics suitable for JSON serialization
+        """
+        return {
+            "connected": self.connected,
+            "in_flight": len(self._pending),
+            "max_in_flight": self._max_in_flight,
+            "commands": self._commands,
+            "late_replies": self._late_replies,
+            "resyncs": self._resyncs,
+            "connects": self._connects,
+        }
+
+
+class MultiplexerRegistry:
+    """Process-wide registry of multiplexers, one per ExaPlay host."""
+    
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._multiplexers: Dict[str, ExaPlayMultiplexer] = {}
+    
+    def get(self, host: str, port: int, opener: ConnectionOpener) -> ExaPlayMultiplexer:
+        """Get the multiplexer for a host, creating it on first use.
+        
+        Args:
+            host: ExaPlay server hostname/IP
+            port: ExaPlay TCP port
+            opener: Coroutine factory used if the multiplexer must be created
+        
+        Returns:
+            ExaPlayMultiplexer: Shared multiplexer for host:port
+        """
+        key = f"{host}:{port}"
+        mux = self._multiplexers.get(key)
+        if mux is None:
+            mux = ExaPlayMultiplexer(opener, name=key)
+            self._multiplexers[key] = mux
+        return mux
+    
+    async def close(self) -> None:
+        """Close every multiplexed connection."""
+        for mux in self._multiplexers.values():
+            await mux.close()
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Statistics for every multiplexer keyed by host:port."""
+        return {key: mux.stats() for key, mux in self._multiplexers.items()}
+
+
+# Global multiplexer registry shared by all clients
+multiplexers = MultiplexerRegistry()
@@ -4,16 +4,35 @@ Provides optional functionality to listen for OSC messages from ExaPlay
 and broadcast them to connected clients via Server-Sent Events (SSE).
 This enables real-time status updates without polling.
 
+Status, cuetime and cueframe messages are merged per composition in an
+OSCStateStore; each change produces one "status" event carrying the full
+SSEStatusEvent (or, for clients that asked for deltas, only the changed
+fields). The messages of one tick are coalesced into a single event, and
+the merged state is applied to the status poller's table so that status
+reads are served from memory. Events are encoded once into a shared ring
+(see EventRing) that every SSE client reads at its own cursor; clients
+filtering by composition or event type, or capping their rate, are
+subscribed to per-topic sets instead.
+
+Datagrams are received on the event loop itself, so handlers and the
+broadcast to client queues run on the loop thread. Where the loop
+supports add_reader (selector loops and uvloop), every readiness wakeup
+drains up to OSC_BATCH_SIZE datagrams from a non-blocking socket with a
+large receive buffer (EXAPLAY_OSC_RCVBUF), so 60 Hz cuetime bursts from
+many compositions are absorbed instead of dropped by the kernel. Other
+loops (e.g. the Windows proactor) fall back to an asyncio datagram
+endpoint on the same socket.
+
 Feature is controlled by EXAPLAY_OSC_ENABLE setting.
 """
 
 import asyncio
 import json
-from typing import Any, AsyncGenerator, Dict, List, Optional, Set
+import socket
+from typing import Any, AsyncGenerator, Dict, List, Optional, Set, Tuple
 
 try:
     from pythonosc import dispatcher
-    from pythonosc import osc_server
     OSC_AVAILABLE = True
 except ImportError:
     # OSC not available, create dummy classes
@@ -21,20 +40,44 @@ except ImportError:
     
     class dispatcher:
         class Dispatcher:
-            def map(self, *args, **kwargs): pass
-    
-    class osc_server:
-        class BlockingOSCUDPServer:
             def __init__(self, *args, **kwargs): pass
-            def serve_forever(self): pass
-            def shutdown(self): pass
+            def map(self, *args, **kwargs): pass
+            def call_handlers_for_packet(self, *args, **kwargs): return []
 
-from app.exaplay.models import SSEStatusEvent
+from app.exaplay.event_ring import ALL_COMPOSITIONS, EventRing, SSEClient
+from app.exaplay.osc_state import OSCStateStore
+from app.exaplay.poller import status_poller
 from app.logging import get_logger
+from app.metrics import broadcast_dropped, osc_messages, sse_clients
 from app.settings import settings
 
 logger = get_logger(__name__)
 
+# Most datagrams read per readiness wakeup before yielding to other tasks
+OSC_BATCH_SIZE = 256
+
+# Largest OSC datagram accepted
+_MAX_DATAGRAM = 65535
+
+# SSE event types clients can subscribe to
+EVENT_TYPES = ("status",)
+
+
+class _OSCDatagramProtocol(asyncio.DatagramProtocol):
+    """Fallback receiver for loops without add_reader."""
+    
+    def __init__(self, broadcaster: "OSCEventBroadcaster") -> None:
+        """Initialize the protocol for a broadcaster."""
+        self.broadcaster = broadcaster
+    
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]) -> None:
+        """Dispatch one received datagram."""
+        self.broadcaster._dispatch(data, addr)
+    
+    def error_received(self, exc: Exception) -> None:
+        """Log socket errors without stopping reception."""
+        logger.warning("OSC receive error", error=str(exc))
+
 
 class OSCEventBroadcaster:
     """Manages OSC message reception and broadcasting to SSE clients.
@@ -45,13 +88,26 @@ class OSCEventBroadcaster:
     
     def __init__(self) -> None:
         """Initialize the OSC event broadcaster."""
-        self._server: Optional[BlockingOSCUDPServer] = None
-        self._server_task: Optional[asyncio.Task] = None
-        self._clients: Set[asyncio.Queue] = set()
+        self._sock: Optional[socket.socket] = None
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Connected clients, each reading the shared event ring at its own cursor
+        self._clients: Set[SSEClient] = set()
+        self._delta_clients = 0
+        self.ring = EventRing(settings.sse_buffer_size)
         self._running = False
+        self._flush_scheduled = False
+        
+        # Merged per-composition state fed by the handlers
+        self.state = OSCStateStore()
         
-        # OSC message dispatcher
-        self._dispatcher = dispatcher.Dispatcher()
+        # Statistics
+        self.datagrams = 0
+        self.wakeups = 0
+        
+        # OSC message dispatcher (no strict timing: it would sleep on the loop for future
+        # bundles; the strict_timing option needs python-osc 1.10.2 or later)
+        self._dispatcher = dispatcher.Dispatcher(strict_timing=False)
         self._setup_handlers()
     
     def _setup_handlers(self) -> None:
@@ -87,6 +143,7 @@ class OSCEventBroadcaster:
             address: OSC address (e.g., /exaplay/status/comp1)
             *args: OSC arguments (typically status value)
         """
+        osc_messages.inc("status")
         try:
             # Extract composition name from address
             parts = address.split("/")
@@ -109,16 +166,7 @@ class OSCEventBroadcaster:
                 address=address
             )
             
-            # Create status event (simplified format for now)
-            event_data = {
-                "composition": composition,
-                "status": int(status_value),
-                "cuetime": 0.0,  # Will be updated by separate cuetime messages
-                "cueframe": 0    # Will be updated by separate cueframe messages
-            }
-            
-            # Broadcast to all connected clients
-            self._broadcast_event("status", event_data)
+            self._update(composition, status=int(status_value))
             
         except Exception as e:
             logger.error(
@@ -135,6 +183,7 @@ class OSCEventBroadcaster:
             address: OSC address (e.g., /exaplay/cuetime/comp1)
             *args: OSC arguments (typically time value)
         """
+        osc_messages.inc("cuetime")
         try:
             parts = address.split("/")
             if len(parts) < 4:
@@ -156,16 +205,7 @@ class OSCEventBroadcaster:
                 address=address
             )
             
-            # For cuetime updates, we might want to combine with current status
-            # For now, send a simplified event
-            event_data = {
-                "composition": composition,
-                "status": 1,  # Assume playing when time updates
-                "cuetime": cuetime_value,
-                "cueframe": 0
-            }
-            
-            self._broadcast_event("cuetime", event_data)
+            self._update(composition, cuetime=cuetime_value)
             
         except Exception as e:
             logger.error(
@@ -182,6 +222,7 @@ class OSCEventBroadcaster:
             address: OSC address (e.g., /exaplay/cueframe/comp1)
             *args: OSC arguments (typically frame value)
         """
+        osc_messages.inc("cueframe")
         try:
             parts = address.split("/")
             if len(parts) < 4:
@@ -203,14 +244,7 @@ class OSCEventBroadcaster:
                 address=address
             )
             
-            event_data = {
-                "composition": composition,
-                "status": 1,  # Assume playing when frame updates
-                "cuetime": 0.0,
-                "cueframe": cueframe_value
-            }
-            
-            self._broadcast_event("cueframe", event_data)
+            self._update(composition, cueframe=cueframe_value)
             
         except Exception as e:
             logger.error(
@@ -236,40 +270,59 @@ class OSCEventBroadcaster:
                 arg_count=len(args)
             )
     
-    def _broadcast_event(self, event_type: str, data: Dict[str, Any]) -> None:
-        """Broadcast event to all connected SSE clients.
+    def _update(self, composition: str, **values: Any) -> None:
+        """Merge handler values into the state store and schedule a flush on change.
         
         Args:
-            event_type: Type of event (status, cuetime, cueframe)
-            data: Event data dictionary
+            composition: Composition name
+            **values: status, cuetime and/or cueframe
         """
-        if not self._clients:
-            logger.debug("No SSE clients connected, skipping broadcast")
+        if not self.state.update(composition, **values) or self._flush_scheduled:
             return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Called outside the loop (e.g. directly in tests): emit immediately
+            self._flush()
+            return
+        # Runs after the current receive batch, coalescing the messages of a tick
+        self._flush_scheduled = True
+        loop.call_soon(self._flush)
+    
+    def _flush(self) -> None:
+        """Emit one merged status event per composition changed since the last flush."""
+        self._flush_scheduled = False
+        for event, delta in self.state.flush():
+            status_poller.apply_live(event["composition"], event["status"], event["cuetime"], event["cueframe"])
+            self._broadcast_event("status", event, delta)
+    
+    @staticmethod
+    def _format_event(event_type: str, data: Dict[str, Any]) -> str:
+        """Format one SSE message."""
+        return f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    
+    def _broadcast_event(self, event_type: str, data: Dict[str, Any], delta: Optional[Dict[str, Any]] = None) -> None:
+        """Publish an event to the shared ring read by all SSE clients.
         
-        # Create SSE-formatted message
-        sse_data = json.dumps(data, ensure_ascii=False)
-        sse_message = f"event: {event_type}\ndata: {sse_data}\n\n"
-        
-        # Send to all connected clients
-        disconnected_clients = set()
-        
-        for client_queue in self._clients:
-            try:
-                # Non-blocking put - if queue is full, skip this client
-                client_queue.put_nowait(sse_message)
-            except asyncio.QueueFull:
-                logger.warning("Client queue full, dropping message")
-            except Exception as e:
-                logger.warning("Error sending to client, removing", error=str(e))
-                disconnected_clients.add(client_queue)
+        Events are published even with no client connected, so that new
+        and resuming clients start from the latest state.
         
-        # Clean up disconnected clients
-        self._clients -= disconnected_clients
+        Args:
+            event_type: Type of event (e.g. status)
+            data: Event data dictionary
+            delta: Reduced payload for clients that asked for deltas, if it differs
+        """
+        # Each form is encoded once, not per client
+        full_message = self._format_event(event_type, data).encode()
+        delta_message = None
+        if delta is not None and self._delta_clients:
+            delta_message = self._format_event(event_type, delta).encode()
+        event_id = self.ring.publish(data.get("composition", ""), event_type, full_message, delta_message)
         
         logger.debug(
             "Event broadcasted",
             event_type=event_type,
+            event_id=event_id,
             clients=len(self._clients),
             data=data
         )
@@ -296,34 +349,112 @@ class OSCEventBroadcaster:
                 prefix=settings.exaplay_osc_prefix
             )
             
-            # Create OSC server
-            self._server = osc_server.BlockingOSCUDPServer(
-                (settings.osc_host, settings.osc_port),
-                self._dispatcher
-            )
-            
-            # Start server in background task
-            self._server_task = asyncio.create_task(self._run_server())
+            self._loop = asyncio.get_running_loop()
+            self._sock = self._open_socket(settings.osc_host, settings.osc_port)
+            try:
+                self._loop.add_reader(self._sock.fileno(), self._drain)
+                mode = "reader"
+            except NotImplementedError:
+                self._transport, _ = await self._loop.create_datagram_endpoint(
+                    lambda: _OSCDatagramProtocol(self),
+                    sock=self._sock
+                )
+                mode = "datagram_endpoint"
             self._running = True
             
-            logger.info("OSC listener started successfully")
+            logger.info(
+                "OSC listener started successfully",
+                mode=mode,
+                rcvbuf=self._sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+            )
             
         except Exception as e:
             logger.error("Failed to start OSC listener", error=str(e))
+            self._close_socket()
             self._running = False
             raise
     
-    async def _run_server(self) -> None:
-        """Run the OSC server in a background task."""
+    @staticmethod
+    def _open_socket(host: str, port: int) -> socket.socket:
+        """Bind a non-blocking UDP socket with an enlarged receive buffer.
+        
+        Args:
+            host: Listen address
+            port: Listen port
+        
+        Returns:
+            socket.socket: Bound socket
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                # The kernel may cap this (net.core.rmem_max); the effective size is logged
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, settings.exaplay_osc_rcvbuf)
+            except OSError as e:
+                logger.warning("Could not set OSC receive buffer", requested=settings.exaplay_osc_rcvbuf, error=str(e))
+            sock.setblocking(False)
+            sock.bind((host, port))
+        except OSError:
+            sock.close()
+            raise
+        return sock
+    
+    def _drain(self) -> None:
+        """Read every pending datagram (up to OSC_BATCH_SIZE) and dispatch it."""
+        sock = self._sock
+        if sock is None:
+            return
+        self.wakeups += 1
+        for _ in range(OSC_BATCH_SIZE):
+            try:
+                data, addr = sock.recvfrom(_MAX_DATAGRAM)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                # E.g. ICMP errors surfacing on the socket; keep receiving
+                logger.warning("OSC receive error", error=str(e))
+                return
+            self._dispatch(data, addr)
+    
+    def _dispatch(self, data: bytes, addr: Tuple[str, int]) -> None:
+        """Decode one datagram and run the matching handlers."""
+        self.datagrams += 1
         try:
-            if self._server:
-                # Run server in executor to avoid blocking the event loop
-                loop = asyncio.get_running_loop()
-                await loop.run_in_executor(None, self._server.serve_forever)
+            self._dispatcher.call_handlers_for_packet(data, addr)
         except Exception as e:
-            logger.error("OSC server error", error=str(e))
-        finally:
-            self._running = False
+            logger.warning("Invalid OSC datagram", client=addr, size=len(data), error=str(e))
+    
+    def _close_socket(self) -> None:
+        """Stop reading and close the socket."""
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        elif self._sock is not None and self._loop is not None:
+            try:
+                self._loop.remove_reader(self._sock.fileno())
+            except (NotImplementedError, ValueError):
+                pass
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of OSC reception counters.
+        
+        Returns:
+            Dict: OSC listener statistics suitable for JSON serialization
+        """
+        return {
+            "running": self._running,
+            "datagrams": self.datagrams,
+            "wakeups": self.wakeups,
+            "datagrams_per_wakeup": round(self.datagrams / self.wakeups, 2) if self.wakeups else 0.0,
+            "clients": len(self._clients),
+            "delta_clients": self._delta_clients,
+            "state": self.state.stats(),
+            "ring": self.ring.stats(),
+        }
     
     async def stop(self) -> None:
         """Stop the OSC listener server."""
@@ -333,18 +464,17 @@ class OSCEventBroadcaster:
         logger.info("Stopping OSC listener")
         
         try:
-            if self._server:
-                self._server.shutdown()
-            
-            if self._server_task:
-                self._server_task.cancel()
-                try:
-                    await self._server_task
-                except asyncio.CancelledError:
-                    pass
+            self._close_socket()
             
             # Clear all client connections
             self._clients.clear()
+            self._delta_clients = 0
+            sse_clients.set(0)
+            
+            # Merged state would go stale without OSC input
+            self.state.clear()
+            self.ring.clear()
+            self._flush_scheduled = False
             
             self._running = False
             logger.info("OSC listener stopped")
@@ -352,56 +482,101 @@ class OSCEventBroadcaster:
         except Exception as e:
             logger.error("Error stopping OSC listener", error=str(e))
     
-    def add_client(self) -> asyncio.Queue:
+    def add_client(
+        self,
+        delta: bool = False,
+        last_event_id: Optional[int] = None,
+        compositions: Optional[List[str]] = None,
+        event_types: Optional[List[str]] = None,
+        max_hz: float = 0.0
+    ) -> SSEClient:
         """Add a new SSE client for event streaming.
         
+        A client with a composition or event type filter is subscribed to
+        just those topics, so it is not woken by other compositions' events.
+        A rate-capped client without filters is subscribed to every
+        composition of every event type.
+        
+        Args:
+            delta: Send status events with only the changed fields
+            last_event_id: Last event id the client received (Last-Event-ID), if resuming
+            compositions: Only events of these compositions (None for all)
+            event_types: Only events of these types (None for all of EVENT_TYPES)
+            max_hz: Send at most this many updates per second, coalescing to the latest state (0 for no cap)
+        
         Returns:
-            asyncio.Queue: Queue for sending events to the client
+            SSEClient: Client reading from the shared event ring
         """
-        client_queue = asyncio.Queue(maxsize=100)  # Limit queue size
-        self._clients.add(client_queue)
+        topics = None
+        if compositions or event_types or max_hz > 0:
+            topics = [
+                (event_type, composition)
+                for event_type in (event_types or EVENT_TYPES)
+                for composition in (compositions or [ALL_COMPOSITIONS])
+            ]
+        client = self.ring.attach(delta=delta, last_event_id=last_event_id, topics=topics, max_hz=max_hz)
+        self._clients.add(client)
+        self._delta_clients += delta
+        sse_clients.set(len(self._clients))
         
         logger.debug(
             "SSE client connected",
-            total_clients=len(self._clients)
+            total_clients=len(self._clients),
+            topics=len(client.topics) if client.subscribed else None,
+            max_hz=max_hz or None
         )
         
-        return client_queue
+        return client
     
-    def remove_client(self, client_queue: asyncio.Queue) -> None:
+    def remove_client(self, client: SSEClient) -> None:
         """Remove an SSE client.
         
         Args:
-            client_queue: Client queue to remove
+            client: Client to remove
         """
-        self._clients.discard(client_queue)
+        if client in self._clients:
+            self._clients.discard(client)
+            self._delta_clients -= client.delta
+        self.ring.detach(client)
+        sse_clients.set(len(self._clients))
         
         logger.debug(
             "SSE client disconnected",
             total_clients=len(self._clients)
         )
     
-    async def get_client_events(self, client_queue: asyncio.Queue) -> AsyncGenerator[str, None]:
+    async def get_client_events(self, client: SSEClient) -> AsyncGenerator[bytes, None]:
         """Generate SSE events for a specific client.
         
+        Reads everything published since the client's cursor and sends it
+        as one chunk. A client that fell out of the ring gets the latest
+        state of every composition instead of the lost events. Subscribed
+        clients get the latest event of each changed topic, at most max_hz
+        times per second.
+        
         Args:
-            client_queue: Client's event queue
+            client: Client registered with add_client
             
         Yields:
-            str: SSE-formatted event messages
+            bytes: SSE-formatted event messages
         """
         try:
             while True:
-                # Wait for next event with timeout
-                try:
-                    event_message = await asyncio.wait_for(
-                        client_queue.get(),
-                        timeout=30.0  # Send keepalive every 30 seconds
+                # Wait for the next event, sending a keepalive every 30 seconds
+                if not await self.ring.wait(client, timeout=30.0):
+                    yield b": keepalive\n\n"
+                    continue
+                
+                skipped = client.skipped
+                messages = self.ring.read(client)
+                if client.skipped != skipped:
+                    broadcast_dropped.inc(amount=client.skipped - skipped)
+                    logger.warning(
+                        "SSE client fell behind, sent state snapshot",
+                        skipped=client.skipped - skipped
                     )
-                    yield event_message
-                except asyncio.TimeoutError:
-                    # Send keepalive comment
-                    yield ": keepalive\n\n"
+                if messages:
+                    yield b"".join(messages)
                     
         except asyncio.CancelledError:
             logger.debug("Client event stream cancelled")
@@ -409,7 +584,7 @@ class OSCEventBroadcaster:
         except Exception as e:
             logger.error("Error in client event stream", error=str(e))
         finally:
-            self.remove_client(client_queue)
+            self.remove_client(client)
 
 
 # Global broadcaster instance
@@ -0,0 +1,188 @@
+"""Per-composition live state aggregated from ExaPlay OSC OUT.
+
+ExaPlay reports status, cuetime and cueframe in separate OSC messages,
+typically all three per tick. Instead of forwarding each as a partial
+event padded with made-up values, the store merges them into one state
+per composition and records which fields changed. Changes are flushed
+once per event loop iteration, so the messages of a tick (which arrive
+in the same receive batch) become a single merged event; a message that
+repeats the current value produces no event at all.
+
+The store is also a snapshot of every composition's playback position,
+readable without a TCP round trip.
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Fields carried by OSC, in event order
+FIELDS = ("status", "cuetime", "cueframe")
+
+
+class OSCCompositionState:
+    """Merged OSC state of one composition."""
+    
+    __slots__ = ("name", "status", "cuetime", "cueframe", "status_known", "updated_at", "changed")
+    
+    def __init__(self, name: str) -> None:
+        """Initialize a state with no OSC data yet.
+        
+        Args:
+            name: Composition name
+        """
+        self.name = name
+        self.status = 0
+        self.cuetime = 0.0
+        self.cueframe = 0
+        self.status_known = False
+        self.updated_at = 0.0
+        # Fields changed since the last flush
+        self.changed: Set[str] = set()
+    
+    def event(self) -> Dict[str, Any]:
+        """Full event payload (the fields of SSEStatusEvent)."""
+        return {"composition": self.name, "status": self.status, "cuetime": self.cuetime, "cueframe": self.cueframe}
+    
+    def delta(self) -> Dict[str, Any]:
+        """Payload with only the fields changed since the last flush."""
+        payload: Dict[str, Any] = {"composition": self.name}
+        for field in FIELDS:
+            if field in self.changed:
+                payload[field] = getattr(self, field)
+        return payload
+
+
+class OSCStateStore:
+    """Merged OSC state of every composition seen, with change tracking.
+    
+    Example:
+        if store.update("comp1", cuetime=15.6):
+            schedule_flush()
+        for event, delta in store.flush():
+            broadcast(event, delta)
+    """
+    
+    def __init__(self, max_compositions: int = 10000) -> None:
+        """Initialize an empty store.
+        
+        Args:
+            max_compositions: Most compositions tracked; updates for new ones beyond it are ignored
+        """
+        self.max_compositions = max_compositions
+        self._states: Dict[str, OSCCompositionState] = {}
+        self._dirty: Dict[str, OSCCompositionState] = {}
+        
+        # Statistics
+        self.updates = 0
+        self.unchanged = 0
+        self.events = 0
+    
+    def update(
+        self,
+        name: str,
+        status: Optional[int] = None,
+        cuetime: Optional[float] = None,
+        cueframe: Optional[int] = None
+    ) -> bool:
+        """Merge values from one OSC message into a composition's state.
+        
+        A time or frame update for a composition whose status has not been
+        reported yet marks it playing, as ExaPlay only sends those while
+        playing.
+        
+        Args:
+            name: Composition name
+            status: Numeric status, if the message carried one
+            cuetime: Time in seconds, if the message carried one
+            cueframe: Frame number, if the message carried one
+        
+        Returns:
+            bool: True if the composition became dirty with this update
+            (the caller should schedule a flush)
+        """
+        self.updates += 1
+        state = self._states.get(name)
+        if state is None:
+            if len(self._states) >= self.max_compositions:
+                return False
+            state = self._states[name] = OSCCompositionState(name)
+        
+        changed = state.changed
+        before = len(changed)
+        if status is not None:
+            state.status_known = True
+            if status != state.status:
+                state.status = status
+                changed.add("status")
+        elif not state.status_known and state.status != 1:
+            state.status = 1
+            changed.add("status")
+        if cuetime is not None and cuetime != state.cuetime:
+            state.cuetime = cuetime
+            changed.add("cuetime")
+        if cueframe is not None and cueframe != state.cueframe:
+            state.cueframe = cueframe
+            changed.add("cueframe")
+        state.updated_at = time.monotonic()
+        
+        if len(changed) == before:
+            self.unchanged += 1
+            return False
+        if name in self._dirty:
+            return False
+        self._dirty[name] = state
+        return True
+    
+    def flush(self) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Take the changes made since the last flush and reset tracking.
+        
+        Returns:
+            List: (full event, delta) payload pairs, one per changed
+            composition, in order of their first change
+        """
+        payloads = []
+        for state in self._dirty.values():
+            payloads.append((state.event(), state.delta()))
+            state.changed.clear()
+        self._dirty.clear()
+        self.events += len(payloads)
+        return payloads
+    
+    def get(self, name: str) -> Optional[Tuple[OSCCompositionState, float]]:
+        """Get a composition's state and its age in seconds.
+        
+        Args:
+            name: Composition name
+        
+        Returns:
+            Optional[Tuple]: (state, seconds since the last OSC message), or
+            None if no OSC message has been seen for it
+        """
+        state = self._states.get(name)
+        if state is None:
+            return None
+        return state, time.monotonic() - state.updated_at
+    
+    def snapshot(self) -> Dict[str, Tuple[OSCCompositionState, float]]:
+        """Every composition's state and age, keyed by name."""
+        now = time.monotonic()
+        return {name: (state, now - state.updated_at) for name, state in self._states.items()}
+    
+    def clear(self) -> None:
+        """Forget every composition (e.g. when the listener stops)."""
+        self._states.clear()
+        self._dirty.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of store counters.
+        
+        Returns:
+            Dict: Store statistics suitable for JSON serialization
+        """
+        return {
+            "compositions": len(self._states),
+            "updates": self.updates,
+            "unchanged": self.unchanged,
+            "events": self.events,
+        }
+
@@ -0,0 +1,380 @@
+"""Background status poller keeping an in-memory composition state table.
+
+Instead of every API client's status request reaching ExaPlay, one
+lifespan-managed task polls each known composition and keeps its last
+status and volume in memory. Playing compositions are polled every
+STATUS_POLL_ACTIVE_INTERVAL, stopped or paused ones every
+STATUS_POLL_IDLE_INTERVAL, and each tick sends all due reads as one
+pipelined batch per host (see HostRegistry.send_pipeline). Upstream load
+thus depends on the number of compositions, not the number of clients.
+
+Compositions become known when they are listed by name in the fleet
+configuration or first requested through the API. Successful writes
+routed through the host registry are applied to the table optimistically
+(``play`` marks the composition playing, ``set:vol`` updates the volume,
+...) and schedule an immediate confirming poll. With OSC enabled, the
+state, time and frame ExaPlay pushes are applied as they arrive (see
+apply_live); such compositions then only need the idle-interval poll to
+confirm clip index and duration.
+
+Entries older than STATUS_POLL_MAX_AGE (e.g. while the host is down) are
+not served; callers then fall back to an upstream read.
+"""
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+from app.exaplay.admission import Priority, set_priority
+from app.exaplay.mapper import ExaPlayMappingError, parse_status_response, parse_volume_response
+from app.exaplay.models import PlaybackState, StatusResponse
+from app.exaplay.tcp_client import ExaPlayError, ExaPlayProtocolError
+from app.logging import get_logger
+from app.settings import settings
+
+if TYPE_CHECKING:
+    from app.exaplay.fleet import HostRegistry
+
+logger = get_logger(__name__)
+
+# Playback state implied by a successful transport command
+_STATE_AFTER = {
+    "play": PlaybackState.PLAYING,
+    "pause": PlaybackState.PAUSED,
+    "stop": PlaybackState.STOPPED,
+}
+
+# Playback state of a numeric OSC status
+_STATE_CODES = {
+    0: PlaybackState.STOPPED,
+    1: PlaybackState.PLAYING,
+    2: PlaybackState.PAUSED,
+}
+
+
+class CompositionState:
+    """Last known status and volume of one composition."""
+    
+    def __init__(self, name: str, pinned: bool = False) -> None:
+        """Initialize an entry that has not been polled yet.
+        
+        Args:
+            name: Composition name
+            pinned: Keep the entry even if ExaPlay reports the composition unknown
+        """
+        self.name = name
+        self.pinned = pinned
+        self.status: Optional[StatusResponse] = None
+        self.volume: Optional[int] = None
+        self.status_at = 0.0
+        self.volume_at = 0.0
+        self.next_status_poll = 0.0
+        self.next_volume_poll = 0.0
+        self.changed_at = 0.0
+        self.last_error: Optional[str] = None
+    
+    def status_age(self, now: float) -> Optional[float]:
+        """Seconds since the status was last confirmed or applied, or None if unknown."""
+        return now - self.status_at if self.status is not None else None
+    
+    def volume_age(self, now: float) -> Optional[float]:
+        """Seconds since the volume was last confirmed or applied, or None if unknown."""
+        return now - self.volume_at if self.volume is not None else None
+    
+    def status_interval(self) -> float:
+        """Poll interval for the current playback state."""
+        if self.status is not None and self.status.state == PlaybackState.PLAYING:
+            return settings.status_poll_active_interval
+        return settings.status_poll_idle_interval
+
+
+class StatusPoller:
+    """Adaptive poller and in-memory state table for composition status.
+    
+    Example:
+        status_poller.start(get_host_registry())
+        status, age = status_poller.status("comp1")
+    """
+    
+    def __init__(self) -> None:
+        """Initialize an empty, stopped poller."""
+        self._states: Dict[str, CompositionState] = {}
+        self._registry: Optional["HostRegistry"] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        
+        # Statistics
+        self._polls = 0
+        self._commands = 0
+        self._errors = 0
+        self._last_poll_ms: Optional[float] = None
+    
+    @property
+    def running(self) -> bool:
+        """Whether the background poll loop is active."""
+        return self._task is not None and not self._task.done()
+    
+    def start(self, registry: "HostRegistry") -> None:
+        """Seed the table from the fleet configuration and start polling.
+        
+        Args:
+            registry: Host registry used to route the status reads
+        """
+        self._registry = registry
+        for host in registry.hosts.values():
+            for name in host.config.compositions:
+                if not any(char in name for char in "*?["):
+                    self._states.setdefault(name, CompositionState(name, pinned=True))
+        
+        if not self.running:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._poll_loop())
+            logger.info("Status poller started", compositions=len(self._states))
+    
+    async def close(self) -> None:
+        """Stop the poll loop."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    
+    def track(self, name: str) -> None:
+        """Start polling a composition if it is not yet known.
+        
+        Args:
+            name: Composition name seen in an API request
+        """
+        if not self.running or name in self._states:
+            return
+        if len(self._states) >= settings.status_poll_max_compositions:
+            return
+        self._states[name] = CompositionState(name)
+        self._wakeup.set()
+    
+    def status(self, name: str) -> Optional[Tuple[StatusResponse, float]]:
+        """Get a composition's status from memory.
+        
+        Args:
+            name: Composition name
+        
+        Returns:
+            Optional[Tuple]: (StatusResponse, age in seconds), or None if the
+            poller is not running or has no recent status
+        """
+        state = self._states.get(name) if self.running else None
+        if state is None:
+            return None
+        age = state.status_age(time.monotonic())
+        if age is None or age > settings.status_poll_max_age:
+            return None
+        return state.status, age
+    
+    def volume(self, name: str) -> Optional[Tuple[int, float]]:
+        """Get a composition's volume from memory.
+        
+        Args:
+            name: Composition name
+        
+        Returns:
+            Optional[Tuple]: (volume, age in seconds), or None if the poller
+            is not running or has no recent volume
+        """
+        state = self._states.get(name) if self.running else None
+        if state is None:
+            return None
+        age = state.volume_age(time.monotonic())
+        if age is None or age > settings.status_poll_max_age:
+            return None
+        return state.volume, age
+    
+    def update_status(self, name: str, status: StatusResponse) -> None:
+        """Record a status read upstream outside the poller (e.g. ``?fresh=true``)."""
+        state = self._states.get(name)
+        if state is not None:
+            now = time.monotonic()
+            state.status, state.status_at = status, now
+            state.next_status_poll = now + state.status_interval()
+    
+    def update_volume(self, name: str, volume: int) -> None:
+        """Record a volume read upstream outside the poller."""
+        state = self._states.get(name)
+        if state is not None:
+            now = time.monotonic()
+            state.volume, state.volume_at = volume, now
+            state.next_volume_poll = now + settings.status_poll_idle_interval
+    
+    def apply_command(self, name: Optional[str], command: str) -> None:
+        """Apply a successful write to the table and schedule a confirming poll.
+        
+        Args:
+            name: Composition the command targeted
+            command: Raw command that ExaPlay acknowledged
+        """
+        state = self._states.get(name) if name is not None else None
+        if state is None:
+            return
+        
+        verb, *args = [part.strip() for part in command.split(",")]
+        now = time.monotonic()
+        state.changed_at = now
+        try:
+            if verb == "set:vol" and len(args) >= 2:
+                state.volume, state.volume_at = int(args[1]), now
+            elif state.status is not None:
+                if verb in _STATE_AFTER:
+                    updates: Dict[str, Any] = {"state": _STATE_AFTER[verb]}
+                    if verb == "stop":
+                        updates.update(time=0.0, frame=0)
+                    state.status = state.status.model_copy(update=updates)
+                    state.status_at = now
+                elif verb == "set:cuetime" and len(args) >= 2:
+                    state.status = state.status.model_copy(update={"time": float(args[1])})
+                    state.status_at = now
+        except ValueError:
+            pass
+        
+        state.next_status_poll = now
+        self._wakeup.set()
+    
+    def apply_live(self, name: str, status: int, cuetime: float, cueframe: int) -> None:
+        """Apply state pushed by ExaPlay over OSC to the table.
+        
+        Only compositions with a polled status are updated, as OSC does
+        not carry clip index and duration. Their next poll is pushed back to
+        the idle interval, since OSC keeps time and frame current.
+        
+        Args:
+            name: Composition name
+            status: Numeric status (0=stopped, 1=playing, 2=paused)
+            cuetime: Time in seconds
+            cueframe: Frame number
+        """
+        state = self._states.get(name)
+        if state is None or state.status is None or status not in _STATE_CODES:
+            return
+        now = time.monotonic()
+        state.status = state.status.model_copy(update={"state": _STATE_CODES[status], "time": cuetime, "frame": cueframe})
+        state.status_at = now
+        state.next_status_poll = max(state.next_status_poll, now + settings.status_poll_idle_interval)
+    
+    async def _poll_loop(self) -> None:
+        """Poll due compositions until cancelled."""
+        # Polls yield to control commands at the upstream (own task, own context)
+        set_priority(Priority.BULK)
+        while True:
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._errors += 1
+                logger.warning("Status poll failed", error=str(e))
+            
+            now = time.monotonic()
+            due = min(
+                (
+                    min(state.next_status_poll, state.next_volume_poll)
+                    for state in self._states.values()
+                ),
+                default=now + settings.status_poll_idle_interval
+            )
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, due - now))
+            except asyncio.TimeoutError:
+                pass
+    
+    async def poll_once(self) -> None:
+        """Read every due status and volume in one pipelined batch per host."""
+        assert self._registry is not None
+        now = time.monotonic()
+        commands: List[str] = []
+        for state in self._states.values():
+            if state.next_status_poll <= now:
+                commands.append(f"get:status,{state.name}")
+            if state.next_volume_poll <= now:
+                commands.append(f"get:vol,{state.name}")
+        if not commands:
+            return
+        
+        start = time.perf_counter()
+        try:
+            results = await self._registry.send_pipeline(commands)
+        except ExaPlayError as e:
+            # No host reachable: try again at the idle interval
+            self._errors += 1
+            for state in self._states.values():
+                state.last_error = str(e)
+                state.next_status_poll = max(state.next_status_poll, now + settings.status_poll_idle_interval)
+                state.next_volume_poll = max(state.next_volume_poll, now + settings.status_poll_idle_interval)
+            logger.debug("Status poll could not reach ExaPlay", error=str(e))
+            return
+        
+        self._polls += 1
+        self._commands += len(commands)
+        self._last_poll_ms = round((time.perf_counter() - start) * 1000, 3)
+        
+        unknown: Set[str] = set()
+        done = time.monotonic()
+        for result in results:
+            kind, name = result.command.split(",", 1)
+            state = self._states.get(name)
+            if state is None or state.changed_at >= now:
+                # Written to while the poll was in flight: the reply may predate
+                # the write, so keep the optimistic state and the pending re-poll
+                continue
+            if result.error is not None:
+                self._errors += 1
+                state.last_error = str(result.error)
+                if isinstance(result.error, ExaPlayProtocolError) and not state.pinned:
+                    unknown.add(name)
+            else:
+                try:
+                    if kind == "get:status":
+                        state.status, state.status_at = parse_status_response(result.reply), done
+                    else:
+                        state.volume, state.volume_at = parse_volume_response(result.reply), done
+                    state.last_error = None
+                except ExaPlayMappingError as e:
+                    self._errors += 1
+                    state.last_error = str(e)
+            
+            if kind == "get:status":
+                state.next_status_poll = done + state.status_interval()
+            else:
+                state.next_volume_poll = done + settings.status_poll_idle_interval
+        
+        # Compositions ExaPlay does not know were requested by mistake; stop polling them
+        for name in unknown:
+            del self._states[name]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the poller and its state table.
+        
+        Returns:
+            Dict: Poller statistics suitable for JSON serialization
+        """
+        now = time.monotonic()
+        return {
+            "running": self.running,
+            "compositions": len(self._states),
+            "playing": sum(
+                1 for state in self._states.values()
+                if state.status is not None and state.status.state == PlaybackState.PLAYING
+            ),
+            "polls": self._polls,
+            "commands": self._commands,
+            "errors": self._errors,
+            "last_poll_ms": self._last_poll_ms,
+            "oldest_status_s": max(
+                (round(age, 3) for state in self._states.values() if (age := state.status_age(now)) is not None),
+                default=None
+            ),
+        }
+
+
+# Global poller shared by the status routes
+status_poller = StatusPoller()
@@ -0,0 +1,521 @@
+"""Connection pooling for ExaPlay TCP sessions.
+
+Keeps long-lived TCP connections to each ExaPlay host so that commands
+reuse an established socket instead of paying a handshake and teardown
+per request. Connections are health-checked on checkout, evicted after
+sitting idle for too long, and re-opened transparently when found dead.
+
+Idle connections are kept warm by a keepalive probe sent every
+TCP_KEEPALIVE_INTERVAL, so that NATs and firewalls do not silently drop
+them and a dead host is noticed before a request needs the connection.
+The outcome of the last probe (or connection attempt) is cached and
+served by /readyz without touching the upstream.
+
+The pool only manages connection lifecycle. Protocol framing and error
+mapping stay in ExaPlayTCPClient, which supplies the opener used to
+establish new connections and the keepalive probe.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from app.logging import get_logger
+from app.settings import settings
+
+logger = get_logger(__name__)
+
+StreamPair = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+ConnectionOpener = Callable[[], Awaitable[StreamPair]]
+KeepaliveProbe = Callable[["PooledConnection"], Awaitable[None]]
+
+
+class PooledConnection:
+    """A single TCP connection owned by an ExaPlayConnectionPool."""
+    
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, generation: int = 0) -> None:
+        """Wrap an established stream pair.
+        
+        Args:
+            reader: Stream reader for the connection
+            writer: Stream writer for the connection
+            generation: Pool generation the connection was opened in
+        """
+        self.reader = reader
+        self.writer = writer
+        self.generation = generation
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.last_probe = self.created_at
+        self.commands_sent = 0
+    
+    def is_alive(self) -> bool:
+        """Check whether the connection can still carry commands.
+        
+        A socket closed by the peer is reported via EOF on the reader as
+        soon as the event loop has processed it, so this catches servers
+        that restarted or dropped idle connections.
+        
+        Returns:
+            bool: True if the connection looks usable
+        """
+        if self.writer.is_closing():
+            return False
+        if self.reader.at_eof() or self.reader.exception() is not None:
+            return False
+        return True
+    
+    def close(self) -> None:
+        """Close the underlying transport without waiting."""
+        if not self.writer.is_closing():
+            self.writer.close()
+
+
+class ExaPlayConnectionPool:
+    """Bounded pool of persistent TCP connections to one ExaPlay host.
+    
+    Example:
+        async with pool.connection() as conn:
+            conn.writer.write(b"get:ver\\r")
+            reply = await conn.reader.readuntil(b"\\r\\n")
+    
+    Leaving the context with an exception discards the connection, since
+    its stream may hold a partial or late reply.
+    """
+    
+    def __init__(
+        self,
+        opener: ConnectionOpener,
+        name: str,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        keepalive: Optional[KeepaliveProbe] = None,
+        keepalive_interval: Optional[float] = None
+    ) -> None:
+        """Initialize an empty pool.
+        
+        Args:
+            opener: Coroutine factory that opens a new (reader, writer) pair
+            name: Identifier used in logs and stats (usually host:port)
+            min_size: Connections kept open while idle (defaults to settings)
+            max_size: Maximum open connections (defaults to settings)
+            idle_timeout: Seconds before an idle connection is evicted (defaults to settings)
+            keepalive: Coroutine that exchanges a cheap command on an idle
+                connection, raising if it is unusable (None disables probing)
+            keepalive_interval: Seconds an idle connection may go unused before
+                it is probed, 0 disables probing (defaults to settings)
+        """
+        self._opener = opener
+        self._keepalive = keepalive
+        self.name = name
+        self.min_size = settings.tcp_pool_min_size if min_size is None else min_size
+        self.max_size = max_size or settings.tcp_pool_max_size
+        self.idle_timeout = idle_timeout or settings.tcp_pool_idle_timeout
+        self.keepalive_interval = (
+            settings.tcp_keepalive_interval if keepalive_interval is None else keepalive_interval
+        )
+        
+        self._idle: Deque[PooledConnection] = deque()
+        self._slots = asyncio.Semaphore(self.max_size)
+        self._size = 0
+        self._waiters = 0
+        self._maintenance_task: Optional[asyncio.Task] = None
+        # Bumped by close(); connections from an earlier generation are not reused
+        self._generation = 0
+        # Set when a connection is dropped so that maintenance refills promptly
+        self._refill = asyncio.Event()
+        
+        # Last probe or connection attempt, served by /readyz
+        self._probe_ok: Optional[bool] = None
+        self._probe_at: Optional[float] = None
+        self._probe_rtt = 0.0
+        self._probe_error: Optional[str] = None
+        
+        # Statistics
+        self._connects = 0
+        self._dead_discarded = 0
+        self._evicted = 0
+        self._checkouts = 0
+        self._checkout_time_total = 0.0
+        self._checkout_time_max = 0.0
+        self._checkout_time_last = 0.0
+        self._keepalive_probes = 0
+        self._keepalive_failures = 0
+    
+    @property
+    def size(self) -> int:
+        """Number of open connections (idle plus checked out)."""
+        return self._size
+    
+    @property
+    def idle(self) -> int:
+        """Number of idle connections ready for checkout."""
+        return len(self._idle)
+    
+    async def _open(self) -> PooledConnection:
+        """Open a new connection and account for it in the pool size."""
+        self._size += 1
+        start = time.perf_counter()
+        try:
+            reader, writer = await self._opener()
+        except Exception as e:
+            self._size -= 1
+            self._record_probe(False, time.perf_counter() - start, e)
+            raise
+        except BaseException:
+            self._size -= 1
+            raise
+        self._connects += 1
+        self._record_probe(True, time.perf_counter() - start)
+        return PooledConnection(reader, writer, self._generation)
+    
+    def _drop(self, conn: PooledConnection) -> None:
+        """Close a connection and remove it from the pool size."""
+        conn.close()
+        self._size -= 1
+        self._refill.set()
+    
+    def _record_probe(self, ok: bool, rtt: float, error: Optional[BaseException] = None) -> None:
+        """Cache the outcome of a keepalive probe or connection attempt."""
+        self._probe_ok = ok
+        self._probe_at = time.monotonic()
+        self._probe_rtt = rtt
+        self._probe_error = None if ok else (str(error) or type(error).__name__)
+    
+    def _checkout_idle(self) -> Optional[PooledConnection]:
+        """Pop the most recently used healthy idle connection, if any."""
+        while self._idle:
+            conn = self._idle.pop()
+            if conn.is_alive():
+                return conn
+            self._dead_discarded += 1
+            logger.debug("Discarding dead pooled connection", pool=self.name)
+            self._drop(conn)
+        return None
+    
+    async def acquire(self, fresh: bool = False, timeout: Optional[float] = None) -> PooledConnection:
+        """Check out a connection, waiting if the pool is at capacity.
+        
+        Args:
+            fresh: Skip idle connections and always open a new one
+            timeout: Seconds to wait for a free slot (None waits indefinitely)
+        
+        Returns:
+            PooledConnection: Connection reserved for the caller
+        
+        Raises:
+            asyncio.TimeoutError: If no slot became free within timeout
+        """
+        start = time.perf_counter()
+        
+        self._waiters += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=timeout)
+        finally:
+            self._waiters -= 1
+        
+        try:
+            conn = None if fresh else self._checkout_idle()
+            if conn is None:
+                conn = await self._open()
+        except BaseException:
+            self._slots.release()
+            raise
+        
+        elapsed = time.perf_counter() - start
+        self._checkouts += 1
+        self._checkout_time_total += elapsed
+        self._checkout_time_last = elapsed
+        self._checkout_time_max = max(self._checkout_time_max, elapsed)
+        
+        return conn
+    
+    def release(self, conn: PooledConnection, discard: bool = False) -> None:
+        """Return a connection to the pool.
+        
+        Args:
+            conn: Connection previously obtained from acquire()
+            discard: Close the connection instead of keeping it for reuse
+        """
+        if discard or conn.generation != self._generation or not conn.is_alive():
+            self._drop(conn)
+        else:
+            conn.last_used = time.monotonic()
+            self._idle.append(conn)
+        self._slots.release()
+    
+    @asynccontextmanager
+    async def connection(
+        self,
+        fresh: bool = False,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[PooledConnection]:
+        """Context manager that checks a connection out and back in.
+        
+        Args:
+            fresh: Skip idle connections and always open a new one
+            timeout: Seconds to wait for a free slot (None waits indefinitely)
+        
+        Yields:
+            PooledConnection: Connection reserved for the block
+        """
+        conn = await self.acquire(fresh=fresh, timeout=timeout)
+        try:
+            yield conn
+        except BaseException:
+            self.release(conn, discard=True)
+            raise
+        else:
+            self.release(conn)
+    
+    async def fill(self) -> None:
+        """Open idle connections until the pool holds min_size of them.
+        
+        Failures are logged and swallowed so that an unreachable host does
+        not prevent startup; the next checkout will simply connect lazily.
+        """
+        while self._size < self.min_size:
+            try:
+                conn = await self._open()
+            except Exception as e:
+                logger.warning("Failed to pre-open pooled connection", pool=self.name, error=str(e))
+                return
+            conn.last_used = time.monotonic()
+            self._idle.append(conn)
+    
+    def evict_idle(self) -> int:
+        """Close connections idle longer than idle_timeout, keeping min_size.
+        
+        Returns:
+            int: Number of connections evicted
+        """
+        now = time.monotonic()
+        evicted = 0
+        
+        # Keepalive probes requeue connections out of last-used order
+        for conn in sorted(self._idle, key=lambda idle: idle.last_used):
+            if self._size <= self.min_size:
+                break
+            if conn.is_alive() and now - conn.last_used < self.idle_timeout:
+                break
+            self._idle.remove(conn)
+            self._drop(conn)
+            evicted += 1
+        
+        self._evicted += evicted
+        if evicted:
+            logger.debug("Evicted idle pooled connections", pool=self.name, evicted=evicted)
+        return evicted
+    
+    async def keepalive(self) -> int:
+        """Probe idle connections not used or probed for keepalive_interval.
+        
+        A probed connection is checked out for the duration of the probe,
+        so it cannot be handed to a request half-way through. Connections
+        failing the probe are closed and replaced by the next fill().
+        
+        Returns:
+            int: Number of connections probed
+        """
+        if self._keepalive is None or self.keepalive_interval <= 0:
+            return 0
+        
+        now = time.monotonic()
+        due = [
+            conn for conn in self._idle
+            if now - max(conn.last_used, conn.last_probe) >= self.keepalive_interval
+        ]
+        probed = 0
+        for conn in due:
+            # Skip connections checked out meanwhile, and busy pools (their connections are in use anyway)
+            if conn not in self._idle or self._slots.locked():
+                continue
+            await self._slots.acquire()
+            self._idle.remove(conn)
+            start = time.perf_counter()
+            try:
+                await self._keepalive(conn)
+            except Exception as e:
+                self._keepalive_failures += 1
+                self._record_probe(False, time.perf_counter() - start, e)
+                logger.info("Keepalive probe failed, dropping pooled connection", pool=self.name, error=str(e))
+                self._drop(conn)
+            else:
+                self._record_probe(True, time.perf_counter() - start)
+                conn.last_probe = time.monotonic()
+                self._idle.append(conn)
+            finally:
+                self._slots.release()
+            self._keepalive_probes += 1
+            probed += 1
+        return probed
+    
+    async def _maintenance_loop(self) -> None:
+        """Keep the pool filled, evict idle connections and probe the rest.
+        
+        Runs every idle_timeout / 2 (or keepalive_interval, if shorter), and
+        immediately after a connection was dropped so that the pool is
+        re-established as soon as the host accepts connections again.
+        """
+        interval = self.idle_timeout / 2
+        if self._keepalive is not None and self.keepalive_interval > 0:
+            interval = min(interval, self.keepalive_interval)
+        interval = max(1.0, interval)
+        while True:
+            self._refill.clear()
+            await self.fill()
+            try:
+                await asyncio.wait_for(self._refill.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self.evict_idle()
+            await self.keepalive()
+    
+    def start(self) -> None:
+        """Start background pre-filling and idle eviction."""
+        if self._maintenance_task is None or self._maintenance_task.done():
+            self._maintenance_task = asyncio.create_task(self._maintenance_loop())
+    
+    async def close(self) -> None:
+        """Stop maintenance and close all idle connections.
+        
+        Connections currently checked out are closed when they are
+        released. The pool stays usable: later checkouts open new
+        connections.
+        """
+        if self._maintenance_task:
+            self._maintenance_task.cancel()
+            try:
+                await self._maintenance_task
+            except asyncio.CancelledError:
+                pass
+            self._maintenance_task = None
+        
+        self._generation += 1
+        while self._idle:
+            self._drop(self._idle.pop())
+    
+    def probe_status(self) -> Dict[str, Any]:
+        """Cached outcome of the last keepalive probe or connection attempt.
+        
+        Returns:
+            Dict: ``ok`` (None before the first attempt), ``age`` in seconds,
+            ``rtt`` in seconds and ``error``
+        """
+        age = None if self._probe_at is None else time.monotonic() - self._probe_at
+        return {"ok": self._probe_ok, "age": age, "rtt": self._probe_rtt, "error": self._probe_error}
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool size, waiters and checkout latency.
+        
+        Returns:
+            Dict: Pool statistics suitable for JSON serialization
+        """
+        avg = self._checkout_time_total / self._checkouts if self._checkouts else 0.0
+        probe = self.probe_status()
+        return {
+            "size": self._size,
+            "idle": len(self._idle),
+            "in_use": self._size - len(self._idle),
+            "waiters": self._waiters,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "connects": self._connects,
+            "dead_discarded": self._dead_discarded,
+            "evicted": self._evicted,
+            "checkouts": self._checkouts,
+            "checkout_ms": {
+                "avg": round(avg * 1000, 3),
+                "max": round(self._checkout_time_max * 1000, 3),
+                "last": round(self._checkout_time_last * 1000, 3),
+            },
+            "keepalive": {
+                "probes": self._keepalive_probes,
+                "failures": self._keepalive_failures,
+                "last_ok": probe["ok"],
+                "last_rtt_ms": round(probe["rtt"] * 1000, 3),
+                "last_age_s": None if probe["age"] is None else round(probe["age"], 3),
+                "last_error": probe["error"],
+            },
+        }
+
+
+class ConnectionPoolManager:
+    """Process-wide registry of connection pools, one per ExaPlay host."""
+    
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._pools: Dict[str, ExaPlayConnectionPool] = {}
+    
+    def get(
+        self,
+        host: str,
+        port: int,
+        opener: ConnectionOpener,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        keepalive: Optional[KeepaliveProbe] = None
+    ) -> ExaPlayConnectionPool:
+        """Get the pool for a host, creating it on first use.
+        
+        Args:
+            host: ExaPlay server hostname/IP
+            port: ExaPlay TCP port
+            opener: Coroutine factory used if the pool must be created
+            min_size: Idle connections to keep if the pool must be created (defaults to settings)
+            max_size: Connection limit if the pool must be created (defaults to settings)
+            keepalive: Idle connection probe used if the pool must be created
+        
+        Returns:
+            ExaPlayConnectionPool: Shared pool for host:port
+        """
+        key = f"{host}:{port}"
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = ExaPlayConnectionPool(
+                opener,
+                name=key,
+                min_size=min_size,
+                max_size=max_size,
+                keepalive=keepalive
+            )
+            self._pools[key] = pool
+        return pool
+    
+    async def warm(self, timeout: float) -> None:
+        """Open min_size connections on every pool before serving requests.
+        
+        Unreachable hosts are logged by fill() and left to the maintenance
+        loop, so startup is delayed by at most timeout.
+        
+        Args:
+            timeout: Seconds to wait for all pools to fill
+        """
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(pool.fill() for pool in self._pools.values())),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Connection pool warmup timed out", timeout=timeout)
+    
+    def start(self) -> None:
+        """Start maintenance (pre-fill, idle eviction and keepalive probes) on all pools."""
+        for pool in self._pools.values():
+            pool.start()
+    
+    async def close(self) -> None:
+        """Close idle connections and stop maintenance on all pools."""
+        for pool in self._pools.values():
+            await pool.close()
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Statistics for every pool keyed by host:port."""
+        return {key: pool.stats() for key, pool in self._pools.items()}
+
+
+# Global pool registry shared by all clients and routes
+connection_pools = ConnectionPoolManager()
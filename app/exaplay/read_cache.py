@@ -0,0 +1,247 @@
+"""Short-lived read cache with request coalescing for ExaPlay queries.
+
+Dashboards poll the same few reads (``get:status``, ``get:vol``,
+``get:ver``) for the same compositions many times a second, so most
+upstream traffic is duplicate work. The cache keeps each reply for a
+per-command-type TTL and coalesces concurrent identical misses onto a
+single in-flight upstream call ("singleflight").
+
+Entries are keyed by host address and command and grouped by composition,
+so a successful control command (play, set:vol, ...) invalidates every
+cached read for that composition on that host. Invalidation also bumps a
+generation counter; a fetch that was already in flight when the
+composition changed still answers its waiters but is not stored.
+
+Like the pool and multiplexer, the cache knows nothing about ExaPlay
+exceptions: the fetch's own exception is passed to every waiter, and an
+expired ``timeout`` surfaces as asyncio.TimeoutError. The shared fetch
+runs without the first caller's deadline (each waiter stays bounded by
+its own ``timeout``) but in its priority lane; a caller in a more urgent
+lane than the fetch in flight starts its own fetch rather than waiting
+behind the lower lane, and later callers join that one.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+from app.exaplay.admission import Priority, get_priority
+from app.exaplay.deadline import RequestDeadline
+from app.settings import settings
+
+Fetch = Callable[[], Awaitable[str]]
+
+# Cacheable read commands and the setting holding each one's TTL
+_TTL_SETTINGS = {
+    "get:status": "read_cache_status_ttl",
+    "get:vol": "read_cache_volume_ttl",
+    "get:ver": "read_cache_version_ttl",
+}
+
+# Upper bound on stored entries, so arbitrary composition names cannot grow the cache forever
+_MAX_ENTRIES = 4096
+
+# Lane order, most urgent first
+_PRIORITY_RANK = {priority: rank for rank, priority in enumerate(Priority)}
+
+
+def command_kind(command: str) -> Optional[str]:
+    """Get the cacheable read type of a command.
+    
+    Args:
+        command: Raw command string
+    
+    Returns:
+        Optional[str]: Command name such as ``get:status``, or None if it is not a cacheable read
+    """
+    kind = command.split(",", 1)[0].strip()
+    return kind if kind in _TTL_SETTINGS else None
+
+
+class CachedReply(NamedTuple):
+    """Reply to a read, with how long ago it was fetched."""
+    reply: str
+    age: Optional[float]  # None when fetched for this caller (miss or coalesced)
+
+
+class _Entry(NamedTuple):
+    reply: str
+    fetched_at: float
+    expires_at: float
+
+
+class _Inflight(NamedTuple):
+    task: asyncio.Task
+    priority: Priority
+
+
+class ReadCache:
+    """TTL cache plus singleflight for upstream read commands.
+    
+    Example:
+        cached = await read_cache.get("10.0.0.11:7000", "get:vol,comp1", "comp1", fetch)
+        if cached.age is not None:
+            response.headers["Age"] = str(int(cached.age))
+    """
+    
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        # (host, composition) -> command -> entry
+        self._entries: Dict[Tuple[str, Optional[str]], Dict[str, _Entry]] = {}
+        self._inflight: Dict[Tuple[str, Optional[str], str], _Inflight] = {}
+        self._generations: Dict[Tuple[str, Optional[str]], int] = {}
+        self._size = 0
+        
+        # Statistics per command type
+        self._counters: Dict[str, Dict[str, int]] = {
+            kind: {"hits": 0, "misses": 0, "coalesced": 0} for kind in _TTL_SETTINGS
+        }
+        self._invalidations = 0
+    
+    @staticmethod
+    def ttl(kind: str) -> float:
+        """Configured TTL in seconds for a command type (0 disables caching)."""
+        return getattr(settings, _TTL_SETTINGS[kind])
+    
+    async def get(
+        self,
+        host: str,
+        command: str,
+        composition: Optional[str],
+        fetch: Fetch,
+        timeout: Optional[float] = None
+    ) -> CachedReply:
+        """Answer a read from the cache, an in-flight fetch, or a new fetch.
+        
+        Args:
+            host: Upstream address (host:port) the command is routed to
+            command: Read command; must satisfy command_kind()
+            composition: Composition the command targets, used for invalidation
+            fetch: Coroutine factory performing the upstream call on a miss
+            timeout: Seconds this caller may wait for a fetch (None waits until it finishes)
+        
+        Returns:
+            CachedReply: Reply and its age if it came from the cache
+        
+        Raises:
+            asyncio.TimeoutError: If timeout expired before the fetch finished
+            Exception: Whatever the fetch raised
+        """
+        kind = command_kind(command)
+        assert kind is not None, f"not a cacheable read: {command}"
+        counters = self._counters[kind]
+        group = (host, composition)
+        
+        entry = self._entries.get(group, {}).get(command)
+        now = time.monotonic()
+        if entry is not None and entry.expires_at > now:
+            counters["hits"] += 1
+            return CachedReply(entry.reply, now - entry.fetched_at)
+        
+        key = (host, composition, command)
+        priority = get_priority()
+        inflight = self._inflight.get(key)
+        if inflight is not None and _PRIORITY_RANK[inflight.priority] <= _PRIORITY_RANK[priority]:
+            counters["coalesced"] += 1
+            task = inflight.task
+        else:
+            counters["misses"] += 1
+            # The fetch runs as its own task so a caller that gives up or
+            # disconnects does not cancel it for the other waiters
+            task = asyncio.ensure_future(self._fill(key, group, kind, fetch))
+            self._inflight[key] = _Inflight(task, priority)
+        
+        reply = await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
+        return CachedReply(reply, None)
+    
+    async def _fill(
+        self,
+        key: Tuple[str, Optional[str], str],
+        group: Tuple[str, Optional[str]],
+        kind: str,
+        fetch: Fetch
+    ) -> str:
+        """Run a fetch and store its reply unless the composition changed meanwhile."""
+        generation = self._generations.get(group, 0)
+        try:
+            # The task copied the first caller's context; its deadline must
+            # not apply to the requests coalesced onto it (its lane does)
+            with RequestDeadline(None, unbounded=True):
+                reply = await fetch()
+        finally:
+            inflight = self._inflight.get(key)
+            if inflight is not None and inflight.task is asyncio.current_task():
+                del self._inflight[key]
+        
+        ttl = self.ttl(kind)
+        if ttl > 0 and self._generations.get(group, 0) == generation:
+            self._store(group, key[2], reply, ttl)
+        return reply
+    
+    def _store(self, group: Tuple[str, Optional[str]], command: str, reply: str, ttl: float) -> None:
+        """Insert an entry, pruning expired ones (or everything) when full."""
+        if self._size >= _MAX_ENTRIES:
+            self._prune()
+        now = time.monotonic()
+        commands = self._entries.setdefault(group, {})
+        if command not in commands:
+            self._size += 1
+        commands[command] = _Entry(reply, now, now + ttl)
+    
+    def _prune(self) -> None:
+        """Drop expired entries, or all entries if none had expired."""
+        now = time.monotonic()
+        for group in list(self._entries):
+            commands = self._entries[group]
+            for command in [c for c, entry in commands.items() if entry.expires_at <= now]:
+                del commands[command]
+            if not commands:
+                del self._entries[group]
+        self._size = sum(len(commands) for commands in self._entries.values())
+        if self._size >= _MAX_ENTRIES:
+            self.clear()
+    
+    def invalidate(self, host: str, composition: Optional[str]) -> None:
+        """Forget cached reads for a composition after it was changed.
+        
+        Args:
+            host: Upstream address (host:port) the change was sent to
+            composition: Composition that changed
+        """
+        group = (host, composition)
+        self._generations[group] = self._generations.get(group, 0) + 1
+        
+        dropped = self._entries.pop(group, None)
+        if dropped:
+            self._size -= len(dropped)
+        
+        # Later reads must not join a fetch that may predate the change
+        for key in [key for key in self._inflight if key[:2] == group]:
+            del self._inflight[key]
+        
+        self._invalidations += 1
+    
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        self._entries.clear()
+        self._size = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of cache size and hit/miss/coalesced counters.
+        
+        Returns:
+            Dict: Cache statistics suitable for JSON serialization
+        """
+        return {
+            "entries": self._size,
+            "inflight": len(self._inflight),
+            "invalidations": self._invalidations,
+            "commands": {
+                kind: {"ttl": self.ttl(kind), **counters}
+                for kind, counters in self._counters.items()
+            },
+        }
+
+
+# Global read cache shared by all hosts
+read_cache = ReadCache()
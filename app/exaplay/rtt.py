@@ -0,0 +1,159 @@
+"""Adaptive reply timeouts from observed upstream round-trip times.
+
+A fixed TCP_TIMEOUT has to cover the slowest reply ExaPlay might ever
+give, so a reply lost on a LAN where ExaPlay answers in a few
+milliseconds is only noticed (and retried) seconds later. Like TCP's
+retransmission timeout (RFC 6298), each host keeps a smoothed RTT and
+RTT variance from successful replies, and waits for a reply no longer
+than ``SRTT + 4 * RTTVAR``, bounded by TCP_TIMEOUT_MIN and the host's
+TCP timeout. Every reply timeout doubles the estimate until the next
+successful sample, so a host that has become slow is not retried into
+the ground.
+
+Only the wait for a reply is adaptive; connecting and checking out a
+pooled connection keep the fixed timeout.
+"""
+
+from typing import Any, Dict, Optional
+
+from app.settings import settings
+
+# RFC 6298 smoothing gains and variance multiplier
+_ALPHA = 1 / 8
+_BETA = 1 / 4
+_K = 4
+
+# Lower bound on the variance term, so that a perfectly steady host still gets slack
+_GRANULARITY = 0.001
+
+# Reply timeouts doubled at most this many times (64x the estimate)
+_MAX_BACKOFF = 6
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    """Convert seconds to milliseconds rounded for stats."""
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+class RttEstimator:
+    """Smoothed round-trip time and derived reply timeout for one host.
+    
+    Example:
+        timeout = estimator.timeout()
+        start = time.perf_counter()
+        reply = await asyncio.wait_for(read_reply(), timeout)
+        estimator.sample(time.perf_counter() - start)
+    """
+    
+    def __init__(self, name: str, minimum: Optional[float] = None, maximum: Optional[float] = None) -> None:
+        """Initialize an estimator without samples.
+        
+        Args:
+            name: Identifier used in stats (usually host:port)
+            minimum: Lower bound on the timeout in seconds (defaults to settings)
+            maximum: Upper bound on the timeout, and the timeout before the first sample (defaults to settings)
+        """
+        self.name = name
+        self.minimum = settings.tcp_timeout_min if minimum is None else minimum
+        self.maximum = maximum or settings.tcp_timeout
+        
+        self._srtt: Optional[float] = None
+        self._rttvar = 0.0
+        self._backoff = 0
+        
+        # Statistics
+        self._samples = 0
+        self._timeouts = 0
+        self._last = 0.0
+        self._max = 0.0
+    
+    def sample(self, rtt: float) -> None:
+        """Fold a successful reply's round-trip time into the estimate.
+        
+        Args:
+            rtt: Seconds from sending the command to receiving its reply
+        """
+        if self._srtt is None:
+            self._srtt = rtt
+            self._rttvar = rtt / 2
+        else:
+            self._rttvar = (1 - _BETA) * self._rttvar + _BETA * abs(self._srtt - rtt)
+            self._srtt = (1 - _ALPHA) * self._srtt + _ALPHA * rtt
+        self._backoff = 0
+        self._samples += 1
+        self._last = rtt
+        self._max = max(self._max, rtt)
+    
+    def on_timeout(self) -> None:
+        """Back the timeout off after a reply did not arrive in time."""
+        self._backoff = min(self._backoff + 1, _MAX_BACKOFF)
+        self._timeouts += 1
+    
+    def timeout(self, maximum: Optional[float] = None) -> float:
+        """Seconds to wait for the next reply.
+        
+        Args:
+            maximum: Upper bound overriding the estimator's own (e.g. a per-client timeout)
+        
+        Returns:
+            float: The backed-off estimate, bounded by minimum and maximum;
+            the maximum until the first sample
+        """
+        upper = self.maximum if maximum is None else maximum
+        if self._srtt is None:
+            return upper
+        rto = (self._srtt + max(_GRANULARITY, _K * self._rttvar)) * 2 ** self._backoff
+        return min(upper, max(self.minimum, rto))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the estimator state.
+        
+        Returns:
+            Dict: Estimator statistics suitable for JSON serialization
+        """
+        return {
+            "samples": self._samples,
+            "srtt_ms": _ms(self._srtt),
+            "rttvar_ms": _ms(self._rttvar if self._srtt is not None else None),
+            "timeout_ms": _ms(self.timeout()),
+            "backoff": 2 ** self._backoff,
+            "timeouts": self._timeouts,
+            "last_ms": _ms(self._last if self._samples else None),
+            "max_ms": _ms(self._max if self._samples else None),
+            "min_timeout_ms": _ms(self.minimum),
+            "max_timeout_ms": _ms(self.maximum),
+        }
+
+
+class RttEstimatorRegistry:
+    """Process-wide registry of RTT estimators, one per ExaPlay host."""
+    
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._estimators: Dict[str, RttEstimator] = {}
+    
+    def get(self, host: str, port: int, maximum: Optional[float] = None) -> RttEstimator:
+        """Get the estimator for a host, creating it on first use.
+        
+        Args:
+            host: ExaPlay server hostname/IP
+            port: ExaPlay TCP port
+            maximum: Timeout upper bound if the estimator must be created (defaults to settings)
+        
+        Returns:
+            RttEstimator: Shared estimator for host:port
+        """
+        key = f"{host}:{port}"
+        estimator = self._estimators.get(key)
+        if estimator is None:
+            estimator = RttEstimator(key, maximum=maximum)
+            self._estimators[key] = estimator
+        return estimator
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Statistics for every estimator keyed by host:port."""
+        return {key: estimator.stats() for key, estimator in self._estimators.items()}
+
+
+# Global estimator registry shared by all clients
+rtt_estimators = RttEstimatorRegistry()
@@ -0,0 +1,344 @@
+"""Scheduled command execution at absolute times.
+
+Show cues used to be triggered by external cron-style scripts calling the
+HTTP API, which adds hundreds of milliseconds of unpredictable delay. The
+scheduler instead keeps pending entries in a heap ordered by fire time and
+drives them from one task inside the event loop. SCHEDULE_PREPARE_LEAD
+seconds before an entry is due its connections are checked out, each
+holding a critical-lane admission slot on its host until the writes are
+done (see send_synchronized()), so that at the fire time only the writes remain;
+the last couple of milliseconds are spun rather than slept for precision.
+
+Fire times are given on the wall clock or the server's monotonic clock
+and converted to time.perf_counter() once, when the entry is added. How
+late each entry's writes actually left is recorded in a histogram.
+"""
+
+import asyncio
+import heapq
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.exaplay.deadline import RequestDeadline
+from app.exaplay.fleet import ExaPlayHost, get_host_registry
+from app.exaplay.models import BatchItemResult, ScheduledCommandResponse
+from app.exaplay.tcp_client import SynchronizedResult
+from app.logging import get_logger
+from app.settings import settings
+
+logger = get_logger(__name__)
+
+# Upper bounds (milliseconds) of the fire error histogram buckets
+FIRE_ERROR_BUCKETS_MS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 1000.0)
+
+
+class SchedulerFullError(Exception):
+    """Raised when SCHEDULE_MAX_PENDING entries are already pending."""
+
+
+def _wall_time(perf: float) -> datetime:
+    """Convert a time.perf_counter() value to a UTC wall-clock time."""
+    return datetime.fromtimestamp(time.time() + (perf - time.perf_counter()), tz=timezone.utc)
+
+
+class ScheduledCommand:
+    """Commands to be released from one write barrier at a fire time."""
+    
+    def __init__(self, commands: List[str], fire_at: float) -> None:
+        """Initialize a pending entry.
+        
+        Args:
+            commands: Raw commands to send
+            fire_at: time.perf_counter() instant to write them at
+        """
+        self.id = uuid.uuid4().hex[:12]
+        self.commands = commands
+        self.fire_at = fire_at
+        self.fire_wall = _wall_time(fire_at)
+        self.fire_monotonic = time.monotonic() + (fire_at - time.perf_counter())
+        self.state = "pending"
+        self.task: Optional[asyncio.Task] = None
+        self.outcomes: Optional[List[Tuple[ExaPlayHost, SynchronizedResult]]] = None
+        self.fired_at: Optional[datetime] = None
+        self.fire_error: Optional[float] = None
+    
+    def snapshot(self) -> ScheduledCommandResponse:
+        """Entry and outcome as an API response."""
+        results = None
+        if self.outcomes is not None:
+            results = [
+                BatchItemResult(
+                    index=index,
+                    sent=result.command,
+                    status="ok" if result.error is None else "error",
+                    reply=result.reply,
+                    error=str(result.error) if result.error is not None else None,
+                    latencyMs=(
+                        round((result.replied_at - result.written_at) * 1000, 3)
+                        if result.replied_at is not None and result.written_at is not None else None
+                    )
+                )
+                for index, (_, result) in enumerate(self.outcomes)
+            ]
+        return ScheduledCommandResponse(
+            id=self.id,
+            state=self.state,
+            commands=self.commands,
+            fireAt=self.fire_wall,
+            fireMonotonic=round(self.fire_monotonic, 6),
+            firedAt=self.fired_at,
+            fireErrorMs=round(self.fire_error * 1000, 3) if self.fire_error is not None else None,
+            results=results
+        )
+
+
+class CommandScheduler:
+    """Heap-driven scheduler firing commands at absolute times.
+    
+    Example:
+        entry = command_scheduler.add(["play,show"], at=datetime(2026, 10, 15, 20, tzinfo=timezone.utc))
+        command_scheduler.cancel(entry.id)
+    """
+    
+    def __init__(self) -> None:
+        """Initialize an empty scheduler; its task starts with the first entry."""
+        self._heap: List[Tuple[float, int, ScheduledCommand]] = []
+        self._sequence = 0
+        self._entries: Dict[str, ScheduledCommand] = {}
+        self._history: Deque[str] = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        
+        # Statistics
+        self._fired = 0
+        self._cancelled = 0
+        self._failed_commands = 0
+        self._error_total = 0.0
+        self._error_max = 0.0
+        self._buckets = [0] * (len(FIRE_ERROR_BUCKETS_MS) + 1)
+    
+    @property
+    def running(self) -> bool:
+        """Whether the scheduler task is active."""
+        return self._task is not None and not self._task.done()
+    
+    def pending(self) -> int:
+        """Number of entries that have not fired yet."""
+        return sum(1 for entry in self._entries.values() if entry.state in ("pending", "firing"))
+    
+    def add(
+        self,
+        commands: List[str],
+        at: Optional[datetime] = None,
+        monotonic: Optional[float] = None
+    ) -> ScheduledCommand:
+        """Schedule commands for a wall-clock or monotonic fire time.
+        
+        Args:
+            commands: Raw commands to release together
+            at: Wall-clock fire time (naive values are taken as UTC)
+            monotonic: Fire time on the time.monotonic() clock
+        
+        Returns:
+            ScheduledCommand: The pending entry
+        
+        Raises:
+            ValueError: If the fire time has passed or lies beyond SCHEDULE_MAX_HORIZON
+            SchedulerFullError: If SCHEDULE_MAX_PENDING entries are pending
+        """
+        if at is not None:
+            if at.tzinfo is None:
+                at = at.replace(tzinfo=timezone.utc)
+            delay = at.timestamp() - time.time()
+        elif monotonic is not None:
+            delay = monotonic - time.monotonic()
+        else:
+            raise ValueError("A fire time is required")
+        
+        if delay <= 0:
+            raise ValueError(f"Fire time is {-delay:.3f}s in the past")
+        if delay > settings.schedule_max_horizon:
+            raise ValueError(f"Fire time is more than {settings.schedule_max_horizon:g}s ahead")
+        if self.pending() >= settings.schedule_max_pending:
+            raise SchedulerFullError(f"{settings.schedule_max_pending} entries are already pending")
+        
+        entry = ScheduledCommand(commands, time.perf_counter() + delay)
+        self._entries[entry.id] = entry
+        self._sequence += 1
+        heapq.heappush(self._heap, (entry.fire_at, self._sequence, entry))
+        
+        if not self.running:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run_loop())
+        self._wakeup.set()
+        
+        logger.info(
+            "Commands scheduled",
+            id=entry.id,
+            commands=commands,
+            fire_at=entry.fire_wall.isoformat(),
+            delay=round(delay, 3)
+        )
+        return entry
+    
+    def get(self, entry_id: str) -> Optional[ScheduledCommand]:
+        """Get a pending or recently finished entry by ID."""
+        return self._entries.get(entry_id)
+    
+    def entries(self) -> List[ScheduledCommand]:
+        """Pending and recently finished entries ordered by fire time."""
+        return sorted(self._entries.values(), key=lambda entry: entry.fire_at)
+    
+    def cancel(self, entry_id: str) -> ScheduledCommand:
+        """Cancel an entry that has not fired yet.
+        
+        An entry whose connections are already checked out can still be
+        cancelled until its fire time; nothing is written in that case.
+        
+        Args:
+            entry_id: Entry ID
+        
+        Returns:
+            ScheduledCommand: The cancelled entry
+        
+        Raises:
+            KeyError: If no such entry is known
+            ValueError: If the entry has already fired or was cancelled
+        """
+        entry = self._entries[entry_id]
+        if entry.state == "pending":
+            self._wakeup.set()
+        elif entry.state == "firing" and time.perf_counter() < entry.fire_at and entry.task is not None:
+            # Still waiting for its release: the writes have not happened yet
+            entry.task.cancel()
+        else:
+            raise ValueError(f"Entry {entry_id} is already {entry.state}")
+        
+        entry.state = "cancelled"
+        self._cancelled += 1
+        self._retire(entry)
+        logger.info("Scheduled commands cancelled", id=entry_id)
+        return entry
+    
+    async def close(self) -> None:
+        """Stop the scheduler, cancelling every entry that has not fired."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        
+        for entry in list(self._entries.values()):
+            if entry.state in ("pending", "firing"):
+                if entry.task is not None:
+                    entry.task.cancel()
+                entry.state = "cancelled"
+                self._cancelled += 1
+        self._heap.clear()
+    
+    def _retire(self, entry: ScheduledCommand) -> None:
+        """Keep a finished entry for listing, forgetting the oldest beyond SCHEDULE_HISTORY_SIZE."""
+        self._history.append(entry.id)
+        while len(self._history) > settings.schedule_history_size:
+            self._entries.pop(self._history.popleft(), None)
+    
+    async def _run_loop(self) -> None:
+        """Start each entry's dispatch SCHEDULE_PREPARE_LEAD before it is due."""
+        while True:
+            while self._heap and self._heap[0][2].state != "pending":
+                heapq.heappop(self._heap)
+            
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+            
+            entry = self._heap[0][2]
+            delay = entry.fire_at - settings.schedule_prepare_lead - time.perf_counter()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            heapq.heappop(self._heap)
+            entry.state = "firing"
+            entry.task = asyncio.create_task(self._fire(entry))
+    
+    async def _fire(self, entry: ScheduledCommand) -> None:
+        """Check out connections, wait for the fire time and write."""
+        # Background work: the scheduling request's deadline must not apply
+        with RequestDeadline(None, unbounded=True):
+            try:
+                outcomes = await get_host_registry().send_synchronized(entry.commands, release_at=entry.fire_at)
+            except asyncio.CancelledError:
+                return
+        
+        entry.state = "done"
+        entry.outcomes = outcomes
+        self._fired += 1
+        self._failed_commands += sum(1 for _, result in outcomes if result.error is not None)
+        
+        written = [result.written_at for _, result in outcomes if result.written_at is not None]
+        if written:
+            entry.fired_at = _wall_time(max(written))
+            entry.fire_error = max(written) - entry.fire_at
+            self._record_error(entry.fire_error)
+        self._retire(entry)
+        
+        logger.info(
+            "Scheduled commands fired",
+            id=entry.id,
+            commands=entry.commands,
+            fire_error_ms=round(entry.fire_error * 1000, 3) if entry.fire_error is not None else None,
+            failed=sum(1 for _, result in outcomes if result.error is not None)
+        )
+    
+    def _record_error(self, error: float) -> None:
+        """Add a fire error (seconds late) to the histogram."""
+        error_ms = max(0.0, error * 1000)
+        self._error_total += error_ms
+        self._error_max = max(self._error_max, error_ms)
+        for index, bound in enumerate(FIRE_ERROR_BUCKETS_MS):
+            if error_ms <= bound:
+                self._buckets[index] += 1
+                return
+        self._buckets[-1] += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of scheduler counters and the fire error histogram.
+        
+        Histogram buckets are cumulative: each counts the fires that were at
+        most that many milliseconds late.
+        
+        Returns:
+            Dict: Scheduler statistics suitable for JSON serialization
+        """
+        measured = sum(self._buckets)
+        cumulative: Dict[str, int] = {}
+        total = 0
+        for bound, count in zip((*FIRE_ERROR_BUCKETS_MS, "+Inf"), self._buckets, strict=True):
+            total += count
+            cumulative[f"{bound:g}" if isinstance(bound, float) else bound] = total
+        return {
+            "running": self.running,
+            "pending": self.pending(),
+            "fired": self._fired,
+            "cancelled": self._cancelled,
+            "failed_commands": self._failed_commands,
+            "fire_error_ms": {
+                "avg": round(self._error_total / measured, 3) if measured else None,
+                "max": round(self._error_max, 3) if measured else None,
+                "buckets": cumulative,
+            },
+        }
+
+
+# Global scheduler shared by the schedule routes
+command_scheduler = CommandScheduler()
@@ -2,6 +2,8 @@
 
 Implements the ExaPlay TCP protocol with proper CR/CRLF handling,
 timeouts, exponential backoff retries, and comprehensive error handling.
+Commands run over persistent connections from app.exaplay.pool, or
+pipelined over one shared socket by app.exaplay.multiplexer.
 
 Protocol Details:
 - Send commands as UTF-8 text lines terminated with CR (\r)
@@ -11,13 +13,38 @@ Protocol Details:
 
 import asyncio
 import socket
-from typing import Optional, Tuple
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Awaitable, Dict, Iterator, List, NamedTuple, Optional, Tuple, TypeVar
 
+from app.exaplay.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    Priority,
+    UpstreamPriority,
+    admission_controllers,
+    get_priority,
+)
+from app.exaplay.breaker import CircuitBreaker, circuit_breakers
+from app.exaplay.deadline import RequestDeadline, remaining_budget
+from app.exaplay.multiplexer import ExaPlayMultiplexer, multiplexers
+from app.exaplay.pool import ExaPlayConnectionPool, PooledConnection, connection_pools
+from app.exaplay.rtt import RttEstimator, rtt_estimators
 from app.logging import PerformanceTimer, get_logger
+from app.metrics import command_verb, tcp_command_duration, tcp_command_retries, tcp_command_timeouts
 from app.settings import settings
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
+# Slack for timers that fire marginally before the deadline they were set from
+_DEADLINE_EPSILON = 0.001
+
+# Final stretch before a scheduled release that is spun on the event loop
+# instead of slept, since loop timers only have millisecond resolution
+_RELEASE_SPIN_WINDOW = 0.002
+
 
 class ExaPlayError(Exception):
     """Base exception for ExaPlay-related errors."""
@@ -32,6 +59,11 @@ class ExaPlayTimeoutError(ExaPlayError):
     pass
 
 
+class ExaPlayDeadlineError(ExaPlayTimeoutError):
+    """Raised when the request's deadline budget is exhausted."""
+    pass
+
+
 class ExaPlayConnectionError(ExaPlayError):
     """Raised when TCP connection fails."""
     pass
@@ -42,11 +74,77 @@ class ExaPlayProtocolError(ExaPlayError):
     pass
 
 
+class ExaPlayCircuitOpenError(ExaPlayError):
+    """Raised without contacting ExaPlay while the host's circuit breaker is open."""
+    
+    def __init__(self, message: str, command: Optional[str] = None, retry_after: int = 1) -> None:
+        super().__init__(message, command=command)
+        self.retry_after = retry_after
+
+
+class ExaPlayOverloadedError(ExaPlayError):
+    """Raised without contacting ExaPlay when admission control sheds the command."""
+    
+    def __init__(self, message: str, command: Optional[str] = None, retry_after: int = 1) -> None:
+        super().__init__(message, command=command)
+        self.retry_after = retry_after
+
+
+class CommandResult(NamedTuple):
+    """Outcome of one command sent as part of a pipelined batch."""
+    command: str
+    reply: Optional[str]
+    error: Optional[ExaPlayError]
+    latency: float
+
+
+class SynchronizedResult(NamedTuple):
+    """Outcome of one command released from a synchronized dispatch barrier.
+    
+    Timestamps are time.perf_counter() values so that callers can compare
+    them across members; they are None if the write or reply never happened.
+    """
+    command: str
+    reply: Optional[str]
+    error: Optional[ExaPlayError]
+    written_at: Optional[float]
+    replied_at: Optional[float]
+
+
+def configure_socket(sock: Optional[socket.socket]) -> None:
+    """Apply TCP_NODELAY and OS-level keepalive to an upstream socket.
+    
+    Commands are single short lines, so Nagle's algorithm would only add
+    latency. Keepalive makes the kernel notice a vanished peer on idle
+    connections; the intervals are only set where the platform exposes them.
+    
+    Args:
+        sock: Connected socket (None when the transport does not expose one)
+    """
+    if sock is None:
+        return
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if settings.tcp_so_keepalive:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            for option, value in (
+                ("TCP_KEEPIDLE", settings.tcp_so_keepalive_idle),
+                ("TCP_KEEPINTVL", settings.tcp_so_keepalive_interval),
+                ("TCP_KEEPCNT", settings.tcp_so_keepalive_count),
+            ):
+                if hasattr(socket, option):
+                    sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+    except OSError as e:
+        logger.warning("Failed to set upstream socket options", error=str(e))
+
+
 class ExaPlayTCPClient:
     """Async TCP client for ExaPlay communication.
     
-    Handles connection management, protocol framing, retries, and error mapping.
-    Designed to be used as a singleton or short-lived instance per request.
+    Handles protocol framing, retries, and error mapping. Connections are
+    borrowed from the process-wide pool for the client's host (or, in
+    multiplexed mode, shared through one pipelined socket), so the client
+    itself is cheap and safe to share between concurrent requests.
     
     Example:
         client = ExaPlayTCPClient()
@@ -63,27 +161,61 @@ class ExaPlayTCPClient:
         port: Optional[int] = None,
         timeout: Optional[float] = None,
         max_retries: Optional[int] = None,
-        retry_backoff: Optional[float] = None
+        retry_backoff: Optional[float] = None,
+        pool: Optional[ExaPlayConnectionPool] = None,
+        multiplex: Optional[bool] = None,
+        pool_min_size: Optional[int] = None,
+        pool_max_size: Optional[int] = None
     ) -> None:
         """Initialize TCP client with connection parameters.
         
         Args:
             host: ExaPlay server hostname/IP (defaults to settings)
             port: ExaPlay TCP port (defaults to settings)
-            timeout: Operation timeout in seconds (defaults to settings)
+            timeout: Operation timeout in seconds, and the upper bound of the
+                adaptive reply timeout (defaults to settings)
             max_retries: Maximum retry attempts (defaults to settings)
             retry_backoff: Initial backoff delay for retries (defaults to settings)
+            pool: Connection pool to use (defaults to the shared pool for host:port)
+            multiplex: Pipeline commands over one shared connection (defaults to settings)
+            pool_min_size: Idle connections kept if the shared pool is created here (defaults to settings)
+            pool_max_size: Connection limit if the shared pool is created here (defaults to settings)
         """
         self.host = host or settings.exaplay_host
         self.port = port or settings.exaplay_tcp_port
         self.timeout = timeout or settings.tcp_timeout
-        self.max_retries = max_retries or settings.tcp_max_retries
+        # Zero is a valid retry policy, so only fall back when unset
+        self.max_retries = settings.tcp_max_retries if max_retries is None else max_retries
         self.retry_backoff = retry_backoff or settings.tcp_retry_backoff
         
-        # Connection state
-        self._reader: Optional[asyncio.StreamReader] = None
-        self._writer: Optional[asyncio.StreamWriter] = None
-        self._connection_lock = asyncio.Lock()
+        # Persistent connections shared with every client for this host
+        self.pool = pool or connection_pools.get(
+            self.host,
+            self.port,
+            self._connect,
+            min_size=pool_min_size,
+            max_size=pool_max_size,
+            keepalive=self._keepalive
+        )
+        
+        # Optional pipelined mode: one socket, replies matched in FIFO order
+        use_multiplex = settings.tcp_multiplex_enable if multiplex is None else multiplex
+        self.multiplexer: Optional[ExaPlayMultiplexer] = (
+            multiplexers.get(self.host, self.port, self._connect) if use_multiplex else None
+        )
+        
+        # Fails requests fast while the host is down, shared per host:port
+        self.breaker: CircuitBreaker = circuit_breakers.get(self.host, self.port, self._probe)
+        
+        # Observed reply times, from which reply timeouts are derived
+        self.rtt: RttEstimator = rtt_estimators.get(self.host, self.port, maximum=self.timeout)
+        
+        # Priority lanes in front of the pool/multiplexer, shared per host:port
+        self.admission: AdmissionController = admission_controllers.get(
+            self.host,
+            self.port,
+            max_inflight=self.pool.max_size
+        )
     
     async def _connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
         """Establish TCP connection to ExaPlay server.
@@ -94,74 +226,220 @@ class ExaPlayTCPClient:
         Raises:
             ExaPlayConnectionError: If connection fails.
             ExaPlayTimeoutError: If connection times out.
+            ExaPlayDeadlineError: If the request deadline runs out first.
         """
+        timeout = self._budget(None)
         try:
             logger.debug(
                 "Connecting to ExaPlay",
                 host=self.host,
                 port=self.port,
-                timeout=self.timeout
+                timeout=timeout
             )
             
             # Use asyncio.wait_for to enforce timeout
             reader, writer = await asyncio.wait_for(
                 asyncio.open_connection(self.host, self.port),
-                timeout=self.timeout
+                timeout=timeout
             )
             
+            configure_socket(writer.get_extra_info("socket"))
             logger.debug("Connected to ExaPlay successfully")
             return reader, writer
             
         except asyncio.TimeoutError as e:
-            raise ExaPlayTimeoutError(
-                f"Connection timeout after {self.timeout}s"
+            raise self._timeout_error(
+                f"Connection timeout after {timeout:.3g}s",
+                command=None
             ) from e
         except (OSError, socket.error) as e:
             raise ExaPlayConnectionError(
                 f"Failed to connect to {self.host}:{self.port}: {e}"
             ) from e
     
-    async def _send_command_raw(self, command: str) -> str:
-        """Send a single command and receive reply without retries.
+    def _budget(self, command: Optional[str], reply: bool = False) -> float:
+        """Timeout for the next operation: the TCP timeout capped by the request deadline.
         
         Args:
-            command: Raw command string (without CR terminator)
+            command: Command being processed, attached to raised errors
+            reply: Waiting for a reply, so use the host's adaptive reply
+                timeout (if enabled) instead of the fixed TCP timeout
             
         Returns:
-            str: Reply from ExaPlay (without CRLF terminator)
+            float: Seconds the next connect/write/read may take
             
         Raises:
-            ExaPlayTimeoutError: If operation times out.
-            ExaPlayConnectionError: If connection fails.
-            ExaPlayProtocolError: If reply is malformed.
+            ExaPlayDeadlineError: If the request deadline has already passed.
         """
-        reader, writer = await self._connect()
+        timeout = self.timeout
+        if reply and settings.tcp_adaptive_timeout:
+            timeout = self.rtt.timeout(self.timeout)
+        remaining = remaining_budget()
+        if remaining is None:
+            return timeout
+        if remaining <= _DEADLINE_EPSILON:
+            raise ExaPlayDeadlineError("Request deadline exceeded", command=command)
+        return min(timeout, remaining)
+    
+    async def _await_reply(self, reply: Awaitable[T], command: str) -> T:
+        """Wait for a reply within the adaptive timeout, feeding the RTT estimate.
         
+        Args:
+            reply: Awaitable that completes with the reply
+            command: Command being processed, attached to raised errors
+            
+        Returns:
+            The awaitable's result
+            
+        Raises:
+            ExaPlayTimeoutError: If the reply did not arrive in time.
+            ExaPlayDeadlineError: If the request deadline ran out first.
+        """
+        timeout = self._budget(command, reply=True)
+        start = time.perf_counter()
         try:
-            # Send command with CR terminator
-            command_bytes = f"{command}\r".encode("utf-8")
-            logger.debug("Sending command", command=command, bytes_len=len(command_bytes))
+            result = await asyncio.wait_for(reply, timeout=timeout)
+        except asyncio.TimeoutError as e:
+            error = self._timeout_error(f"No reply within {timeout:.3g}s", command=command)
+            if not isinstance(error, ExaPlayDeadlineError):
+                self.rtt.on_timeout()
+            raise error from e
+        self.rtt.sample(time.perf_counter() - start)
+        return result
+    
+    async def _submit_multiplexed(self, command: str) -> str:
+        """Pipeline a command on the shared connection, feeding the RTT estimate.
+        
+        The adaptive reply timeout is handed to the multiplexer rather than
+        wrapped around it, so that a lost reply at the head of the stream
+        triggers its resynchronisation; connecting and writing get the
+        fixed TCP timeout.
+        
+        Args:
+            command: Raw command string (without CR terminator)
             
-            writer.write(command_bytes)
-            await asyncio.wait_for(writer.drain(), timeout=self.timeout)
+        Returns:
+            str: Reply from ExaPlay (without CRLF terminator)
             
-            # Read reply until CRLF
-            reply_bytes = await asyncio.wait_for(
-                reader.readuntil(b"\r\n"),
-                timeout=self.timeout
-            )
+        Raises:
+            ExaPlayTimeoutError: If the reply did not arrive in time.
+            ExaPlayDeadlineError: If the request deadline ran out first.
+        """
+        assert self.multiplexer is not None
+        write_timeout = self._budget(command)
+        timeout = self._budget(command, reply=True)
+        [(outcome, latency)] = await self.multiplexer.submit_many(
+            [command],
+            timeout=timeout,
+            write_timeout=write_timeout
+        )
+        if isinstance(outcome, asyncio.TimeoutError):
+            error = self._timeout_error(f"No reply within {timeout:.3g}s", command=command)
+            if not isinstance(error, ExaPlayDeadlineError):
+                self.rtt.on_timeout()
+            raise error from outcome
+        if isinstance(outcome, BaseException):
+            raise outcome
+        self.rtt.sample(latency)
+        return outcome
+    
+    def _timeout_error(self, message: str, command: Optional[str]) -> ExaPlayTimeoutError:
+        """Build the error for an expired operation timeout.
+        
+        An operation whose timeout was shortened to the remaining request
+        budget reports the deadline rather than an upstream timeout, so
+        that it is neither retried nor held against the host.
+        """
+        remaining = remaining_budget()
+        if remaining is not None and remaining <= _DEADLINE_EPSILON:
+            return ExaPlayDeadlineError("Request deadline exceeded", command=command)
+        return ExaPlayTimeoutError(message, command=command)
+    
+    async def _admit(self, command: Optional[str], priority: Priority) -> float:
+        """Wait for one of the host's in-flight slots in a priority lane.
+        
+        Args:
+            command: Command being processed, attached to raised errors
+            priority: Priority lane to queue in
             
-            # Decode and strip CRLF terminator
-            reply = reply_bytes.decode("utf-8").rstrip("\r\n")
-            logger.debug("Received reply", reply=reply, bytes_len=len(reply_bytes))
+        Returns:
+            float: Admission time, to pass to ``self.admission.release()``
             
-            return reply
+        Raises:
+            ExaPlayOverloadedError: If the lane's queue wait budget is exceeded.
+            ExaPlayDeadlineError: If the request deadline runs out while queued.
+        """
+        remaining = remaining_budget()
+        if remaining is not None and remaining <= _DEADLINE_EPSILON:
+            raise ExaPlayDeadlineError("Request deadline exceeded", command=command)
+        try:
+            with self._map_transport_errors(command):
+                return await self.admission.acquire(priority, timeout=remaining)
+        except AdmissionRejected as e:
+            raise ExaPlayOverloadedError(str(e), command=command, retry_after=e.retry_after) from e
+    
+    @asynccontextmanager
+    async def _admitted(self, command: Optional[str]) -> AsyncIterator[None]:
+        """Hold one of the host's in-flight slots in the current priority lane.
+        
+        Args:
+            command: Command being processed, attached to raised errors
             
+        Raises:
+            ExaPlayOverloadedError: If the lane's queue wait budget is exceeded.
+            ExaPlayDeadlineError: If the request deadline runs out while queued.
+        """
+        admitted_at = await self._admit(command, get_priority())
+        try:
+            yield
+        finally:
+            self.admission.release(admitted_at)
+    
+    def _record_failure(self, error: ExaPlayError) -> None:
+        """Count a transport failure against the host's circuit breaker."""
+        if not isinstance(error, ExaPlayDeadlineError):
+            self.breaker.record_failure(error)
+    
+    def _observe_attempt(self, command: str, started: float, reply: Optional[str], error: Optional[BaseException]) -> None:
+        """Record one command attempt's latency and outcome in the metrics."""
+        host = f"{self.host}:{self.port}"
+        if error is None:
+            outcome = "err" if reply is not None and reply.startswith("ERR") else "ok"
+        elif isinstance(error, ExaPlayDeadlineError):
+            outcome = "deadline"
+        elif isinstance(error, ExaPlayTimeoutError):
+            outcome = "timeout"
+            tcp_command_timeouts.inc(host)
+        elif isinstance(error, ExaPlayOverloadedError):
+            outcome = "shed"
+        else:
+            outcome = "error"
+        tcp_command_duration.observe(time.perf_counter() - started, command_verb(command), host, outcome)
+    
+    @contextmanager
+    def _map_transport_errors(self, command: Optional[str]) -> Iterator[None]:
+        """Translate low-level stream errors into ExaPlay exceptions.
+        
+        Args:
+            command: Command being processed, attached to raised errors
+            
+        Raises:
+            ExaPlayTimeoutError: If operation times out.
+            ExaPlayConnectionError: If the connection fails or is closed by the peer.
+            ExaPlayProtocolError: If reply is malformed.
+        """
+        try:
+            yield
         except asyncio.TimeoutError as e:
-            raise ExaPlayTimeoutError(
+            raise self._timeout_error(
                 f"Command timeout after {self.timeout}s",
                 command=command
             ) from e
+        except asyncio.IncompleteReadError as e:
+            raise ExaPlayConnectionError(
+                "Connection closed by ExaPlay before reply",
+                command=command
+            ) from e
         except (OSError, socket.error) as e:
             raise ExaPlayConnectionError(
                 f"Connection error during command: {e}",
@@ -172,15 +450,103 @@ class ExaPlayTCPClient:
                 f"Invalid UTF-8 in reply: {e}",
                 command=command
             ) from e
-        finally:
-            # Always close connection after single command
-            writer.close()
+    
+    async def _exchange(self, conn: PooledConnection, command: str) -> str:
+        """Write one command on a pooled connection and read its reply.
+        
+        Args:
+            conn: Connection checked out from the pool
+            command: Raw command string (without CR terminator)
+            
+        Returns:
+            str: Reply from ExaPlay (without CRLF terminator)
+        """
+        with self._map_transport_errors(command):
+            # Send command with CR terminator
+            command_bytes = f"{command}\r".encode("utf-8")
+            logger.debug("Sending command", command=command, bytes_len=len(command_bytes))
+            
+            conn.writer.write(command_bytes)
+            await asyncio.wait_for(conn.writer.drain(), timeout=self._budget(command))
+            
+            # Read reply until CRLF
+            reply_bytes = await self._await_reply(conn.reader.readuntil(b"\r\n"), command)
+            conn.commands_sent += 1
+            
+            # Decode and strip CRLF terminator
+            reply = reply_bytes.decode("utf-8").rstrip("\r\n")
+            logger.debug("Received reply", reply=reply, bytes_len=len(reply_bytes))
+            
+            return reply
+    
+    async def _send_command_raw(self, command: str) -> str:
+        """Send a single command without retries.
+        
+        In multiplexed mode the command is pipelined onto the host's shared
+        connection. Otherwise it runs on a pooled connection; a reused
+        connection can turn out to be dead even after passing the checkout
+        health check (e.g. ExaPlay restarted in between), in which case the
+        command is re-sent once on a freshly opened connection before the
+        failure counts as an attempt. Every attempt first waits for admission
+        in the current priority lane.
+        
+        Args:
+            command: Raw command string (without CR terminator)
+            
+        Returns:
+            str: Reply from ExaPlay (without CRLF terminator)
+            
+        Raises:
+            ExaPlayTimeoutError: If operation times out.
+            ExaPlayConnectionError: If connection fails.
+            ExaPlayProtocolError: If reply is malformed.
+            ExaPlayOverloadedError: If the command was shed by admission control.
+        """
+        async with self._admitted(command):
+            if self.multiplexer is not None:
+                with self._map_transport_errors(command):
+                    return await self._submit_multiplexed(command)
+            
+            reused = False
             try:
-                await asyncio.wait_for(writer.wait_closed(), timeout=1.0)
-            except asyncio.TimeoutError:
-                logger.warning("Timeout waiting for connection to close")
-            except Exception as e:
-                logger.warning("Error closing connection", error=str(e))
+                with self._map_transport_errors(command):
+                    async with self.pool.connection(timeout=self._budget(command)) as conn:
+                        reused = conn.commands_sent > 0
+                        return await self._exchange(conn, command)
+            except ExaPlayConnectionError as e:
+                if not reused:
+                    raise
+                logger.info("Pooled connection went stale, reconnecting", command=command, error=str(e))
+            
+            with self._map_transport_errors(command):
+                async with self.pool.connection(fresh=True, timeout=self._budget(command)) as conn:
+                    return await self._exchange(conn, command)
+    
+    def _check_breaker(self, command: Optional[str]) -> None:
+        """Reject the request if the host's circuit breaker is open.
+        
+        Raises:
+            ExaPlayCircuitOpenError: If the breaker does not allow requests.
+        """
+        if not self.breaker.allow_request():
+            raise ExaPlayCircuitOpenError(
+                f"Circuit breaker open for {self.host}:{self.port}",
+                command=command,
+                retry_after=self.breaker.retry_after()
+            )
+    
+    async def _probe(self) -> None:
+        """Half-open probe used by the circuit breaker (single attempt, no breaker check)."""
+        # The probe task inherits the context of the request that tripped
+        # the breaker; it must not be bound by that request's deadline or
+        # shed behind that request's queued work
+        with RequestDeadline(None, unbounded=True), UpstreamPriority(Priority.CRITICAL):
+            await self._send_command_raw("get:ver")
+    
+    async def _keepalive(self, conn: PooledConnection) -> None:
+        """Keepalive probe run by the pool on idle connections (`get:ver`)."""
+        with RequestDeadline(None, unbounded=True):
+            await self._exchange(conn, "get:ver")
     
     async def send_command(self, command: str) -> str:
         """Send command to ExaPlay with retry logic and error handling.
@@ -195,12 +561,17 @@ class ExaPlayTCPClient:
             ExaPlayTimeoutError: If all retry attempts timeout.
             ExaPlayConnectionError: If connection consistently fails.
             ExaPlayProtocolError: If ExaPlay returns ERR or malformed response.
+            ExaPlayCircuitOpenError: If the host's circuit breaker is open.
+            ExaPlayOverloadedError: If admission control shed the command.
         """
-        async with self._connection_lock:
-            last_exception: Optional[Exception] = None
-            
-            # Attempt command with exponential backoff retry
-            for attempt in range(self.max_retries + 1):
+        last_exception: Optional[Exception] = None
+        
+        # Attempt command with exponential backoff retry
+        for attempt in range(self.max_retries + 1):
+            # Checked on every attempt so retries stop once the breaker trips
+            self._check_breaker(command)
+            try:
+                started = time.perf_counter()
                 try:
                     with PerformanceTimer(
                         "tcp_command",
@@ -209,81 +580,249 @@ class ExaPlayTCPClient:
                         attempt=attempt + 1
                     ):
                         reply = await self._send_command_raw(command)
-                    
-                    # Check for ExaPlay error response
-                    if reply.startswith("ERR"):
-                        raise ExaPlayProtocolError(
-                            f"ExaPlay returned error: {reply}",
-                            command=command
-                        )
-                    
-                    # Log successful command
-                    logger.info(
-                        "Command completed successfully",
-                        command=command,
-                        reply=reply,
-                        attempt=attempt + 1
+                except ExaPlayError as e:
+                    self._observe_attempt(command, started, None, e)
+                    raise
+                self._observe_attempt(command, started, reply, None)
+                
+                self.breaker.record_success()
+                
+                # Check for ExaPlay error response
+                if reply.startswith("ERR"):
+                    raise ExaPlayProtocolError(
+                        f"ExaPlay returned error: {reply}",
+                        command=command
                     )
+                
+                # Log successful command
+                logger.info(
+                    "Command completed successfully",
+                    command=command,
+                    reply=reply,
+                    attempt=attempt + 1
+                )
+                
+                return reply
+                
+            except ExaPlayDeadlineError:
+                # The request's budget is spent; nothing left to retry with
+                raise
+            
+            except (ExaPlayTimeoutError, ExaPlayConnectionError) as e:
+                last_exception = e
+                self._record_failure(e)
+                
+                if attempt < self.max_retries:
+                    # Calculate backoff delay with exponential increase
+                    delay = self.retry_backoff * (2 ** attempt)
                     
-                    return reply
-                    
-                except (ExaPlayTimeoutError, ExaPlayConnectionError) as e:
-                    last_exception = e
-                    
-                    if attempt < self.max_retries:
-                        # Calculate backoff delay with exponential increase
-                        delay = self.retry_backoff * (2 ** attempt)
-                        
+                    # Only retry if the backoff leaves time for another attempt
+                    remaining = remaining_budget()
+                    if remaining is not None and delay >= remaining:
                         logger.warning(
-                            "Command failed, retrying",
+                            "Command failed, retry does not fit in request deadline",
                             command=command,
                             attempt=attempt + 1,
-                            max_retries=self.max_retries,
                             retry_delay=delay,
-                            error=str(e)
-                        )
-                        
-                        await asyncio.sleep(delay)
-                    else:
-                        logger.error(
-                            "Command failed after all retries",
-                            command=command,
-                            attempts=attempt + 1,
+                            remaining_budget=round(remaining, 3),
                             error=str(e)
                         )
                         break
-                
-                except ExaPlayProtocolError:
-                    # Protocol errors (like ERR responses) should not be retried
+                    
+                    tcp_command_retries.inc(f"{self.host}:{self.port}")
+                    logger.warning(
+                        "Command failed, retrying",
+                        command=command,
+                        attempt=attempt + 1,
+                        max_retries=self.max_retries,
+                        retry_delay=delay,
+                        error=str(e)
+                    )
+                    
+                    await asyncio.sleep(delay)
+                else:
+                    logger.error(
+                        "Command failed after all retries",
+                        command=command,
+                        attempts=attempt + 1,
+                        error=str(e)
+                    )
+                    break
+            
+            except ExaPlayProtocolError:
+                # Protocol errors (like ERR responses) should not be retried
+                raise
+        
+        # Re-raise the last exception if all retries failed
+        if last_exception:
+            raise last_exception
+        
+        # This should not happen, but provide a fallback
+        raise ExaPlayConnectionError(
+            "Unexpected error: no exception but no success",
+            command=command
+        )
+    
+    def _as_result(self, command: str, outcome: object, latency: float) -> CommandResult:
+        """Convert a raw reply or transport exception into a CommandResult."""
+        if isinstance(outcome, BaseException):
+            try:
+                with self._map_transport_errors(command):
+                    raise outcome
+            except ExaPlayError as e:
+                return CommandResult(command, None, e, latency)
+        
+        reply = str(outcome)
+        if reply.startswith("ERR"):
+            error = ExaPlayProtocolError(f"ExaPlay returned error: {reply}", command=command)
+            return CommandResult(command, reply, error, latency)
+        return CommandResult(command, reply, None, latency)
+    
+    async def _read_replies(
+        self,
+        conn: PooledConnection,
+        commands: List[str],
+        sent_at: float
+    ) -> Tuple[List[CommandResult], bool]:
+        """Read one reply per command from a connection they were burst onto.
+        
+        Args:
+            conn: Connection the commands were written to
+            commands: Commands in the order they were written
+            sent_at: perf_counter() timestamp of the write, for latencies
+            
+        Returns:
+            Tuple of (one result per command, whether the stream is broken).
+            Once a read fails the remaining commands are reported as aborted.
+        """
+        results: List[CommandResult] = []
+        broken = False
+        for command in commands:
+            try:
+                reply_bytes = await asyncio.wait_for(
+                    conn.reader.readuntil(b"\r\n"),
+                    timeout=self._budget(command, reply=True)
+                )
+                outcome: object = reply_bytes.decode("utf-8").rstrip("\r\n")
+                conn.commands_sent += 1
+            except Exception as e:
+                # Replies can no longer be matched to commands on this stream
+                broken = True
+                outcome = e
+            results.append(self._as_result(command, outcome, time.perf_counter() - sent_at))
+            if broken:
+                break
+        
+        for command in commands[len(results):]:
+            error = ExaPlayConnectionError("Batch aborted after an earlier stream error", command=command)
+            results.append(CommandResult(command, None, error, time.perf_counter() - sent_at))
+        
+        return results, broken
+    
+    async def _send_burst(self, commands: List[str]) -> List[CommandResult]:
+        """Write all commands at once on one connection and read the replies."""
+        if self.multiplexer is not None:
+            with self._map_transport_errors(None):
+                outcomes = await self.multiplexer.submit_many(commands, timeout=self._budget(None))
+            return [
+                self._as_result(command, outcome, latency)
+                for command, (outcome, latency) in zip(commands, outcomes, strict=True)
+            ]
+        
+        with self._map_transport_errors(None):
+            conn = await self.pool.acquire(timeout=self._budget(None))
+        broken = False
+        try:
+            with self._map_transport_errors(None):
+                conn.writer.write("".join(f"{command}\r" for command in commands).encode("utf-8"))
+                await asyncio.wait_for(conn.writer.drain(), timeout=self._budget(None))
+            sent_at = time.perf_counter()
+            
+            results, broken = await self._read_replies(conn, commands, sent_at)
+            
+            if results[0].error is not None and not isinstance(results[0].error, ExaPlayProtocolError):
+                # Nothing came back at all; report it as an upstream failure
+                raise results[0].error
+            return results
+        except BaseException:
+            broken = True
+            raise
+        finally:
+            self.pool.release(conn, discard=broken)
+    
+    async def _send_sequential(self, commands: List[str]) -> List[CommandResult]:
+        """Send commands one at a time, stopping at the first failure."""
+        results: List[CommandResult] = []
+        for command in commands:
+            start = time.perf_counter()
+            try:
+                outcome: object = await self._send_command_raw(command)
+            except ExaPlayError as e:
+                if not results and not isinstance(e, ExaPlayProtocolError):
                     raise
+                outcome = e
+            result = self._as_result(command, outcome, time.perf_counter() - start)
+            results.append(result)
+            if result.error is not None:
+                break
+        return results
+    
+    async def send_pipeline(self, commands: List[str], stop_on_error: bool = False) -> List[CommandResult]:
+        """Send several commands as one batch without retries.
+        
+        By default all commands are written in a single burst on one
+        connection, so the whole batch costs one round trip and every
+        command is executed regardless of earlier ERR replies. With
+        ``stop_on_error`` the commands are sent one after another and the
+        batch stops at the first failure; the returned list is then
+        shorter than ``commands``.
+        
+        Batches are not retried because part of a batch may already have
+        been executed by ExaPlay when a failure is detected.
+        
+        Args:
+            commands: Raw command strings (without CR terminator), in order
+            stop_on_error: Stop at the first ERR reply or transport failure
             
-            # Re-raise the last exception if all retries failed
-            if last_exception:
-                raise last_exception
+        Returns:
+            List[CommandResult]: Per-command reply, error and latency, in order
             
-            # This should not happen, but provide a fallback
-            raise ExaPlayConnectionError(
-                "Unexpected error: no exception but no success",
-                command=command
-            )
+        Raises:
+            ExaPlayError: If ExaPlay could not be reached before any reply arrived
+            ExaPlayCircuitOpenError: If the host's circuit breaker is open
+            ExaPlayOverloadedError: If admission control shed the batch
+        """
+        if not commands:
+            return []
+        
+        self._check_breaker(None)
+        try:
+            with PerformanceTimer(
+                "tcp_pipeline",
+                logger,
+                commands=len(commands),
+                stop_on_error=stop_on_error
+            ):
+                if stop_on_error:
+                    results = await self._send_sequential(commands)
+                else:
+                    async with self._admitted(None):
+                        results = await self._send_burst(commands)
+        except (ExaPlayTimeoutError, ExaPlayConnectionError) as e:
+            self._record_failure(e)
+            raise
+        
+        self.breaker.record_success()
+        return results
     
     async def close(self) -> None:
-        """Close any existing connections.
+        """Release client resources.
         
-        This method is idempotent and safe to call multiple times.
+        Connections belong to the shared pool and stay open for reuse by
+        other requests; they are closed by the pool on shutdown or idle
+        eviction. This method is kept so existing ``async with`` usage
+        continues to work and is safe to call multiple times.
         """
-        if self._writer and not self._writer.is_closing():
-            logger.debug("Closing TCP connection")
-            self._writer.close()
-            try:
-                await asyncio.wait_for(self._writer.wait_closed(), timeout=1.0)
-            except asyncio.TimeoutError:
-                logger.warning("Timeout waiting for connection to close")
-            except Exception as e:
-                logger.warning("Error closing connection", error=str(e))
-            finally:
-                self._writer = None
-                self._reader = None
     
     async def __aenter__(self) -> "ExaPlayTCPClient":
         """Async context manager entry."""
@@ -294,12 +833,177 @@ class ExaPlayTCPClient:
         await self.close()
 
 
+async def sleep_until(release_at: float) -> None:
+    """Wait until a time.perf_counter() instant with sub-millisecond precision.
+    
+    Sleeps on the event loop until shortly before the instant, then spins,
+    yielding to other tasks, for the last _RELEASE_SPIN_WINDOW seconds.
+    
+    Args:
+        release_at: time.perf_counter() value to wait for
+    """
+    delay = release_at - time.perf_counter() - _RELEASE_SPIN_WINDOW
+    if delay > 0:
+        await asyncio.sleep(delay)
+    while time.perf_counter() < release_at:
+        await asyncio.sleep(0)
+
+
+async def send_synchronized(
+    targets: List[Tuple[ExaPlayTCPClient, str]],
+    release_at: Optional[float] = None
+) -> List[SynchronizedResult]:
+    """Send commands to one or more hosts with minimal skew between them.
+    
+    Runs in three phases so that connection setup never delays the start
+    of any member:
+    
+    1. One pooled connection per client is checked out concurrently, each
+       after taking an in-flight slot in the host's critical admission
+       lane, so group sends count against the same per-host cap as every
+       other upstream command. With ``release_at``, the connections and
+       slots are then held until that instant, so that firing a scheduled
+       command is only a write.
+    2. Every client's commands are written back-to-back from a single
+       synchronous loop (no awaits in between), which acts as the barrier:
+       all writes are handed to the kernel within microseconds.
+    3. Replies are drained and read concurrently per connection.
+    
+    Commands for the same client share its connection and are written as
+    one burst. Nothing is retried, since a late retry would defeat the
+    synchronisation; multiplexed clients also use their pool here so the
+    barrier write is not queued behind unrelated traffic.
+    
+    Args:
+        targets: (client, raw command) pairs, in order
+        release_at: time.perf_counter() instant to write at (None writes as
+            soon as the connections are checked out). Cancelling before
+            then, including while connections are still being checked out,
+            returns them without writing anything.
+        
+    Returns:
+        List[SynchronizedResult]: Per-command outcome and timestamps, in order
+    """
+    groups: Dict[int, Tuple[ExaPlayTCPClient, List[int]]] = {}
+    for index, (client, _) in enumerate(targets):
+        groups.setdefault(id(client), (client, []))[1].append(index)
+    members = list(groups.values())
+    # Connections checked out so far and their admission times, by client
+    held: Dict[int, Tuple[PooledConnection, float]] = {}
+    
+    async def acquire(client: ExaPlayTCPClient) -> PooledConnection:
+        client._check_breaker(None)
+        admitted_at = await client._admit(None, Priority.CRITICAL)
+        try:
+            with client._map_transport_errors(None):
+                conn = await client.pool.acquire(timeout=client._budget(None))
+        except BaseException as e:
+            client.admission.release(admitted_at)
+            if isinstance(e, (ExaPlayTimeoutError, ExaPlayConnectionError)):
+                client._record_failure(e)
+            raise
+        held[id(client)] = (conn, admitted_at)
+        return conn
+    
+    def release(client: ExaPlayTCPClient, discard: bool = False) -> None:
+        conn, admitted_at = held.pop(id(client))
+        client.pool.release(conn, discard=discard)
+        client.admission.release(admitted_at)
+    
+    # Phase 1: pre-acquire, so that connects and health checks happen before the barrier
+    try:
+        conns = await asyncio.gather(
+            *(acquire(client) for client, _ in members),
+            return_exceptions=True
+        )
+        if release_at is not None:
+            await sleep_until(release_at)
+    except BaseException:
+        for client, _ in members:
+            if id(client) in held:
+                release(client)
+        raise
+    
+    # Phase 2: barrier release; keep this loop free of awaits
+    written_at: List[Optional[float]] = []
+    for (_, indexes), conn in zip(members, conns, strict=True):
+        if isinstance(conn, BaseException):
+            written_at.append(None)
+            continue
+        conn.writer.write("".join(f"{targets[i][1]}\r" for i in indexes).encode("utf-8"))
+        written_at.append(time.perf_counter())
+    
+    # Phase 3: collect replies concurrently
+    async def collect(
+        client: ExaPlayTCPClient,
+        commands: List[str],
+        conn: object,
+        sent_at: Optional[float]
+    ) -> List[SynchronizedResult]:
+        if not isinstance(conn, PooledConnection) or sent_at is None:
+            error = conn if isinstance(conn, ExaPlayError) else ExaPlayConnectionError(str(conn))
+            return [SynchronizedResult(command, None, error, None, None) for command in commands]
+        
+        broken = True
+        try:
+            try:
+                with client._map_transport_errors(None):
+                    await asyncio.wait_for(conn.writer.drain(), timeout=client._budget(None))
+            except ExaPlayError as e:
+                client._record_failure(e)
+                return [SynchronizedResult(command, None, e, sent_at, None) for command in commands]
+            
+            results, broken = await client._read_replies(conn, commands, sent_at)
+            if results[0].reply is not None:
+                client.breaker.record_success()
+            elif results[0].error is not None:
+                client._record_failure(results[0].error)
+            return [
+                SynchronizedResult(
+                    result.command,
+                    result.reply,
+                    result.error,
+                    sent_at,
+                    sent_at + result.latency if result.reply is not None else None
+                )
+                for result in results
+            ]
+        finally:
+            release(client, discard=broken)
+    
+    collected = await asyncio.gather(*(
+        collect(client, [targets[i][1] for i in indexes], conn, sent_at)
+        for (client, indexes), conn, sent_at in zip(members, conns, written_at, strict=True)
+    ))
+    
+    ordered: List[Optional[SynchronizedResult]] = [None] * len(targets)
+    for (_, indexes), results in zip(members, collected, strict=True):
+        for index, result in zip(indexes, results, strict=True):
+            ordered[index] = result
+    return [result for result in ordered if result is not None]
+
+
+_default_client: Optional[ExaPlayTCPClient] = None
+
+
+def get_exaplay_client() -> ExaPlayTCPClient:
+    """Get the shared client for the configured ExaPlay host.
+    
+    Returns:
+        ExaPlayTCPClient: Process-wide client backed by the host's connection pool
+    """
+    global _default_client
+    if _default_client is None:
+        _default_client = ExaPlayTCPClient()
+    return _default_client
+
+
 # Convenience functions for common operations
 async def send_exaplay_command(command: str) -> str:
     """Send a single command to ExaPlay using default settings.
     
-    Convenience function that creates a client, sends the command,
-    and cleans up automatically.
+    Convenience function that sends the command through the shared
+    client, reusing a pooled connection to the configured host.
     
     Args:
         command: Raw command string
@@ -310,8 +1014,7 @@ async def send_exaplay_command(command: str) -> str:
     Raises:
         ExaPlayError: For any communication or protocol errors
     """
-    async with ExaPlayTCPClient() as client:
-        return await client.send_command(command)
+    return await get_exaplay_client().send_command(command)
 
 
 async def test_exaplay_connection() -> bool:
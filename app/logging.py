@@ -4,15 +4,27 @@
 Provides centralized logging setup with structured output suitable for
 production monitoring and debugging. Includes trace ID injection for
 request correlation.
+
+With LOG_ASYNC enabled, the calling thread (usually the event loop) only
+runs the cheap processors that must see its context (level filter,
+sampling, timestamp, trace ID) and appends the record to a bounded queue;
+exception formatting, rendering and the write to stdout happen on a
+background writer thread. High-frequency DEBUG/INFO events can be
+sampled (LOG_SAMPLE_RATES) or rate limited (LOG_RATE_LIMITS) by event
+message before any of that work is done.
 """
 
+import atexit
 import json
 import logging
 import sys
+import threading
 import time
 import uuid
+from collections import deque
 from contextvars import ContextVar
-from typing import Any, Dict, Optional
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional, TextIO
 
 import structlog
 from structlog.types import FilteringBoundLogger
@@ -77,8 +89,36 @@ def add_timestamp(logger: FilteringBoundLogger, name: str, event_dict: Dict[str,
         dict: Event dictionary with timestamp added.
     """
     # Use datetime for microsecond precision
-    import datetime
-    event_dict["timestamp"] = datetime.datetime.utcnow().isoformat() + "Z"
+    event_dict["timestamp"] = format_timestamp(time.time())
+    return event_dict
+
+
+def format_timestamp(epoch: float) -> str:
+    """Format a Unix time as an ISO 8601 UTC timestamp with microseconds.
+    
+    Args:
+        epoch: Seconds since the epoch.
+        
+    Returns:
+        str: Timestamp such as 2024-01-01T12:00:00.000000Z.
+    """
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def capture_timestamp(logger: FilteringBoundLogger, name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Processor recording the raw time of a record for the background writer.
+    
+    The writer formats it like add_timestamp, off the logging thread.
+    
+    Args:
+        logger: The logger instance.
+        name: Logger name.
+        event_dict: Log event dictionary.
+        
+    Returns:
+        dict: Event dictionary with the timestamp as seconds since the epoch.
+    """
+    event_dict["timestamp"] = time.time()
     return event_dict
 
 
@@ -143,17 +183,236 @@ def console_renderer(logger: FilteringBoundLogger, name: str, event_dict: Dict[s
     return base
 
 
-def configure_logging() -> None:
+class EventSampler:
+    """Processor thinning out high-frequency DEBUG/INFO events by message.
+    
+    Sampling keeps a fixed share of an event's records (every tenth for
+    0.1, deterministically rather than at random); rate limiting keeps at
+    most a given number per second with a one-second burst. Records that
+    pass after others were dropped carry a ``suppressed`` count. Warnings
+    and errors are never dropped.
+    
+    Example:
+        sampler = EventSampler({"Command completed successfully": 0.1}, {"OSC message received": 5})
+    """
+    
+    _SAMPLED_LEVELS = frozenset(("debug", "info"))
+    
+    def __init__(self, sample_rates: Dict[str, float], rate_limits: Dict[str, float]) -> None:
+        """Initialize the sampler.
+        
+        Args:
+            sample_rates: Share of records kept (0 to 1) per event message
+            rate_limits: Maximum records per second per event message
+        """
+        self.sample_rates = dict(sample_rates)
+        self.rate_limits = dict(rate_limits)
+        self._credit: Dict[str, float] = {}
+        self._tokens: Dict[str, float] = {}
+        self._refilled: Dict[str, float] = {}
+        self._suppressed: Dict[str, int] = {}
+    
+    def _keep(self, event: str) -> bool:
+        """Decide whether one record of the event passes sampling and rate limits."""
+        rate = self.sample_rates.get(event)
+        if rate is not None:
+            # The first record of an event is always kept
+            credit = self._credit.get(event, 1.0 - rate) + rate
+            if credit < 1.0:
+                self._credit[event] = credit
+                return False
+            self._credit[event] = credit - 1.0
+        
+        limit = self.rate_limits.get(event)
+        if limit is not None:
+            now = time.monotonic()
+            burst = max(1.0, limit)
+            tokens = min(burst, self._tokens.get(event, burst) + (now - self._refilled.get(event, now)) * limit)
+            self._refilled[event] = now
+            if tokens < 1.0:
+                self._tokens[event] = tokens
+                return False
+            self._tokens[event] = tokens - 1.0
+        return True
+    
+    def __call__(self, logger: FilteringBoundLogger, name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop the record if its event is being thinned out.
+        
+        Raises:
+            structlog.DropEvent: If the record is sampled out or over its rate limit
+        """
+        if name not in self._SAMPLED_LEVELS:
+            return event_dict
+        event = event_dict.get("event")
+        if event not in self.sample_rates and event not in self.rate_limits:
+            return event_dict
+        
+        if not self._keep(event):
+            self._suppressed[event] = self._suppressed.get(event, 0) + 1
+            raise structlog.DropEvent
+        suppressed = self._suppressed.pop(event, 0)
+        if suppressed:
+            event_dict["suppressed"] = suppressed
+        return event_dict
+
+
+def capture_exc_info(logger: FilteringBoundLogger, name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Processor resolving ``exc_info=True`` while still on the logging thread.
+    
+    The background writer formats exceptions later, when sys.exc_info()
+    no longer refers to the exception being logged.
+    
+    Args:
+        logger: The logger instance.
+        name: Logger name.
+        event_dict: Log event dictionary.
+        
+    Returns:
+        dict: Event dictionary with exc_info as an exception tuple.
+    """
+    if event_dict.get("exc_info") is True:
+        event_dict["exc_info"] = sys.exc_info()
+    return event_dict
+
+
+class BackgroundLogWriter:
+    """Bounded record queue drained, rendered and written by a daemon thread.
+    
+    Used as the final structlog processor: it appends the event dictionary
+    (no formatting, no I/O) and stops the chain. The writer thread batches
+    whatever has accumulated into a single write and flush. When the queue
+    is full the oldest or the newest record is dropped, per overflow, and
+    the writer reports the number of dropped records in a warning.
+    """
+    
+    def __init__(
+        self,
+        renderer: Callable[[Any, str, Dict[str, Any]], str],
+        stream: TextIO,
+        max_size: int,
+        overflow: str = "drop_oldest"
+    ) -> None:
+        """Initialize the writer and start its thread.
+        
+        Args:
+            renderer: Final renderer turning an event dictionary into a line
+            stream: Output stream written by the thread
+            max_size: Maximum records waiting to be written
+            overflow: drop_oldest or drop_newest when the queue is full
+        """
+        self.renderer = renderer
+        self.stream = stream
+        self.max_size = max_size
+        self.overflow = overflow
+        # drop_oldest is the deque's own bound; drop_newest is checked on append
+        self._decode = structlog.processors.UnicodeDecoder()
+        self._records: Deque[Dict[str, Any]] = deque(maxlen=max_size if overflow == "drop_oldest" else None)
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self.written = 0
+        self.dropped = 0
+        self._reported = 0
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+    
+    def __call__(self, logger: FilteringBoundLogger, name: str, event_dict: Dict[str, Any]) -> None:
+        """Enqueue the record for the writer thread.
+        
+        Raises:
+            structlog.DropEvent: Always, as the record has been taken over
+        """
+        if len(self._records) >= self.max_size:
+            self.dropped += 1
+            if self.overflow == "drop_newest":
+                raise structlog.DropEvent
+        self._records.append(event_dict)
+        if not self._wakeup.is_set():
+            self._wakeup.set()
+        raise structlog.DropEvent
+    
+    def _render(self, event_dict: Dict[str, Any]) -> str:
+        """Run the deferred processors and the renderer on one record."""
+        try:
+            if isinstance(event_dict.get("timestamp"), float):
+                event_dict["timestamp"] = format_timestamp(event_dict["timestamp"])
+            event_dict = structlog.processors.format_exc_info(None, "", event_dict)
+            event_dict = self._decode(None, "", event_dict)
+            return self.renderer(None, "", event_dict)
+        except Exception as e:
+            return f"Unrenderable log record {event_dict.get('event')!r}: {e}"
+    
+    def flush(self) -> None:
+        """Write every queued record (and any drop report) to the stream."""
+        lines = []
+        while True:
+            try:
+                lines.append(self._render(self._records.popleft()))
+            except IndexError:
+                break
+        
+        dropped = self.dropped
+        if dropped > self._reported:
+            lines.append(self._render({
+                "timestamp": time.time(),
+                "trace_id": "",
+                "component": "logging",
+                "level": "warning",
+                "event": "Log records dropped, queue full",
+                "dropped": dropped - self._reported,
+                "overflow": self.overflow
+            }))
+            self._reported = dropped
+        
+        if lines:
+            self.written += len(lines)
+            try:
+                self.stream.write("\n".join(lines) + "\n")
+                self.stream.flush()
+            except (OSError, ValueError):
+                pass
+    
+    def _run(self) -> None:
+        """Writer thread: wait for records, then write them in one batch."""
+        while not self._stopping:
+            self._wakeup.wait(timeout=1.0)
+            self._wakeup.clear()
+            self.flush()
+    
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop the thread after writing everything still queued."""
+        self._stopping = True
+        self._wakeup.set()
+        self._thread.join(timeout)
+        self.flush()
+
+
+# Background writer while LOG_ASYNC is in effect
+_log_writer: Optional[BackgroundLogWriter] = None
+
+
+def configure_logging(log_async: Optional[bool] = None, stream: Optional[TextIO] = None) -> None:
     """Configure structured logging based on settings.
     
     Sets up structlog with appropriate processors and renderers
-    based on the LOG_FORMAT setting (json or console).
+    based on the LOG_FORMAT setting (json or console), optionally
+    handing formatting and output to a background writer thread.
+    
+    Args:
+        log_async: Override for LOG_ASYNC
+        stream: Output stream replacing the root handler's (defaults to stdout)
     """
+    global _log_writer
+    if log_async is None:
+        log_async = settings.log_async
+    replace_handlers = stream is not None
+    stream = stream or sys.stdout
+    
     # Configure standard library logging
     logging.basicConfig(
         format="%(message)s",
-        stream=sys.stdout,
+        stream=stream,
         level=getattr(logging, settings.log_level.upper(), logging.INFO),
+        force=replace_handlers,
     )
     
     # Choose renderer based on format setting
@@ -162,20 +421,34 @@ def configure_logging() -> None:
     else:
         renderer = console_renderer
     
-    # Configure structlog
-    structlog.configure(
-        processors=[
-            structlog.stdlib.filter_by_level,
-            add_timestamp,
-            add_trace_id,
-            add_component,
-            structlog.stdlib.add_log_level,
-            structlog.stdlib.PositionalArgumentsFormatter(),
-            structlog.processors.StackInfoRenderer(),
+    processors: List[Any] = [structlog.stdlib.filter_by_level]
+    if settings.log_sample_rates or settings.log_rate_limits:
+        processors.append(EventSampler(settings.log_sample_rates, settings.log_rate_limits))
+    processors += [
+        capture_timestamp if log_async else add_timestamp,
+        add_trace_id,
+        add_component,
+        structlog.stdlib.add_log_level,
+        structlog.stdlib.PositionalArgumentsFormatter(),
+        structlog.processors.StackInfoRenderer(),
+    ]
+    
+    if _log_writer is not None:
+        _log_writer.stop()
+        _log_writer = None
+    if log_async:
+        _log_writer = BackgroundLogWriter(renderer, stream, settings.log_queue_size, settings.log_queue_overflow)
+        processors += [capture_exc_info, _log_writer]
+    else:
+        processors += [
             structlog.processors.format_exc_info,
             structlog.processors.UnicodeDecoder(),
             renderer,
-        ],
+        ]
+    
+    # Configure structlog
+    structlog.configure(
+        processors=processors,
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
         wrapper_class=structlog.stdlib.BoundLogger,
@@ -183,6 +456,15 @@ def configure_logging() -> None:
     )
 
 
+def shutdown_logging() -> None:
+    """Write out records still queued for the background writer."""
+    if _log_writer is not None:
+        _log_writer.stop()
+
+
+atexit.register(shutdown_logging)
+
+
 class RequestLoggingContext:
     """Context manager for request-scoped logging with automatic trace ID management.
     
@@ -255,6 +537,7 @@ class PerformanceTimer:
         self.logger = logger
         self.extra_fields = extra_fields
         self.start_time: float = 0.0
+        self.elapsed_ms: float = 0.0
     
     def __enter__(self) -> "PerformanceTimer":
         """Start timing the operation."""
@@ -269,6 +552,7 @@ class PerformanceTimer:
     def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
         """Stop timing and log the duration."""
         duration_ms = (time.perf_counter() - self.start_time) * 1000
+        self.elapsed_ms = duration_ms
         
         if exc_type is None:
             outcome = "success"
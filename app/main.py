@@ -5,18 +5,41 @@ and lifecycle management for the ExaPlay Control API.
 """
 
 import asyncio
+import time
 from contextlib import asynccontextmanager
 from typing import Any, Dict
 
 from fastapi import FastAPI, Request, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 
-from app.api import routes_admin, routes_control, routes_events, routes_position, routes_status, routes_volume
+from app.api import (
+    routes_admin,
+    routes_control,
+    routes_events,
+    routes_groups,
+    routes_macros,
+    routes_position,
+    routes_schedule,
+    routes_status,
+    routes_volume,
+    routes_ws,
+)
 from app.deps import configure_cors
 from app.exaplay.models import ErrorResponse
+from app.exaplay.breaker import circuit_breakers
+from app.exaplay.deadline import RequestDeadline
+from app.exaplay.fader import fade_engine
+from app.exaplay.fleet import get_host_registry
+from app.exaplay.macros import get_macro_registry
+from app.exaplay.multiplexer import multiplexers
 from app.exaplay.osc_listener import osc_broadcaster
+from app.exaplay.poller import status_poller
+from app.exaplay.pool import connection_pools
+from app.exaplay.scheduler import command_scheduler
 from app.logging import RequestLoggingContext, get_logger, get_trace_id
+from app.metrics import http_request_duration
 from app.settings import settings
 
 logger = get_logger(__name__)
@@ -27,6 +50,8 @@ async def lifespan(app: FastAPI):
     """FastAPI lifespan context manager for startup and shutdown tasks.
     
     Handles:
+    - Upstream connection pool warmup, keepalive and shutdown
+    - Background status poller startup/shutdown (if enabled)
     - OSC listener startup/shutdown (if enabled)
     - Graceful resource cleanup
     - Application lifecycle logging
@@ -44,6 +69,20 @@ async def lifespan(app: FastAPI):
         log_level=settings.log_level
     )
     
+    # Load the host registry (registering one pool per ExaPlay host), open
+    # the pools' connections before the first request and keep them warm
+    registry = get_host_registry()
+    logger.info("ExaPlay host registry loaded", hosts={name: host.address for name, host in registry.hosts.items()})
+    await connection_pools.warm(timeout=settings.tcp_timeout)
+    connection_pools.start()
+    
+    # Load macros from MACROS_FILE (fails startup if the file is invalid)
+    logger.info("Macros loaded", macros=get_macro_registry().names())
+    
+    # Start the background status poller if enabled
+    if settings.status_poller_enable:
+        status_poller.start(registry)
+    
     # Start OSC listener if enabled
     if settings.exaplay_osc_enable:
         try:
@@ -68,6 +107,17 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error("Error stopping OSC broadcaster", error=str(e))
     
+    # Cancel scheduled commands, macro runs, running volume fades and the status poller
+    await command_scheduler.close()
+    await get_macro_registry().close()
+    await fade_engine.close()
+    await status_poller.close()
+    
+    # Stop breaker probes, then close pooled and multiplexed upstream connections
+    await circuit_breakers.close()
+    await connection_pools.close()
+    await multiplexers.close()
+    
     logger.info("ExaPlay Control API shutdown complete")
 
 
@@ -119,7 +169,8 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     error_response = ErrorResponse(
         error=f"Validation error: {'; '.join(error_details)}",
         traceId=trace_id,
-        details={"validation_errors": exc.errors()}
+        # Custom validators attach the raised exception in ctx, which is not JSON serializable
+        details={"validation_errors": jsonable_encoder(exc.errors(), custom_encoder={Exception: str})}
     )
     
     return JSONResponse(
@@ -163,6 +214,43 @@ async def global_exception_handler(request: Request, exc: Exception) -> JSONResp
     )
 
 
+# Middleware applying the end-to-end deadline budget
+# (registered before the logging middleware so that logging stays outermost)
+@app.middleware("http")
+async def request_deadline_middleware(request: Request, call_next):
+    """Middleware bounding all upstream work of a request by a deadline.
+    
+    The budget comes from the X-Request-Timeout header (seconds, capped at
+    REQUEST_TIMEOUT_MAX) or defaults to REQUEST_TIMEOUT.
+    
+    Args:
+        request: FastAPI request object
+        call_next: Next middleware/route handler
+        
+    Returns:
+        Response from the next handler, or 400 for an invalid header
+    """
+    budget = settings.request_timeout
+    header = request.headers.get("X-Request-Timeout")
+    if header is not None:
+        try:
+            budget = float(header)
+            if not 0 < budget < float("inf"):
+                raise ValueError(header)
+        except ValueError:
+            return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content=ErrorResponse(
+                    error="X-Request-Timeout must be a positive number of seconds",
+                    traceId=get_trace_id()
+                ).model_dump()
+            )
+        budget = min(budget, settings.request_timeout_max)
+    
+    with RequestDeadline(budget):
+        return await call_next(request)
+
+
 # Middleware for request/response logging
 @app.middleware("http")
 async def request_response_logging_middleware(request: Request, call_next):
@@ -177,10 +265,25 @@ async def request_response_logging_middleware(request: Request, call_next):
     """
     # Set up request context with trace ID
     with RequestLoggingContext() as trace_id:
+        start = time.perf_counter()
         # Add trace ID to response headers
         response = await call_next(request)
         response.headers["X-Trace-ID"] = trace_id
         
+        # RateLimit-* headers of the route group's limiter, if any
+        rate_limit_headers = getattr(request.state, "rate_limit", None)
+        if rate_limit_headers:
+            response.headers.update(rate_limit_headers)
+        
+        # Label by route template, not path, to keep the series bounded
+        route = request.scope.get("route")
+        http_request_duration.observe(
+            time.perf_counter() - start,
+            request.method,
+            getattr(route, "path", "unmatched"),
+            str(response.status_code)
+        )
+        
         # Log response details
         logger.info(
             "Request completed",
@@ -201,8 +304,12 @@ app.include_router(routes_status.status_router)  # Status endpoints
 app.include_router(routes_control.router)        # Control endpoints
 app.include_router(routes_position.router)       # Position endpoints  
 app.include_router(routes_volume.router)         # Volume endpoints
+app.include_router(routes_groups.router)         # Group (synchronized) endpoints
+app.include_router(routes_schedule.router)       # Scheduled command endpoints
+app.include_router(routes_macros.router)         # Macro endpoints
 app.include_router(routes_admin.router)          # Admin endpoints
 app.include_router(routes_events.router)         # Events/SSE endpoints
+app.include_router(routes_ws.router)             # WebSocket control channel
 
 logger.info(
     "FastAPI routes configured",
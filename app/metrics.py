@@ -0,0 +1,341 @@
+"""In-process metrics exposed in the Prometheus text exposition format.
+
+PerformanceTimer only writes latencies into log lines, which cannot be
+aggregated without shipping and parsing every line. The metrics here are
+recorded on the hot paths (HTTP requests, upstream TCP commands, OSC
+ingestion and the SSE broadcast) and rendered on demand at /metrics.
+
+Recording is lock-free and allocation-light: all updates happen on the
+event loop thread, the child series for a label combination is created
+once and cached by its label tuple, and a histogram observation is a
+bisect into fixed bucket bounds plus two additions. Label values must
+come from small, bounded sets (route templates, command verbs, hosts) so
+that the number of series stays bounded.
+"""
+
+import math
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Content type of the text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds, from sub-millisecond LAN replies to slow timeouts
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value the way Prometheus parses it."""
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if value != value:
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the exposition format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_string(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Render a label set as ``{a="1",b="2"}`` (empty string if no labels)."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Base class holding the name, help text and label names of a metric family."""
+    
+    kind = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        """Initialize a metric family.
+        
+        Args:
+            name: Metric name
+            documentation: HELP text
+            labelnames: Names of the labels distinguishing child series
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+    
+    def _header(self) -> List[str]:
+        """HELP and TYPE lines of the family."""
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+    
+    def render(self) -> List[str]:
+        """Render the family as exposition format lines."""
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label combination.
+    
+    Example:
+        retries = Counter("exaplay_command_retries_total", "Command retries", ["host"])
+        retries.inc("10.0.0.5:7000")
+    """
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+    
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Increase the counter.
+        
+        Args:
+            *labels: Label values in labelnames order
+            amount: Non-negative increment
+        """
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+    
+    def value(self, *labels: str) -> float:
+        """Current value for a label combination (0 if never incremented)."""
+        return self._values.get(labels, 0.0)
+    
+    def render(self) -> List[str]:
+        lines = self._header()
+        if not self.labelnames and not self._values:
+            lines.append(f"{self.name} 0")
+        for labels, value in list(self._values.items()):
+            lines.append(f"{self.name}{_label_string(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Value that can go up and down per label combination."""
+    
+    kind = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+    
+    def set(self, value: float, *labels: str) -> None:
+        """Set the gauge for a label combination."""
+        self._values[labels] = value
+    
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Increase the gauge."""
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+    
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        """Decrease the gauge."""
+        self._values[labels] = self._values.get(labels, 0.0) - amount
+    
+    def value(self, *labels: str) -> float:
+        """Current value for a label combination (0 if never set)."""
+        return self._values.get(labels, 0.0)
+    
+    def render(self) -> List[str]:
+        lines = self._header()
+        if not self.labelnames and not self._values:
+            lines.append(f"{self.name} 0")
+        for labels, value in list(self._values.items()):
+            lines.append(f"{self.name}{_label_string(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class _HistogramSeries:
+    """Bucket counts, sum and count of one histogram child series."""
+    
+    __slots__ = ("counts", "sum", "count")
+    
+    def __init__(self, size: int) -> None:
+        """Initialize zeroed buckets (the last one is +Inf)."""
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed buckets per label combination.
+    
+    Buckets are stored non-cumulatively so that an observation touches a
+    single slot; they are accumulated only when rendered.
+    
+    Example:
+        latency = Histogram("exaplay_command_duration_seconds", "Command latency", ["verb", "host"])
+        latency.observe(0.0042, "play", "10.0.0.5:7000")
+    """
+    
+    kind = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], _HistogramSeries] = {}
+    
+    def observe(self, value: float, *labels: str) -> None:
+        """Record one observation.
+        
+        Args:
+            value: Observed value (seconds for latency histograms)
+            *labels: Label values in labelnames order
+        """
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = _HistogramSeries(len(self.buckets) + 1)
+        series.counts[bisect_left(self.buckets, value)] += 1
+        series.sum += value
+        series.count += 1
+    
+    def count(self, *labels: str) -> int:
+        """Number of observations for a label combination."""
+        series = self._series.get(labels)
+        return series.count if series is not None else 0
+    
+    def render(self) -> List[str]:
+        lines = self._header()
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        for labels, series in list(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, series.counts, strict=True):
+                cumulative += bucket_count
+                label_string = _label_string(self.labelnames, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{label_string} {cumulative}")
+            label_string = _label_string(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_string} {_format_value(series.sum)}")
+            lines.append(f"{self.name}_count{label_string} {series.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Ordered collection of metric families rendered together."""
+    
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._metrics: Dict[str, _Metric] = {}
+    
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric family.
+        
+        Raises:
+            ValueError: If a family of that name is already registered
+        """
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create and register a counter."""
+        metric = Counter(name, documentation, labelnames)
+        self.register(metric)
+        return metric
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Create and register a gauge."""
+        metric = Gauge(name, documentation, labelnames)
+        self.register(metric)
+        return metric
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        """Create and register a histogram."""
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self.register(metric)
+        return metric
+    
+    def get(self, name: str) -> Optional[_Metric]:
+        """Get a registered family by name."""
+        return self._metrics.get(name)
+    
+    def render(self) -> str:
+        """Render every family in the text exposition format.
+        
+        Returns:
+            str: Exposition text ending with a newline
+        """
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global registry rendered at /metrics
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency until the response starts, by route template and status",
+    ["method", "route", "status"]
+)
+tcp_command_duration = registry.histogram(
+    "exaplay_command_duration_seconds",
+    "Latency of single ExaPlay TCP command attempts, by command verb and host",
+    ["verb", "host", "outcome"]
+)
+tcp_command_retries = registry.counter(
+    "exaplay_command_retries_total",
+    "ExaPlay TCP command attempts retried after a timeout or connection failure",
+    ["host"]
+)
+tcp_command_timeouts = registry.counter(
+    "exaplay_command_timeouts_total",
+    "ExaPlay TCP command attempts that timed out waiting for a reply",
+    ["host"]
+)
+sse_clients = registry.gauge(
+    "sse_clients",
+    "Connected Server-Sent Events clients"
+)
+websocket_clients = registry.gauge(
+    "websocket_clients",
+    "Connected WebSocket control channel clients"
+)
+osc_messages = registry.counter(
+    "osc_messages_total",
+    "OSC messages received from ExaPlay, by kind (use rate() for messages per second)",
+    ["kind"]
+)
+broadcast_dropped = registry.counter(
+    "sse_broadcast_dropped_total",
+    "Events an SSE client fell too far behind to receive (replaced by a state snapshot)"
+)
+rate_limit_rejections = registry.counter(
+    "rate_limit_rejections_total",
+    "Requests rejected with 429 by the API rate limiter",
+    ["limiter"]
+)
+
+
+def command_verb(command: str) -> str:
+    """Reduce an ExaPlay command to its verb for use as a metric label.
+    
+    Composition names and values are dropped so that the label has a
+    small, bounded set of values (e.g. "play", "get:status", "set:vol").
+    
+    Args:
+        command: Raw command string
+    
+    Returns:
+        str: Command verb, or "other" for anything unexpected
+    """
+    verb = command.split(",", 1)[0].strip().lower()
+    if not verb or len(verb) > 32 or not verb.replace(":", "").replace("_", "").isalnum():
+        return "other"
+    return verb
@@ -4,7 +4,7 @@ Loads configuration from environment variables using Pydantic BaseSettings.
 Supports .env file loading for development environments.
 """
 
-from typing import List
+from typing import ClassVar, Dict, List, Tuple
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -27,10 +27,28 @@ class Settings(BaseSettings):
         description="ExaPlay TCP control port"
     )
     
+    # Multi-host fleet (optional; the single host above is used when unset)
+    exaplay_fleet: str = Field(
+        default="",
+        description="Inline JSON host registry mapping compositions to ExaPlay hosts"
+    )
+    exaplay_fleet_file: str = Field(
+        default="",
+        description="Path to a JSON host registry file (takes precedence over EXAPLAY_FLEET)"
+    )
+    
     # TCP Client Settings  
     tcp_timeout: float = Field(
         default=5.0,
-        description="TCP operation timeout in seconds"
+        description="TCP operation timeout in seconds (upper bound of adaptive reply timeouts)"
+    )
+    tcp_adaptive_timeout: bool = Field(
+        default=True,
+        description="Derive reply timeouts from each host's observed round-trip time (SRTT + 4 * RTTVAR)"
+    )
+    tcp_timeout_min: float = Field(
+        default=0.25,
+        description="Lower bound of adaptive reply timeouts in seconds"
     )
     tcp_max_retries: int = Field(
         default=3,
@@ -41,6 +59,168 @@ class Settings(BaseSettings):
         description="Initial retry backoff delay in seconds (exponential)"
     )
     
+    # TCP Connection Pool Settings
+    tcp_pool_min_size: int = Field(
+        default=1,
+        description="Idle TCP connections kept open per ExaPlay host"
+    )
+    tcp_pool_max_size: int = Field(
+        default=8,
+        description="Maximum concurrent TCP connections per ExaPlay host"
+    )
+    tcp_pool_idle_timeout: float = Field(
+        default=60.0,
+        description="Seconds an idle pooled connection is kept before eviction"
+    )
+    tcp_multiplex_enable: bool = Field(
+        default=False,
+        description="Pipeline concurrent commands over one shared connection per host instead of the pool"
+    )
+    
+    # Connection Keepalive and Readiness Settings
+    tcp_keepalive_interval: float = Field(
+        default=15.0,
+        description="Seconds an idle pooled connection may go unused before a get:ver keepalive probe (0 disables)"
+    )
+    tcp_so_keepalive: bool = Field(
+        default=True,
+        description="Enable OS-level TCP keepalive on upstream sockets"
+    )
+    tcp_so_keepalive_idle: int = Field(
+        default=30,
+        description="Seconds of socket idleness before the kernel sends keepalive packets (TCP_KEEPIDLE)"
+    )
+    tcp_so_keepalive_interval: int = Field(
+        default=10,
+        description="Seconds between unanswered kernel keepalive packets (TCP_KEEPINTVL)"
+    )
+    tcp_so_keepalive_count: int = Field(
+        default=3,
+        description="Unanswered kernel keepalive packets before the connection is dropped (TCP_KEEPCNT)"
+    )
+    readiness_probe_max_age: float = Field(
+        default=60.0,
+        description="Seconds a successful keepalive probe or connect counts as reachability for /readyz"
+    )
+    
+    # Upstream Admission Control Settings (priority lanes: critical, normal, bulk)
+    upstream_max_inflight: int = Field(
+        default=0,
+        description="Commands in flight per ExaPlay host before work queues by priority (0 uses the host's pool size)"
+    )
+    upstream_queue_budget_normal: float = Field(
+        default=1.0,
+        description="Seconds normal-priority commands may queue before they are shed with 429 (0 never sheds)"
+    )
+    upstream_queue_budget_bulk: float = Field(
+        default=0.25,
+        description="Seconds bulk-priority commands (bulk status, poller) may queue before they are shed with 429 (0 never sheds)"
+    )
+    
+    # Circuit Breaker Settings (per ExaPlay host)
+    circuit_breaker_failure_threshold: int = Field(
+        default=5,
+        description="Consecutive TCP failures before a host's breaker opens (0 disables)"
+    )
+    circuit_breaker_reset_timeout: float = Field(
+        default=5.0,
+        description="Seconds an open breaker waits before probing the host with get:ver"
+    )
+    circuit_breaker_max_reset_timeout: float = Field(
+        default=60.0,
+        description="Upper bound for the probe interval after repeated failed probes"
+    )
+    
+    # Read Cache Settings (TTL per command type; 0 disables caching, concurrent reads are still coalesced)
+    read_cache_status_ttl: float = Field(
+        default=0.2,
+        description="Seconds a get:status reply is served from cache"
+    )
+    read_cache_volume_ttl: float = Field(
+        default=1.0,
+        description="Seconds a get:vol reply is served from cache"
+    )
+    read_cache_version_ttl: float = Field(
+        default=60.0,
+        description="Seconds a get:ver reply is served from cache"
+    )
+    
+    # Status Poller Settings (background polling into an in-memory state table)
+    status_poller_enable: bool = Field(
+        default=False,
+        description="Poll known compositions in the background and serve status/volume reads from memory"
+    )
+    status_poll_active_interval: float = Field(
+        default=0.25,
+        description="Seconds between status polls of a playing composition"
+    )
+    status_poll_idle_interval: float = Field(
+        default=5.0,
+        description="Seconds between status polls of a stopped or paused composition (and between volume polls)"
+    )
+    status_poll_max_age: float = Field(
+        default=10.0,
+        description="Oldest in-memory state served before falling back to an upstream read"
+    )
+    status_poll_max_compositions: int = Field(
+        default=512,
+        description="Maximum number of compositions tracked by the poller"
+    )
+    
+    # Write Coalescing Settings
+    write_coalescing_enable: bool = Field(
+        default=True,
+        description="Coalesce concurrent volume/cuetime writes per composition, sending only the latest value"
+    )
+    
+    # Volume Fade Settings (server-side fades sent as set:vol steps)
+    volume_fade_tick_rate: float = Field(
+        default=30.0,
+        description="Volume steps per second sent while a fade is running"
+    )
+    
+    # Command Scheduler Settings (POST /schedule)
+    schedule_prepare_lead: float = Field(
+        default=0.5,
+        description="Seconds before a scheduled fire time at which its connections are checked out"
+    )
+    schedule_max_pending: int = Field(
+        default=1000,
+        description="Maximum number of pending scheduled entries"
+    )
+    schedule_max_horizon: float = Field(
+        default=604800.0,
+        description="Furthest a fire time may lie in the future, in seconds"
+    )
+    schedule_history_size: int = Field(
+        default=100,
+        description="Fired or cancelled entries kept for GET /schedule"
+    )
+    
+    # Macro Settings (named command sequences run server-side)
+    macros_file: str = Field(
+        default="",
+        description="Path to a JSON file of macro definitions keyed by name, loaded at startup"
+    )
+    macro_wait_poll_interval: float = Field(
+        default=0.05,
+        description="Seconds between status reads while a macro waits for a condition"
+    )
+    
+    # Request Deadline Settings (end-to-end budget for upstream calls)
+    request_timeout: float = Field(
+        default=10.0,
+        description="Default end-to-end budget in seconds for a request's upstream calls (0 disables)"
+    )
+    request_timeout_max: float = Field(
+        default=60.0,
+        description="Upper bound for budgets requested via the X-Request-Timeout header"
+    )
+    control_request_timeout: float = Field(
+        default=0.0,
+        description="Tighter budget in seconds for playback control and positioning routes (0 uses REQUEST_TIMEOUT)"
+    )
+    
     # OSC Settings (Optional live status streaming)
     exaplay_osc_enable: bool = Field(
         default=False,
@@ -54,6 +234,14 @@ class Settings(BaseSettings):
         default="0.0.0.0:8000",
         description="OSC listener bind address and port"
     )
+    exaplay_osc_rcvbuf: int = Field(
+        default=4 * 1024 * 1024,
+        description="Requested UDP receive buffer (SO_RCVBUF) of the OSC socket in bytes"
+    )
+    sse_buffer_size: int = Field(
+        default=4096,
+        description="Events kept in the shared SSE ring buffer for Last-Event-ID resume and slow clients"
+    )
     
     # Security Settings
     api_key: str = Field(
@@ -89,6 +277,26 @@ class Settings(BaseSettings):
         default="json",
         description="Log format (json or console)"
     )
+    log_async: bool = Field(
+        default=False,
+        description="Only enqueue log records on the caller's thread; format and write them on a background thread"
+    )
+    log_queue_size: int = Field(
+        default=10000,
+        description="Maximum log records waiting for the background writer"
+    )
+    log_queue_overflow: str = Field(
+        default="drop_oldest",
+        description="What to drop when the log queue is full (drop_oldest or drop_newest)"
+    )
+    log_sample_rates: Dict[str, float] = Field(
+        default={},
+        description="Share of DEBUG/INFO records kept per event message, e.g. {\"Command completed successfully\": 0.1}"
+    )
+    log_rate_limits: Dict[str, float] = Field(
+        default={},
+        description="Maximum DEBUG/INFO records per second per event message, e.g. {\"OSC message received\": 5}"
+    )
     
     # API Settings
     api_title: str = Field(
@@ -114,8 +322,24 @@ class Settings(BaseSettings):
     # Performance Settings
     rate_limit_commands_per_minute: int = Field(
         default=60,
-        description="Rate limit for /exaplay/command endpoint (requests per minute)"
+        description="Rate limit for /exaplay/command and /exaplay/batch (requests per minute, 0 = unlimited)"
+    )
+    rate_limits: Dict[str, int] = Field(
+        default={},
+        description="Requests per minute per route group (control, groups, status, events, schedule, macros, admin); "
+                    "missing or 0 = unlimited, admin defaults to RATE_LIMIT_COMMANDS_PER_MINUTE"
     )
+    rate_limit_key: str = Field(
+        default="ip",
+        description="What a client is rate limited as: ip (client address) or api_key (bearer token, IP without one)"
+    )
+    rate_limit_max_keys: int = Field(
+        default=10000,
+        description="Most clients tracked per rate limiter; least recently seen clients are evicted beyond that"
+    )
+    
+    # Route groups accepted in RATE_LIMITS
+    RATE_LIMIT_GROUPS: ClassVar[Tuple[str, ...]] = ("control", "groups", "status", "events", "schedule", "macros", "admin")
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -151,9 +375,94 @@ class Settings(BaseSettings):
         if self.tcp_timeout <= 0:
             raise ValueError("TCP_TIMEOUT must be positive")
         
+        if not (0 < self.tcp_timeout_min <= self.tcp_timeout):
+            raise ValueError("TCP_TIMEOUT_MIN must be positive and at most TCP_TIMEOUT")
+        
         if self.tcp_max_retries < 0:
             raise ValueError("TCP_MAX_RETRIES must be non-negative")
         
+        if self.tcp_pool_max_size < 1:
+            raise ValueError("TCP_POOL_MAX_SIZE must be at least 1")
+        
+        if not (0 <= self.tcp_pool_min_size <= self.tcp_pool_max_size):
+            raise ValueError("TCP_POOL_MIN_SIZE must be between 0 and TCP_POOL_MAX_SIZE")
+        
+        if self.tcp_keepalive_interval < 0:
+            raise ValueError("TCP_KEEPALIVE_INTERVAL must be non-negative")
+        
+        if min(self.tcp_so_keepalive_idle, self.tcp_so_keepalive_interval, self.tcp_so_keepalive_count) < 1:
+            raise ValueError("TCP_SO_KEEPALIVE_IDLE, TCP_SO_KEEPALIVE_INTERVAL and TCP_SO_KEEPALIVE_COUNT must be at least 1")
+        
+        if self.readiness_probe_max_age <= 0:
+            raise ValueError("READINESS_PROBE_MAX_AGE must be positive")
+        
+        if self.log_queue_size < 1:
+            raise ValueError("LOG_QUEUE_SIZE must be at least 1")
+        
+        if self.log_queue_overflow not in ("drop_oldest", "drop_newest"):
+            raise ValueError("LOG_QUEUE_OVERFLOW must be drop_oldest or drop_newest")
+        
+        if any(not 0 <= rate <= 1 for rate in self.log_sample_rates.values()):
+            raise ValueError("LOG_SAMPLE_RATES values must be between 0 and 1")
+        
+        if any(rate < 0 for rate in self.log_rate_limits.values()):
+            raise ValueError("LOG_RATE_LIMITS values must be non-negative")
+        
+        unknown_groups = set(self.rate_limits) - set(self.RATE_LIMIT_GROUPS)
+        if unknown_groups:
+            raise ValueError(f"RATE_LIMITS has unknown route groups: {', '.join(sorted(unknown_groups))}")
+        
+        if any(limit < 0 for limit in self.rate_limits.values()) or self.rate_limit_commands_per_minute < 0:
+            raise ValueError("RATE_LIMITS and RATE_LIMIT_COMMANDS_PER_MINUTE must be non-negative")
+        
+        if self.rate_limit_key not in ("ip", "api_key"):
+            raise ValueError("RATE_LIMIT_KEY must be ip or api_key")
+        
+        if self.rate_limit_max_keys < 1:
+            raise ValueError("RATE_LIMIT_MAX_KEYS must be at least 1")
+        
+        if self.upstream_max_inflight < 0:
+            raise ValueError("UPSTREAM_MAX_INFLIGHT must be non-negative")
+        
+        if self.upstream_queue_budget_normal < 0 or self.upstream_queue_budget_bulk < 0:
+            raise ValueError("UPSTREAM_QUEUE_BUDGET_NORMAL and UPSTREAM_QUEUE_BUDGET_BULK must be non-negative")
+        
+        if self.circuit_breaker_failure_threshold < 0:
+            raise ValueError("CIRCUIT_BREAKER_FAILURE_THRESHOLD must be non-negative")
+        
+        if self.circuit_breaker_reset_timeout <= 0:
+            raise ValueError("CIRCUIT_BREAKER_RESET_TIMEOUT must be positive")
+        
+        if min(self.read_cache_status_ttl, self.read_cache_volume_ttl, self.read_cache_version_ttl) < 0:
+            raise ValueError("READ_CACHE_*_TTL must be non-negative")
+        
+        if self.status_poll_active_interval <= 0 or self.status_poll_idle_interval <= 0:
+            raise ValueError("STATUS_POLL_ACTIVE_INTERVAL and STATUS_POLL_IDLE_INTERVAL must be positive")
+        
+        if not (0 < self.volume_fade_tick_rate <= 200):
+            raise ValueError("VOLUME_FADE_TICK_RATE must be between 0 and 200")
+        
+        if self.schedule_prepare_lead < 0:
+            raise ValueError("SCHEDULE_PREPARE_LEAD must be non-negative")
+        
+        if self.schedule_max_pending < 1 or self.schedule_max_horizon <= 0:
+            raise ValueError("SCHEDULE_MAX_PENDING and SCHEDULE_MAX_HORIZON must be positive")
+        
+        if self.macro_wait_poll_interval <= 0:
+            raise ValueError("MACRO_WAIT_POLL_INTERVAL must be positive")
+        
+        if self.request_timeout < 0 or self.control_request_timeout < 0:
+            raise ValueError("REQUEST_TIMEOUT and CONTROL_REQUEST_TIMEOUT must be non-negative")
+        
+        if self.request_timeout_max <= 0:
+            raise ValueError("REQUEST_TIMEOUT_MAX must be positive")
+        
+        if self.exaplay_osc_rcvbuf < 0:
+            raise ValueError("EXAPLAY_OSC_RCVBUF must be non-negative")
+        
+        if self.sse_buffer_size < 1:
+            raise ValueError("SSE_BUFFER_SIZE must be positive")
+        
         if self.exaplay_osc_enable:
             try:
                 # Validate OSC listen address format
@@ -23,10 +23,17 @@ os.environ.update({
 })
 
 from app.main import app
+from app.exaplay.read_cache import read_cache
 from app.tests.fixtures.mock_exaplay import MockExaPlayServer
 from app.settings import settings
 
 
+@pytest.fixture(autouse=True)
+def clear_read_cache() -> None:
+    """Start every test without reads cached by earlier tests."""
+    read_cache.clear()
+
+
 @pytest.fixture(scope="session")
 def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
     """Create an instance of the default event loop for the test session."""
@@ -6,7 +6,7 @@ for testing purposes. Supports scripted responses and state simulation.
 
 import asyncio
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 # Simplified composition state for mock server
 class MockComposition:
@@ -109,6 +109,11 @@ class MockExaPlayServer:
         self.server: Optional[asyncio.Server] = None
         self.compositions: Dict[str, MockComposition] = {}
         self.version = "2.21.0.0"
+        self.connections_accepted = 0
+        self.commands_received = 0
+        self.reply_delay = 0.0  # Seconds to wait before each reply
+        self.silent_commands: Set[str] = set()  # Commands left unanswered
+        self._client_writers: Set[asyncio.StreamWriter] = set()
         
         # Create some default compositions for testing
         self._create_default_compositions()
@@ -135,6 +140,8 @@ class MockExaPlayServer:
         """
         client_addr = writer.get_extra_info('peername')
         self.logger.debug(f"Client connected: {client_addr}")
+        self.connections_accepted += 1
+        self._client_writers.add(writer)
         
         try:
             while True:
@@ -145,6 +152,12 @@ class MockExaPlayServer:
                 
                 command = data.decode("utf-8").rstrip("\r")
                 self.logger.debug(f"Received command: {command}")
+                self.commands_received += 1
+                
+                if command in self.silent_commands:
+                    continue
+                if self.reply_delay:
+                    await asyncio.sleep(self.reply_delay)
                 
                 # Process command and get response
                 response = self._process_command(command)
@@ -161,12 +174,18 @@ class MockExaPlayServer:
         except Exception as e:
             self.logger.error(f"Error handling client: {e}")
         finally:
+            self._client_writers.discard(writer)
             writer.close()
             try:
                 await writer.wait_closed()
             except Exception:
                 pass
     
+    def drop_connections(self) -> None:
+        """Close all open client connections, simulating a server restart."""
+        for writer in list(self._client_writers):
+            writer.close()
+    
     def _process_command(self, command: str) -> str:
         """Process a command and return the response.
         
@@ -281,6 +300,9 @@ class MockExaPlayServer:
         self.logger.info("Stopping mock ExaPlay server")
         
         self.server.close()
+        # Persistent clients keep connections open; close them so
+        # wait_closed() does not block on pooled sockets.
+        self.drop_connections()
         await self.server.wait_closed()
         self.server = None
         
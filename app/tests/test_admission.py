@@ -0,0 +1,105 @@
+"""Tests for upstream priority lanes and admission control.
+
+Covers strict-priority admission, shedding on the wait budget (expected
+and actual), and the 429 surfaced for shed bulk status requests.
+"""
+
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from app.exaplay.admission import AdmissionController, AdmissionRejected, Priority
+from app.exaplay.fleet import get_host_registry
+from app.tests.fixtures.mock_exaplay import MockExaPlayServer
+
+BUDGETS = {Priority.CRITICAL: None, Priority.NORMAL: 1.0, Priority.BULK: 0.05}
+
+
+class TestAdmissionController:
+    """Test cases for AdmissionController."""
+    
+    async def test_higher_priority_is_admitted_first(self) -> None:
+        """Test that a freed slot goes to critical work queued after bulk work."""
+        controller = AdmissionController("test", max_inflight=1, wait_budgets=BUDGETS)
+        held = await controller.acquire(Priority.NORMAL)
+        order = []
+        
+        async def run(priority: Priority) -> None:
+            admitted = await controller.acquire(priority)
+            order.append(priority)
+            controller.release(admitted)
+        
+        bulk = asyncio.ensure_future(run(Priority.BULK))
+        await asyncio.sleep(0)
+        critical = asyncio.ensure_future(run(Priority.CRITICAL))
+        await asyncio.sleep(0)
+        assert controller.stats()["priorities"]["bulk"]["queued"] == 1
+        
+        controller.release(held)
+        await asyncio.gather(bulk, critical)
+        
+        assert order == [Priority.CRITICAL, Priority.BULK]
+        assert controller.inflight == 0
+    
+    async def test_bulk_shed_after_wait_budget(self) -> None:
+        """Test that queued bulk work is rejected once it has waited its budget."""
+        controller = AdmissionController("test", max_inflight=1, wait_budgets=BUDGETS)
+        await controller.acquire(Priority.CRITICAL)
+        
+        with pytest.raises(AdmissionRejected) as excinfo:
+            await controller.acquire(Priority.BULK)
+        
+        assert excinfo.value.retry_after >= 1
+        stats = controller.stats()["priorities"]["bulk"]
+        assert stats["shed"] == 1
+        assert stats["queued"] == 0
+    
+    async def test_bulk_shed_up_front_when_queue_is_slow(self) -> None:
+        """Test that work is rejected without queueing if the expected wait exceeds the budget."""
+        controller = AdmissionController("test", max_inflight=1, wait_budgets=BUDGETS)
+        await controller.acquire(Priority.CRITICAL)
+        controller._service_time = 2.0
+        
+        with pytest.raises(AdmissionRejected) as excinfo:
+            await asyncio.wait_for(controller.acquire(Priority.BULK), timeout=0.01)
+        
+        assert excinfo.value.retry_after == 2
+
+
+class TestAdmissionRoutes:
+    """Test cases for admission control through the API."""
+    
+    async def test_bulk_status_gets_429_while_host_is_saturated(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        mock_exaplay_server: MockExaPlayServer,
+        monkeypatch
+    ) -> None:
+        """Test that a shed bulk read maps to 429 with Retry-After."""
+        controller = get_host_registry().default.client.admission
+        monkeypatch.setitem(controller.wait_budgets, Priority.BULK, 0.05)
+        held = [await controller.acquire(Priority.CRITICAL) for _ in range(controller.max_inflight)]
+        try:
+            response = await async_client.get(
+                "/compositions/status?names=comp1&fresh=true",
+                headers=auth_headers
+            )
+        finally:
+            for admitted in held:
+                controller.release(admitted)
+        
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+        
+        recovered = await async_client.get("/compositions/status?names=comp1&fresh=true", headers=auth_headers)
+        assert recovered.status_code == 200
+    
+    async def test_invalid_priority_header_is_400(self, async_client: AsyncClient, auth_headers: dict) -> None:
+        """Test that an unknown X-Request-Priority is rejected."""
+        response = await async_client.get(
+            "/compositions/comp1/status",
+            headers={**auth_headers, "X-Request-Priority": "urgent"}
+        )
+        assert response.status_code == 400
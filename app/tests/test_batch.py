@@ -0,0 +1,129 @@
+"""Tests for the batch command endpoint.
+
+Tests POST /exaplay/batch, which sends an ordered list of raw and typed
+commands to ExaPlay in a single upstream burst.
+"""
+
+import pytest
+from httpx import AsyncClient
+
+
+class TestBatchEndpoint:
+    """Test cases for the batch command endpoint."""
+    
+    async def test_batch_mixed_commands_success(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict
+    ) -> None:
+        """Test a batch of raw and typed commands returns per-item replies."""
+        response = await async_client.post(
+            "/exaplay/batch",
+            json={
+                "commands": [
+                    "get:ver",
+                    {"op": "vol", "name": "batch_comp", "value": 40},
+                    {"op": "seek", "name": "batch_comp", "value": 12.5},
+                    {"op": "play", "name": "batch_comp"},
+                    "get:vol,batch_comp"
+                ]
+            },
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert data["succeeded"] == 5
+        assert data["failed"] == 0
+        assert data["skipped"] == 0
+        assert [item["sent"] for item in data["results"]] == [
+            "get:ver",
+            "set:vol,batch_comp,40",
+            "set:cuetime,batch_comp,12.5",
+            "play,batch_comp",
+            "get:vol,batch_comp"
+        ]
+        assert data["results"][0]["reply"] == "2.21.0.0"
+        assert data["results"][4]["reply"] == "40"
+        assert all(item["status"] == "ok" for item in data["results"])
+        assert all(item["latencyMs"] >= 0 for item in data["results"])
+    
+    async def test_batch_continues_after_err(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict
+    ) -> None:
+        """Test that the default mode executes every command despite ERR replies."""
+        response = await async_client.post(
+            "/exaplay/batch",
+            json={"commands": ["bogus:command", "get:ver"]},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert data["failed"] == 1
+        assert data["results"][0]["status"] == "error"
+        assert data["results"][0]["reply"] == "ERR"
+        assert data["results"][1]["status"] == "ok"
+        assert data["results"][1]["reply"] == "2.21.0.0"
+    
+    async def test_batch_stop_on_error_skips_remaining(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict
+    ) -> None:
+        """Test that stopOnError stops at the first ERR and skips the rest."""
+        response = await async_client.post(
+            "/exaplay/batch",
+            json={
+                "commands": ["get:ver", "bogus:command", "play,batch_skip"],
+                "stopOnError": True
+            },
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert [item["status"] for item in data["results"]] == ["ok", "error", "skipped"]
+        assert data["skipped"] == 1
+        assert data["results"][2]["reply"] is None
+    
+    @pytest.mark.parametrize("commands", [
+        [],
+        [""],
+        ["get:ver\rplay,comp1"],
+        [{"op": "vol", "name": "comp1", "value": 150}],
+        [{"op": "seek", "name": "comp1"}],
+    ])
+    async def test_batch_validation_errors(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        commands: list
+    ) -> None:
+        """Test that invalid batches are rejected before reaching ExaPlay."""
+        response = await async_client.post(
+            "/exaplay/batch",
+            json={"commands": commands},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 400
+    
+    async def test_batch_requires_auth(
+        self,
+        async_client: AsyncClient,
+        no_auth_headers: dict
+    ) -> None:
+        """Test that the batch endpoint requires authentication."""
+        response = await async_client.post(
+            "/exaplay/batch",
+            json={"commands": ["get:ver"]},
+            headers=no_auth_headers
+        )
+        
+        assert response.status_code == 401
@@ -0,0 +1,184 @@
+"""Tests for the per-host circuit breaker.
+
+Covers opening after consecutive failures, fast-fail while open,
+half-open probing with backoff, and the HTTP 503/health integration.
+"""
+
+import asyncio
+import time
+
+import pytest
+from httpx import AsyncClient
+
+from app.exaplay import fleet
+from app.exaplay.breaker import BreakerState, CircuitBreaker, circuit_breakers
+from app.exaplay.fleet import FleetConfig, HostConfig, HostRegistry
+from app.exaplay.tcp_client import ExaPlayCircuitOpenError, ExaPlayConnectionError, ExaPlayTCPClient
+from app.tests.fixtures.mock_exaplay import MockExaPlayServer
+
+BREAKER_TEST_PORT = 17107
+
+
+@pytest.fixture
+def isolated_breakers(monkeypatch) -> None:
+    """Keep breakers created by a test out of the process-wide registry."""
+    monkeypatch.setattr(circuit_breakers, "_breakers", {})
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker state transitions."""
+    
+    async def test_opens_after_threshold_and_closes_after_probe(self) -> None:
+        """Test that consecutive failures open the breaker and a good probe closes it."""
+        probes = []
+        
+        async def probe() -> None:
+            probes.append(time.monotonic())
+        
+        breaker = CircuitBreaker("test", probe, failure_threshold=2, reset_timeout=0.05)
+        
+        breaker.record_failure(ConnectionError("down"))
+        assert breaker.allow_request()
+        breaker.record_failure(ConnectionError("down"))
+        
+        assert breaker.state == BreakerState.OPEN
+        assert not breaker.allow_request()
+        assert breaker.retry_after() == 1
+        
+        await asyncio.sleep(0.1)
+        
+        assert breaker.state == BreakerState.CLOSED
+        assert len(probes) == 1
+        assert breaker.stats()["rejected"] == 1
+        await breaker.close()
+    
+    async def test_success_resets_consecutive_failures(self) -> None:
+        """Test that failures must be consecutive to trip the breaker."""
+        async def probe() -> None:
+            pass
+        
+        breaker = CircuitBreaker("test", probe, failure_threshold=2, reset_timeout=0.05)
+        
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        
+        assert breaker.state == BreakerState.CLOSED
+    
+    async def test_failed_probe_backs_off(self) -> None:
+        """Test that a failing probe keeps the breaker open with a longer interval."""
+        async def probe() -> None:
+            raise ConnectionError("still down")
+        
+        breaker = CircuitBreaker(
+            "test",
+            probe,
+            failure_threshold=1,
+            reset_timeout=0.02,
+            max_reset_timeout=0.05
+        )
+        breaker.record_failure()
+        
+        await asyncio.sleep(0.1)
+        
+        stats = breaker.stats()
+        assert breaker.state in (BreakerState.OPEN, BreakerState.HALF_OPEN)
+        assert stats["probes"] >= 2
+        assert stats["last_error"] == "still down"
+        assert breaker._current_reset_timeout == 0.05
+        await breaker.close()
+    
+    async def test_zero_threshold_disables_breaker(self) -> None:
+        """Test that a threshold of zero never opens the breaker."""
+        async def probe() -> None:
+            pass
+        
+        breaker = CircuitBreaker("test", probe, failure_threshold=0)
+        for _ in range(10):
+            breaker.record_failure()
+        
+        assert breaker.allow_request()
+
+
+class TestClientBreakerIntegration:
+    """Test cases for circuit breaking in ExaPlayTCPClient."""
+    
+    async def test_retries_stop_once_breaker_opens(self, isolated_breakers: None) -> None:
+        """Test that a dead host fails fast and recovers after a probe."""
+        client = ExaPlayTCPClient(
+            host="127.0.0.1",
+            port=BREAKER_TEST_PORT,
+            timeout=0.2,
+            max_retries=5,
+            retry_backoff=0.01,
+            pool_min_size=0
+        )
+        client.breaker = CircuitBreaker(client.breaker.name, client._probe, failure_threshold=2, reset_timeout=0.1)
+        
+        with pytest.raises(ExaPlayCircuitOpenError):
+            await client.send_command("get:ver")
+        
+        start = time.perf_counter()
+        with pytest.raises(ExaPlayCircuitOpenError) as exc_info:
+            await client.send_command("play,comp1")
+        assert time.perf_counter() - start < 0.01
+        assert exc_info.value.retry_after >= 1
+        
+        async with MockExaPlayServer(port=BREAKER_TEST_PORT):
+            await asyncio.sleep(0.2)
+            
+            assert client.breaker.state == BreakerState.CLOSED
+            assert await client.send_command("get:ver") == "2.21.0.0"
+            await client.pool.close()
+        await client.breaker.close()
+    
+    async def test_protocol_errors_do_not_trip_breaker(self, isolated_breakers: None) -> None:
+        """Test that ERR replies count as a live host."""
+        async with MockExaPlayServer(port=BREAKER_TEST_PORT):
+            client = ExaPlayTCPClient(host="127.0.0.1", port=BREAKER_TEST_PORT, pool_min_size=0)
+            client.breaker = CircuitBreaker(client.breaker.name, client._probe, failure_threshold=1)
+            
+            for _ in range(3):
+                with pytest.raises(Exception) as exc_info:
+                    await client.send_command("bogus,comp1")
+                assert not isinstance(exc_info.value, ExaPlayConnectionError)
+            
+            assert client.breaker.state == BreakerState.CLOSED
+            await client.pool.close()
+
+
+class TestBreakerEndpoints:
+    """Test cases for 503 responses and health output."""
+    
+    async def test_open_breaker_returns_503_and_degrades_health(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        isolated_breakers: None,
+        monkeypatch
+    ) -> None:
+        """Test that an open breaker maps to 503 with Retry-After and shows in /healthz."""
+        registry = HostRegistry(FleetConfig(hosts={
+            "dead": HostConfig(host="127.0.0.1", port=BREAKER_TEST_PORT, timeout=0.1, max_retries=0)
+        }))
+        monkeypatch.setattr(fleet, "_registry", registry)
+        breaker = registry.default.client.breaker
+        breaker.failure_threshold = 1
+        breaker.reset_timeout = breaker._current_reset_timeout = 30.0
+        
+        first = await async_client.post("/compositions/comp1/play", headers=auth_headers)
+        second = await async_client.post("/compositions/comp1/play", headers=auth_headers)
+        
+        assert first.status_code == 502
+        assert second.status_code == 503
+        assert int(second.headers["Retry-After"]) > 1
+        
+        health = await async_client.get("/healthz")
+        
+        assert health.status_code == 200
+        assert health.json()["status"] == "degraded"
+        assert health.json()["upstreams"][f"127.0.0.1:{BREAKER_TEST_PORT}"]["state"] == "open"
+        
+        stats = await async_client.get("/exaplay/stats", headers=auth_headers)
+        assert stats.json()["hosts"]["dead"]["rejected"] == 1
+        await breaker.close()
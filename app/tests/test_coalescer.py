@@ -0,0 +1,134 @@
+"""Tests for last-writer-wins write coalescing.
+
+Covers superseding pending writes, error delivery, and the coalesced
+acknowledgement returned by the volume and cuetime routes.
+"""
+
+import asyncio
+from typing import List
+
+import pytest
+from httpx import AsyncClient
+
+from app.exaplay.coalescer import WriteCoalescer
+from app.settings import settings
+from app.tests.fixtures.mock_exaplay import MockExaPlayServer
+
+
+class TestWriteCoalescer:
+    """Test cases for WriteCoalescer in isolation."""
+    
+    async def test_only_latest_pending_value_is_sent(self) -> None:
+        """Test that a burst sends the first and the last value only."""
+        coalescer = WriteCoalescer()
+        sent: List[str] = []
+        
+        def sender(command: str):
+            async def send() -> str:
+                sent.append(command)
+                await asyncio.sleep(0.02)
+                return "OK"
+            return send
+        
+        commands = [f"set:vol,comp1,{value}" for value in (10, 20, 30, 40)]
+        results = await asyncio.gather(*(
+            coalescer.submit(("comp1", "vol"), command, sender(command)) for command in commands
+        ))
+        
+        assert sent == ["set:vol,comp1,10", "set:vol,comp1,40"]
+        assert [result.coalesced for result in results] == [False, True, True, False]
+        assert results[-1].reply == "OK"
+        assert coalescer.stats()["parameters"]["vol"] == {"submitted": 4, "sent": 2, "coalesced": 2}
+    
+    async def test_keys_are_independent(self) -> None:
+        """Test that different parameters of a composition do not coalesce."""
+        coalescer = WriteCoalescer()
+        sent: List[str] = []
+        
+        def sender(command: str):
+            async def send() -> str:
+                sent.append(command)
+                await asyncio.sleep(0.01)
+                return "OK"
+            return send
+        
+        await asyncio.gather(
+            coalescer.submit(("comp1", "vol"), "set:vol,comp1,10", sender("set:vol,comp1,10")),
+            coalescer.submit(("comp1", "cuetime"), "set:cuetime,comp1,5", sender("set:cuetime,comp1,5")),
+            coalescer.submit(("comp2", "vol"), "set:vol,comp2,10", sender("set:vol,comp2,10")),
+        )
+        
+        assert len(sent) == 3
+    
+    async def test_send_error_reaches_its_caller_only(self) -> None:
+        """Test that a failed write fails its own caller and the follow-up still runs."""
+        coalescer = WriteCoalescer()
+        
+        async def failing() -> str:
+            await asyncio.sleep(0.01)
+            raise ConnectionError("down")
+        
+        async def working() -> str:
+            return "OK"
+        
+        outcomes = await asyncio.gather(
+            coalescer.submit(("comp1", "vol"), "set:vol,comp1,10", failing),
+            coalescer.submit(("comp1", "vol"), "set:vol,comp1,20", working),
+            return_exceptions=True
+        )
+        
+        assert isinstance(outcomes[0], ConnectionError)
+        assert outcomes[1].reply == "OK"
+
+
+class TestCoalescedRoutes:
+    """Test cases for coalescing in the volume and cuetime routes."""
+    
+    async def test_volume_burst_applies_last_value(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        mock_exaplay_server: MockExaPlayServer
+    ) -> None:
+        """Test that a fader burst ends on the last value with fewer upstream writes."""
+        mock_exaplay_server.reply_delay = 0.02
+        before = mock_exaplay_server.commands_received
+        try:
+            responses = await asyncio.gather(*(
+                async_client.post(
+                    "/compositions/comp1/volume",
+                    json={"value": value},
+                    headers=auth_headers
+                )
+                for value in range(50, 60)
+            ))
+        finally:
+            mock_exaplay_server.reply_delay = 0.0
+        
+        assert all(response.status_code == 200 for response in responses)
+        bodies = [response.json() for response in responses]
+        assert any(body["coalesced"] for body in bodies)
+        assert not bodies[-1]["coalesced"]
+        assert bodies[-1]["reply"] == "OK"
+        assert mock_exaplay_server.compositions["comp1"].volume == 59
+        assert mock_exaplay_server.commands_received - before < len(responses)
+    
+    @pytest.mark.parametrize("enabled", [True, False])
+    async def test_single_seek_is_not_coalesced(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        monkeypatch,
+        enabled: bool
+    ) -> None:
+        """Test that an isolated write is sent and acknowledged normally."""
+        monkeypatch.setattr(settings, "write_coalescing_enable", enabled)
+        
+        response = await async_client.post(
+            "/compositions/timeline1/cuetime",
+            json={"seconds": 12.5},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert response.json() == {"sent": "set:cuetime,timeline1,12.5", "reply": "OK", "coalesced": False}
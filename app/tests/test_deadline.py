@@ -0,0 +1,131 @@
+"""Tests for the request-scoped deadline budget.
+
+Covers budget scoping, shortening TCP timeouts to the remaining budget,
+skipping retries that cannot fit, and the X-Request-Timeout header.
+"""
+
+import asyncio
+import time
+
+import pytest
+from httpx import AsyncClient
+
+from app.exaplay.breaker import BreakerState, circuit_breakers
+from app.exaplay.deadline import RequestDeadline, get_deadline, remaining_budget, tighten_deadline
+from app.exaplay.tcp_client import ExaPlayConnectionError, ExaPlayDeadlineError, ExaPlayTCPClient
+from app.tests.fixtures.mock_exaplay import MockExaPlayServer
+
+DEADLINE_TEST_PORT = 17108
+
+
+@pytest.fixture
+def isolated_breakers(monkeypatch) -> None:
+    """Keep breakers created by a test out of the process-wide registry."""
+    monkeypatch.setattr(circuit_breakers, "_breakers", {})
+
+
+class TestRequestDeadline:
+    """Test cases for deadline scoping."""
+    
+    def test_deadlines_only_tighten(self) -> None:
+        """Test that nested scopes keep the earlier deadline and restore on exit."""
+        assert remaining_budget() is None
+        
+        with RequestDeadline(1.0) as outer:
+            with RequestDeadline(5.0) as inner:
+                assert inner == outer
+            
+            tighten_deadline(0.5)
+            assert remaining_budget() <= 0.5
+            
+            with RequestDeadline(None, unbounded=True):
+                assert get_deadline() is None
+        
+        assert get_deadline() is None
+
+
+class TestClientDeadline:
+    """Test cases for deadline enforcement in ExaPlayTCPClient."""
+    
+    async def test_slow_reply_fails_at_deadline(self, isolated_breakers) -> None:
+        """Test that a read is cut short at the deadline and not held against the host."""
+        async with MockExaPlayServer(port=DEADLINE_TEST_PORT) as server:
+            server.reply_delay = 1.0
+            client = ExaPlayTCPClient(
+                host="127.0.0.1",
+                port=DEADLINE_TEST_PORT,
+                timeout=5.0,
+                max_retries=2
+            )
+            client.breaker.failure_threshold = 1
+            
+            start = time.monotonic()
+            with pytest.raises(ExaPlayDeadlineError):
+                with RequestDeadline(0.2):
+                    await client.send_command("get:ver")
+            
+            assert time.monotonic() - start < 0.5
+            assert client.breaker.state == BreakerState.CLOSED
+            await client.pool.close()
+    
+    async def test_retry_skipped_when_backoff_exceeds_budget(self, isolated_breakers) -> None:
+        """Test that a retry whose backoff outlasts the budget is not attempted."""
+        client = ExaPlayTCPClient(
+            host="127.0.0.1",
+            port=DEADLINE_TEST_PORT,
+            timeout=1.0,
+            max_retries=3,
+            retry_backoff=0.5
+        )
+        
+        start = time.monotonic()
+        with pytest.raises(ExaPlayConnectionError):
+            with RequestDeadline(0.3):
+                await client.send_command("get:ver")
+        
+        assert time.monotonic() - start < 0.25
+        await client.pool.close()
+
+
+class TestDeadlineHeader:
+    """Test cases for the X-Request-Timeout header."""
+    
+    async def test_header_budget_returns_504(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        mock_exaplay_server: MockExaPlayServer
+    ) -> None:
+        """Test that a short header budget fails fast with a deadline error."""
+        mock_exaplay_server.reply_delay = 0.5
+        try:
+            start = time.monotonic()
+            response = await async_client.get(
+                "/version",
+                headers={**auth_headers, "X-Request-Timeout": "0.1"}
+            )
+            elapsed = time.monotonic() - start
+        finally:
+            mock_exaplay_server.reply_delay = 0.0
+            # Let the late reply land before later tests reuse the server
+            await asyncio.sleep(0.5)
+        
+        assert response.status_code == 504
+        assert response.json()["detail"]["error"] == "Request deadline exceeded"
+        assert elapsed < 0.4
+    
+    @pytest.mark.parametrize("value", ["soon", "0", "-1", "nan"])
+    async def test_invalid_header_rejected(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        value: str
+    ) -> None:
+        """Test that a malformed budget is a client error."""
+        response = await async_client.get(
+            "/version",
+            headers={**auth_headers, "X-Request-Timeout": value}
+        )
+        
+        assert response.status_code == 400
+        assert "X-Request-Timeout" in response.json()["error"]
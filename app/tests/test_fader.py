@@ -0,0 +1,178 @@
+"""Tests for server-side volume fades.
+
+Covers the fade curves, step scheduling with dropped ticks, retargeting,
+and cancellation by a manual volume write.
+"""
+
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from app.exaplay.fader import fade_engine, fade_level
+from app.exaplay.models import FadeCurve
+from app.settings import settings
+from app.tests.fixtures.mock_exaplay import MockExaPlayServer
+
+
+@pytest.fixture
+def fresh_fades(monkeypatch):
+    """Run each test with no fades left over from earlier tests."""
+    monkeypatch.setattr(fade_engine, "_fades", {})
+    yield fade_engine
+
+
+async def wait_for_fade(name: str) -> None:
+    """Wait until a composition's fade task has ended."""
+    fade = fade_engine.get(name)
+    assert fade is not None and fade.task is not None
+    await asyncio.wait_for(asyncio.shield(fade.task), timeout=5.0)
+
+
+class TestFadeCurves:
+    """Test cases for fade_level."""
+    
+    @pytest.mark.parametrize("curve", list(FadeCurve))
+    @pytest.mark.parametrize("start,target", [(0, 100), (80, 0)])
+    def test_curves_are_monotonic_between_endpoints(self, curve: FadeCurve, start: int, target: int) -> None:
+        """Test that every curve starts and ends exactly and never overshoots."""
+        levels = [fade_level(curve, start, target, step / 50) for step in range(51)]
+        
+        assert levels[0] == pytest.approx(start)
+        assert levels[-1] == pytest.approx(target)
+        ordered = sorted(levels, reverse=target < start)
+        assert levels == ordered
+    
+    def test_equal_power_fade_out_falls_faster_than_linear_at_the_end(self) -> None:
+        """Test that the curves differ where they should."""
+        assert fade_level(FadeCurve.EQUAL_POWER, 0, 100, 0.5) == pytest.approx(70.71, abs=0.01)
+        assert fade_level(FadeCurve.EQUAL_POWER, 100, 0, 0.5) == pytest.approx(70.71, abs=0.01)
+        assert fade_level(FadeCurve.EXPONENTIAL, 0, 100, 0.5) < 50
+        assert fade_level(FadeCurve.EXPONENTIAL, 100, 0, 0.5) < 50
+
+
+class TestFadeRoutes:
+    """Test cases for the volume fade endpoints."""
+    
+    async def test_fade_reaches_target(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        mock_exaplay_server: MockExaPlayServer,
+        fresh_fades
+    ) -> None:
+        """Test that a fade sends steps and ends on the target level."""
+        mock_exaplay_server._get_or_create_composition("fade1").volume = 80
+        
+        response = await async_client.post(
+            "/compositions/fade1/volume/fade",
+            json={"target": 20, "duration": 0.3, "curve": "equal-power"},
+            headers=auth_headers
+        )
+        assert response.status_code == 202
+        assert response.json()["state"] == "running"
+        assert response.json()["start"] == 80
+        
+        await wait_for_fade("fade1")
+        
+        body = (await async_client.get("/compositions/fade1/volume/fade", headers=auth_headers)).json()
+        assert body["state"] == "completed"
+        assert body["value"] == 20
+        assert body["progress"] == 1.0
+        assert 2 <= body["stepsSent"] <= 60
+        assert body["jitterMaxMs"] is not None
+        assert mock_exaplay_server.compositions["fade1"].volume == 20
+        
+        stats = await async_client.get("/exaplay/stats", headers=auth_headers)
+        assert stats.json()["fades"]["completed"] >= 1
+    
+    async def test_slow_steps_are_dropped_not_queued(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        mock_exaplay_server: MockExaPlayServer,
+        monkeypatch,
+        fresh_fades
+    ) -> None:
+        """Test that ticks missed during a slow step are dropped and the fade stays on time."""
+        monkeypatch.setattr(settings, "volume_fade_tick_rate", 100.0)
+        mock_exaplay_server._get_or_create_composition("fade2").volume = 0
+        mock_exaplay_server.reply_delay = 0.03
+        try:
+            await async_client.post(
+                "/compositions/fade2/volume/fade",
+                json={"target": 100, "duration": 0.3},
+                headers=auth_headers
+            )
+            started = asyncio.get_running_loop().time()
+            await wait_for_fade("fade2")
+            elapsed = asyncio.get_running_loop().time() - started
+        finally:
+            mock_exaplay_server.reply_delay = 0.0
+        
+        fade = fade_engine.get("fade2")
+        assert fade.state == "completed"
+        assert fade.steps_dropped > 0
+        assert fade.steps_sent < 30
+        assert elapsed < 0.3 + 0.15
+        assert mock_exaplay_server.compositions["fade2"].volume == 100
+    
+    async def test_new_fade_retargets_running_fade(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        mock_exaplay_server: MockExaPlayServer,
+        fresh_fades
+    ) -> None:
+        """Test that a second fade continues from the level the first reached."""
+        mock_exaplay_server._get_or_create_composition("fade3").volume = 100
+        
+        await async_client.post(
+            "/compositions/fade3/volume/fade",
+            json={"target": 0, "duration": 0.4},
+            headers=auth_headers
+        )
+        first = fade_engine.get("fade3")
+        await asyncio.sleep(0.2)
+        
+        response = await async_client.post(
+            "/compositions/fade3/volume/fade",
+            json={"target": 60, "duration": 0.1, "curve": "exponential"},
+            headers=auth_headers
+        )
+        
+        assert first.state == "cancelled"
+        assert 0 < response.json()["start"] < 100
+        assert response.json()["start"] == first.value
+        await wait_for_fade("fade3")
+        assert mock_exaplay_server.compositions["fade3"].volume == 60
+    
+    async def test_manual_set_cancels_fade(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        mock_exaplay_server: MockExaPlayServer,
+        fresh_fades
+    ) -> None:
+        """Test that POST /volume stops the fade so it cannot overwrite the value."""
+        mock_exaplay_server._get_or_create_composition("fade4").volume = 0
+        
+        await async_client.post(
+            "/compositions/fade4/volume/fade",
+            json={"target": 100, "duration": 0.3},
+            headers=auth_headers
+        )
+        await asyncio.sleep(0.1)
+        response = await async_client.post(
+            "/compositions/fade4/volume",
+            json={"value": 5},
+            headers=auth_headers
+        )
+        await asyncio.sleep(0.3)
+        
+        assert response.status_code == 200
+        assert fade_engine.get("fade4").state == "cancelled"
+        assert mock_exaplay_server.compositions["fade4"].volume == 5
+        
+        cancel = await async_client.delete("/compositions/fade4/volume/fade", headers=auth_headers)
+        assert cancel.status_code == 404
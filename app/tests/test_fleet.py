@@ -0,0 +1,218 @@
+"""Tests for multi-host fleet routing.
+
+Covers composition-to-host resolution, per-host isolation and counters,
+batch splitting across hosts and loading the registry from settings.
+"""
+
+import asyncio
+import json
+from typing import Optional
+
+import pytest
+from httpx import AsyncClient
+
+from app.exaplay.fleet import FleetConfig, HostConfig, HostRegistry, composition_of
+from app.exaplay.tcp_client import ExaPlayTimeoutError
+from app.settings import settings
+from app.tests.fixtures.mock_exaplay import MockExaPlayServer
+
+NODE_A_PORT = 17103
+NODE_B_PORT = 17104
+
+
+def make_registry(node_b_timeout: Optional[float] = None) -> HostRegistry:
+    """Create a two-node registry pointing at the fleet test servers."""
+    return HostRegistry(FleetConfig(
+        default="node_a",
+        hosts={
+            "node_a": HostConfig(
+                host="127.0.0.1",
+                port=NODE_A_PORT,
+                compositions=["comp1"]
+            ),
+            "node_b": HostConfig(
+                host="127.0.0.1",
+                port=NODE_B_PORT,
+                timeout=node_b_timeout,
+                max_retries=0,
+                compositions=["showA", "stage_*"]
+            ),
+        }
+    ))
+
+
+async def close_registry(registry: HostRegistry) -> None:
+    """Close the pools opened by a test registry."""
+    for host in registry.hosts.values():
+        await host.client.pool.close()
+
+
+class TestHostResolution:
+    """Test cases for composition-to-host lookup."""
+    
+    def test_exact_pattern_and_default_resolution(self) -> None:
+        """Test that exact names, patterns and unmatched names resolve correctly."""
+        registry = make_registry()
+        
+        assert registry.resolve("comp1").name == "node_a"
+        assert registry.resolve("showA").name == "node_b"
+        assert registry.resolve("stage_left").name == "node_b"
+        assert registry.resolve("unknown").name == "node_a"
+        assert registry.resolve(None) is registry.default
+    
+    def test_host_for_raw_command(self) -> None:
+        """Test that raw commands are routed by the composition they name."""
+        registry = make_registry()
+        
+        assert composition_of("set:vol,stage_1,50") == "stage_1"
+        assert composition_of("get:ver") is None
+        assert registry.host_for_command("play,showA").name == "node_b"
+        assert registry.host_for_command("get:ver").name == "node_a"
+    
+    def test_duplicate_exact_assignment_rejected(self) -> None:
+        """Test that one composition cannot be assigned to two hosts."""
+        with pytest.raises(ValueError):
+            HostRegistry(FleetConfig(hosts={
+                "a": HostConfig(host="10.0.0.1", compositions=["intro"]),
+                "b": HostConfig(host="10.0.0.2", compositions=["intro"]),
+            }))
+    
+    def test_duplicate_address_rejected(self) -> None:
+        """Test that two hosts cannot share an address with different policies."""
+        with pytest.raises(ValueError, match="10.0.0.1:7000"):
+            FleetConfig(hosts={
+                "a": HostConfig(host="10.0.0.1", timeout=1.0, compositions=["intro"]),
+                "b": HostConfig(host="10.0.0.1", port=7000, timeout=5.0, compositions=["outro"]),
+            })
+        
+        FleetConfig(hosts={
+            "a": HostConfig(host="10.0.0.1"),
+            "b": HostConfig(host="10.0.0.1", port=7001),
+        })
+    
+    def test_unknown_default_rejected(self) -> None:
+        """Test that the default host must be one of the configured hosts."""
+        with pytest.raises(ValueError):
+            FleetConfig(default="missing", hosts={"a": HostConfig(host="10.0.0.1")})
+    
+    def test_from_settings_reads_fleet_file(self, tmp_path, monkeypatch) -> None:
+        """Test that EXAPLAY_FLEET_FILE takes precedence and is parsed."""
+        fleet_file = tmp_path / "fleet.json"
+        fleet_file.write_text(json.dumps({
+            "hosts": {
+                "render01": {"host": "10.0.0.11", "compositions": ["lobby_*"]},
+                "render02": {"host": "10.0.0.12", "port": 7001, "max_retries": 0},
+            }
+        }))
+        monkeypatch.setattr(settings, "exaplay_fleet_file", str(fleet_file))
+        monkeypatch.setattr(settings, "exaplay_fleet", "not json")
+        
+        registry = HostRegistry.from_settings()
+        
+        assert registry.default.name == "render01"
+        assert registry.resolve("lobby_main").address == "10.0.0.11:7000"
+        assert registry.hosts["render02"].client.max_retries == 0
+    
+    def test_from_settings_rejects_invalid_json(self, monkeypatch) -> None:
+        """Test that a malformed inline registry fails loudly."""
+        monkeypatch.setattr(settings, "exaplay_fleet_file", "")
+        monkeypatch.setattr(settings, "exaplay_fleet", "{\"hosts\": ")
+        
+        with pytest.raises(ValueError):
+            HostRegistry.from_settings()
+
+
+class TestFleetRouting:
+    """Test cases for sending commands across several hosts."""
+    
+    async def test_commands_reach_their_host(self) -> None:
+        """Test that each command is sent to the host serving its composition."""
+        async with MockExaPlayServer(port=NODE_A_PORT) as node_a, \
+                MockExaPlayServer(port=NODE_B_PORT) as node_b:
+            registry = make_registry()
+            
+            assert await registry.send_command("play,comp1", composition="comp1") == "OK"
+            assert await registry.send_command("play,showA") == "OK"
+            assert await registry.send_command("get:ver") == "2.21.0.0"
+            
+            assert node_a.commands_received == 2
+            assert node_b.commands_received == 1
+            assert node_b.compositions["showA"].state == 1
+            assert node_a.compositions["showA"].state == 0
+            await close_registry(registry)
+    
+    async def test_slow_node_does_not_block_others(self) -> None:
+        """Test that a stalled host only delays its own requests."""
+        async with MockExaPlayServer(port=NODE_A_PORT), \
+                MockExaPlayServer(port=NODE_B_PORT) as node_b:
+            node_b.reply_delay = 0.5
+            registry = make_registry(node_b_timeout=0.2)
+            
+            slow = asyncio.ensure_future(registry.send_command("play,showA"))
+            fast = await asyncio.wait_for(registry.send_command("play,comp1"), timeout=0.1)
+            
+            assert fast == "OK"
+            with pytest.raises(ExaPlayTimeoutError):
+                await slow
+            
+            stats = registry.stats()
+            assert stats["node_a"]["requests"] == 1
+            assert stats["node_a"]["errors"] == 0
+            assert stats["node_b"]["timeouts"] == 1
+            assert stats["node_b"]["last_error"]
+            await close_registry(registry)
+    
+    async def test_batch_is_split_per_host_in_order(self) -> None:
+        """Test that a mixed batch keeps request order across hosts."""
+        async with MockExaPlayServer(port=NODE_A_PORT) as node_a, \
+                MockExaPlayServer(port=NODE_B_PORT) as node_b:
+            node_a.compositions["comp1"].volume = 11
+            node_b.compositions["showA"].volume = 22
+            registry = make_registry()
+            
+            results = await registry.send_pipeline([
+                "get:vol,showA",
+                "get:vol,comp1",
+                "bogus,showA",
+                "get:ver",
+            ])
+            
+            assert [result.reply for result in results] == ["22", "11", "ERR", "2.21.0.0"]
+            assert results[2].error is not None
+            assert node_b.commands_received == 2
+            await close_registry(registry)
+    
+    async def test_batch_stop_on_error_across_hosts(self) -> None:
+        """Test that stopOnError halts the batch even when the next host differs."""
+        async with MockExaPlayServer(port=NODE_A_PORT) as node_a, \
+                MockExaPlayServer(port=NODE_B_PORT):
+            registry = make_registry()
+            
+            results = await registry.send_pipeline(
+                ["play,showA", "bogus,showA", "play,comp1"],
+                stop_on_error=True
+            )
+            
+            assert [result.reply for result in results] == ["OK", "ERR"]
+            assert node_a.commands_received == 0
+            await close_registry(registry)
+
+
+class TestFleetStats:
+    """Test cases for per-host statistics in the stats endpoint."""
+    
+    async def test_stats_include_default_host(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict
+    ) -> None:
+        """Test that /exaplay/stats reports per-host counters."""
+        await async_client.post("/compositions/comp1/play", headers=auth_headers)
+        
+        response = await async_client.get("/exaplay/stats", headers=auth_headers)
+        
+        assert response.status_code == 200
+        hosts = response.json()["hosts"]
+        assert hosts["default"]["address"] == "127.0.0.1:17000"
+        assert hosts["default"]["requests"] >= 1
+        assert {"errors", "timeouts", "latency_ms"} <= set(hosts["default"])
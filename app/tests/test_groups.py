@@ -0,0 +1,194 @@
+"""Tests for synchronized group control.
+
+Covers the barrier dispatch across hosts, skew reporting, per-member
+errors and the /groups endpoints.
+"""
+
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from app.exaplay import fleet
+from app.exaplay.fleet import FleetConfig, HostConfig, HostRegistry
+from app.exaplay.pool import ExaPlayConnectionPool
+from app.exaplay.tcp_client import ExaPlayTCPClient, send_synchronized
+from app.tests.fixtures.mock_exaplay import MockExaPlayServer
+
+NODE_A_PORT = 17105
+NODE_B_PORT = 17106
+
+
+@pytest.fixture
+def group_registry(monkeypatch) -> HostRegistry:
+    """Install a two-node registry with a video wall group spanning both nodes."""
+    registry = HostRegistry(FleetConfig(
+        default="node_a",
+        hosts={
+            "node_a": HostConfig(host="127.0.0.1", port=NODE_A_PORT, compositions=["comp1", "timeline1"]),
+            "node_b": HostConfig(host="127.0.0.1", port=NODE_B_PORT, timeout=0.3, compositions=["showA"]),
+        },
+        groups={
+            "wall": ["comp1", "timeline1", "showA"],
+            "mixed": ["comp1", "timeline1"],
+        }
+    ))
+    monkeypatch.setattr(fleet, "_registry", registry)
+    return registry
+
+
+class TestSynchronizedDispatch:
+    """Test cases for send_synchronized()."""
+    
+    async def test_one_write_per_host(self) -> None:
+        """Test that commands for the same host share one connection and burst."""
+        async with MockExaPlayServer(port=NODE_A_PORT) as server:
+            client = ExaPlayTCPClient(host="127.0.0.1", port=NODE_A_PORT, pool_min_size=0)
+            
+            results = await send_synchronized([(client, "play,comp1"), (client, "play,showA")])
+            
+            assert [result.reply for result in results] == ["OK", "OK"]
+            assert results[0].written_at == results[1].written_at
+            assert all(result.replied_at >= result.written_at for result in results)
+            assert server.connections_accepted == 1
+            admission = client.admission.stats()
+            assert admission["inflight"] == 0
+            assert admission["priorities"]["critical"]["admitted"] >= 1
+            await client.pool.close()
+    
+    async def test_unreachable_host_fails_only_its_members(self) -> None:
+        """Test that a dead host does not prevent the other members from running."""
+        async with MockExaPlayServer(port=NODE_A_PORT):
+            live = ExaPlayTCPClient(host="127.0.0.1", port=NODE_A_PORT, pool_min_size=0)
+            dead = ExaPlayTCPClient(host="127.0.0.1", port=NODE_B_PORT, timeout=0.2, pool_min_size=0)
+            
+            results = await send_synchronized([(live, "play,comp1"), (dead, "play,showA")])
+            
+            assert results[0].reply == "OK"
+            assert results[1].error is not None
+            assert results[1].written_at is None
+            await live.pool.close()
+    
+    async def test_cancel_during_checkout_returns_connections(self) -> None:
+        """Test that cancelling while another member is still connecting releases the ones already checked out."""
+        async with MockExaPlayServer(port=NODE_A_PORT) as server:
+            live = ExaPlayTCPClient(host="127.0.0.1", port=NODE_A_PORT, pool_min_size=0)
+            stuck = ExaPlayTCPClient(host="127.0.0.1", port=NODE_B_PORT, timeout=5.0)
+            
+            async def never_connects() -> tuple:
+                await asyncio.Event().wait()
+            
+            stuck.pool = ExaPlayConnectionPool(never_connects, name="stuck", min_size=0)
+            task = asyncio.ensure_future(send_synchronized([(live, "play,comp1"), (stuck, "play,showA")]))
+            await asyncio.sleep(0.1)
+            assert live.pool.stats()["in_use"] == 1
+            assert live.admission.stats()["inflight"] == 1
+            
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            
+            assert live.pool.stats()["in_use"] == 0
+            assert live.admission.stats()["inflight"] == 0
+            assert stuck.admission.stats()["inflight"] == 0
+            assert stuck.pool.stats()["size"] == 0
+            assert server.commands_received == 0
+            await live.pool.close()
+
+
+class TestGroupEndpoints:
+    """Test cases for the /groups API."""
+    
+    async def test_play_group_across_hosts(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        group_registry: HostRegistry
+    ) -> None:
+        """Test that a group play reaches every member and reports skew."""
+        async with MockExaPlayServer(port=NODE_A_PORT) as node_a, \
+                MockExaPlayServer(port=NODE_B_PORT) as node_b:
+            response = await async_client.post("/groups/wall/play", headers=auth_headers)
+            
+            assert response.status_code == 200
+            
+            data = response.json()
+            assert data["succeeded"] == 3
+            assert [member["host"] for member in data["members"]] == ["node_a", "node_a", "node_b"]
+            assert all(member["reply"] == "OK" for member in data["members"])
+            assert data["writeSkewMs"] >= 0
+            assert data["replySkewMs"] >= 0
+            assert min(member["writeOffsetMs"] for member in data["members"]) == 0
+            assert node_a.compositions["timeline1"].state == 1
+            assert node_b.compositions["showA"].state == 1
+            for host in group_registry.hosts.values():
+                await host.client.pool.close()
+    
+    async def test_group_cuetime_reports_member_errors(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        group_registry: HostRegistry
+    ) -> None:
+        """Test that an ERR from one member is reported without failing the others."""
+        async with MockExaPlayServer(port=NODE_A_PORT) as server:
+            server.compositions["timeline1"].duration = 1.0
+            response = await async_client.post(
+                "/groups/mixed/cuetime",
+                json={"seconds": 5.0},
+                headers=auth_headers
+            )
+            
+            assert response.status_code == 200
+            
+            data = response.json()
+            assert data["members"][0]["sent"] == "set:cuetime,comp1,5.0"
+            assert data["members"][0]["status"] == "ok"
+            assert data["members"][1]["status"] == "error"
+            assert data["failed"] == 1
+            for host in group_registry.hosts.values():
+                await host.client.pool.close()
+    
+    async def test_group_unreachable_returns_502(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        group_registry: HostRegistry
+    ) -> None:
+        """Test that a group with no reachable member maps to an upstream error."""
+        response = await async_client.post("/groups/wall/stop", headers=auth_headers)
+        
+        assert response.status_code in (502, 504)
+    
+    async def test_unknown_group_returns_404(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        group_registry: HostRegistry
+    ) -> None:
+        """Test that an unconfigured group is rejected."""
+        response = await async_client.post("/groups/nope/pause", headers=auth_headers)
+        
+        assert response.status_code == 404
+    
+    async def test_list_groups(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        group_registry: HostRegistry
+    ) -> None:
+        """Test that configured groups are listed."""
+        response = await async_client.get("/groups", headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert response.json()["wall"] == ["comp1", "timeline1", "showA"]
+    
+    async def test_groups_require_auth(
+        self,
+        async_client: AsyncClient,
+        no_auth_headers: dict
+    ) -> None:
+        """Test that group endpoints require authentication."""
+        response = await async_client.post("/groups/wall/play", headers=no_auth_headers)
+        
+        assert response.status_code == 401
@@ -7,6 +7,9 @@ without requiring authentication.
 import pytest
 from httpx import AsyncClient
 
+from app.exaplay.fleet import get_host_registry
+from app.tests.fixtures.mock_exaplay import MockExaPlayServer
+
 
 class TestHealthEndpoint:
     """Test cases for the health check endpoint."""
@@ -71,3 +74,43 @@ class TestHealthEndpoint:
         assert response.status_code == 200
         # Check if CORS headers are present when configured origins are used
         # (The exact headers depend on FastAPI CORS middleware configuration)
+
+
+class TestReadinessEndpoint:
+    """Test cases for the /readyz readiness probe."""
+    
+    async def test_ready_after_successful_connect(
+        self,
+        async_client: AsyncClient,
+        mock_exaplay_server: MockExaPlayServer
+    ) -> None:
+        """Test that a fresh connection makes the host ready and /readyz sends nothing upstream."""
+        pool = get_host_registry().default.client.pool
+        async with pool.connection(fresh=True):
+            pass
+        before = mock_exaplay_server.commands_received
+        
+        for _ in range(5):
+            response = await async_client.get("/readyz")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ready"
+        host = data["hosts"]["default"]
+        assert host["reachable"] is True
+        assert host["breaker"] == "closed"
+        assert host["lastProbeRttMs"] >= 0
+        assert mock_exaplay_server.commands_received == before
+    
+    async def test_not_ready_after_failed_probe(self, async_client: AsyncClient) -> None:
+        """Test that a failed probe makes /readyz return 503 without authentication."""
+        pool = get_host_registry().default.client.pool
+        pool._record_probe(False, 0.002, ConnectionRefusedError("Connection refused"))
+        
+        response = await async_client.get("/readyz")
+        
+        assert response.status_code == 503
+        data = response.json()
+        assert data["status"] == "not_ready"
+        assert data["hosts"]["default"]["reachable"] is False
+        assert data["hosts"]["default"]["lastProbeError"] == "Connection refused"
@@ -0,0 +1,99 @@
+"""Tests for the logging pipeline.
+
+Covers event sampling and rate limits, and the background writer used
+with LOG_ASYNC (rendering off-thread, overflow policy, drop reports).
+"""
+
+import io
+import json
+import re
+
+import pytest
+import structlog
+
+from app.logging import BackgroundLogWriter, EventSampler, add_timestamp, json_renderer
+
+
+def run(sampler: EventSampler, event: str, level: str = "info") -> bool:
+    """Pass one record through the sampler, returning whether it was kept."""
+    try:
+        sampler(None, level, {"event": event})
+    except structlog.DropEvent:
+        return False
+    return True
+
+
+class TestEventSampler:
+    """Test cases for EventSampler."""
+    
+    def test_sample_rate_keeps_fixed_share(self) -> None:
+        """Test that a 0.25 sample rate keeps exactly every fourth record."""
+        sampler = EventSampler({"Command completed successfully": 0.25}, {})
+        
+        kept = [run(sampler, "Command completed successfully") for _ in range(8)]
+        
+        assert kept == [True, False, False, False, True, False, False, False]
+        assert run(sampler, "Request completed")
+    
+    def test_suppressed_count_and_levels(self) -> None:
+        """Test that kept records report drops and warnings are never dropped."""
+        sampler = EventSampler({"OSC message received": 0.0}, {})
+        
+        assert run(sampler, "OSC message received")
+        assert not run(sampler, "OSC message received", "debug")
+        assert run(sampler, "OSC message received", "warning")
+        
+        sampler.sample_rates["OSC message received"] = 1.0
+        record = sampler(None, "debug", {"event": "OSC message received"})
+        assert record["suppressed"] == 1
+    
+    def test_rate_limit(self, monkeypatch) -> None:
+        """Test that a rate limit allows a burst, then refills over time."""
+        now = [100.0]
+        monkeypatch.setattr("app.logging.time.monotonic", lambda: now[0])
+        sampler = EventSampler({}, {"Event broadcasted": 2})
+        
+        assert [run(sampler, "Event broadcasted") for _ in range(3)] == [True, True, False]
+        
+        now[0] += 0.5
+        assert run(sampler, "Event broadcasted")
+        assert not run(sampler, "Event broadcasted")
+
+
+class TestBackgroundLogWriter:
+    """Test cases for BackgroundLogWriter."""
+    
+    def test_records_are_rendered_by_the_writer(self) -> None:
+        """Test that enqueued records come out as rendered JSON lines."""
+        stream = io.StringIO()
+        writer = BackgroundLogWriter(json_renderer, stream, max_size=100)
+        
+        with pytest.raises(structlog.DropEvent):
+            writer(None, "info", {"event": "Request completed", "timestamp": 0.0, "status_code": 200})
+        writer.stop()
+        
+        line = json.loads(stream.getvalue())
+        assert line == {"event": "Request completed", "timestamp": "1970-01-01T00:00:00.000000Z", "status_code": 200}
+    
+    @pytest.mark.parametrize("overflow, expected", [("drop_oldest", ["2", "3"]), ("drop_newest", ["0", "1"])])
+    def test_overflow_policy(self, overflow: str, expected: list) -> None:
+        """Test which records survive a full queue, and that drops are reported."""
+        stream = io.StringIO()
+        writer = BackgroundLogWriter(json_renderer, stream, max_size=2, overflow=overflow)
+        writer.stop()
+        
+        for i in range(4):
+            with pytest.raises(structlog.DropEvent):
+                writer(None, "info", {"event": str(i)})
+        writer.flush()
+        
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [line["event"] for line in lines[:-1]] == expected
+        assert lines[-1]["event"] == "Log records dropped, queue full"
+        assert lines[-1]["dropped"] == 2
+
+
+def test_add_timestamp_format() -> None:
+    """Test the ISO 8601 UTC timestamp format."""
+    record = add_timestamp(None, "info", {})
+    assert re.fullmatch(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{6}Z", record["timestamp"])
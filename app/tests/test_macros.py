@@ -0,0 +1,172 @@
+"""Tests for server-side cue macros.
+
+Covers registration, NDJSON and SSE progress streams, status waits,
+and aborting a run at a failed step.
+"""
+
+import json
+import time
+from typing import Any, Dict, List
+
+import pytest
+from httpx import AsyncClient
+
+from app.exaplay import macros
+from app.exaplay.macros import MacroRegistry, wait_satisfied
+from app.exaplay.models import MacroWait, PlaybackState, StatusResponse
+from app.tests.fixtures.mock_exaplay import MockExaPlayServer
+
+SHOW_START = {
+    "description": "Play, wait until playing, then bring the volume up",
+    "steps": [
+        {"command": {"op": "play", "name": "macro1"}},
+        {"wait": {"name": "macro1", "state": "playing", "timeout": 2}},
+        {"delay": 0.05, "command": {"op": "vol", "name": "macro1", "value": 40}}
+    ]
+}
+
+
+@pytest.fixture(autouse=True)
+def macro_registry(monkeypatch) -> MacroRegistry:
+    """Run each test against an empty macro registry."""
+    registry = MacroRegistry()
+    monkeypatch.setattr(macros, "_registry", registry)
+    return registry
+
+
+def ndjson(body: str) -> List[Dict[str, Any]]:
+    """Parse an NDJSON response body."""
+    return [json.loads(line) for line in body.splitlines() if line]
+
+
+class TestMacroRoutes:
+    """Test cases for the /macros endpoints."""
+    
+    async def test_register_list_and_remove(self, async_client: AsyncClient, auth_headers: dict) -> None:
+        """Test the macro registration lifecycle."""
+        created = await async_client.put("/macros/show_start", json=SHOW_START, headers=auth_headers)
+        replaced = await async_client.put("/macros/show_start", json=SHOW_START, headers=auth_headers)
+        listing = await async_client.get("/macros", headers=auth_headers)
+        
+        assert created.status_code == 201
+        assert replaced.status_code == 200
+        assert list(listing.json()) == ["show_start"]
+        assert len(listing.json()["show_start"]["steps"]) == 3
+        
+        assert (await async_client.delete("/macros/show_start", headers=auth_headers)).status_code == 204
+        assert (await async_client.get("/macros/show_start", headers=auth_headers)).status_code == 404
+    
+    async def test_run_streams_ndjson_progress(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        mock_exaplay_server: MockExaPlayServer
+    ) -> None:
+        """Test that a run executes every step and reports it as NDJSON."""
+        await async_client.put("/macros/show_start", json=SHOW_START, headers=auth_headers)
+        
+        response = await async_client.post("/macros/show_start/run", headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        events = ndjson(response.text)
+        assert [event["event"] for event in events] == ["started", "step", "wait", "step", "completed"]
+        assert events[1]["sent"] == "play,macro1"
+        assert events[2]["state"] == "playing"
+        assert events[3]["sent"] == "set:vol,macro1,40"
+        assert events[4]["succeeded"] == 3
+        assert {event["runId"] for event in events} == {response.headers["X-Macro-Run-Id"]}
+        assert mock_exaplay_server.compositions["macro1"].volume == 40
+    
+    async def test_run_streams_sse_when_accepted(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        mock_exaplay_server: MockExaPlayServer
+    ) -> None:
+        """Test that Accept: text/event-stream selects SSE framing."""
+        await async_client.put(
+            "/macros/stop_all",
+            json={"steps": [{"command": {"op": "stop", "name": "macro2"}}]},
+            headers=auth_headers
+        )
+        
+        response = await async_client.post(
+            "/macros/stop_all/run",
+            headers={**auth_headers, "Accept": "text/event-stream"}
+        )
+        
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert "event: started\n" in response.text
+        assert "event: completed\n" in response.text
+    
+    async def test_wait_timeout_aborts_run(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        mock_exaplay_server: MockExaPlayServer
+    ) -> None:
+        """Test that a failed wait stops the run before later steps."""
+        mock_exaplay_server._get_or_create_composition("macro3").stop()
+        await async_client.put(
+            "/macros/never",
+            json={"steps": [
+                {"wait": {"name": "macro3", "state": "paused", "timeout": 0.15}},
+                {"command": {"op": "play", "name": "macro3"}}
+            ]},
+            headers=auth_headers
+        )
+        
+        response = await async_client.post("/macros/never/run?format=ndjson", headers=auth_headers)
+        
+        events = ndjson(response.text)
+        assert [event["event"] for event in events] == ["started", "wait", "aborted"]
+        assert events[1]["status"] == "error"
+        assert "Timed out" in events[2]["error"]
+        assert mock_exaplay_server.compositions["macro3"].state == 0
+    
+    async def test_wait_timeout_bounds_unanswered_poll(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        mock_exaplay_server: MockExaPlayServer
+    ) -> None:
+        """Test that a wait step fails after its own timeout when the status poll gets no reply."""
+        mock_exaplay_server.silent_commands.add("get:status,macro4")
+        await async_client.put(
+            "/macros/silent",
+            json={"steps": [{"wait": {"name": "macro4", "state": "playing", "timeout": 0.2}}]},
+            headers=auth_headers
+        )
+        
+        started = time.monotonic()
+        response = await async_client.post("/macros/silent/run?format=ndjson", headers=auth_headers)
+        
+        assert time.monotonic() - started < 1.0
+        events = ndjson(response.text)
+        assert [event["event"] for event in events] == ["started", "wait", "aborted"]
+        assert "Timed out after 0.2s" in events[1]["error"]
+    
+    async def test_unknown_macro_is_404(self, async_client: AsyncClient, auth_headers: dict) -> None:
+        """Test that running an unknown macro fails before streaming."""
+        response = await async_client.post("/macros/missing/run", headers=auth_headers)
+        assert response.status_code == 404
+
+
+class TestWaitConditions:
+    """Test cases for wait_satisfied."""
+    
+    def test_state_and_time_must_both_hold(self) -> None:
+        """Test combining a state with a minimum playback time."""
+        wait = MacroWait(name="show", state=PlaybackState.PLAYING, timeAtLeast=10.0)
+        early = StatusResponse(state=PlaybackState.PLAYING, time=4.0, frame=100, clipIndex=-1, duration=60.0)
+        later = early.model_copy(update={"time": 12.0})
+        
+        assert not wait_satisfied(wait, early)
+        assert wait_satisfied(wait, later)
+        assert not wait_satisfied(wait, later.model_copy(update={"state": PlaybackState.PAUSED}))
+    
+    def test_wait_needs_a_condition(self) -> None:
+        """Test that an empty wait is rejected."""
+        with pytest.raises(ValueError):
+            MacroWait(name="show")
@@ -0,0 +1,102 @@
+"""Tests for the in-process metrics registry and the /metrics endpoint.
+
+Covers the text exposition format, bounded command verb labels, and
+that requests and upstream commands are recorded on the hot paths.
+"""
+
+import pytest
+from httpx import AsyncClient
+
+from app.deps import admin_rate_limiter
+from app.metrics import MetricsRegistry, command_verb, rate_limit_rejections
+from app.tests.fixtures.mock_exaplay import MockExaPlayServer
+
+
+class TestRegistry:
+    """Test cases for metric families and rendering."""
+    
+    def test_histogram_renders_cumulative_buckets(self) -> None:
+        """Test that buckets accumulate and +Inf counts every observation."""
+        registry = MetricsRegistry()
+        latency = registry.histogram("op_seconds", "Operation latency", ["op"], buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            latency.observe(value, "read")
+        
+        text = registry.render()
+        
+        assert "# TYPE op_seconds histogram" in text
+        assert 'op_seconds_bucket{op="read",le="0.1"} 1\n' in text
+        assert 'op_seconds_bucket{op="read",le="1"} 3\n' in text
+        assert 'op_seconds_bucket{op="read",le="+Inf"} 4\n' in text
+        assert 'op_seconds_count{op="read"} 4\n' in text
+        assert 'op_seconds_sum{op="read"} 4.25\n' in text
+    
+    def test_counter_and_gauge(self) -> None:
+        """Test unlabelled families, label escaping and duplicate names."""
+        registry = MetricsRegistry()
+        drops = registry.counter("drops_total", "Drops")
+        clients = registry.gauge("clients", "Clients", ["kind"])
+        
+        assert "drops_total 0\n" in registry.render()
+        
+        drops.inc()
+        drops.inc(amount=2)
+        clients.inc('a"b')
+        
+        text = registry.render()
+        assert "drops_total 3\n" in text
+        assert 'clients{kind="a\\"b"} 1\n' in text
+        
+        with pytest.raises(ValueError):
+            registry.counter("drops_total", "Again")
+    
+    def test_command_verb_is_bounded(self) -> None:
+        """Test that composition names and values never become label values."""
+        assert command_verb("play,comp1") == "play"
+        assert command_verb("set:vol,comp1,40") == "set:vol"
+        assert command_verb("GET:STATUS,comp1") == "get:status"
+        assert command_verb("rm -rf /") == "other"
+        assert command_verb("") == "other"
+
+
+class TestMetricsEndpoint:
+    """Test cases for GET /metrics."""
+    
+    async def test_metrics_record_requests_and_commands(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        mock_exaplay_server: MockExaPlayServer
+    ) -> None:
+        """Test that a control request shows up in the HTTP and TCP histograms."""
+        play = await async_client.post("/compositions/metrics1/play", headers=auth_headers)
+        assert play.status_code == 200
+        
+        response = await async_client.get("/metrics")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = response.text
+        assert (
+            'http_request_duration_seconds_count{method="POST",'
+            'route="/compositions/{name}/play",status="200"}'
+        ) in text
+        assert 'exaplay_command_duration_seconds_count{verb="play",host="127.0.0.1:17000",outcome="ok"}' in text
+        assert "metrics1" not in text
+    
+    async def test_rate_limit_rejections_are_counted(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        monkeypatch
+    ) -> None:
+        """Test that a 429 from the admin rate limiter increments its counter."""
+        monkeypatch.setattr(admin_rate_limiter, "max_requests", 1)
+        monkeypatch.setattr(admin_rate_limiter, "_buckets", type(admin_rate_limiter._buckets)())
+        before = rate_limit_rejections.value("admin")
+        
+        await async_client.post("/exaplay/command", json={"raw": "get:ver"}, headers=auth_headers)
+        response = await async_client.post("/exaplay/command", json={"raw": "get:ver"}, headers=auth_headers)
+        
+        assert response.status_code == 429
+        assert rate_limit_rejections.value("admin") == before + 1
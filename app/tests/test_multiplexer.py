@@ -0,0 +1,115 @@
+"""Tests for pipelined command multiplexing over one ExaPlay connection.
+
+Covers FIFO reply matching, single-write bursts, resynchronisation after
+a stalled reply, and the multiplexed mode of ExaPlayTCPClient.
+"""
+
+import asyncio
+
+import pytest
+
+from app.exaplay.multiplexer import ExaPlayMultiplexer
+from app.exaplay.tcp_client import ExaPlayTCPClient, ExaPlayTimeoutError
+from app.tests.fixtures.mock_exaplay import MockExaPlayServer
+
+MUX_TEST_PORT = 17102
+
+
+def make_client() -> ExaPlayTCPClient:
+    """Create a multiplexed client with a private multiplexer."""
+    client = ExaPlayTCPClient(
+        host="127.0.0.1",
+        port=MUX_TEST_PORT,
+        timeout=0.5,
+        max_retries=1,
+        retry_backoff=0.01,
+        multiplex=True
+    )
+    client.multiplexer = ExaPlayMultiplexer(client._connect, name="mux-test")
+    return client
+
+
+class TestMultiplexer:
+    """Test cases for ExaPlayMultiplexer."""
+    
+    async def test_concurrent_commands_share_one_connection(self) -> None:
+        """Test that concurrent commands are matched to their own replies."""
+        async with MockExaPlayServer(port=MUX_TEST_PORT) as server:
+            server.compositions["comp1"].volume = 10
+            server.compositions["showA"].volume = 20
+            client = make_client()
+            
+            replies = await asyncio.gather(
+                client.send_command("get:vol,comp1"),
+                client.send_command("get:vol,showA"),
+                client.send_command("get:ver"),
+            )
+            
+            assert replies == ["10", "20", "2.21.0.0"]
+            assert server.connections_accepted == 1
+            assert client.multiplexer.stats()["commands"] == 3
+            await client.multiplexer.close()
+    
+    async def test_burst_costs_one_round_trip(self) -> None:
+        """Test that a burst is written at once instead of one RTT per command."""
+        async with MockExaPlayServer(port=MUX_TEST_PORT) as server:
+            mux = make_client().multiplexer
+            
+            results = await mux.submit_many(
+                ["get:ver", "play,comp1", "get:status,comp1"],
+                timeout=1.0
+            )
+            replies = [reply for reply, _ in results]
+            
+            assert replies[0] == "2.21.0.0"
+            assert replies[1] == "OK"
+            assert replies[2].startswith("1,")
+            assert server.commands_received == 3
+            assert mux.stats()["max_in_flight"] == 3
+            assert all(latency >= 0 for _, latency in results)
+            await mux.close()
+    
+    async def test_timeout_at_head_triggers_resync(self) -> None:
+        """Test that a missing reply resynchronises and the next command recovers."""
+        async with MockExaPlayServer(port=MUX_TEST_PORT) as server:
+            server.silent_commands.add("get:status,lost")
+            mux = make_client().multiplexer
+            
+            with pytest.raises(asyncio.TimeoutError):
+                await mux.submit("get:status,lost", timeout=0.1)
+            
+            assert mux.stats()["resyncs"] == 1
+            assert not mux.connected
+            
+            assert await mux.submit("get:ver", timeout=1.0) == "2.21.0.0"
+            assert server.connections_accepted == 2
+            await mux.close()
+    
+    async def test_late_reply_is_discarded(self) -> None:
+        """Test that a reply arriving after its caller gave up is not misrouted."""
+        async with MockExaPlayServer(port=MUX_TEST_PORT) as server:
+            mux = make_client().multiplexer
+            await mux.submit("get:ver", timeout=1.0)
+            
+            server.reply_delay = 0.05
+            slow_first = asyncio.ensure_future(mux.submit("get:vol,comp1", timeout=1.0))
+            await asyncio.sleep(0)
+            with pytest.raises(asyncio.TimeoutError):
+                await mux.submit("get:ver", timeout=0.06)
+            
+            assert await slow_first == "75"
+            server.reply_delay = 0.0
+            assert await mux.submit("play,comp1", timeout=1.0) == "OK"
+            assert mux.stats()["late_replies"] == 1
+            await mux.close()
+    
+    async def test_client_maps_timeout_errors(self) -> None:
+        """Test that multiplexed timeouts surface as ExaPlayTimeoutError."""
+        async with MockExaPlayServer(port=MUX_TEST_PORT) as server:
+            server.silent_commands.add("get:status,lost")
+            client = make_client()
+            client.timeout = 0.05
+            
+            with pytest.raises(ExaPlayTimeoutError):
+                await client.send_command("get:status,lost")
+            await client.multiplexer.close()
@@ -0,0 +1,333 @@
+"""Tests for OSC ingestion, the merged state store and the SSE event ring.
+
+Sends real OSC datagrams to a broadcaster bound on localhost and checks
+that they reach SSE clients from the loop thread, merged into one status
+event per composition change, and that clients resume and catch up
+through the shared ring.
+"""
+
+import asyncio
+import json
+import threading
+from typing import AsyncGenerator, List
+
+import pytest
+from httpx import AsyncClient
+from pythonosc.udp_client import SimpleUDPClient
+
+from app.exaplay.event_ring import EventRing, SSEClient
+from app.exaplay.models import PlaybackState, StatusResponse
+from app.exaplay.osc_listener import OSCEventBroadcaster, osc_broadcaster
+from app.exaplay.osc_state import OSCStateStore
+from app.exaplay.poller import CompositionState, status_poller
+from app.settings import settings
+
+OSC_PORT = 17113
+
+
+@pytest.fixture
+async def broadcaster(monkeypatch) -> AsyncGenerator[OSCEventBroadcaster, None]:
+    """Provide a running broadcaster listening on localhost."""
+    monkeypatch.setattr(settings, "exaplay_osc_enable", True)
+    monkeypatch.setattr(settings, "exaplay_osc_listen", f"127.0.0.1:{OSC_PORT}")
+    instance = OSCEventBroadcaster()
+    await instance.start()
+    try:
+        yield instance
+    finally:
+        await instance.stop()
+
+
+def decode(message: bytes) -> dict:
+    """Decode the data of one SSE message."""
+    return json.loads(message.decode().split("data: ", 1)[1])
+
+
+async def read_events(broadcaster: OSCEventBroadcaster, client: SSEClient) -> List[dict]:
+    """Wait for a client's next messages and decode their data."""
+    assert await broadcaster.ring.wait(client, timeout=2.0)
+    return [decode(message) for message in broadcaster.ring.read(client)]
+
+
+class TestOSCIngestion:
+    """Test cases for datagram reception."""
+    
+    async def test_message_reaches_client_on_loop_thread(self, broadcaster: OSCEventBroadcaster) -> None:
+        """Test that a status datagram is dispatched on the event loop thread."""
+        sse_client = broadcaster.add_client()
+        handler_threads = []
+        original = broadcaster._broadcast_event
+        
+        def recording_broadcast(event_type: str, data: dict, delta: dict = None) -> None:
+            handler_threads.append(threading.get_ident())
+            original(event_type, data, delta)
+        
+        broadcaster._broadcast_event = recording_broadcast
+        SimpleUDPClient("127.0.0.1", OSC_PORT).send_message("/exaplay/status/comp1", 1)
+        
+        [event] = await read_events(broadcaster, sse_client)
+        
+        assert event["composition"] == "comp1"
+        assert event["status"] == 1
+        assert handler_threads == [threading.get_ident()]
+    
+    async def test_burst_is_drained_and_coalesced(self, broadcaster: OSCEventBroadcaster) -> None:
+        """Test that a burst is read in batches and merged into at most one event per composition and batch."""
+        sse_client = broadcaster.add_client()
+        client = SimpleUDPClient("127.0.0.1", OSC_PORT)
+        
+        for i in range(1, 61):
+            client.send_message(f"/exaplay/cuetime/comp{i % 6}", float(i))
+        for _ in range(200):
+            if broadcaster.datagrams == 60:
+                break
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0)
+        
+        latest = {event["composition"]: event["cuetime"] for event in await read_events(broadcaster, sse_client)}
+        
+        assert broadcaster.datagrams == 60
+        assert broadcaster.wakeups < 60
+        assert broadcaster.state.events < 60
+        assert latest == {f"comp{i % 6}": float(i) for i in range(55, 61)}
+    
+    async def test_malformed_datagram_is_ignored(self, broadcaster: OSCEventBroadcaster) -> None:
+        """Test that garbage does not stop reception."""
+        sse_client = broadcaster.add_client()
+        transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+            asyncio.DatagramProtocol,
+            remote_addr=("127.0.0.1", OSC_PORT)
+        )
+        transport.sendto(b"not osc")
+        transport.close()
+        SimpleUDPClient("127.0.0.1", OSC_PORT).send_message("/exaplay/cueframe/comp2", 42)
+        
+        [event] = await read_events(broadcaster, sse_client)
+        
+        assert event["composition"] == "comp2"
+        assert broadcaster.stats()["running"] is True
+
+
+class TestMergedState:
+    """Test cases for the per-composition state store and merged events."""
+    
+    async def test_messages_of_a_tick_become_one_event(self) -> None:
+        """Test that status, cuetime and cueframe merge into one full event."""
+        broadcaster = OSCEventBroadcaster()
+        sse_client = broadcaster.add_client()
+        
+        broadcaster._handle_status_update("/exaplay/status/comp1", 1)
+        broadcaster._handle_cuetime_update("/exaplay/cuetime/comp1", 15.6)
+        broadcaster._handle_cueframe_update("/exaplay/cueframe/comp1", 939)
+        await asyncio.sleep(0)
+        
+        assert await read_events(broadcaster, sse_client) == [
+            {"composition": "comp1", "status": 1, "cuetime": 15.6, "cueframe": 939}
+        ]
+        
+        # Repeating a value is not a change
+        broadcaster._handle_status_update("/exaplay/status/comp1", 1)
+        await asyncio.sleep(0)
+        assert broadcaster.ring.read(sse_client) == []
+        assert broadcaster.state.stats()["unchanged"] == 1
+    
+    async def test_delta_clients_get_changed_fields(self) -> None:
+        """Test that delta clients receive only changed fields and full clients the merged state."""
+        broadcaster = OSCEventBroadcaster()
+        broadcaster._handle_status_update("/exaplay/status/comp1", 2)
+        await asyncio.sleep(0)
+        full = broadcaster.add_client()
+        delta = broadcaster.add_client(delta=True)
+        
+        # Both start with the current state
+        assert await read_events(broadcaster, full) == [{"composition": "comp1", "status": 2, "cuetime": 0.0, "cueframe": 0}]
+        assert await read_events(broadcaster, delta) == [{"composition": "comp1", "status": 2, "cuetime": 0.0, "cueframe": 0}]
+        
+        broadcaster._handle_cuetime_update("/exaplay/cuetime/comp1", 3.5)
+        await asyncio.sleep(0)
+        
+        assert await read_events(broadcaster, full) == [{"composition": "comp1", "status": 2, "cuetime": 3.5, "cueframe": 0}]
+        assert await read_events(broadcaster, delta) == [{"composition": "comp1", "cuetime": 3.5}]
+    
+    async def test_state_is_applied_to_the_poller_table(self, monkeypatch) -> None:
+        """Test that OSC updates refresh a polled status, keeping clip index and duration."""
+        entry = CompositionState("comp1")
+        entry.status = StatusResponse(state=PlaybackState.STOPPED, time=0.0, frame=0, clipIndex=2, duration=300.0)
+        monkeypatch.setattr(status_poller, "_states", {"comp1": entry})
+        broadcaster = OSCEventBroadcaster()
+        
+        broadcaster._handle_status_update("/exaplay/status/comp1", 1)
+        broadcaster._handle_cuetime_update("/exaplay/cuetime/comp1", 15.6)
+        await asyncio.sleep(0)
+        
+        assert entry.status.state == PlaybackState.PLAYING
+        assert entry.status.time == 15.6
+        assert entry.status.clipIndex == 2
+        assert entry.next_status_poll >= entry.status_at + settings.status_poll_idle_interval
+    
+    async def test_state_snapshot_route(self, async_client: AsyncClient, auth_headers: dict, monkeypatch) -> None:
+        """Test that the snapshot route serves the merged state from memory."""
+        monkeypatch.setattr(osc_broadcaster, "state", OSCStateStore())
+        monkeypatch.setattr(settings, "exaplay_osc_enable", True)
+        osc_broadcaster.state.update("comp2", status=2, cuetime=4.0, cueframe=240)
+        osc_broadcaster.state.update("comp1", cuetime=1.0)
+        
+        response = await async_client.get("/events/state", headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert [(entry["composition"], entry["status"]) for entry in response.json()] == [("comp1", 1), ("comp2", 2)]
+        assert response.json()[1]["cueframe"] == 240
+        
+        monkeypatch.setattr(settings, "exaplay_osc_enable", False)
+        assert (await async_client.get("/events/state", headers=auth_headers)).status_code == 503
+
+
+def publish(ring: EventRing, composition: str, value: int) -> int:
+    """Publish a minimal status event to a ring."""
+    return ring.publish(composition, "status", b'event: status\ndata: {"composition":"%s","value":%d}\n\n' % (composition.encode(), value))
+
+
+class TestEventRing:
+    """Test cases for the shared SSE event ring."""
+    
+    def test_clients_read_from_their_cursor(self) -> None:
+        """Test that messages carry ids and each client advances independently."""
+        ring = EventRing(capacity=8)
+        first = ring.attach()
+        publish(ring, "comp1", 1)
+        second = ring.attach()
+        publish(ring, "comp2", 2)
+        
+        assert [message.split(b"\n", 1)[0] for message in ring.read(first)] == [b"id: 1", b"id: 2"]
+        # The later client starts with the snapshot, then continues from the head
+        assert [decode(message)["value"] for message in ring.read(second)] == [1]
+        assert [decode(message)["value"] for message in ring.read(second)] == [2]
+        assert ring.read(first) == []
+    
+    def test_resume_after_last_event_id(self) -> None:
+        """Test that a buffered Last-Event-ID resumes without a snapshot, and a stale one gets one."""
+        ring = EventRing(capacity=8)
+        for value in range(1, 6):
+            publish(ring, f"comp{value % 2}", value)
+        
+        resumed = ring.attach(last_event_id=3)
+        assert [decode(message)["value"] for message in ring.read(resumed)] == [4, 5]
+        assert ring.stats()["resumes"] == 1
+        
+        for value in range(6, 20):
+            publish(ring, f"comp{value % 2}", value)
+        stale = ring.attach(last_event_id=3)
+        assert [decode(message)["value"] for message in ring.read(stale)] == [18, 19]
+        future = ring.attach(last_event_id=1000)
+        assert [decode(message)["value"] for message in ring.read(future)] == [18, 19]
+    
+    def test_slow_client_gets_latest_value_per_composition(self) -> None:
+        """Test that a client that fell out of the ring is sent the current state, not a gap."""
+        ring = EventRing(capacity=4)
+        slow = ring.attach()
+        for value in range(1, 11):
+            publish(ring, f"comp{value % 3}", value)
+        
+        assert [decode(message) for message in ring.read(slow)] == [
+            {"composition": "comp2", "value": 8},
+            {"composition": "comp0", "value": 9},
+            {"composition": "comp1", "value": 10},
+        ]
+        assert slow.skipped == 10 - 4
+        assert slow.cursor == ring.next_id
+        assert ring.stats()["conflations"] == 1
+    
+    async def test_wait_wakes_on_publish(self) -> None:
+        """Test that waiting clients wake on publish and time out otherwise."""
+        ring = EventRing(capacity=4)
+        client = ring.attach()
+        
+        assert not await ring.wait(client, timeout=0.01)
+        waiter = asyncio.create_task(ring.wait(client, timeout=2.0))
+        await asyncio.sleep(0)
+        publish(ring, "comp1", 1)
+        
+        assert await waiter
+        assert len(ring.read(client)) == 1
+
+
+class TestSubscriptions:
+    """Test cases for filtered and rate-capped SSE clients."""
+    
+    def test_only_subscribers_of_a_topic_are_marked(self) -> None:
+        """Test that publishing touches only the clients subscribed to the event's topic."""
+        ring = EventRing(capacity=16)
+        follower = ring.attach(topics=[("status", "comp2")])
+        everything = ring.attach(topics=[("status", "*")])
+        
+        for value in range(1, 7):
+            publish(ring, f"comp{value % 3}", value)
+        
+        assert not follower.pending and follower.wakeup.is_set()
+        assert list(follower.dirty) == [("status", "comp2")]
+        assert [decode(message)["value"] for message in ring.read(follower)] == [5]
+        assert [decode(message)["value"] for message in ring.read(everything)] == [4, 5, 6]
+        assert ring.stats()["coalesced"] == 1 + 3
+        
+        ring.detach(follower)
+        publish(ring, "comp2", 7)
+        assert not follower.dirty
+    
+    async def test_rate_cap_coalesces_to_latest_state(self) -> None:
+        """Test that a capped client gets one update per interval, with deltas only when nothing was skipped."""
+        ring = EventRing(capacity=16)
+        client = ring.attach(delta=True, topics=[("status", "comp1")], max_hz=20)
+        
+        def publish_delta(value: int) -> None:
+            full = b'data: {"composition":"comp1","value":%d,"status":1}\n\n' % value
+            ring.publish("comp1", "status", full, b'data: {"value":%d}\n\n' % value)
+        
+        for value in range(1, 4):
+            publish_delta(value)
+        assert await ring.wait(client, timeout=1.0)
+        assert [decode(message) for message in ring.read(client)] == [{"composition": "comp1", "value": 3, "status": 1}]
+        
+        publish_delta(4)
+        started = asyncio.get_running_loop().time()
+        assert await ring.wait(client, timeout=1.0)
+        assert asyncio.get_running_loop().time() - started >= 0.04
+        assert [decode(message) for message in ring.read(client)] == [{"value": 4}]
+    
+    async def test_rate_cap_without_filters(self) -> None:
+        """Test that a rate-capped client without filters still receives every composition."""
+        broadcaster = OSCEventBroadcaster()
+        sse_client = broadcaster.add_client(max_hz=50)
+        
+        broadcaster._handle_cuetime_update("/exaplay/cuetime/comp1", 1.0)
+        broadcaster._handle_cuetime_update("/exaplay/cuetime/comp2", 2.0)
+        await asyncio.sleep(0)
+        
+        assert sse_client.subscribed
+        assert await broadcaster.ring.wait(sse_client, timeout=1.0)
+        assert [decode(message)["composition"] for message in broadcaster.ring.read(sse_client)] == ["comp1", "comp2"]
+        with pytest.raises(ValueError):
+            broadcaster.ring.attach(max_hz=10)
+        broadcaster.remove_client(sse_client)
+    
+    async def test_broadcaster_composition_filter(self) -> None:
+        """Test that a client following one composition only receives its events."""
+        broadcaster = OSCEventBroadcaster()
+        sse_client = broadcaster.add_client(compositions=["comp2"])
+        
+        broadcaster._handle_cuetime_update("/exaplay/cuetime/comp1", 1.0)
+        broadcaster._handle_cuetime_update("/exaplay/cuetime/comp2", 2.0)
+        broadcaster._handle_cuetime_update("/exaplay/cuetime/comp3", 3.0)
+        await asyncio.sleep(0)
+        
+        assert await read_events(broadcaster, sse_client) == [{"composition": "comp2", "status": 1, "cuetime": 2.0, "cueframe": 0}]
+        broadcaster.remove_client(sse_client)
+        assert broadcaster.ring.stats()["subscribed_topics"] == 0
+    
+    async def test_unknown_event_type_is_rejected(self, async_client: AsyncClient, auth_headers: dict, monkeypatch) -> None:
+        """Test that subscribing to an unknown event type is a 400 before streaming starts."""
+        monkeypatch.setattr(settings, "exaplay_osc_enable", True)
+        
+        response = await async_client.get("/events/status?types=status,volume", headers=auth_headers)
+        
+        assert response.status_code == 400
+        assert "volume" in response.json()["detail"]["error"]
@@ -0,0 +1,120 @@
+"""Tests for the background status poller.
+
+Covers adaptive poll intervals, optimistic application of writes,
+and serving status and volume from memory with ``?fresh=true`` bypass.
+"""
+
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from app.exaplay.fleet import FleetConfig, HostConfig, HostRegistry, get_host_registry
+from app.exaplay.models import PlaybackState
+from app.exaplay.poller import StatusPoller, status_poller
+from app.settings import settings
+from app.tests.fixtures.mock_exaplay import MockExaPlayServer
+
+POLLER_TEST_PORT = 17110
+
+
+@pytest.fixture
+def fast_polling(monkeypatch) -> None:
+    """Use short poll intervals so tests run quickly."""
+    monkeypatch.setattr(settings, "status_poll_active_interval", 0.05)
+    monkeypatch.setattr(settings, "status_poll_idle_interval", 10.0)
+
+
+@pytest.fixture
+async def global_poller(monkeypatch):
+    """Run the process-wide poller for one test with an empty state table."""
+    monkeypatch.setattr(status_poller, "_states", {})
+    yield status_poller
+    await status_poller.close()
+
+
+def make_registry() -> HostRegistry:
+    """Create a single-node registry serving two known compositions."""
+    return HostRegistry(FleetConfig(hosts={
+        "node": HostConfig(host="127.0.0.1", port=POLLER_TEST_PORT, compositions=["comp1", "timeline1"])
+    }))
+
+
+class TestStatusPoller:
+    """Test cases for polling and the state table."""
+    
+    async def test_playing_compositions_polled_faster(self, fast_polling) -> None:
+        """Test that playing compositions are re-polled while stopped ones wait."""
+        async with MockExaPlayServer(port=POLLER_TEST_PORT) as server:
+            server.compositions["comp1"].state = 1
+            registry = make_registry()
+            poller = StatusPoller()
+            
+            poller.start(registry)
+            await asyncio.sleep(0.3)
+            await poller.close()
+            
+            assert poller.status("comp1") is None  # Not served once the poller stopped
+            
+            states = poller._states
+            assert states["comp1"].status.state == PlaybackState.PLAYING
+            assert states["timeline1"].status.state == PlaybackState.STOPPED
+            assert states["comp1"].volume == 75
+            assert states["comp1"].next_status_poll - states["comp1"].status_at == pytest.approx(0.05)
+            assert states["timeline1"].next_status_poll - states["timeline1"].status_at == pytest.approx(10.0)
+            
+            # One initial poll of both compositions, then only comp1's status
+            stats = poller.stats()
+            assert stats["playing"] == 1
+            assert 4 + 3 <= stats["commands"] <= 4 + 7
+            await registry.default.client.pool.close()
+    
+    async def test_writes_are_applied_optimistically(self, fast_polling, global_poller) -> None:
+        """Test that a successful write updates the table before the next poll."""
+        async with MockExaPlayServer(port=POLLER_TEST_PORT) as server:
+            server.reply_delay = 0.05
+            registry = make_registry()
+            global_poller.start(registry)
+            await asyncio.sleep(0.2)
+            
+            await registry.send_command("play,timeline1")
+            await registry.send_command("set:vol,timeline1,30")
+            
+            status, _ = global_poller.status("timeline1")
+            volume, _ = global_poller.volume("timeline1")
+            assert status.state == PlaybackState.PLAYING
+            assert volume == 30
+            await registry.default.client.pool.close()
+
+
+class TestStatusFromMemory:
+    """Test cases for status and volume routes answering from the poller."""
+    
+    async def test_status_served_from_memory(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        mock_exaplay_server: MockExaPlayServer,
+        fast_polling,
+        global_poller
+    ) -> None:
+        """Test that reads come from memory with Age, and fresh=true goes upstream."""
+        # Stopped compositions are only re-polled at the (long) idle interval
+        mock_exaplay_server.compositions["comp1"].stop()
+        global_poller.start(get_host_registry())
+        await async_client.get("/compositions/comp1/status", headers=auth_headers)
+        await asyncio.sleep(0.1)
+        
+        before = mock_exaplay_server.commands_received
+        for _ in range(5):
+            response = await async_client.get("/compositions/comp1/status", headers=auth_headers)
+            assert response.status_code == 200
+            assert "Age" in response.headers
+        volume = await async_client.get("/compositions/comp1/volume", headers=auth_headers)
+        assert volume.json() == {"value": mock_exaplay_server.compositions["comp1"].volume}
+        assert mock_exaplay_server.commands_received == before
+        
+        fresh = await async_client.get("/compositions/comp1/status?fresh=true", headers=auth_headers)
+        assert fresh.status_code == 200
+        assert "Age" not in fresh.headers
+        assert mock_exaplay_server.commands_received == before + 1
@@ -0,0 +1,194 @@
+"""Tests for the persistent ExaPlay connection pool.
+
+Covers connection reuse, capacity limits, idle eviction, dead-socket
+detection, keepalive probing and transparent reconnect through
+ExaPlayTCPClient.
+"""
+
+import asyncio
+
+from httpx import AsyncClient
+
+from app.exaplay.pool import ExaPlayConnectionPool
+from app.exaplay.tcp_client import ExaPlayTCPClient
+from app.tests.fixtures.mock_exaplay import MockExaPlayServer
+
+POOL_TEST_PORT = 17101
+
+
+def make_client(**pool_kwargs) -> ExaPlayTCPClient:
+    """Create a client with a private pool pointing at the pool test server."""
+    client = ExaPlayTCPClient(host="127.0.0.1", port=POOL_TEST_PORT, max_retries=1, retry_backoff=0.01)
+    client.pool = ExaPlayConnectionPool(client._connect, name="pool-test", **pool_kwargs)
+    return client
+
+
+class TestConnectionPool:
+    """Test cases for ExaPlayConnectionPool and pooled clients."""
+    
+    async def test_commands_reuse_single_connection(self) -> None:
+        """Test that sequential commands share one TCP connection."""
+        async with MockExaPlayServer(port=POOL_TEST_PORT) as server:
+            client = make_client(min_size=0, max_size=4)
+            
+            for _ in range(5):
+                assert await client.send_command("get:ver") == "2.21.0.0"
+            
+            assert server.connections_accepted == 1
+            stats = client.pool.stats()
+            assert stats["size"] == 1
+            assert stats["idle"] == 1
+            assert stats["checkouts"] == 5
+            await client.pool.close()
+    
+    async def test_concurrent_commands_bounded_by_max_size(self) -> None:
+        """Test that concurrency never opens more than max_size connections."""
+        async with MockExaPlayServer(port=POOL_TEST_PORT) as server:
+            client = make_client(min_size=0, max_size=2)
+            
+            replies = await asyncio.gather(*(client.send_command("get:ver") for _ in range(10)))
+            
+            assert replies == ["2.21.0.0"] * 10
+            assert server.connections_accepted <= 2
+            assert client.pool.size <= 2
+            assert client.pool.stats()["waiters"] == 0
+            await client.pool.close()
+    
+    async def test_dead_connection_is_replaced_transparently(self) -> None:
+        """Test that a server-side close is detected and the command still succeeds."""
+        async with MockExaPlayServer(port=POOL_TEST_PORT) as server:
+            client = make_client(min_size=0, max_size=2)
+            
+            assert await client.send_command("get:ver") == "2.21.0.0"
+            server.drop_connections()
+            await asyncio.sleep(0.05)
+            
+            assert await client.send_command("get:ver") == "2.21.0.0"
+            assert server.connections_accepted == 2
+            assert client.pool.stats()["dead_discarded"] == 1
+            await client.pool.close()
+    
+    async def test_idle_connections_are_evicted_down_to_min_size(self) -> None:
+        """Test that idle eviction closes old connections but keeps min_size."""
+        async with MockExaPlayServer(port=POOL_TEST_PORT):
+            client = make_client(min_size=1, max_size=4, idle_timeout=0.01)
+            
+            await asyncio.gather(*(client.send_command("get:ver") for _ in range(4)))
+            assert client.pool.size > 1
+            
+            await asyncio.sleep(0.05)
+            client.pool.evict_idle()
+            
+            assert client.pool.size == 1
+            assert client.pool.stats()["evicted"] >= 1
+            await client.pool.close()
+    
+    async def test_fill_pre_opens_min_size(self) -> None:
+        """Test that fill() establishes min_size idle connections up front."""
+        async with MockExaPlayServer(port=POOL_TEST_PORT) as server:
+            client = make_client(min_size=2, max_size=4)
+            
+            await client.pool.fill()
+            
+            assert client.pool.idle == 2
+            assert server.connections_accepted == 2
+            await client.pool.close()
+            assert client.pool.size == 0
+    
+    async def test_release_after_close_closes_connection(self) -> None:
+        """Test that a connection checked out across close() is closed on release, not pooled."""
+        async with MockExaPlayServer(port=POOL_TEST_PORT) as server:
+            client = make_client(min_size=0, max_size=2)
+            conn = await client.pool.acquire()
+            
+            await client.pool.close()
+            client.pool.release(conn)
+            
+            assert conn.writer.is_closing()
+            assert client.pool.idle == 0
+            assert client.pool.size == 0
+            
+            assert await client.send_command("get:ver") == "2.21.0.0"
+            assert server.connections_accepted == 2
+            await client.pool.close()
+    
+    async def test_fill_tolerates_unreachable_host(self) -> None:
+        """Test that pre-filling against a dead host does not raise."""
+        client = make_client(min_size=1, max_size=2)
+        
+        await client.pool.fill()
+        
+        assert client.pool.size == 0
+        assert client.pool.probe_status()["ok"] is False
+    
+    async def test_keepalive_probes_idle_connections_without_resetting_idle_time(self) -> None:
+        """Test that due idle connections get a get:ver probe and keep their last-used time."""
+        async with MockExaPlayServer(port=POOL_TEST_PORT) as server:
+            client = make_client(min_size=1, max_size=2, keepalive_interval=0.01)
+            client.pool._keepalive = client._keepalive
+            await client.pool.fill()
+            conn = client.pool._idle[0]
+            last_used = conn.last_used
+            await asyncio.sleep(0.02)
+            
+            assert await client.pool.keepalive() == 1
+            assert await client.pool.keepalive() == 0
+            
+            assert server.commands_received == 1
+            assert conn.last_used == last_used
+            assert client.pool.idle == 1
+            stats = client.pool.stats()["keepalive"]
+            assert stats["probes"] == 1
+            assert stats["last_ok"] is True
+            await client.pool.close()
+    
+    async def test_failed_keepalive_drops_connection_and_maintenance_refills(self) -> None:
+        """Test that a connection failing its probe is replaced without waiting a full interval."""
+        async with MockExaPlayServer(port=POOL_TEST_PORT) as server:
+            client = make_client(min_size=1, max_size=2, idle_timeout=60, keepalive_interval=0.01)
+            client.pool._keepalive = client._keepalive
+            client.pool.start()
+            await asyncio.sleep(0.02)
+            server.drop_connections()
+            await asyncio.sleep(0.02)
+            
+            # Maintenance sleeps for a second between passes; the drop must wake it early
+            assert await client.pool.keepalive() == 1
+            assert client.pool.stats()["keepalive"]["failures"] == 1
+            for _ in range(50):
+                if server.connections_accepted == 2 and client.pool.idle == 1:
+                    break
+                await asyncio.sleep(0.01)
+            
+            assert server.connections_accepted == 2
+            assert client.pool.size == 1
+            await client.pool.close()
+
+
+class TestUpstreamStatsEndpoint:
+    """Test cases for the upstream statistics endpoint."""
+    
+    async def test_stats_reports_default_pool(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict
+    ) -> None:
+        """Test that /exaplay/stats exposes the shared pool after a request."""
+        await async_client.get("/version", headers=auth_headers)
+        
+        response = await async_client.get("/exaplay/stats", headers=auth_headers)
+        
+        assert response.status_code == 200
+        pools = response.json()["pools"]
+        assert "127.0.0.1:17000" in pools
+        assert {"size", "idle", "waiters", "checkout_ms"} <= set(pools["127.0.0.1:17000"])
+    
+    async def test_stats_requires_auth(
+        self,
+        async_client: AsyncClient,
+        no_auth_headers: dict
+    ) -> None:
+        """Test that the statistics endpoint requires authentication."""
+        response = await async_client.get("/exaplay/stats", headers=no_auth_headers)
+        
+        assert response.status_code == 401
@@ -0,0 +1,105 @@
+"""Tests for the token-bucket rate limiter.
+
+Covers burst and refill, bounded key tracking with LRU/idle eviction,
+client keys, and per route group limits with RateLimit-* headers.
+"""
+
+from httpx import AsyncClient
+
+from app import deps
+from app.deps import RateLimiter
+from app.settings import settings
+from app.tests.fixtures.mock_exaplay import MockExaPlayServer
+
+
+class TestTokenBucket:
+    """Test cases for RateLimiter.acquire."""
+    
+    def test_burst_then_refill(self) -> None:
+        """Test that a full bucket allows a burst and refills at the window rate."""
+        limiter = RateLimiter(max_requests=3, window_seconds=3, name="test")
+        
+        results = [limiter.acquire("ip:a", now=10.0) for _ in range(4)]
+        
+        assert [allowed for allowed, _, _ in results] == [True, True, True, False]
+        assert [remaining for _, remaining, _ in results] == [2, 1, 0, 0]
+        assert results[2][2] == 3  # bucket full again after 3 s
+        assert results[3][2] == 1  # next token in 1 s
+        
+        assert limiter.acquire("ip:a", now=11.0)[0]
+        assert not limiter.acquire("ip:a", now=11.5)[0]
+        assert limiter.acquire("ip:b", now=11.5)[0]
+    
+    def test_tracked_keys_are_bounded(self) -> None:
+        """Test that the least recently seen clients are evicted beyond max_keys."""
+        limiter = RateLimiter(max_requests=1, window_seconds=60, name="test", max_keys=2)
+        
+        limiter.acquire("ip:a", now=0.0)
+        limiter.acquire("ip:b", now=1.0)
+        limiter.acquire("ip:a", now=2.0)
+        limiter.acquire("ip:c", now=3.0)
+        
+        assert limiter.tracked == 2
+        assert limiter.evicted == 1
+        # a was refreshed, so b was evicted and starts with a full bucket
+        assert not limiter.acquire("ip:a", now=4.0)[0]
+        assert limiter.acquire("ip:b", now=4.0)[0]
+    
+    def test_idle_full_buckets_are_evicted(self) -> None:
+        """Test that buckets idle for a whole window are dropped on the next insert."""
+        limiter = RateLimiter(max_requests=5, window_seconds=10, name="test")
+        
+        for i in range(100):
+            limiter.acquire(f"ip:{i}", now=float(i) / 10)
+        limiter.acquire("ip:late", now=100.0)
+        
+        assert limiter.tracked == 1
+    
+    def test_api_key_clients(self, monkeypatch) -> None:
+        """Test keying by bearer token, falling back to the client IP."""
+        class FakeRequest:
+            def __init__(self, headers: dict) -> None:
+                self.headers = headers
+                self.client = type("Client", (), {"host": "10.0.0.7"})()
+        
+        monkeypatch.setattr(settings, "rate_limit_key", "api_key")
+        assert deps.rate_limit_key(FakeRequest({"Authorization": "Bearer abc"})) == "key:abc"
+        assert deps.rate_limit_key(FakeRequest({})) == "ip:10.0.0.7"
+        
+        monkeypatch.setattr(settings, "rate_limit_key", "ip")
+        assert deps.rate_limit_key(FakeRequest({"Authorization": "Bearer abc"})) == "ip:10.0.0.7"
+
+
+class TestRouteGroupLimits:
+    """Test cases for per route group limiting."""
+    
+    async def test_headers_and_rejection_before_upstream(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        mock_exaplay_server: MockExaPlayServer,
+        monkeypatch
+    ) -> None:
+        """Test RateLimit-* headers and that a 429 sends nothing upstream."""
+        monkeypatch.setitem(deps._rate_limiters, "control", RateLimiter(2, 60, name="control"))
+        
+        first = await async_client.post("/compositions/limited1/play", headers=auth_headers)
+        await async_client.post("/compositions/limited1/play", headers=auth_headers)
+        sent = mock_exaplay_server.commands_received
+        rejected = await async_client.post("/compositions/limited1/play", headers=auth_headers)
+        
+        assert first.status_code == 200
+        assert first.headers["RateLimit-Limit"] == "2"
+        assert first.headers["RateLimit-Remaining"] == "1"
+        assert first.headers["RateLimit-Policy"] == '2;w=60;name="control"'
+        
+        assert rejected.status_code == 429
+        assert rejected.headers["RateLimit-Remaining"] == "0"
+        assert int(rejected.headers["Retry-After"]) == 30
+        assert mock_exaplay_server.commands_received == sent
+    
+    async def test_unlimited_groups_send_no_headers(self, async_client: AsyncClient, auth_headers: dict) -> None:
+        """Test that groups without a configured limit are not limited."""
+        response = await async_client.get("/compositions/limited2/status", headers=auth_headers)
+        
+        assert "RateLimit-Limit" not in response.headers
@@ -0,0 +1,232 @@
+"""Tests for the read cache and request coalescing.
+
+Covers TTL hits, singleflight coalescing of concurrent misses,
+invalidation by control commands, and the Age header on read routes.
+"""
+
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from app.exaplay.admission import Priority, UpstreamPriority, get_priority
+from app.exaplay.deadline import RequestDeadline, remaining_budget
+from app.exaplay.fleet import FleetConfig, HostConfig, HostRegistry
+from app.exaplay.read_cache import ReadCache, read_cache
+from app.exaplay.tcp_client import ExaPlayDeadlineError
+from app.settings import settings
+from app.tests.fixtures.mock_exaplay import MockExaPlayServer
+
+CACHE_TEST_PORT = 17109
+
+
+def make_registry() -> HostRegistry:
+    """Create a single-node registry pointing at the cache test server."""
+    return HostRegistry(FleetConfig(hosts={
+        "node": HostConfig(host="127.0.0.1", port=CACHE_TEST_PORT, max_retries=0)
+    }))
+
+
+class TestReadCache:
+    """Test cases for ReadCache in isolation."""
+    
+    async def test_concurrent_misses_share_one_fetch(self) -> None:
+        """Test that identical concurrent reads are coalesced onto one fetch."""
+        cache = ReadCache()
+        calls = 0
+        
+        async def fetch() -> str:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "60"
+        
+        replies = await asyncio.gather(*(
+            cache.get("h:7000", "get:vol,comp1", "comp1", fetch) for _ in range(10)
+        ))
+        
+        assert calls == 1
+        assert {reply.reply for reply in replies} == {"60"}
+        assert all(reply.age is None for reply in replies)
+        
+        hit = await cache.get("h:7000", "get:vol,comp1", "comp1", fetch)
+        assert hit.reply == "60"
+        assert hit.age is not None
+        
+        counters = cache.stats()["commands"]["get:vol"]
+        assert (counters["misses"], counters["coalesced"], counters["hits"]) == (1, 9, 1)
+    
+    async def test_fetch_errors_reach_every_waiter_and_are_not_cached(self) -> None:
+        """Test that a failed fetch fails all waiters and the next read retries."""
+        cache = ReadCache()
+        calls = 0
+        
+        async def fetch() -> str:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise ConnectionError("down")
+        
+        outcomes = await asyncio.gather(
+            *(cache.get("h:7000", "get:ver", None, fetch) for _ in range(3)),
+            return_exceptions=True
+        )
+        
+        assert all(isinstance(outcome, ConnectionError) for outcome in outcomes)
+        with pytest.raises(ConnectionError):
+            await cache.get("h:7000", "get:ver", None, fetch)
+        assert calls == 2
+    
+    async def test_invalidation_discards_inflight_fetch(self) -> None:
+        """Test that a fetch overtaken by a change is neither joined nor stored."""
+        cache = ReadCache()
+        calls = 0
+        
+        async def fetch() -> str:
+            nonlocal calls
+            calls += 1
+            call = calls
+            await asyncio.sleep(0.05)
+            return str(call)
+        
+        stale = asyncio.ensure_future(cache.get("h:7000", "get:status,comp1", "comp1", fetch))
+        await asyncio.sleep(0)
+        cache.invalidate("h:7000", "comp1")
+        fresh = await cache.get("h:7000", "get:status,comp1", "comp1", fetch)
+        
+        assert (await stale).reply == "1"
+        assert fresh.reply == "2"
+        assert (await cache.get("h:7000", "get:status,comp1", "comp1", fetch)).reply == "2"
+    
+    async def test_fetch_does_not_inherit_first_callers_context(self) -> None:
+        """Test that the shared fetch runs without the first caller's deadline but in its lane."""
+        cache = ReadCache()
+        seen = []
+        
+        async def fetch() -> str:
+            seen.append((remaining_budget(), get_priority()))
+            return "60"
+        
+        with RequestDeadline(0.5), UpstreamPriority(Priority.CRITICAL):
+            await cache.get("h:7000", "get:vol,comp1", "comp1", fetch)
+        with UpstreamPriority(Priority.BULK):
+            await cache.get("h:7000", "get:vol,comp2", "comp2", fetch)
+        
+        assert seen == [(None, Priority.CRITICAL), (None, Priority.BULK)]
+    
+    async def test_urgent_caller_does_not_join_lower_lane_fetch(self) -> None:
+        """Test that a critical read starts its own fetch instead of waiting behind a bulk one."""
+        cache = ReadCache()
+        lanes = []
+        
+        async def fetch() -> str:
+            lanes.append(get_priority())
+            await asyncio.sleep(0.05)
+            return "60"
+        
+        async def read(priority: Priority) -> str:
+            with UpstreamPriority(priority):
+                return (await cache.get("h:7000", "get:vol,comp1", "comp1", fetch)).reply
+        
+        bulk = asyncio.ensure_future(read(Priority.BULK))
+        await asyncio.sleep(0)
+        replies = await asyncio.gather(read(Priority.CRITICAL), read(Priority.NORMAL), bulk)
+        
+        assert replies == ["60", "60", "60"]
+        assert lanes == [Priority.BULK, Priority.CRITICAL]
+        counters = cache.stats()["commands"]["get:vol"]
+        assert (counters["misses"], counters["coalesced"]) == (2, 1)
+    
+    async def test_zero_ttl_disables_caching(self, monkeypatch) -> None:
+        """Test that a TTL of 0 still coalesces but never stores replies."""
+        monkeypatch.setattr(settings, "read_cache_volume_ttl", 0.0)
+        cache = ReadCache()
+        
+        async def fetch() -> str:
+            return "60"
+        
+        await cache.get("h:7000", "get:vol,comp1", "comp1", fetch)
+        await cache.get("h:7000", "get:vol,comp1", "comp1", fetch)
+        
+        assert cache.stats()["entries"] == 0
+        assert cache.stats()["commands"]["get:vol"]["misses"] == 2
+
+
+class TestRegistryReads:
+    """Test cases for cached reads through the host registry."""
+    
+    async def test_control_command_invalidates_reads(self) -> None:
+        """Test that a successful set:vol is visible to the next read."""
+        async with MockExaPlayServer(port=CACHE_TEST_PORT) as server:
+            registry = make_registry()
+            
+            assert (await registry.read_command("get:vol,comp1")).reply == "75"
+            assert (await registry.read_command("get:vol,comp1")).age is not None
+            assert server.commands_received == 1
+            
+            await registry.send_command("set:vol,comp1,40")
+            
+            assert (await registry.read_command("get:vol,comp1")).reply == "40"
+            assert server.commands_received == 3
+            await registry.default.client.pool.close()
+    
+    async def test_waiter_deadline_does_not_cancel_shared_fetch(self) -> None:
+        """Test that a waiter with a short budget gives up without failing the others."""
+        async with MockExaPlayServer(port=CACHE_TEST_PORT) as server:
+            server.reply_delay = 0.2
+            registry = make_registry()
+            
+            leader = asyncio.ensure_future(registry.read_command("get:ver"))
+            await asyncio.sleep(0.01)
+            with pytest.raises(ExaPlayDeadlineError):
+                with RequestDeadline(0.05):
+                    await registry.read_command("get:ver")
+            
+            assert (await leader).reply == "2.21.0.0"
+            assert server.commands_received == 1
+            await registry.default.client.pool.close()
+    
+    async def test_short_leader_deadline_does_not_bind_other_waiters(self) -> None:
+        """Test that a 50 ms caller starting a slow fetch does not fail a 5 s caller joining it."""
+        async with MockExaPlayServer(port=CACHE_TEST_PORT) as server:
+            server.reply_delay = 0.2
+            registry = make_registry()
+            
+            async def read_within(seconds: float) -> str:
+                with RequestDeadline(seconds):
+                    return (await registry.read_command("get:ver")).reply
+            
+            short = asyncio.ensure_future(read_within(0.05))
+            await asyncio.sleep(0.01)
+            
+            assert await read_within(5.0) == "2.21.0.0"
+            with pytest.raises(ExaPlayDeadlineError):
+                await short
+            assert server.commands_received == 1
+            await registry.default.client.pool.close()
+
+
+class TestAgeHeader:
+    """Test cases for the Age header on cached read routes."""
+    
+    async def test_cached_volume_has_age_header(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        mock_exaplay_server: MockExaPlayServer
+    ) -> None:
+        """Test that only a reply served from cache carries Age."""
+        before = mock_exaplay_server.commands_received
+        
+        first = await async_client.get("/compositions/comp1/volume", headers=auth_headers)
+        second = await async_client.get("/compositions/comp1/volume", headers=auth_headers)
+        
+        assert first.status_code == second.status_code == 200
+        assert "Age" not in first.headers
+        assert second.headers["Age"] == "0"
+        assert second.json() == first.json()
+        assert mock_exaplay_server.commands_received == before + 1
+        
+        stats = await async_client.get("/exaplay/stats", headers=auth_headers)
+        assert stats.json()["cache"]["commands"]["get:vol"]["hits"] >= 1
+        assert read_cache.stats()["entries"] >= 1
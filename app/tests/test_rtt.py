@@ -0,0 +1,94 @@
+"""Tests for adaptive reply timeouts.
+
+Covers the RTT estimator's smoothing, bounds and backoff, and a lost
+reply being given up on after the adaptive timeout instead of TCP_TIMEOUT.
+"""
+
+import time
+
+import pytest
+
+from app.exaplay.multiplexer import ExaPlayMultiplexer
+from app.exaplay.rtt import RttEstimator
+from app.exaplay.tcp_client import ExaPlayTCPClient, ExaPlayTimeoutError
+from app.tests.fixtures.mock_exaplay import MockExaPlayServer
+
+RTT_TEST_PORT = 17112
+
+
+class TestRttEstimator:
+    """Test cases for RttEstimator."""
+    
+    def test_maximum_until_first_sample(self) -> None:
+        """Test that an unmeasured host gets the full timeout."""
+        estimator = RttEstimator("test", minimum=0.1, maximum=5.0)
+        assert estimator.timeout() == 5.0
+        assert estimator.timeout(maximum=2.0) == 2.0
+    
+    def test_timeout_follows_smoothed_rtt_within_bounds(self) -> None:
+        """Test SRTT + 4 * RTTVAR, clamped to the configured bounds."""
+        estimator = RttEstimator("test", minimum=0.001, maximum=5.0)
+        for _ in range(50):
+            estimator.sample(0.010)
+        
+        assert estimator.timeout() == pytest.approx(0.011, abs=0.001)
+        
+        estimator.minimum = 0.25
+        assert estimator.timeout() == 0.25
+    
+    def test_timeouts_back_off_until_next_sample(self) -> None:
+        """Test that each reply timeout doubles the estimate and a sample resets it."""
+        estimator = RttEstimator("test", minimum=0.001, maximum=5.0)
+        estimator.sample(0.1)
+        base = estimator.timeout()
+        
+        estimator.on_timeout()
+        estimator.on_timeout()
+        assert estimator.timeout() == pytest.approx(base * 4)
+        assert estimator.stats()["timeouts"] == 2
+        
+        estimator.sample(0.1)
+        assert estimator.stats()["backoff"] == 1
+        assert estimator.timeout() < base * 4
+
+
+class TestAdaptiveClientTimeout:
+    """Test cases for adaptive reply timeouts in ExaPlayTCPClient."""
+    
+    async def test_lost_reply_fails_after_adaptive_timeout(self) -> None:
+        """Test that a lost reply is detected in well under TCP_TIMEOUT."""
+        async with MockExaPlayServer(port=RTT_TEST_PORT) as server:
+            client = ExaPlayTCPClient(host="127.0.0.1", port=RTT_TEST_PORT, timeout=5.0, max_retries=0)
+            for _ in range(5):
+                await client.send_command("get:ver")
+            assert client.rtt.stats()["samples"] >= 5
+            
+            server.silent_commands.add("get:status,lost")
+            start = time.monotonic()
+            with pytest.raises(ExaPlayTimeoutError, match="No reply within"):
+                await client.send_command("get:status,lost")
+            
+            assert time.monotonic() - start < 1.0
+            assert client.rtt.stats()["backoff"] == 2
+            await client.pool.close()
+    
+    async def test_lost_multiplexed_reply_resynchronises(self) -> None:
+        """Test that an adaptive timeout on the shared connection resyncs it, so later commands still succeed."""
+        async with MockExaPlayServer(port=RTT_TEST_PORT) as server:
+            client = ExaPlayTCPClient(host="127.0.0.1", port=RTT_TEST_PORT, timeout=5.0, max_retries=0, multiplex=True)
+            client.multiplexer = ExaPlayMultiplexer(client._connect, name="rtt-mux-test")
+            client.rtt = RttEstimator("rtt-mux-test", minimum=0.25, maximum=5.0)
+            for _ in range(5):
+                await client.send_command("get:ver")
+            
+            server.silent_commands.add("get:status,lost")
+            start = time.monotonic()
+            with pytest.raises(ExaPlayTimeoutError, match="No reply within"):
+                await client.send_command("get:status,lost")
+            
+            assert time.monotonic() - start < 1.0
+            stats = client.multiplexer.stats()
+            assert stats["resyncs"] == 1
+            assert stats["in_flight"] == 0
+            assert await client.send_command("get:vol,comp1") == "75"
+            await client.multiplexer.close()
@@ -0,0 +1,171 @@
+"""Tests for scheduled command execution.
+
+Covers firing at wall-clock and monotonic times, cancellation before and
+after connections were checked out, validation and the fire error histogram.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from httpx import AsyncClient
+
+from app.exaplay.fleet import get_host_registry
+from app.exaplay.scheduler import CommandScheduler, command_scheduler
+from app.settings import settings
+from app.tests.fixtures.mock_exaplay import MockExaPlayServer
+
+
+def in_seconds(seconds: float) -> str:
+    """ISO 8601 wall-clock time the given number of seconds from now."""
+    return (datetime.now(timezone.utc) + timedelta(seconds=seconds)).isoformat()
+
+
+async def wait_until_fired(entry_id: str) -> None:
+    """Wait until a scheduled entry has fired."""
+    entry = command_scheduler.get(entry_id)
+    for _ in range(200):
+        if entry.state == "done":
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Entry {entry_id} did not fire")
+
+
+class TestScheduleRoutes:
+    """Test cases for the /schedule endpoints."""
+    
+    async def test_commands_fire_at_wall_clock_time(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        mock_exaplay_server: MockExaPlayServer
+    ) -> None:
+        """Test that scheduled operations are sent together at their fire time."""
+        response = await async_client.post(
+            "/schedule",
+            json={
+                "commands": [{"op": "cue", "name": "sched1", "value": 2}, {"op": "play", "name": "sched1"}],
+                "at": in_seconds(0.2)
+            },
+            headers=auth_headers
+        )
+        assert response.status_code == 201
+        body = response.json()
+        assert body["state"] in ("pending", "firing")
+        assert body["commands"] == ["set:cue,sched1,2", "play,sched1"]
+        
+        await wait_until_fired(body["id"])
+        
+        entry = (await async_client.get(f"/schedule/{body['id']}", headers=auth_headers)).json()
+        assert entry["state"] == "done"
+        assert [result["status"] for result in entry["results"]] == ["ok", "ok"]
+        assert 0 <= entry["fireErrorMs"] < 50
+        assert entry["firedAt"] >= entry["fireAt"]
+        assert mock_exaplay_server.compositions["sched1"].state == 1
+        
+        stats = (await async_client.get("/exaplay/stats", headers=auth_headers)).json()["schedule"]
+        assert stats["fired"] >= 1
+        assert stats["fire_error_ms"]["buckets"]["+Inf"] == stats["fired"]
+    
+    async def test_monotonic_fire_time(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        mock_exaplay_server: MockExaPlayServer
+    ) -> None:
+        """Test scheduling against the server's monotonic clock from GET /schedule."""
+        listing = (await async_client.get("/schedule", headers=auth_headers)).json()
+        
+        response = await async_client.post(
+            "/schedule",
+            json={"commands": [{"op": "vol", "name": "sched2", "value": 33}], "monotonic": listing["serverMonotonic"] + 0.1},
+            headers=auth_headers
+        )
+        assert response.status_code == 201
+        
+        await wait_until_fired(response.json()["id"])
+        assert mock_exaplay_server.compositions["sched2"].volume == 33
+    
+    async def test_cancel_pending_entry(self, async_client: AsyncClient, auth_headers: dict) -> None:
+        """Test that a pending entry can be cancelled exactly once."""
+        response = await async_client.post(
+            "/schedule",
+            json={"commands": [{"op": "stop", "name": "sched3"}], "at": in_seconds(3600)},
+            headers=auth_headers
+        )
+        entry_id = response.json()["id"]
+        
+        cancelled = await async_client.delete(f"/schedule/{entry_id}", headers=auth_headers)
+        assert cancelled.status_code == 200
+        assert cancelled.json()["state"] == "cancelled"
+        
+        again = await async_client.delete(f"/schedule/{entry_id}", headers=auth_headers)
+        assert again.status_code == 409
+        
+        missing = await async_client.delete("/schedule/doesnotexist", headers=auth_headers)
+        assert missing.status_code == 404
+    
+    async def test_cancel_while_holding_connections(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        mock_exaplay_server: MockExaPlayServer,
+        monkeypatch
+    ) -> None:
+        """Test that cancelling before the fire time writes nothing and returns the connection."""
+        monkeypatch.setattr(settings, "schedule_prepare_lead", 1.0)
+        before = mock_exaplay_server.commands_received
+        
+        response = await async_client.post(
+            "/schedule",
+            json={"commands": [{"op": "play", "name": "sched4"}], "at": in_seconds(0.3)},
+            headers=auth_headers
+        )
+        entry_id = response.json()["id"]
+        await asyncio.sleep(0.1)
+        assert command_scheduler.get(entry_id).state == "firing"
+        
+        cancelled = await async_client.delete(f"/schedule/{entry_id}", headers=auth_headers)
+        await asyncio.sleep(0.3)
+        
+        assert cancelled.status_code == 200
+        assert mock_exaplay_server.commands_received == before
+        pool = get_host_registry().default.client.pool
+        assert pool.stats()["in_use"] == 0
+    
+    async def test_invalid_fire_times_rejected(self, async_client: AsyncClient, auth_headers: dict) -> None:
+        """Test that past, missing or ambiguous fire times are rejected."""
+        operation = [{"op": "play", "name": "sched5"}]
+        
+        past = await async_client.post(
+            "/schedule",
+            json={"commands": operation, "at": in_seconds(-5)},
+            headers=auth_headers
+        )
+        both = await async_client.post(
+            "/schedule",
+            json={"commands": operation, "at": in_seconds(5), "monotonic": 1.0},
+            headers=auth_headers
+        )
+        neither = await async_client.post("/schedule", json={"commands": operation}, headers=auth_headers)
+        
+        assert past.status_code == 400
+        assert "in the past" in past.json()["detail"]["error"]
+        assert both.status_code == neither.status_code == 400
+
+
+class TestFireErrorHistogram:
+    """Test cases for the scheduler's fire error histogram."""
+    
+    def test_buckets_are_cumulative(self) -> None:
+        """Test that each bucket counts every fire at most that late."""
+        scheduler = CommandScheduler()
+        for error in (0.00005, 0.0008, 0.003, 2.0):
+            scheduler._record_error(error)
+        
+        stats = scheduler.stats()["fire_error_ms"]
+        assert stats["buckets"]["0.1"] == 1
+        assert stats["buckets"]["1"] == 2
+        assert stats["buckets"]["5"] == 3
+        assert stats["buckets"]["1000"] == 3
+        assert stats["buckets"]["+Inf"] == 4
+        assert stats["max"] == 2000.0
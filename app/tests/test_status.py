@@ -7,7 +7,11 @@ ExaPlay server state and information.
 import pytest
 from httpx import AsyncClient
 
+from app.exaplay import fleet
+from app.exaplay.breaker import circuit_breakers
+from app.exaplay.fleet import FleetConfig, HostConfig, HostRegistry
 from app.tests.conftest import APITestHelper
+from app.tests.fixtures.mock_exaplay import MockExaPlayServer
 
 
 class TestStatusEndpoints:
@@ -241,6 +245,74 @@ class TestStatusEndpoints:
         assert status1["duration"] == status2["duration"] == status3["duration"]
 
 
+class TestBulkStatusEndpoint:
+    """Test cases for the bulk status endpoint."""
+    
+    async def test_bulk_status_and_volume(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        mock_exaplay_server: MockExaPlayServer
+    ) -> None:
+        """Test that several compositions are read in one request."""
+        mock_exaplay_server.compositions["timeline1"].volume = 40
+        
+        response = await async_client.get(
+            "/compositions/status?names=comp1,timeline1,comp1&fields=status,volume",
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        compositions = response.json()["compositions"]
+        assert list(compositions) == ["comp1", "timeline1"]
+        assert compositions["timeline1"]["volume"] == 40
+        assert compositions["timeline1"]["status"]["duration"] == 180.0
+        assert "errors" not in compositions["comp1"]
+    
+    async def test_bulk_status_reports_per_item_errors(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        mock_exaplay_server: MockExaPlayServer,
+        monkeypatch
+    ) -> None:
+        """Test that an unreachable host fails only its own compositions."""
+        monkeypatch.setattr(circuit_breakers, "_breakers", {})
+        registry = HostRegistry(FleetConfig(
+            default="node_a",
+            hosts={
+                "node_a": HostConfig(host="127.0.0.1", port=mock_exaplay_server.port),
+                "node_b": HostConfig(host="127.0.0.1", port=17111, max_retries=0, compositions=["remote_*"]),
+            }
+        ))
+        monkeypatch.setattr(fleet, "_registry", registry)
+        
+        response = await async_client.get(
+            "/compositions/status?names=comp1,remote_1",
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        compositions = response.json()["compositions"]
+        assert compositions["comp1"]["status"]["state"] in ("stopped", "playing", "paused")
+        assert "status" not in compositions["remote_1"]
+        assert "status" in compositions["remote_1"]["errors"]
+        for host in registry.hosts.values():
+            await host.client.pool.close()
+    
+    @pytest.mark.parametrize("query", ["names=,", "names=comp1&fields=duration", "fields=status"])
+    async def test_bulk_status_rejects_invalid_parameters(
+        self,
+        async_client: AsyncClient,
+        auth_headers: dict,
+        query: str
+    ) -> None:
+        """Test that empty names and unknown fields are client errors."""
+        response = await async_client.get(f"/compositions/status?{query}", headers=auth_headers)
+        
+        assert response.status_code == 400
+
+
 class TestAPIRootEndpoint:
     """Test cases for the API root information endpoint."""
     
@@ -0,0 +1,183 @@
+"""Tests for the WebSocket control-and-telemetry channel.
+
+Drives the /ws endpoint through an in-memory WebSocket: authentication,
+commands routed upstream with request ids, error replies, and pushed
+status events with subscription changes.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import AsyncGenerator, Optional
+
+import pytest
+
+from app.api.routes_ws import control_channel
+from app.exaplay.event_ring import EventRing
+from app.exaplay.osc_listener import osc_broadcaster
+from app.exaplay.osc_state import OSCStateStore
+from app.settings import settings
+from app.tests.fixtures.mock_exaplay import MockExaPlayServer
+
+
+class FakeWebSocket:
+    """In-memory stand-in for a Starlette WebSocket."""
+    
+    def __init__(self, headers: Optional[dict] = None, query_params: Optional[dict] = None) -> None:
+        self.headers = headers or {}
+        self.query_params = query_params or {}
+        self.client = SimpleNamespace(host="127.0.0.1")
+        self.url = SimpleNamespace(path="/ws")
+        self.state = SimpleNamespace()
+        self.accepted = False
+        self.close_code: Optional[int] = None
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        self.outbox: asyncio.Queue = asyncio.Queue()
+    
+    async def accept(self) -> None:
+        self.accepted = True
+    
+    async def close(self, code: int = 1000) -> None:
+        self.close_code = code
+    
+    async def receive(self) -> dict:
+        return await self.inbox.get()
+    
+    async def send_text(self, text: str) -> None:
+        await self.outbox.put(json.loads(text))
+    
+    def send_frame(self, frame: dict) -> None:
+        """Queue a frame from the client."""
+        self.inbox.put_nowait({"type": "websocket.receive", "text": json.dumps(frame)})
+    
+    async def next_frame(self) -> dict:
+        """Wait for the next frame sent by the server."""
+        return await asyncio.wait_for(self.outbox.get(), timeout=2.0)
+
+
+@pytest.fixture
+async def channel(auth_headers: dict) -> AsyncGenerator[FakeWebSocket, None]:
+    """Provide a connected, authenticated channel (hello frame consumed)."""
+    websocket = FakeWebSocket(headers=auth_headers)
+    task = asyncio.create_task(control_channel(websocket))
+    hello = await websocket.next_frame()
+    assert hello["type"] == "hello"
+    try:
+        yield websocket
+    finally:
+        websocket.inbox.put_nowait({"type": "websocket.disconnect"})
+        await asyncio.wait_for(task, timeout=2.0)
+
+
+@pytest.fixture
+def fresh_broadcaster(monkeypatch) -> None:
+    """Enable OSC events on the global broadcaster with an empty ring and state."""
+    monkeypatch.setattr(settings, "exaplay_osc_enable", True)
+    monkeypatch.setattr(osc_broadcaster, "ring", EventRing(64))
+    monkeypatch.setattr(osc_broadcaster, "state", OSCStateStore())
+    monkeypatch.setattr(osc_broadcaster, "_clients", set())
+
+
+class TestAuthentication:
+    """Test cases for the WebSocket handshake."""
+    
+    async def test_missing_or_wrong_key_is_rejected(self) -> None:
+        """Test that the connection is closed with a policy violation before accepting."""
+        for websocket in (FakeWebSocket(), FakeWebSocket(query_params={"token": "wrong"})):
+            await control_channel(websocket)
+            
+            assert not websocket.accepted
+            assert websocket.close_code == 1008
+    
+    async def test_token_query_parameter(self, mock_exaplay_server: MockExaPlayServer) -> None:
+        """Test that browsers can authenticate with the token query parameter."""
+        websocket = FakeWebSocket(query_params={"token": settings.api_key})
+        task = asyncio.create_task(control_channel(websocket))
+        
+        assert (await websocket.next_frame())["type"] == "hello"
+        websocket.inbox.put_nowait({"type": "websocket.disconnect"})
+        await asyncio.wait_for(task, timeout=2.0)
+
+
+class TestCommands:
+    """Test cases for commands sent over the channel."""
+    
+    async def test_commands_reach_exaplay(self, channel: FakeWebSocket, mock_exaplay_server: MockExaPlayServer) -> None:
+        """Test play, seek and volume commands with request ids echoed in the replies."""
+        channel.send_frame({"id": "r1", "op": "play", "name": "ws1"})
+        channel.send_frame({"id": "r2", "op": "seek", "name": "ws1", "value": 12.5})
+        channel.send_frame({"id": "r3", "op": "vol", "name": "ws1", "value": 40})
+        
+        replies = {}
+        for _ in range(3):
+            frame = await channel.next_frame()
+            replies[frame["id"]] = frame
+        
+        assert replies["r1"] == {"type": "reply", "id": "r1", "ok": True, "sent": "play,ws1", "reply": "OK"}
+        assert replies["r2"]["sent"] == "set:cuetime,ws1,12.5"
+        assert replies["r3"]["ok"] and replies["r3"]["coalesced"] is False
+        assert mock_exaplay_server.compositions["ws1"].volume == 40
+    
+    async def test_invalid_frames_get_error_replies(self, channel: FakeWebSocket) -> None:
+        """Test that malformed frames and invalid values are answered with 400 replies."""
+        channel.inbox.put_nowait({"type": "websocket.receive", "text": "not json"})
+        channel.send_frame({"id": "r4", "op": "vol", "name": "ws1", "value": 150})
+        channel.send_frame({"id": "r5", "op": "jump", "name": "ws1"})
+        
+        invalid = await channel.next_frame()
+        assert invalid["ok"] is False and invalid["status"] == 400
+        for request_id in ("r4", "r5"):
+            frame = await channel.next_frame()
+            assert frame["id"] == request_id
+            assert frame["status"] == 400
+    
+    async def test_upstream_errors_map_like_rest(self, channel: FakeWebSocket, mock_exaplay_server: MockExaPlayServer) -> None:
+        """Test that an ExaPlay error carries the status code of the REST route."""
+        channel.send_frame({"id": "r6", "op": "seek", "name": "ws1", "value": 99999})
+        
+        frame = await channel.next_frame()
+        
+        assert frame["ok"] is False
+        assert frame["status"] == 422
+        assert frame["sent"] == "set:cuetime,ws1,99999.0"
+
+
+class TestEvents:
+    """Test cases for status events pushed over the channel."""
+    
+    async def test_events_and_subscription(self, fresh_broadcaster, channel: FakeWebSocket) -> None:
+        """Test that status events are pushed, and a subscription narrows them to one composition."""
+        osc_broadcaster._handle_status_update("/exaplay/status/comp1", 1)
+        await asyncio.sleep(0)
+        
+        event = await channel.next_frame()
+        assert event == {
+            "type": "event",
+            "event": "status",
+            "eventId": 1,
+            "data": {"composition": "comp1", "status": 1, "cuetime": 0.0, "cueframe": 0}
+        }
+        
+        channel.send_frame({"id": "s1", "op": "subscribe", "compositions": ["comp2"]})
+        assert await channel.next_frame() == {"type": "reply", "id": "s1", "ok": True}
+        
+        osc_broadcaster._handle_cuetime_update("/exaplay/cuetime/comp1", 5.0)
+        osc_broadcaster._handle_cuetime_update("/exaplay/cuetime/comp2", 6.0)
+        await asyncio.sleep(0)
+        
+        event = await channel.next_frame()
+        assert event["data"]["composition"] == "comp2"
+        assert event["eventId"] == 3
+        assert channel.outbox.empty()
+    
+    async def test_rate_capped_subscription_without_filters(self, fresh_broadcaster, channel: FakeWebSocket) -> None:
+        """Test that a maxHz-only subscription still pushes events of every composition."""
+        channel.send_frame({"id": "s2", "op": "subscribe", "maxHz": 5})
+        assert await channel.next_frame() == {"type": "reply", "id": "s2", "ok": True}
+        
+        osc_broadcaster._handle_status_update("/exaplay/status/comp1", 1)
+        osc_broadcaster._handle_status_update("/exaplay/status/comp2", 2)
+        await asyncio.sleep(0)
+        
+        compositions = {(await channel.next_frame())["data"]["composition"] for _ in range(2)}
+        assert compositions == {"comp1", "comp2"}
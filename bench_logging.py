@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Benchmark event-loop time spent logging, synchronous vs LOG_ASYNC.
+
+Emits the log lines of a typical control request (request started,
+operation completed, command completed, request completed) from a
+coroutine and reports the time the event loop spent per request inside
+logging calls. Output goes to a temporary file so that terminal speed
+does not skew the numbers.
+
+Usage:
+    python bench_logging.py [requests]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("API_KEY", "benchmark-api-key-benchmark-api-key")
+os.environ.setdefault("LOG_LEVEL", "INFO")
+
+from app import logging as app_logging  # noqa: E402
+from app.settings import settings  # noqa: E402
+
+
+async def emit(requests: int) -> float:
+    """Log the lines of `requests` control requests and return seconds spent."""
+    logger = app_logging.get_logger(f"app.bench.{time.perf_counter_ns()}")
+    start = time.perf_counter()
+    for i in range(requests):
+        with app_logging.RequestLoggingContext(trace_id=f"{i:032x}"):
+            logger.info("Request started", method="POST", path="/compositions/comp1/play", client_ip="127.0.0.1")
+            logger.info(
+                "Operation completed",
+                operation="tcp_command",
+                latency_ms=0.84,
+                outcome="success",
+                command="play,comp1",
+                attempt=1
+            )
+            logger.info("Command completed successfully", command="play,comp1", reply="OK", attempt=1)
+            logger.info("Request completed", method="POST", path="/compositions/comp1/play", status_code=200)
+        if i % 100 == 0:
+            # Let the loop breathe as it would between requests
+            await asyncio.sleep(0)
+    return time.perf_counter() - start
+
+
+def run(mode: str, requests: int, sample_rates: dict) -> None:
+    """Benchmark one logging configuration and print per-request loop time."""
+    settings.log_sample_rates = sample_rates
+    with tempfile.TemporaryFile("w+") as sink:
+        app_logging.configure_logging(log_async=(mode != "sync"), stream=sink)
+        elapsed = asyncio.run(emit(requests))
+        flush_start = time.perf_counter()
+        app_logging.shutdown_logging()
+        drain = time.perf_counter() - flush_start
+        sink.seek(0)
+        lines = sum(1 for _ in sink)
+    print(
+        f"{mode:<22} {elapsed / requests * 1e6:8.1f} us/request on the loop"
+        f"   ({lines} lines written, {drain * 1000:.1f} ms left to drain at exit)"
+    )
+
+
+def main() -> None:
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"{requests} requests x 4 INFO lines, LOG_FORMAT={settings.log_format}")
+    run("sync", requests, {})
+    run("async", requests, {})
+    run("async + sampled 1/10", requests, {"Command completed successfully": 0.1, "Operation completed": 0.1})
+
+
+if __name__ == "__main__":
+    main()